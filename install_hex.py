@@ -3,11 +3,13 @@
 Hex Installer - kör SQL-filer i beroendeordning
 Användning:
     python install_hex.py              # Installera alla konfigurerade databaser
-    python install_hex.py --upgrade    # Uppgradera (bevarar inställningar, avinstallerar och installerar om)
+    python install_hex.py --upgrade    # Uppgradera på plats (nya migreringar och ändrade SQL-filer)
+    python install_hex.py --reinstall  # Fullständig ominstallation (bevarar inställningar, avinstallerar och installerar om)
     python install_hex.py --uninstall  # Ta bort alla Hex-objekt från alla databaser
 """
 
 import argparse
+import hashlib
 import re
 import psycopg2
 from psycopg2 import sql as pgsql
@@ -68,8 +70,17 @@ INSTALL_ORDER = [
     "src/sql/02_tables/hex_dummy_geometrier.sql",
     "src/sql/02_tables/hex_avvikande_srid.sql",
     "src/sql/02_tables/hex_role_credentials.sql",
+    "src/sql/02_tables/hex_geoserver_handelser.sql",
+    "src/sql/02_tables/hex_installningar.sql",
+    # hex_installning() läser hex_installningar – måste skapas efter tabellen
+    "src/sql/00_config/hex_installning.sql",
+    "src/sql/02_tables/hex_uppskjuten_omstrukturering.sql",
+    "src/sql/02_tables/hex_schema_matchningar.sql",
+    "src/sql/02_tables/hex_historik_gallring.sql",
+    "src/sql/02_tables/hex_version.sql",
     # Funktioner - Struktur
     "src/sql/03_functions/01_structure/hamta_geometri_definition.sql",
+    "src/sql/03_functions/01_structure/hamta_kolumnbeskrivning.sql",
     "src/sql/03_functions/01_structure/hamta_kolumnstandard.sql",
     # Funktioner - Validering
     "src/sql/03_functions/02_validation/validera_tabell.sql",
@@ -78,6 +89,7 @@ INSTALL_ORDER = [
     "src/sql/03_functions/02_validation/blockera_schema_namnbyte.sql",
     "src/sql/03_functions/02_validation/validera_geometri.sql",
     "src/sql/03_functions/02_validation/forklara_geometrifel.sql",
+    "src/sql/03_functions/02_validation/granska_geometrier.sql",
     # Funktioner - Regler
     "src/sql/03_functions/03_rules/spara_tabellregler.sql",
     "src/sql/03_functions/03_rules/spara_kolumnegenskaper.sql",
@@ -85,8 +97,18 @@ INSTALL_ORDER = [
     "src/sql/03_functions/03_rules/aterskapa_kolumnegenskaper.sql",
     # Funktioner - Verktyg
     "src/sql/03_functions/04_utility/byt_ut_tabell.sql",
+    "src/sql/03_functions/04_utility/flytta_kolumner_sist.sql",
+    "src/sql/03_functions/04_utility/ar_stor_tabell.sql",
+    "src/sql/03_functions/04_utility/kor_uppskjuten_omstrukturering.sql",
+    "src/sql/03_functions/04_utility/gallra_historik.sql",
+    "src/sql/03_functions/04_utility/uppdatera_schema_matchningar.sql",
     "src/sql/03_functions/04_utility/uppdatera_sekvensnamn.sql",
+    "src/sql/03_functions/04_utility/vaxla_qa_triggrar.sql",
+    "src/sql/03_functions/04_utility/skapa_qa_trigger.sql",
+    "src/sql/03_functions/04_utility/skapa_historikpartitioner.sql",
+    "src/sql/03_functions/04_utility/skapa_historikindex.sql",
     "src/sql/03_functions/04_utility/skapa_historik_qa.sql",
+    "src/sql/03_functions/04_utility/skapa_geometrivalidering.sql",
     "src/sql/03_functions/04_utility/tilldela_rollrattigheter.sql",
     "src/sql/03_functions/04_utility/tillampa_grupprattigheter.sql",
     "src/sql/03_functions/04_utility/tvinga_gid_fran_sekvens.sql",
@@ -103,6 +125,8 @@ INSTALL_ORDER = [
     "src/sql/03_functions/05_trigger_functions/hantera_borttagen_tabell.sql",
     "src/sql/03_functions/05_trigger_functions/notifiera_geoserver.sql",
     "src/sql/03_functions/05_trigger_functions/notifiera_geoserver_borttagning.sql",
+    "src/sql/03_functions/05_trigger_functions/notifiera_schemakonfiguration.sql",
+    "src/sql/03_functions/05_trigger_functions/uppdatera_schema_matchningar_trigger.sql",
     # Triggers
     "src/sql/04_triggers/hantera_ny_tabell_trigger.sql",
     "src/sql/04_triggers/hantera_kolumntillagg_trigger.sql",
@@ -114,8 +138,15 @@ INSTALL_ORDER = [
     "src/sql/04_triggers/blockera_schema_namnbyte_trigger.sql",
     "src/sql/04_triggers/notifiera_geoserver_trigger.sql",
     "src/sql/04_triggers/notifiera_geoserver_borttagning_trigger.sql",
+    "src/sql/04_triggers/notifiera_schemakonfiguration_trigger.sql",
+    "src/sql/04_triggers/uppdatera_schema_matchningar_trigger.sql",
 ]
 
+# Engångsmigreringar (NNN_beskrivning.sql) för ändringar som inte går att göra
+# genom att köra om en fil ovan, t.ex. ny kolumn i en befintlig tabell.
+# Se src/sql/migrations/README.md.
+MIGRATIONS_DIR = "src/sql/migrations"
+
 # =============================================================================
 # AVINSTALLATION - omvänd ordning, DROP-satser
 # =============================================================================
@@ -134,6 +165,8 @@ DROP EVENT TRIGGER IF EXISTS hantera_ny_tabell_trigger;
 DROP EVENT TRIGGER IF EXISTS hantera_borttagen_tabell_trigger;
 
 -- Triggerfunktioner
+DROP FUNCTION IF EXISTS public.uppdatera_schema_matchningar_trigger() CASCADE;
+DROP FUNCTION IF EXISTS public.notifiera_schemakonfiguration() CASCADE;
 DROP FUNCTION IF EXISTS public.notifiera_geoserver_borttagning();
 DROP FUNCTION IF EXISTS public.notifiera_geoserver();
 DROP FUNCTION IF EXISTS public.hantera_standardiserade_roller();
@@ -153,8 +186,17 @@ DROP FUNCTION IF EXISTS public.underhall_hex();
 DROP FUNCTION IF EXISTS public.reparera_rad_triggers();
 DROP FUNCTION IF EXISTS public.tilldela_rollrattigheter(text, text, text);
 DROP FUNCTION IF EXISTS public.skapa_historik_qa(text, text);
+DROP FUNCTION IF EXISTS public.skapa_qa_trigger(text, text, text);
+DROP FUNCTION IF EXISTS public.vaxla_qa_triggrar(regclass, boolean);
+DROP FUNCTION IF EXISTS public.skapa_historikpartitioner(text, text, text, integer);
+DROP FUNCTION IF EXISTS public.skapa_historikindex(text, text, text);
+DROP FUNCTION IF EXISTS public.skapa_geometrivalidering(text, text, text, boolean);
 DROP FUNCTION IF EXISTS public.uppdatera_sekvensnamn(text, text, text);
 DROP FUNCTION IF EXISTS public.byt_ut_tabell(text, text, text);
+DROP PROCEDURE IF EXISTS public.kor_uppskjuten_omstrukturering(integer);
+DROP PROCEDURE IF EXISTS public.gallra_historik(integer, text);
+DROP FUNCTION IF EXISTS public.ar_stor_tabell(text, text);
+DROP FUNCTION IF EXISTS public.flytta_kolumner_sist(text, text, text[], text[]);
 
 -- Regelfunktioner
 DROP FUNCTION IF EXISTS public.aterskapa_kolumnegenskaper(text, text, kolumnegenskaper);
@@ -163,6 +205,7 @@ DROP FUNCTION IF EXISTS public.spara_kolumnegenskaper(text, text);
 DROP FUNCTION IF EXISTS public.spara_tabellregler(text, text);
 
 -- Valideringsfunktioner
+DROP FUNCTION IF EXISTS public.granska_geometrier(text, text);
 DROP FUNCTION IF EXISTS public.forklara_geometrifel(geometry);
 DROP FUNCTION IF EXISTS public.validera_geometri(geometry) CASCADE;
 DROP FUNCTION IF EXISTS public.validera_schemanamn();
@@ -172,16 +215,26 @@ DROP FUNCTION IF EXISTS public.validera_tabell(text, text);
 
 -- Strukturfunktioner
 DROP FUNCTION IF EXISTS public.hamta_kolumnstandard(text, text, geom_info);
+DROP FUNCTION IF EXISTS public.hamta_kolumnbeskrivning(regclass);
 DROP FUNCTION IF EXISTS public.hamta_geometri_definition(text, text);
 
 -- Konfigurationsfunktioner
 DROP FUNCTION IF EXISTS public.hex_schema_regex();
+DROP FUNCTION IF EXISTS public.hex_installning(text, text);
+DROP FUNCTION IF EXISTS public.hamta_schema_matchningar(text, text);
+DROP FUNCTION IF EXISTS public.uppdatera_schema_matchningar(text, text);
 DROP FUNCTION IF EXISTS public.system_owner();
 -- OBS: hex_geoserver_roller tas INTE bort här. Rollen är kluster-nivå och delas
 -- av alla databaser som kör Hex. Om du avinstallerar Hex från alla databaser och
 -- vill ta bort rollen helt, kör manuellt: DROP ROLE hex_geoserver_roller;
 
 -- Tabeller
+DROP TABLE IF EXISTS public.hex_version;
+DROP TABLE IF EXISTS public.hex_historik_gallring;
+DROP TABLE IF EXISTS public.hex_schema_matchningar;
+DROP TABLE IF EXISTS public.hex_uppskjuten_omstrukturering;
+DROP TABLE IF EXISTS public.hex_installningar;
+DROP TABLE IF EXISTS public.hex_geoserver_handelser;
 DROP TABLE IF EXISTS public.hex_role_credentials;
 DROP TABLE IF EXISTS public.hex_avvikande_srid;
 DROP TABLE IF EXISTS public.hex_dummy_geometrier;
@@ -223,6 +276,10 @@ PRESERVE_CONFIG = {
         "key": "rollnamn",
         "restore": ["rolltyp", "schema_uttryck", "ta_bort_med_schema", "with_login", "arvs_fran", "beskrivning"],
     },
+    "hex_installningar": {
+        "key": "nyckel",
+        "restore": ["varde"],
+    },
 }
 
 # Purely user-managed tables — no system defaults; fully re-inserted on upgrade.
@@ -231,6 +288,20 @@ PRESERVE_USER_DATA = {
     "hex_systemanvandare": ["anvandare", "beskrivning"],
     "hex_grupprattigheter": ["ad_grupproll", "hex_roll", "beskrivning"],
     "hex_role_credentials": ["rolname", "password", "rolcanlogin"],
+    "hex_uppskjuten_omstrukturering": [
+        "schema_namn", "tabell_namn", "atgard", "kolumner", "definitioner", "index_namn",
+        "constraint_namn", "registrerad", "registrerad_av", "forsok", "senaste_fel",
+    ],
+    "hex_historik_gallring": ["schema_prefix", "tabell_namn", "bevara_dagar", "atgard", "beskrivning"],
+    "hex_geoserver_handelser": ["schema_namn", "handelse", "skapad", "forsok", "senaste_fel"],
+}
+
+# Row filter/order for PRESERVE_USER_DATA tables where only part of the table
+# is carried across. Pending GeoServer outbox events are kept in queue order
+# (new ids are assigned in the same order on restore) so the listener replays
+# them after a reinstall; processed events are dropped with the table.
+PRESERVE_USER_DATA_WHERE = {
+    "hex_geoserver_handelser": "WHERE behandlad IS NULL ORDER BY id",
 }
 
 # =============================================================================
@@ -289,6 +360,49 @@ def process_sql(sql: str, owner_role: str | None) -> str:
     return re.sub(r'OWNER TO \w+', f'OWNER TO {owner_role}', sql, flags=re.IGNORECASE)
 
 
+def _checksum(sql: str) -> str:
+    """sha256 av bearbetad SQL-text - det som registreras i hex_version."""
+    return hashlib.sha256(sql.encode('utf-8')).hexdigest()
+
+
+def _migration_files(base_path=".") -> list:
+    """Migreringsfiler (NNN_*.sql) i namnordning, som sökvägar relativt base_path."""
+    directory = Path(base_path) / MIGRATIONS_DIR
+    if not directory.is_dir():
+        return []
+    return [f"{MIGRATIONS_DIR}/{p.name}" for p in sorted(directory.glob("[0-9][0-9][0-9]_*.sql"))]
+
+
+def _system_owner_sql(effective_owner: str) -> str:
+    """SQL för system_owner(), som genereras av installern i stället för att läsas från fil."""
+    return f"""
+CREATE OR REPLACE FUNCTION public.system_owner()
+    RETURNS text
+    LANGUAGE 'sql'
+    IMMUTABLE
+AS $BODY$
+    SELECT '{effective_owner}'::text;
+$BODY$;
+
+ALTER FUNCTION public.system_owner() OWNER TO postgres;
+
+COMMENT ON FUNCTION public.system_owner()
+    IS 'Returnerar ägarrollen för Hex-skapade roller. Genererad av installer.';
+"""
+
+
+def _record_version(cur, component: str, kind: str, checksum: str):
+    """Registrerar en installerad fil eller migrering i hex_version."""
+    cur.execute(
+        "INSERT INTO public.hex_version (komponent, typ, kontrollsumma)"
+        " VALUES (%s, %s, %s)"
+        " ON CONFLICT (komponent) DO UPDATE"
+        " SET typ = EXCLUDED.typ, kontrollsumma = EXCLUDED.kontrollsumma,"
+        "     installerad = now(), installerad_av = session_user",
+        (component, kind, checksum),
+    )
+
+
 # =============================================================================
 # UPGRADE HELPERS
 # =============================================================================
@@ -320,9 +434,10 @@ def snapshot_settings(cur) -> dict:
         if not available_cols:
             continue
         cur.execute(
-            pgsql.SQL("SELECT {} FROM public.{}").format(
+            pgsql.SQL("SELECT {} FROM public.{} {}").format(
                 pgsql.SQL(", ").join(pgsql.Identifier(c) for c in available_cols),
                 pgsql.Identifier(table),
+                pgsql.SQL(PRESERVE_USER_DATA_WHERE.get(table, "")),
             )
         )
         snapshot[table] = {"rows": cur.fetchall(), "cols": available_cols}
@@ -427,10 +542,14 @@ def restore_settings(cur, snapshot: dict):
             )
 
 
-def upgrade(db: dict, base_path="."):
-    """Sparar inställningar, avinstallerar, installerar om och återställer inställningar."""
+def reinstall(db: dict, base_path="."):
+    """Sparar inställningar, avinstallerar, installerar om och återställer inställningar.
+
+    Fullständig ominstallation: under avinstallationen saknas event-triggrarna,
+    så DDL i andra sessioner hanteras inte. Använd upgrade() när hex_version finns.
+    """
     print("=" * 60)
-    print(f"Hex Uppgradering - {_label(db)}")
+    print(f"Hex Ominstallation - {_label(db)}")
     print("=" * 60)
 
     # Snapshot before uninstall
@@ -468,6 +587,117 @@ def upgrade(db: dict, base_path="."):
         conn.close()
 
 
+def upgrade(db: dict, base_path="."):
+    """Uppgraderar på plats: kör nya migreringar och ändrade SQL-filer i en transaktion.
+
+    Jämför kontrollsummorna i hex_version med källkoden. Inget avinstalleras -
+    konfigurationstabellerna behåller sina rader och event-triggrar som byts ut
+    (DROP + CREATE i samma fil) är synliga för andra sessioner först vid COMMIT,
+    så DDL hanteras hela tiden. Databaser utan hex_version (installerade före
+    uppgraderingsstödet) ominstalleras en gång med reinstall().
+    """
+    owner_role = db.get("owner_role")
+
+    conn = psycopg2.connect(**_conn_params(db))
+    conn.set_client_encoding('UTF8')
+    cur = conn.cursor()
+    try:
+        has_version = _table_exists(cur, "hex_version")
+        has_hex = _table_exists(cur, "hex_metadata")
+    finally:
+        cur.close()
+        conn.close()
+
+    if not has_version:
+        if has_hex:
+            print(f"{_label(db)}: hex_version saknas - installationen är äldre än "
+                  "uppgradering på plats. Gör en fullständig ominstallation (en gång).")
+            return reinstall(db, base_path)
+        print(f"{_label(db)}: Hex är inte installerat - gör en ny installation.")
+        return install(db, base_path)
+
+    print("=" * 60)
+    print(f"Hex Uppgradering - {_label(db)}")
+    print("=" * 60)
+
+    conn = psycopg2.connect(**_conn_params(db))
+    conn.set_client_encoding('UTF8')
+    cur = conn.cursor()
+
+    try:
+        # En uppgradering åt gången per databas; vänta inte länge på lås som
+        # hålls av pågående arbete - hellre avbryta och köra igen.
+        cur.execute("SET LOCAL lock_timeout = '10s'")
+        cur.execute("LOCK TABLE public.hex_version IN EXCLUSIVE MODE")
+
+        # Hex egna ALTER/CREATE i migreringarna ska inte hanteras av event-triggrarna
+        cur.execute("SELECT set_config('temp.reorganization_in_progress', 'true', true)")
+        cur.execute("SELECT set_config('temp.tabellstrukturering_pagar', 'true', true)")
+
+        cur.execute("SELECT komponent, kontrollsumma FROM public.hex_version")
+        recorded = dict(cur.fetchall())
+
+        cur.execute(_system_owner_sql(owner_role or 'postgres'))
+
+        migrated = 0
+        for migration in _migration_files(base_path):
+            path = Path(base_path) / migration
+            sql = process_sql(path.read_text(encoding='utf-8'), owner_role)
+            checksum = _checksum(sql)
+            if migration in recorded:
+                if recorded[migration] != checksum:
+                    print(f"  Varning: {path.name} har ändrats efter att den körts - körs inte igen.")
+                continue
+
+            print(f"Migrerar {path.name}...")
+            cur.execute(sql)
+            _record_version(cur, migration, 'migrering', checksum)
+            migrated += 1
+
+        updated = 0
+        for sql_file in INSTALL_ORDER:
+            path = Path(base_path) / sql_file
+            if not path.exists():
+                raise FileNotFoundError(f"Saknas: {sql_file}")
+
+            sql = process_sql(path.read_text(encoding='utf-8'), owner_role)
+            checksum = _checksum(sql)
+            if recorded.get(sql_file) == checksum:
+                continue
+
+            print(f"Uppdaterar {path.name}...")
+            cur.execute(sql)
+            _record_version(cur, sql_file, 'fil', checksum)
+            updated += 1
+
+        # Filer som inte längre ingår - objekten tas bort av en migrering
+        cur.execute(
+            "DELETE FROM public.hex_version WHERE typ = 'fil' AND NOT komponent = ANY(%s)",
+            (INSTALL_ORDER,),
+        )
+
+        # Commit bara om allt lyckas
+        conn.commit()
+        print("=" * 60)
+        print(f"{migrated} migrering(ar) och {updated} fil(er) uppdaterade, "
+              f"{len(INSTALL_ORDER) - updated} fil(er) oförändrade.")
+        print("=" * 60)
+
+        if migrated or updated:
+            _run_maintenance(conn, cur)
+
+        print("+++Upgrade Complete+++")
+
+    except Exception as e:
+        conn.rollback()
+        print(f"MISSLYCKADES: {e}")
+        print("Transaktionen återställd - inga ändringar gjorda.")
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+
 # =============================================================================
 # INSTALLATION
 # =============================================================================
@@ -497,6 +727,34 @@ def uninstall(db: dict):
         conn.close()
 
 
+def _run_maintenance(conn, cur):
+    """Kör underhall_hex() efter installation eller uppgradering.
+
+    Separat transaktion så att ett fel här aldrig rullar tillbaka
+    huvudinstallationen.
+    """
+    print("Underhåller Hex-struktur (triggers, roller, behörigheter)...")
+    try:
+        cur.execute(
+            "SELECT schema_namn, tabell_namn, trigger_namn, atgard"
+            " FROM public.underhall_hex()"
+        )
+        rows = cur.fetchall()
+        conn.commit()
+        created = [(s, t, tr, a) for s, t, tr, a in rows if a not in ("redan finns",)]
+        if created:
+            for s, t, tr, a in created:
+                prefix = f"{s}." if s and s != "-" else ""
+                print(f"  ✓ {prefix}{t} → {tr} ({a})")
+            print(f"  {len(created)} åtgärd(er) genomförda.")
+        else:
+            print("  Inga åtgärder behövdes.")
+    except Exception as repair_err:
+        conn.rollback()
+        print(f"  Varning: underhåll misslyckades: {repair_err}")
+        print("  Hex är installerat. Kör SELECT * FROM public.underhall_hex() manuellt.")
+
+
 def install(db: dict, base_path="."):
     """Installerar alla Hex-komponenter till en databas."""
     owner_role = db.get("owner_role")
@@ -529,24 +787,11 @@ def install(db: dict, base_path="."):
             raise ValueError(f"owner_role '{effective_owner}' finns inte i databasen")
 
         # Skapa system_owner()-funktionen dynamiskt
-        system_owner_sql = f"""
-CREATE OR REPLACE FUNCTION public.system_owner()
-    RETURNS text
-    LANGUAGE 'sql'
-    IMMUTABLE
-AS $BODY$
-    SELECT '{effective_owner}'::text;
-$BODY$;
-
-ALTER FUNCTION public.system_owner() OWNER TO postgres;
-
-COMMENT ON FUNCTION public.system_owner()
-    IS 'Returnerar ägarrollen för Hex-skapade roller. Genererad av installer.';
-"""
         print("Installerar system_owner()...")
-        cur.execute(system_owner_sql)
+        cur.execute(_system_owner_sql(effective_owner))
         installed += 1
 
+        checksums = {}
         for sql_file in INSTALL_ORDER:
             path = Path(base_path) / sql_file
             if not path.exists():
@@ -555,8 +800,17 @@ COMMENT ON FUNCTION public.system_owner()
             print(f"Installerar {path.name}...")
             sql = process_sql(path.read_text(encoding='utf-8'), owner_role)
             cur.execute(sql)
+            checksums[sql_file] = _checksum(sql)
             installed += 1
 
+        # Registrera versionen. Basfilerna motsvarar redan alla migreringar,
+        # så de registreras som genomförda utan att köras.
+        for sql_file, checksum in checksums.items():
+            _record_version(cur, sql_file, 'fil', checksum)
+        for migration in _migration_files(base_path):
+            sql = process_sql((Path(base_path) / migration).read_text(encoding='utf-8'), owner_role)
+            _record_version(cur, migration, 'migrering', _checksum(sql))
+
         # Commit bara om allt lyckas
         conn.commit()
         print("=" * 60)
@@ -564,28 +818,8 @@ COMMENT ON FUNCTION public.system_owner()
         print("=" * 60)
 
         # Underhåll: verifiera och reparera triggers, roller och behörigheter
-        # på befintliga tabeller och scheman (separat steg så att ett fel här
-        # aldrig rullar tillbaka huvudinstallationen).
-        print("Underhåller Hex-struktur (triggers, roller, behörigheter)...")
-        try:
-            cur.execute(
-                "SELECT schema_namn, tabell_namn, trigger_namn, atgard"
-                " FROM public.underhall_hex()"
-            )
-            rows = cur.fetchall()
-            conn.commit()
-            created = [(s, t, tr, a) for s, t, tr, a in rows if a not in ("redan finns",)]
-            if created:
-                for s, t, tr, a in created:
-                    prefix = f"{s}." if s and s != "-" else ""
-                    print(f"  ✓ {prefix}{t} → {tr} ({a})")
-                print(f"  {len(created)} åtgärd(er) genomförda.")
-            else:
-                print("  Inga åtgärder behövdes.")
-        except Exception as repair_err:
-            conn.rollback()
-            print(f"  Varning: underhåll misslyckades: {repair_err}")
-            print("  Hex är installerat. Kör SELECT * FROM public.underhall_hex() manuellt.")
+        # på befintliga tabeller och scheman.
+        _run_maintenance(conn, cur)
 
         print("+++Anthill Inside+++")
 
@@ -607,7 +841,8 @@ COMMENT ON FUNCTION public.system_owner()
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Hex Installation")
     parser.add_argument("--uninstall", action="store_true", help="Ta bort alla Hex-objekt")
-    parser.add_argument("--upgrade", action="store_true", help="Spara inställningar, avinstallera, installera om och återställ")
+    parser.add_argument("--upgrade", action="store_true", help="Uppgradera på plats: kör nya migreringar och ändrade SQL-filer")
+    parser.add_argument("--reinstall", action="store_true", help="Spara inställningar, avinstallera, installera om och återställ")
     args = parser.parse_args()
 
     if args.uninstall:
@@ -616,6 +851,9 @@ if __name__ == "__main__":
     elif args.upgrade:
         action_name = "Uppgradering"
         def action(db): return upgrade(db)
+    elif args.reinstall:
+        action_name = "Ominstallation"
+        def action(db): return reinstall(db)
     else:
         action_name = "Installation"
         def action(db): return install(db)
@@ -21,9 +21,13 @@ Processen lyssnar på två PostgreSQL-kanaler och hanterar schema-händelser aut
 Båda kanalerna hanterar enbart scheman vars skyddsnivå har publiceras_geoserver = true
 i tabellen standardiserade_skyddsnivaer. Standardkonfigurationen publicerar sk0 och sk1;
 övriga prefix (sk2, skx m.fl.) kan aktiveras genom att sätta publiceras_geoserver = true
-för respektive rad. Mönstret laddas om dynamiskt vid varje notifiering.
+för respektive rad. Mönstret cachas per databas och läses om när konfigurationen ändras.
 
-Stödjer flera databaser - en lyssnartråd per databas.
+Stödjer flera databaser - en gemensam lyssnartråd gör select() över alla
+LISTEN-anslutningar och lämnar notifieringarna till en begränsad arbetspool
+(HEX_WORKER_COUNT) där olika scheman hanteras parallellt medan händelser för
+samma schema körs i tur och ordning. Arbetare och avstämning lånar anslutningar
+ur en liten pool per databas (HEX_PG_POOL_SIZE).
 Konfiguration laddas från miljövariabler eller .env-fil.
 
 Användning:
@@ -31,7 +35,12 @@ Användning:
     python geoserver_listener.py --test       # Testa GeoServer-anslutning
     python geoserver_listener.py --dry-run    # Visa vad som skulle göras utan att göra det
 
-Manuell återutsändning (om lyssnaren var nere när ett schema skapades/togs bort):
+Händelserna skrivs också till händelsekön hex_geoserver_handelser. Lyssnaren
+hämtar dem därifrån (FOR UPDATE SKIP LOCKED), så att händelser som inträffar
+medan den är nere spelas upp vid nästa anslutning och flera instanser kan dela
+på kön. Notifieringarna fungerar då enbart som väckning.
+
+Manuell återutsändning (t.ex. om publiceringen misslyckades):
     NOTIFY geoserver_schema,      'sk0_kba_mittschema';   -- lägg till workspace
     NOTIFY geoserver_schema_drop, 'sk0_kba_mittschema';   -- ta bort workspace
 
@@ -40,21 +49,27 @@ Krav:
 """
 
 import argparse
+import hashlib
 import json
 import logging
 import os
 import re
-import select
+import selectors
 import smtplib
+import socket
 import sys
 import threading
 import time
+from collections import deque
+from contextlib import contextmanager
 from email.mime.text import MIMEText
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
 import psycopg2
 import psycopg2.extensions
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 
 # =============================================================================
@@ -118,6 +133,20 @@ def load_config():
         "reconnect_delay": int(os.environ.get("HEX_RECONNECT_DELAY", "5")),
         # Periodisk avstämning – intervall i sekunder (0 = avaktiverad)
         "reconcile_interval": int(os.environ.get("HEX_RECONCILE_INTERVAL", "3600")),
+        # Fil där datastore-fingeravtryck sparas mellan omstarter (tom = bara i minnet)
+        "datastore_cache_file": os.environ.get("HEX_DATASTORE_CACHE_FILE", ""),
+        # Max antal schema-notifieringar som hanteras parallellt (en arbetarpool
+        # som delas av alla databaser)
+        "worker_count": max(1, int(os.environ.get("HEX_WORKER_COUNT", "4"))),
+        # Max samtidiga HTTP-anrop mot GeoServer (delas av alla databaser)
+        "gs_max_connections": max(1, int(os.environ.get("HEX_GS_MAX_CONNECTIONS", "8"))),
+        # Max PG-anslutningar per databas för arbetare och avstämning (utöver LISTEN)
+        "pg_pool_size": max(1, int(os.environ.get("HEX_PG_POOL_SIZE", "2"))),
+        # Sekunder som notifieringar samlas för att slå ihop dubbletter (0 = bara samma poll)
+        "coalesce_window": max(0.0, float(os.environ.get("HEX_COALESCE_WINDOW", "2"))),
+        # Metrik i Prometheus-textformat på http://<host>:<port>/metrics (0 = avaktiverad)
+        "metrics_port": int(os.environ.get("HEX_METRICS_PORT", "0")),
+        "metrics_host": os.environ.get("HEX_METRICS_HOST", "127.0.0.1"),
         # Databaser
         "databases": _parse_database_configs(),
         # E-post (valfritt - inaktivt om HEX_SMTP_TO inte är satt)
@@ -349,10 +378,336 @@ class EmailNotifier:
         )
 
 
+# =============================================================================
+# DATASTORE-CACHE
+# =============================================================================
+
+class DatastoreFingerprintCache:
+    """Minns ett fingeravtryck av senast skrivna konfiguration per datastore.
+
+    Fingeravtrycket är en SHA-256 av hela datastore-payloaden (anslutnings-
+    parametrar inklusive lösenordet från hex_role_credentials). Ett nytt
+    lösenord eller ändrad host/port/parameter ger ett nytt fingeravtryck och
+    därmed en PUT; i övrigt kan create_pg_datastore hoppa över skrivningen.
+
+    Cachen är trådsäker och delas av alla GeoServerClient-instanser i processen.
+    Om path anges sparas den som JSON (HEX_DATASTORE_CACHE_FILE) så att den
+    överlever omstart av tjänsten; annars lever den bara i minnet.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._entries = {}  # "workspace/store" -> fingeravtryck
+        if self.path and self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._entries = {str(k): str(v) for k, v in data.items()}
+                log.info("Laddade %d datastore-fingeravtryck från %s", len(self._entries), self.path)
+            except Exception as e:
+                log.warning("Kunde inte läsa datastore-cache %s: %s – börjar om tom", self.path, e)
+
+    @staticmethod
+    def fingerprint(payload):
+        """Returnerar SHA-256-hex av en datastore-payload (oberoende av nyckelordning)."""
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key, fingerprint):
+        with self._lock:
+            if self._entries.get(key) == fingerprint:
+                return
+            self._entries[key] = fingerprint
+            self._save()
+
+    def discard(self, key):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+    def discard_workspace(self, workspace):
+        """Glömmer alla datastores i en workspace (t.ex. efter DROP SCHEMA)."""
+        prefix = f"{workspace}/"
+        with self._lock:
+            keys = [k for k in self._entries if k.startswith(prefix)]
+            for k in keys:
+                del self._entries[k]
+            if keys:
+                self._save()
+
+    def _save(self):
+        """Skriver cachen atomärt till disk. Anropas med _lock hållet."""
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=0, sort_keys=True)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            log.warning("Kunde inte spara datastore-cache %s: %s", self.path, e)
+
+
+# =============================================================================
+# METRIK
+# =============================================================================
+
+# Metriker som lyssnaren exponerar: namn -> (typ, hjälptext)
+_METRIC_DEFINITIONS = {
+    "hex_geoserver_request_seconds": (
+        "histogram", "Svarstid per HTTP-försök mot GeoServer REST API"),
+    "hex_geoserver_request_retries_total": (
+        "counter", "Nya försök efter timeout eller anslutningsfel mot GeoServer"),
+    "hex_geoserver_request_failures_total": (
+        "counter", "GeoServer-anrop som misslyckades efter alla försök"),
+    "hex_notifications_received_total": (
+        "counter", "Mottagna pg_notify-notifieringar per databas och kanal"),
+    "hex_notification_queue_seconds": (
+        "histogram", "Väntetid i arbetspoolen från mottagning till hantering"),
+    "hex_notification_seconds": (
+        "histogram", "Hanteringstid per schema-notifiering"),
+    "hex_notifications_handled_total": (
+        "counter", "Hanterade schema-notifieringar per databas, kanal och resultat"),
+    "hex_notifications_coalesced_total": (
+        "counter", "Notifieringar som slogs ihop (dubblett) eller ställdes in (skapa följt av borttagning)"),
+    "hex_worker_queue_depth": (
+        "gauge", "Köade notifieringar i arbetspoolen som ännu inte påbörjats"),
+    "hex_reconcile_seconds": (
+        "histogram", "Tid för avstämning mellan GeoServer och PostgreSQL"),
+    "hex_reconcile_runs_total": (
+        "counter", "Avstämningar per databas och resultat"),
+    "hex_listen_wakeups_total": (
+        "counter", "Uppvaknanden i LISTEN-loopen (notify eller timeout)"),
+    "hex_listen_cycle_seconds": (
+        "histogram", "Tid för poll och utdelning per uppvaknande i LISTEN-loopen"),
+    "hex_listen_connected": (
+        "gauge", "1 om LISTEN-anslutningen mot databasen är uppe, annars 0"),
+    "hex_listen_connection_errors_total": (
+        "counter", "Tappade eller misslyckade LISTEN-anslutningar"),
+}
+
+
+def _format_metric_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_metric_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class ListenerMetrics:
+    """Trådsäkert register för räknare, mätare och histogram.
+
+    Värdena hålls i minnet och renderas i Prometheus textformat (version
+    0.0.4) av render(). Varje serie identifieras av metriknamn plus etiketter;
+    serier skapas vid första användning. Mätare kan vara ett fast värde eller
+    en funktion som anropas vid varje skrapning (t.ex. köns längd).
+    """
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+    def __init__(self, definitions=None, buckets=DEFAULT_BUCKETS):
+        self._definitions = dict(_METRIC_DEFINITIONS if definitions is None else definitions)
+        self._buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {}   # namn -> {etiketter: värde | funktion | [hinkar, summa, antal]}
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def _values(self, name, kind):
+        defined = self._definitions.get(name)
+        if defined is None or defined[0] != kind:
+            raise ValueError(f"Okänd {kind}-metrik: {name}")
+        return self._series.setdefault(name, {})
+
+    def inc(self, name, amount=1, **labels):
+        """Ökar en räknare."""
+        key = self._key(labels)
+        with self._lock:
+            values = self._values(name, "counter")
+            values[key] = values.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        """Sätter en mätare till ett värde eller en funktion utan argument."""
+        key = self._key(labels)
+        with self._lock:
+            self._values(name, "gauge")[key] = value
+
+    def observe(self, name, value, **labels):
+        """Registrerar ett mätvärde (sekunder) i ett histogram."""
+        key = self._key(labels)
+        with self._lock:
+            values = self._values(name, "histogram")
+            hist = values.get(key)
+            if hist is None:
+                hist = values[key] = [[0] * len(self._buckets), 0.0, 0]
+            for i, bound in enumerate(self._buckets):
+                if value <= bound:
+                    hist[0][i] += 1
+            hist[1] += value
+            hist[2] += 1
+
+    def value(self, name, **labels):
+        """Aktuellt värde: räknarens värde, mätarens värde eller histogrammets antal."""
+        key = self._key(labels)
+        with self._lock:
+            current = self._series.get(name, {}).get(key)
+        if current is None:
+            return 0
+        if callable(current):
+            return current()
+        if isinstance(current, list):
+            return current[2]
+        return current
+
+    def render(self):
+        """Returnerar alla serier i Prometheus textformat."""
+        with self._lock:
+            snapshot = {
+                name: {key: (list(v[0]) + [v[1], v[2]] if isinstance(v, list) else v)
+                       for key, v in values.items()}
+                for name, values in self._series.items()
+            }
+        lines = []
+        for name, (kind, help_text) in self._definitions.items():
+            values = snapshot.get(name)
+            if not values:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key in sorted(values):
+                current = values[key]
+                if kind == "histogram":
+                    counts, total, count = current[:-2], current[-2], current[-1]
+                    for bound, bucket_count in zip(self._buckets, counts):
+                        le = key + (("le", _format_metric_value(bound)),)
+                        lines.append(f"{name}_bucket{_format_metric_labels(le)} {bucket_count}")
+                    le = key + (("le", "+Inf"),)
+                    lines.append(f"{name}_bucket{_format_metric_labels(le)} {count}")
+                    lines.append(f"{name}_sum{_format_metric_labels(key)} {_format_metric_value(total)}")
+                    lines.append(f"{name}_count{_format_metric_labels(key)} {count}")
+                    continue
+                if callable(current):
+                    try:
+                        current = current()
+                    except Exception as e:
+                        log.debug("Mätaren %s kunde inte läsas: %s", name, e)
+                        continue
+                lines.append(f"{name}{_format_metric_labels(key)} {_format_metric_value(current)}")
+        return "\n".join(lines) + "\n"
+
+
+# Processgemensamt register – delas av alla databaser och trådar
+_metrics = ListenerMetrics()
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Svarar på GET /metrics med serverns register i Prometheus textformat."""
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.debug("Metrik: %s - %s", self.address_string(), format % args)
+
+
+def start_metrics_server(port, host="127.0.0.1", metrics=None):
+    """Startar HTTP-endpointen för metrik i en bakgrundstråd.
+
+    Args:
+        port:    TCP-port (0 = avaktiverad).
+        host:    Adress att lyssna på; 0.0.0.0 för att nås från andra maskiner.
+        metrics: ListenerMetrics att exponera (standard: processens register).
+
+    Returns:
+        ThreadingHTTPServer (stängs med shutdown()) eller None om avaktiverad
+        eller om porten inte kunde öppnas.
+    """
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+    except OSError as e:
+        log.error("Kunde inte starta metrik-endpoint på %s:%d: %s", host, port, e)
+        return None
+    server.daemon_threads = True
+    server.metrics = metrics if metrics is not None else _metrics
+    t = threading.Thread(target=server.serve_forever, name="metrics", daemon=True)
+    t.start()
+    log.info("Metrik exponeras på http://%s:%d/metrics", host, server.server_address[1])
+    return server
+
+
 # =============================================================================
 # GEOSERVER REST API
 # =============================================================================
 
+class GeoServerHttpPool:
+    """Processgemensam HTTP-anslutningspool mot GeoServer.
+
+    En delad HTTPAdapter (urllib3-pool, trådsäker) monteras på varje tråds
+    requests.Session, så att keep-alive-anslutningar återanvänds mellan
+    LISTEN-, arbetar- och avstämningstrådar för alla databaser. En semafor
+    begränsar antalet samtidiga anrop mot GeoServer till max_connections;
+    poolen växer därmed aldrig förbi sin storlek och GeoServer skyddas mot
+    rusningar när många databaser stäms av samtidigt.
+
+    Backoff mellan retry-försök väntar på stop_event i stället för
+    time.sleep(), så att en avstängning inte blockeras av pågående retries.
+    """
+
+    def __init__(self, max_connections=8, stop_event=None):
+        self.max_connections = max(1, int(max_connections))
+        self.adapter = HTTPAdapter(pool_maxsize=self.max_connections)
+        self.stop_event = stop_event if stop_event is not None else threading.Event()
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+
+    def mount(self, session):
+        """Monterar den delade adaptern på en session."""
+        session.mount("http://", self.adapter)
+        session.mount("https://", self.adapter)
+
+    def request(self, session, method, url, **kwargs):
+        """Gör ett anrop när en plats i poolen är ledig."""
+        with self._slots:
+            return session.request(method, url, **kwargs)
+
+    def backoff(self, delay):
+        """Väntar delay sekunder utan att hålla någon plats i poolen.
+
+        Returns:
+            False om stop_event sattes under väntan (anroparen ska ge upp), annars True.
+        """
+        return not self.stop_event.wait(delay)
+
+
 class GeoServerClient:
     """Klient för GeoServer REST API."""
 
@@ -363,26 +718,46 @@ class GeoServerClient:
     MAX_RETRIES = 3
     RETRY_BACKOFF = [2, 5, 10]  # Sekunder mellan försök
 
-    def __init__(self, base_url, user, password, dry_run=False, namespace_uri_base=""):
+    # Max antal regler per POST/PUT mot security/acl/layers
+    ACL_BATCH_SIZE = 200
+
+    def __init__(self, base_url, user, password, dry_run=False, namespace_uri_base="", fingerprint_cache=None, http_pool=None):
         self.base_url = base_url.rstrip("/")
         self.rest_url = f"{self.base_url}/rest"
         self.auth = HTTPBasicAuth(user, password)
         self.dry_run = dry_run
         # Bas-URI för namespace-identifierare; standard är GeoServer-URL:en.
         self.namespace_uri_base = (namespace_uri_base or self.base_url).rstrip("/")
-        self.session = requests.Session()
-        self.session.auth = self.auth
-        self.session.headers.update({
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        })
+        # DatastoreFingerprintCache (eller None) – avgör om en datastore-PUT behövs
+        self.fingerprint_cache = fingerprint_cache
+        # requests.Session är inte trådsäker – varje tråd (LISTEN-tråd,
+        # arbetartrådar, avstämningstråd) får en egen session via _local.
+        # Sessionerna delar anslutningspoolen i http_pool.
+        self._local = threading.local()
+        self.http_pool = http_pool if http_pool is not None else GeoServerHttpPool()
+
+    @property
+    def session(self):
+        """Returnerar den anropande trådens requests.Session (skapas vid behov)."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self.http_pool.mount(session)
+            session.auth = self.auth
+            session.headers.update({
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+            })
+            self._local.session = session
+        return session
 
     def _request_with_retry(self, method, url, **kwargs):
         """Gör ett HTTP-anrop med retry vid transienta fel.
 
         Transienta fel (timeout, anslutningsfel) får upp till MAX_RETRIES
         nya försök med exponentiell backoff. Lyckade svar och HTTP-felkoder
-        (4xx, 5xx) returneras direkt utan retry.
+        (4xx, 5xx) returneras direkt utan retry. Under backoff hålls ingen
+        plats i anslutningspoolen, och väntan avbryts om tjänsten stängs.
 
         Returns:
             requests.Response
@@ -394,12 +769,23 @@ class GeoServerClient:
         last_exc = None
 
         for attempt in range(1 + self.MAX_RETRIES):
+            started = time.monotonic()
             try:
-                resp = self.session.request(method, url, **kwargs)
+                resp = self.http_pool.request(self.session, method, url, **kwargs)
+                _metrics.observe(
+                    "hex_geoserver_request_seconds", time.monotonic() - started,
+                    method=method, status=resp.status_code,
+                )
                 return resp
             except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
                 last_exc = e
+                _metrics.observe(
+                    "hex_geoserver_request_seconds", time.monotonic() - started,
+                    method=method,
+                    status="timeout" if isinstance(e, requests.exceptions.Timeout) else "connection_error",
+                )
                 if attempt < self.MAX_RETRIES:
+                    _metrics.inc("hex_geoserver_request_retries_total", method=method)
                     delay = self.RETRY_BACKOFF[attempt]
                     log.warning(
                         "  GeoServer-anrop misslyckades (försök %d/%d): %s. "
@@ -409,7 +795,9 @@ class GeoServerClient:
                         e,
                         delay,
                     )
-                    time.sleep(delay)
+                    if not self.http_pool.backoff(delay):
+                        log.info("  Avstängning pågår - avbryter retry mot GeoServer")
+                        break
                 else:
                     log.error(
                         "  GeoServer-anrop misslyckades efter %d försök: %s",
@@ -417,6 +805,7 @@ class GeoServerClient:
                         e,
                     )
 
+        _metrics.inc("hex_geoserver_request_failures_total", method=method)
         raise last_exc
 
     def test_connection(self):
@@ -523,6 +912,9 @@ class GeoServerClient:
             "DELETE", f"{self.rest_url}/workspaces/{name}?recurse=true"
         )
 
+        if resp.status_code in (200, 404) and self.fingerprint_cache is not None:
+            self.fingerprint_cache.discard_workspace(name)
+
         if resp.status_code == 200:
             log.info("  Workspace '%s' borttagen (inkl. datastores och lager)", name)
             return True
@@ -614,9 +1006,9 @@ class GeoServerClient:
                 return entry.get("$")
         return None
 
-    def _update_pg_datastore(self, workspace, store_name, host, port, dbname, schema_name, pg_user, pg_password):
-        """Uppdaterar en befintlig PostGIS-datastore med nya autentiseringsuppgifter (PUT)."""
-        payload = {
+    def _datastore_payload(self, workspace, store_name, host, port, dbname, schema_name, pg_user, pg_password):
+        """Bygger JSON-payload för en direkt PostGIS-datastore (används av både POST och PUT)."""
+        return {
             "dataStore": {
                 "name": store_name,
                 "type": "PostGIS",
@@ -644,6 +1036,12 @@ class GeoServerClient:
             }
         }
 
+    def _update_pg_datastore(self, workspace, store_name, host, port, dbname, schema_name, pg_user, pg_password):
+        """Uppdaterar en befintlig PostGIS-datastore med nya autentiseringsuppgifter (PUT)."""
+        payload = self._datastore_payload(
+            workspace, store_name, host, port, dbname, schema_name, pg_user, pg_password
+        )
+
         if self.dry_run:
             log.info("  [DRY-RUN] Skulle uppdatera PG-datastore: %s", store_name)
             log.info("  [DRY-RUN] PUT %s/workspaces/%s/datastores/%s.json", self.rest_url, workspace, store_name)
@@ -671,9 +1069,14 @@ class GeoServerClient:
         """Skapar eller uppdaterar en PostGIS-datastore i GeoServer.
 
         Skapar en ny datastore om den inte finns. Om datastore redan existerar
-        uppdateras den alltid via PUT med aktuella uppgifter från hex_role_credentials,
+        uppdateras den via PUT med aktuella uppgifter från hex_role_credentials,
         så att lösenordsändringar (t.ex. efter ominstallation) slår igenom.
 
+        PUT hoppas över om fingerprint_cache visar att exakt samma konfiguration
+        (inklusive lösenord) redan skrivits till storen och GeoServer fortfarande
+        rapporterar samma användare. Varje PUT får GeoServer att nollställa
+        storens anslutningspool, så onödiga PUT:ar märks som latenstoppar i WMS.
+
         Args:
             workspace:   Workspace-namn
             store_name:  Datastore-namn (samma som schema)
@@ -684,6 +1087,12 @@ class GeoServerClient:
             pg_user:     PostgreSQL-användare (gs_r_-rollen för schemat)
             pg_password: Lösenord för pg_user
         """
+        payload = self._datastore_payload(
+            workspace, store_name, host, port, dbname, schema_name, pg_user, pg_password
+        )
+        cache_key = f"{workspace}/{store_name}"
+        fingerprint = DatastoreFingerprintCache.fingerprint(payload)
+
         existing_user = self._get_datastore_user(workspace, store_name)
 
         if existing_user is not None:
@@ -692,40 +1101,21 @@ class GeoServerClient:
                     "  Datastore '%s' använder gammal användare '%s', uppdaterar till '%s'",
                     store_name, existing_user, pg_user,
                 )
+            elif (self.fingerprint_cache is not None
+                    and self.fingerprint_cache.get(cache_key) == fingerprint):
+                log.info(
+                    "  Datastore '%s' oförändrad sedan senaste skrivning - hoppar över PUT",
+                    store_name,
+                )
+                return True
             else:
                 log.info(
                     "  Datastore '%s' finns redan i workspace '%s' - uppdaterar autentiseringsuppgifter",
                     store_name, workspace,
                 )
-            return self._update_pg_datastore(workspace, store_name, host, port, dbname, schema_name, pg_user, pg_password)
-
-        payload = {
-            "dataStore": {
-                "name": store_name,
-                "type": "PostGIS",
-                "enabled": True,
-                "connectionParameters": {
-                    "entry": [
-                        {"@key": "dbtype",              "$": "postgis"},
-                        {"@key": "namespace",           "$": f"{self.namespace_uri_base}/{workspace}"},
-                        {"@key": "host",                "$": host},
-                        {"@key": "port",                "$": str(port)},
-                        {"@key": "database",            "$": dbname},
-                        {"@key": "schema",              "$": schema_name},
-                        {"@key": "user",                "$": pg_user},
-                        {"@key": "passwd",              "$": pg_password},
-                        {"@key": "Expose primary keys", "$": "true"},
-                        {"@key": "fetch size",          "$": "1000"},
-                        {"@key": "Loose bbox",          "$": "true"},
-                        {"@key": "Estimated extends",   "$": "true"},
-                        {"@key": "encode functions",    "$": "true"},
-                        {"@key": "validate connections","$": "true"},
-                        {"@key": "max connections",     "$": "10"},
-                        {"@key": "min connections",     "$": "1"},
-                    ]
-                },
-            }
-        }
+            ok = self._update_pg_datastore(workspace, store_name, host, port, dbname, schema_name, pg_user, pg_password)
+            self._remember_datastore(cache_key, fingerprint, ok)
+            return ok
 
         if self.dry_run:
             log.info("  [DRY-RUN] Skulle skapa PG-datastore: %s", store_name)
@@ -740,6 +1130,7 @@ class GeoServerClient:
 
         if resp.status_code == 201:
             log.info("  Datastore '%s' skapad (direkt PG, användare: %s)", store_name, pg_user)
+            self._remember_datastore(cache_key, fingerprint, True)
             return True
         elif resp.status_code in (409, 500) and "already exists" in resp.text:
             log.warning(
@@ -747,9 +1138,11 @@ class GeoServerClient:
                 " – försöker uppdatera med nya uppgifter...",
                 store_name,
             )
-            return self._update_pg_datastore(
+            ok = self._update_pg_datastore(
                 workspace, store_name, host, port, dbname, schema_name, pg_user, pg_password
             )
+            self._remember_datastore(cache_key, fingerprint, ok)
+            return ok
         else:
             log.error(
                 "  Misslyckades att skapa datastore '%s': %d %s",
@@ -759,6 +1152,15 @@ class GeoServerClient:
             )
             return False
 
+    def _remember_datastore(self, cache_key, fingerprint, ok):
+        """Sparar fingeravtrycket efter en lyckad skrivning (aldrig i dry-run)."""
+        if self.fingerprint_cache is None or self.dry_run:
+            return
+        if ok:
+            self.fingerprint_cache.set(cache_key, fingerprint)
+        else:
+            self.fingerprint_cache.discard(cache_key)
+
     def create_gs_role(self, role_name):
         """Skapar en GeoServer-roll om den inte redan finns.
 
@@ -786,6 +1188,22 @@ class GeoServerClient:
             )
             return False
 
+    def get_gs_roles(self):
+        """Hämtar namnen på alla GeoServer-roller.
+
+        Returnerar en mängd rollnamn eller None vid fel.
+        """
+        resp = self._request_with_retry(
+            "GET", f"{self.rest_url}/security/roles.json"
+        )
+        if resp.status_code != 200:
+            return None
+        roles = resp.json().get("roles") or []
+        # Äldre GeoServer-versioner svarar {"roles": {"role": [...]}}
+        if isinstance(roles, dict):
+            roles = roles.get("role", [])
+        return set(roles)
+
     def delete_gs_role(self, role_name):
         """Tar bort en GeoServer-roll.
 
@@ -831,7 +1249,24 @@ class GeoServerClient:
                 log.info("  [DRY-RUN]   %s = %s", rule, role)
             return True
 
-        return self._ensure_acl_rules(workspace, rules)
+        resp = self._request_with_retry(
+            "POST", f"{self.rest_url}/security/acl/layers", json=rules
+        )
+        if resp.status_code in (200, 201):
+            log.info("  ACL-regler skapade för workspace '%s'", workspace)
+            return True
+        elif resp.status_code == 409 or (
+            resp.status_code == 404 and "already exists" in resp.text
+        ):
+            # Minst en regel finns redan – verifiera och korrigera
+            log.info("  ACL-regler för '%s' finns delvis redan - verifierar...", workspace)
+            return self._ensure_acl_rules(workspace, rules)
+        else:
+            log.error(
+                "  Misslyckades att skapa ACL-regler för workspace '%s': %d %s",
+                workspace, resp.status_code, resp.text,
+            )
+            return False
 
     def delete_workspace_acl(self, workspace):
         """Tar bort ACL-regler för en workspace.
@@ -877,69 +1312,131 @@ class GeoServerClient:
             return None
         return resp.json()
 
-    def _ensure_acl_rules(self, workspace, expected_rules):
+    def _ensure_acl_rules(self, workspace, expected_rules, all_rules=None):
         """Verifierar och korrigerar ACL-regler mot förväntat utfall.
 
         Anropas av create_workspace_acl när POST returnerar 409 (minst en regel
-        finns redan). Hämtar nuvarande regler via GET, jämför mot expected_rules
-        och korrigerar avvikande eller saknade regler.
+        finns redan). Hämtar nuvarande regler via GET och låter sync_acl_rules
+        skriva det som saknas eller avviker.
 
         Args:
             workspace:      Workspace-namn (används bara för loggning).
             expected_rules: Dict {regelnyckeln: förväntad_roll}.
+            all_rules:      Redan hämtade regler (från get_acl_rules). Om angivet
+                            görs ingen egen GET.
 
         Returns:
             True om alla förväntade regler är korrekta (eller korrigerades), annars False.
         """
-        all_rules = self.get_acl_rules()
+        if all_rules is None:
+            all_rules = self.get_acl_rules()
         if all_rules is None:
             log.error(
                 "  Kunde inte hämta ACL-regler för att verifiera workspace '%s'", workspace
             )
             return False
 
-        all_ok = True
+        return not self.sync_acl_rules(expected_rules, all_rules)
+
+    def sync_acl_rules(self, expected_rules, all_rules):
+        """Skriver saknade och avvikande ACL-regler i så få anrop som möjligt.
 
+        Jämför expected_rules mot all_rules (hela regelkartan, hämtad en gång)
+        och skickar alla saknade regler i en POST och alla regler med fel roll
+        i en PUT mot security/acl/layers – uppdelat i block om ACL_BATCH_SIZE.
+        GeoServer avvisar hela blocket om någon regel i det inte går att skriva
+        (t.ex. 409 om en regel skapats under tiden); då skrivs det blockets
+        regler en och en så att övriga regler ändå kommer på plats.
+
+        Args:
+            expected_rules: Dict {regelnyckeln: förväntad_roll}, gärna för många
+                            workspaces på en gång (avstämningen).
+            all_rules:      Nuvarande regelkarta. Uppdateras på plats med de
+                            regler som skrevs.
+
+        Returns:
+            Mängd regelnycklar som inte kunde skrivas (tom mängd = allt i synk).
+        """
+        missing = {}
+        wrong = {}
         for rule_key, expected_role in expected_rules.items():
             current_role = all_rules.get(rule_key)
-
             if current_role == expected_role:
-                log.info("  ACL-regel '%s' är korrekt – hoppar över", rule_key)
                 continue
-
-            if current_role is not None:
-                # Felaktig roll – ta bort gammal regel, skapa ny
+            if current_role is None:
+                missing[rule_key] = expected_role
+            else:
                 log.warning(
                     "  ACL-regel '%s': är '%s', förväntas '%s' – korrigerar...",
                     rule_key, current_role, expected_role,
                 )
-                del_resp = self._request_with_retry(
-                    "DELETE", f"{self.rest_url}/security/acl/layers/{rule_key}"
+                wrong[rule_key] = expected_role
+
+        if not missing and not wrong:
+            return set()
+
+        if self.dry_run:
+            log.info(
+                "  [DRY-RUN] Skulle skapa %d och korrigera %d ACL-regel/regler",
+                len(missing), len(wrong),
+            )
+            return set()
+
+        failed = set()
+        for method, rules in (("POST", missing), ("PUT", wrong)):
+            items = sorted(rules.items())
+            for i in range(0, len(items), self.ACL_BATCH_SIZE):
+                batch = dict(items[i:i + self.ACL_BATCH_SIZE])
+                resp = self._request_with_retry(
+                    method, f"{self.rest_url}/security/acl/layers", json=batch
                 )
-                if del_resp.status_code not in (200, 404):
+                if resp.status_code in (200, 201):
+                    log.info("  %d ACL-regel/regler skrivna (%s)", len(batch), method)
+                    all_rules.update(batch)
+                    continue
+                if len(batch) == 1:
+                    rule_key, role = next(iter(batch.items()))
                     log.error(
-                        "  Misslyckades att ta bort felaktig ACL-regel '%s': %d %s",
-                        rule_key, del_resp.status_code, del_resp.text,
+                        "  Misslyckades att skriva ACL-regel '%s' = '%s': %d %s",
+                        rule_key, role, resp.status_code, resp.text,
                     )
-                    all_ok = False
+                    failed.add(rule_key)
                     continue
-            else:
-                log.info("  ACL-regel '%s' saknas – skapar...", rule_key)
+                log.warning(
+                    "  ACL-block med %d regler avvisades (%d) – skriver reglerna en och en",
+                    len(batch), resp.status_code,
+                )
+                failed |= self._write_acl_rules_individually(batch, all_rules)
+        return failed
+
+    def _write_acl_rules_individually(self, rules, all_rules):
+        """Skriver ACL-regler en och en (PUT om regeln finns, annars POST).
 
-            post_resp = self._request_with_retry(
-                "POST", f"{self.rest_url}/security/acl/layers",
-                json={rule_key: expected_role},
+        Reservväg för sync_acl_rules när ett helt block avvisas.
+
+        Returns:
+            Mängd regelnycklar som inte kunde skrivas.
+        """
+        failed = set()
+        for rule_key, role in rules.items():
+            resp = self._request_with_retry(
+                "POST", f"{self.rest_url}/security/acl/layers", json={rule_key: role}
             )
-            if post_resp.status_code in (200, 201):
-                log.info("  ACL-regel '%s' = '%s' skapad/korrigerad", rule_key, expected_role)
+            if resp.status_code == 409 or (
+                resp.status_code == 404 and "already exists" in resp.text
+            ):
+                resp = self._request_with_retry(
+                    "PUT", f"{self.rest_url}/security/acl/layers", json={rule_key: role}
+                )
+            if resp.status_code in (200, 201):
+                all_rules[rule_key] = role
             else:
                 log.error(
-                    "  Misslyckades att skapa ACL-regel '%s': %d %s",
-                    rule_key, post_resp.status_code, post_resp.text,
+                    "  Misslyckades att skriva ACL-regel '%s' = '%s': %d %s",
+                    rule_key, role, resp.status_code, resp.text,
                 )
-                all_ok = False
-
-        return all_ok
+                failed.add(rule_key)
+        return failed
 
 
 # =============================================================================
@@ -947,25 +1444,23 @@ class GeoServerClient:
 # =============================================================================
 
 # Regex som matchar giltiga schemanamn för GeoServer-publicering.
-# Laddas dynamiskt från standardiserade_skyddsnivaer (publiceras_geoserver = true)
-# och standardiserade_datakategorier vid uppstart via _load_schema_pattern().
+# Byggs per databas från standardiserade_skyddsnivaer (publiceras_geoserver = true)
+# och standardiserade_datakategorier och cachas i _schema_patterns.
 # Standardvärdet nedan används som fallback om DB-laddningen misslyckas.
 SCHEMA_PATTERN = re.compile(r"^sk[01]_(ext|kba|sys)_.+$")
-_schema_pattern_lock = threading.Lock()
 
 
 def _load_schema_pattern(cur):
-    """Laddar schemanamnsmönstret från konfigurationstabellerna och uppdaterar SCHEMA_PATTERN.
+    """Bygger schemanamnsmönstret från konfigurationstabellerna.
 
     Bygger ett regex baserat på:
       - standardiserade_skyddsnivaer WHERE publiceras_geoserver = true  → tillåtna prefix
       - standardiserade_datakategorier                                  → tillåtna kategorier
 
-    Om tabellerna är tomma eller ett fel uppstår behålls det befintliga mönstret.
-    Anropas i listen_loop efter lyckad DB-anslutning så att mönstret hålls i synk
-    med konfigurationen utan omstart av tjänsten.
+    Returns:
+        Kompilerat mönster, eller None om tabellerna är tomma eller ett fel
+        uppstår (anroparen behåller då sitt befintliga mönster).
     """
-    global SCHEMA_PATTERN
     try:
         cur.execute(
             "SELECT prefix FROM public.standardiserade_skyddsnivaer"
@@ -981,30 +1476,81 @@ def _load_schema_pattern(cur):
         if not skyddsnivaer or not kategorier:
             log.warning(
                 "Schemanamnsmönster: konfigurationstabellerna är tomma – "
-                "behåller nuvarande mönster '%s'",
-                SCHEMA_PATTERN.pattern,
+                "behåller nuvarande mönster"
             )
-            return
+            return None
 
         prefix_alts = "|".join(re.escape(p) for p in skyddsnivaer)
         kat_alts    = "|".join(re.escape(k) for k in kategorier)
-        pattern = re.compile(rf"^({prefix_alts})_({kat_alts})_.+$")
-
-        with _schema_pattern_lock:
-            SCHEMA_PATTERN = pattern
-        log.info("Schemanamnsmönster uppdaterat från DB: %s", pattern.pattern)
+        return re.compile(rf"^({prefix_alts})_({kat_alts})_.+$")
 
     except Exception as e:
         log.warning(
-            "Kunde inte ladda schemanamnsmönster från DB: %s – "
-            "behåller nuvarande mönster '%s'",
-            e, SCHEMA_PATTERN.pattern,
+            "Kunde inte ladda schemanamnsmönster från DB: %s – behåller nuvarande mönster",
+            e,
         )
+        return None
+
+
+class SchemaPatternCache:
+    """Cache av schemanamnsmönstret per databas.
+
+    Mönstret laddas från DB vid första behov och återanvänds därefter, så att
+    en notifiering inte kostar några extra frågor. Cachen ogiltigförklaras när
+    konfigurationstabellerna ändras (kanal CHANNEL_SCHEMA_CONFIG, skickas av
+    statement-triggern notifiera_schemakonfiguration) och vid varje
+    (åter)anslutning, eftersom notifieringar kan ha missats under avbrottet.
+
+    Nycklas på databasnamn så att databaser med olika prefix (t.ex. skx bara
+    i sk0-databasen) inte skriver över varandras mönster.
+    """
+
+    def __init__(self):
+        self._patterns = {}
+        self._generation = {}
+        self._lock = threading.Lock()
+
+    def get(self, db_label, pg_conn=None):
+        """Returnerar mönstret för db_label och laddar det via pg_conn vid cachemiss.
+
+        Utan pg_conn (eller om laddningen misslyckas) returneras det senast
+        kända mönstret för databasen, annars fallback-värdet SCHEMA_PATTERN.
+        """
+        with self._lock:
+            pattern = self._patterns.get(db_label)
+            generation = self._generation.get(db_label, 0)
+        if pattern is not None or pg_conn is None:
+            return pattern or SCHEMA_PATTERN
+
+        with pg_conn.cursor() as cur:
+            pattern = _load_schema_pattern(cur)
+        if pattern is None:
+            return SCHEMA_PATTERN
+
+        with self._lock:
+            # En ogiltigförklaring under laddningen vinner – mönstret kan vara inaktuellt
+            if self._generation.get(db_label, 0) == generation:
+                self._patterns[db_label] = pattern
+        log.info("%sSchemanamnsmönster laddat från DB: %s", _db_tag(db_label), pattern.pattern)
+        return pattern
+
+    def invalidate(self, db_label=None):
+        """Glömmer mönstret för db_label (eller för alla databaser om None)."""
+        with self._lock:
+            labels = list(self._patterns) if db_label is None else [db_label]
+            for label in labels:
+                self._patterns.pop(label, None)
+                self._generation[label] = self._generation.get(label, 0) + 1
+
+
+_schema_patterns = SchemaPatternCache()
 
 # pg_notify-kanalnamn. Måste överensstämma med SQL-funktionerna
 # notifiera_geoserver() och notifiera_geoserver_borttagning().
 CHANNEL_SCHEMA_CREATE = "geoserver_schema"
 CHANNEL_SCHEMA_DROP   = "geoserver_schema_drop"
+# Skickas av notifiera_schemakonfiguration() när konfigurationstabellerna ändras.
+CHANNEL_SCHEMA_CONFIG = "hex_schemakonfiguration"
 
 
 def _db_tag(db_label):
@@ -1040,7 +1586,7 @@ def _fetch_role_credentials(conn, schema_name):
         return None, None
 
 
-def _validate_schema_name(schema_name, tag):
+def _validate_schema_name(schema_name, tag, pattern=None):
     """Validerar att schemanamnet matchar det förväntade mönstret.
 
     SQL-triggern filtrerar redan, men pg_notify-kanalerna är öppna för
@@ -1049,16 +1595,19 @@ def _validate_schema_name(schema_name, tag):
     Args:
         schema_name: Schemanamnet från notifieringens payload.
         tag:         Logg-prefix (från _db_tag).
+        pattern:     Databasens mönster (från _schema_patterns). Om None
+                     används fallback-värdet SCHEMA_PATTERN.
 
     Returns:
         True om schemanamnet är giltigt, annars False (efter loggning).
     """
-    if not SCHEMA_PATTERN.match(schema_name):
+    pattern = pattern or SCHEMA_PATTERN
+    if not pattern.match(schema_name):
         log.warning(
             "%sOgiltigt schemanamn '%s' - matchar inte mönster '%s'. Ignorerar.",
             tag,
             schema_name,
-            SCHEMA_PATTERN.pattern,
+            pattern.pattern,
         )
         return False
     return True
@@ -1085,6 +1634,47 @@ def _fetch_anonymous_read(conn, schema_name):
         return False
 
 
+def _expected_acl_rules(schema_name, anonymous_read=False):
+    """Returnerar de ACL-regler {regelnyckel: roll} som en workspace ska ha.
+
+    Samma regler som GeoServerClient.create_workspace_acl skapar.
+    """
+    read_role = f"r_{schema_name},ROLE_ANONYMOUS" if anonymous_read else f"r_{schema_name}"
+    return {
+        f"{schema_name}.*.r": read_role,
+        f"{schema_name}.*.w": f"w_{schema_name}",
+    }
+
+
+def _fetch_all_role_credentials(conn, schema_names):
+    """Hämtar autentiseringsuppgifter för läsrollerna för flera scheman i en fråga.
+
+    Returns:
+        Dict {schema_name: (rolname, password)} – scheman utan rad saknas i dict:en.
+    """
+    role_to_schema = {f"gs_r_{name}": name for name in schema_names}
+    if not role_to_schema:
+        return {}
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT rolname, password FROM public.hex_role_credentials"
+            " WHERE rolname = ANY(%s)",
+            (list(role_to_schema),),
+        )
+        rows = cur.fetchall()
+    return {role_to_schema[rolname]: (rolname, password) for rolname, password in rows}
+
+
+def _fetch_anonymous_read_prefixes(conn):
+    """Returnerar mängden skyddsnivå-prefix som har anonym_las aktiverat."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT prefix FROM public.standardiserade_skyddsnivaer"
+            " WHERE anonym_las = true"
+        )
+        return {row[0] for row in cur.fetchall()}
+
+
 def handle_schema_notification(schema_name, db_config, pg_conn, gs_client, db_label=""):
     """Hanterar en notifiering om nytt schema (kanal: CHANNEL_SCHEMA_CREATE).
 
@@ -1101,13 +1691,11 @@ def handle_schema_notification(schema_name, db_config, pg_conn, gs_client, db_la
     tag = _db_tag(db_label)
     log.info("%sMottog notifiering för schema: %s", tag, schema_name)
 
-    # Ladda om mönstret innan validering så att ändringar i
-    # standardiserade_skyddsnivaer (t.ex. publiceras_geoserver = true för ett
-    # nytt prefix) slår igenom utan omstart av tjänsten.
-    with pg_conn.cursor() as cur:
-        _load_schema_pattern(cur)
+    # Databasens cachade mönster – laddas bara om efter en ändring i
+    # konfigurationstabellerna (CHANNEL_SCHEMA_CONFIG) eller en återanslutning.
+    pattern = _schema_patterns.get(db_label, pg_conn)
 
-    if not _validate_schema_name(schema_name, tag):
+    if not _validate_schema_name(schema_name, tag, pattern):
         return False
 
     # Hämta autentiseringsuppgifter för läsrollen från hex_role_credentials
@@ -1171,21 +1759,19 @@ def handle_schema_removal_notification(schema_name, gs_client, pg_conn=None, db_
     Args:
         schema_name: Schemanamnet från pg_notify-payloaden
         gs_client:   GeoServerClient-instans
-        pg_conn:     Öppen psycopg2-anslutning för att ladda om SCHEMA_PATTERN
-                     från rätt databas. Om None används nuvarande globalt mönster.
+        pg_conn:     Öppen psycopg2-anslutning för att ladda databasens mönster
+                     vid cachemiss. Om None används det cachade mönstret
+                     (eller fallback-värdet SCHEMA_PATTERN).
         db_label:    Databasnamn för logg-prefix
     """
     tag = _db_tag(db_label)
     log.info("%sMottog borttagningsnotifiering för schema: %s", tag, schema_name)
 
-    # Ladda om mönstret från rätt databas så att konfigurationsändringar och
-    # prefixskillnader mellan databaser (t.ex. skx bara i sk0-databasen) inte
-    # gör att DROP-notifieringar avvisas p.g.a. ett inaktuellt globalt mönster.
-    if pg_conn is not None:
-        with pg_conn.cursor() as cur:
-            _load_schema_pattern(cur)
+    # Mönstret cachas per databas så att prefixskillnader mellan databaser
+    # (t.ex. skx bara i sk0-databasen) inte gör att DROP-notifieringar avvisas.
+    pattern = _schema_patterns.get(db_label, pg_conn)
 
-    if not _validate_schema_name(schema_name, tag):
+    if not _validate_schema_name(schema_name, tag, pattern):
         return False
 
     # 1. Ta bort ACL-regler innan workspace raderas
@@ -1207,80 +1793,224 @@ def handle_schema_removal_notification(schema_name, gs_client, pg_conn=None, db_
     return True
 
 
-def _fetch_publishable_schemas(db_config):
-    """Hämtar mängden publicerbara schemanamn från en databas.
+def _fetch_geoserver_state(gs_client):
+    """Hämtar GeoServer-tillståndet som avstämningen diffar mot, i bulk.
 
-    Används av run_all_listeners för att bygga en samlad schema-mängd över
-    alla övervakade databaser, så att startavstämningens varplansvarning
-    inte slår falskt vid multi-databaskonfiguration.
+    Två GET-anrop oavsett antal scheman: alla roller och hela ACL-regelkartan.
 
-    Returnerar tom mängd vid anslutningsfel eller om tabellerna saknas.
+    Returns:
+        Dict {"roles": set, "acl": dict} eller None om något anrop misslyckades.
     """
-    try:
-        conn = psycopg2.connect(
-            host=db_config["host"],
-            port=db_config["port"],
-            dbname=db_config["dbname"],
-            user=db_config["user"],
-            password=db_config["password"],
-            connect_timeout=10,
-            client_encoding="utf8",
-        )
-        try:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "SELECT nspname"
-                    " FROM pg_namespace"
-                    " WHERE EXISTS ("
-                    "   SELECT 1"
-                    "   FROM public.standardiserade_skyddsnivaer n,"
-                    "        public.standardiserade_datakategorier d"
-                    "   WHERE n.publiceras_geoserver = true"
-                    "     AND nspname ~ ('^' || n.prefix || '_' || d.prefix || '_')"
-                    " )"
-                )
-                return {row[0] for row in cur.fetchall()}
-        finally:
-            conn.close()
-    except Exception as e:
-        log.warning(
-            "Kunde inte hämta scheman från '%s' för startavstämning: %s",
-            db_config["dbname"], e,
-        )
-        return set()
+    roles = gs_client.get_gs_roles()
+    if not isinstance(roles, set):
+        return None
+    acl = gs_client.get_acl_rules()
+    if not isinstance(acl, dict):
+        return None
+    return {"roles": roles, "acl": acl}
 
 
-def _reconcile_geoserver_schemas(cur, db_config, gs_client, db_label="", all_pg_schemas=None):
-    """Avstämning: skapar saknade GeoServer-workspaces och datastores för befintliga PG-scheman.
+def _sync_existing_schema(schema_name, db_config, credentials, gs_client, gs_state, tag=""):
+    """Stämmer av ett schema vars workspace redan finns mot förhämtat GeoServer-tillstånd.
 
-    Körs vid uppstart och periodiskt (se _periodic_reconcile_loop). Använder den
-    anropandes cursor/anslutning så att ingen extra PG-anslutning öppnas.
+    Till skillnad från handle_schema_notification görs inga GET-anrop för
+    workspace, namespace eller roller – de jämförs lokalt mot gs_state.
+    Enbart det som faktiskt avviker skrivs. Datastore hanteras via
+    create_pg_datastore (som själv avgör om en PUT behövs). ACL-regler
+    stäms av för alla scheman på en gång i _reconcile_existing_schemas.
 
     Args:
-        cur:            Öppen psycopg2-cursor (autocommit OK)
-        db_config:      Databaskonfiguration för denna databas
-        gs_client:      GeoServerClient-instans
-        db_label:       Logg-prefix
-        all_pg_schemas: Samlad mängd scheman från ALLA övervakade databaser,
-                        förbyggd av run_all_listeners. Används för att avgöra
-                        om en GeoServer-workspace verkligen är föräldralös eller
-                        om den tillhör en annan övervakad databas. Om None
-                        används endast denna databas scheman.
+        schema_name:    Schemanamn (= workspace = datastore).
+        db_config:      Databaskonfiguration med host/port/dbname.
+        credentials:    (rolname, password) för gs_r_-rollen.
+        gs_client:      GeoServerClient-instans.
+        gs_state:       Tillstånd från _fetch_geoserver_state. Uppdateras
+                        på plats när roller skapas.
+        tag:            Logg-prefix.
 
-    Logik:
-      a) Hämtar publicerbara scheman från denna databas (pg_namespace).
-      b) Hämtar befintliga workspaces via GeoServer REST GET /rest/workspaces.json.
-      c) Kör handle_schema_notification för ALLA PG-scheman (inte bara saknade).
-         Saknade workspaces skapas; befintliga datastores uppdateras alltid med
-         aktuella autentiseringsuppgifter från hex_role_credentials (så att
-         lösenordsändringar efter ominstallation slår igenom vid omstart).
-      d) Loggar INFO för varje nyskapad workspace.
+    Returns:
+        True om schemat är (eller blev) i synk, annars False.
+    """
+    role_name, password = credentials
+
+    if not gs_client.create_pg_datastore(
+        workspace=schema_name,
+        store_name=schema_name,
+        host=db_config["host"],
+        port=db_config["port"],
+        dbname=db_config["dbname"],
+        schema_name=schema_name,
+        pg_user=role_name,
+        pg_password=password,
+    ):
+        log.error("%s  Datastore '%s' kunde inte stämmas av", tag, schema_name)
+        return False
+
+    for gs_role in (f"r_{schema_name}", f"w_{schema_name}"):
+        if gs_role in gs_state["roles"]:
+            continue
+        if not gs_client.create_gs_role(gs_role):
+            log.error("%s  GeoServer-roll '%s' kunde inte skapas", tag, gs_role)
+            return False
+        gs_state["roles"].add(gs_role)
+
+    return True
+
+
+def _reconcile_existing_schemas(schema_names, pg_conn, db_config, gs_client, tag="", fallback=None):
+    """Diffbaserad avstämning av scheman vars workspace redan finns i GeoServer.
+
+    Hämtar GeoServer-roller och ACL-regler en gång, autentiseringsuppgifter och
+    anonym_las för alla scheman med en fråga vardera, och anropar sedan
+    _sync_existing_schema per schema. ACL-reglerna för alla scheman samlas
+    och skrivs till sist med GeoServerClient.sync_acl_rules (ett fåtal
+    POST/PUT totalt i stället för flera anrop per schema). Om bulkhämtningen
+    från GeoServer misslyckas används fallback(schema_name) per schema (full
+    publicering). Fel för ett enskilt schema avbryter aldrig övriga.
+    """
+    gs_state = _fetch_geoserver_state(gs_client)
+    if gs_state is None:
+        log.warning(
+            "%sStartavstämning: kunde inte hämta roller/ACL i bulk – "
+            "stämmer av varje schema för sig",
+            tag,
+        )
+        if fallback is None:
+            return
+        for schema_name in schema_names:
+            try:
+                fallback(schema_name)
+            except Exception as e:
+                log.error(
+                    "%sStartavstämning: fel vid hantering av workspace '%s': %s",
+                    tag, schema_name, e,
+                )
+        return
+
+    credentials = _fetch_all_role_credentials(pg_conn, schema_names)
+    anonymous_prefixes = _fetch_anonymous_read_prefixes(pg_conn)
+
+    synced = []
+    expected_rules = {}
+    for schema_name in schema_names:
+        if schema_name not in credentials:
+            log.error(
+                "%sIngen autentiseringsuppgifter hittades för 'gs_r_%s' i hex_role_credentials - "
+                "hoppar över schema '%s'",
+                tag, schema_name, schema_name,
+            )
+            continue
+        try:
+            if _sync_existing_schema(
+                schema_name,
+                db_config,
+                credentials[schema_name],
+                gs_client,
+                gs_state,
+                tag,
+            ):
+                synced.append(schema_name)
+                expected_rules.update(_expected_acl_rules(
+                    schema_name, schema_name.split("_")[0] in anonymous_prefixes,
+                ))
+        except Exception as e:
+            log.error(
+                "%sStartavstämning: fel vid hantering av workspace '%s': %s",
+                tag, schema_name, e,
+            )
+
+    # ACL för alla avstämda scheman i ett svep mot den förhämtade regelkartan
+    try:
+        failed_rules = gs_client.sync_acl_rules(expected_rules, gs_state["acl"])
+    except Exception as e:
+        log.error("%sStartavstämning: fel vid avstämning av ACL-regler: %s", tag, e)
+        failed_rules = set(expected_rules)
+    failed_schemas = {key.split(".", 1)[0] for key in failed_rules}
+    for schema_name in sorted(failed_schemas):
+        log.error("%s  ACL-regler för '%s' kunde inte korrigeras", tag, schema_name)
+    in_sync = len([name for name in synced if name not in failed_schemas])
+
+    log.info(
+        "%sStartavstämning: %d av %d befintliga workspace(s) avstämda",
+        tag, in_sync, len(schema_names),
+    )
+
+
+def _fetch_publishable_schemas(db_config, pg_pool=None):
+    """Hämtar mängden publicerbara schemanamn från en databas.
+
+    Används av run_all_listeners för att bygga en samlad schema-mängd över
+    alla övervakade databaser, så att startavstämningens varplansvarning
+    inte slår falskt vid multi-databaskonfiguration. Med pg_pool lånas
+    anslutningen ur databasens pool (och återanvänds sedan av lyssnaren).
+
+    Returnerar tom mängd vid anslutningsfel eller om tabellerna saknas.
+    """
+    own_pool = pg_pool is None
+    if own_pool:
+        pg_pool = PgConnectionPool(db_config, max_connections=1)
+    try:
+        with pg_pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT nspname"
+                    " FROM pg_namespace"
+                    " WHERE EXISTS ("
+                    "   SELECT 1"
+                    "   FROM public.standardiserade_skyddsnivaer n,"
+                    "        public.standardiserade_datakategorier d"
+                    "   WHERE n.publiceras_geoserver = true"
+                    "     AND nspname ~ ('^' || n.prefix || '_' || d.prefix || '_')"
+                    " )"
+                )
+                return {row[0] for row in cur.fetchall()}
+    except Exception as e:
+        log.warning(
+            "Kunde inte hämta scheman från '%s' för startavstämning: %s",
+            db_config["dbname"], e,
+        )
+        return set()
+    finally:
+        if own_pool:
+            pg_pool.close()
+
+
+def _reconcile_geoserver_schemas(cur, db_config, gs_client, db_label="", all_pg_schemas=None):
+    """Avstämning: skapar saknade GeoServer-workspaces och datastores för befintliga PG-scheman.
+
+    Körs vid uppstart och periodiskt (se _periodic_reconcile_loop). Använder den
+    anropandes cursor/anslutning så att ingen extra PG-anslutning öppnas.
+
+    Args:
+        cur:            Öppen psycopg2-cursor (autocommit OK)
+        db_config:      Databaskonfiguration för denna databas
+        gs_client:      GeoServerClient-instans
+        db_label:       Logg-prefix
+        all_pg_schemas: Samlad mängd scheman från ALLA övervakade databaser,
+                        förbyggd av run_all_listeners. Används för att avgöra
+                        om en GeoServer-workspace verkligen är föräldralös eller
+                        om den tillhör en annan övervakad databas. Om None
+                        används endast denna databas scheman.
+
+    Logik:
+      a) Hämtar publicerbara scheman från denna databas (pg_namespace).
+      b) Hämtar befintliga workspaces via GeoServer REST GET /rest/workspaces.json.
+      c) Kör handle_schema_notification (full publicering) för PG-scheman som
+         saknar workspace. För scheman med befintlig workspace hämtas roller och
+         ACL-regler i bulk (två GET totalt) och bara avvikelser skrivs (ACL i
+         ett fåtal batchade POST/PUT för alla scheman), se
+         _reconcile_existing_schemas. Datastores stäms av mot aktuella
+         autentiseringsuppgifter från hex_role_credentials (så att
+         lösenordsändringar efter ominstallation slår igenom vid omstart).
+      d) Loggar INFO för varje nyskapad workspace.
       e) Loggar WARNING för varje GeoServer-workspace som saknar PG-schema i
          SAMTLIGA övervakade databaser (ingen borttagning görs automatiskt).
       f) Alla fel loggas; funktionen avbryter aldrig LISTEN-loopen.
     """
     tag = _db_tag(db_label)
     log.info("%sStartavstämning: kontrollerar GeoServer mot PostgreSQL-scheman...", tag)
+    started = time.monotonic()
+    result = "error"
 
     try:
         # a) Hämta publicerbara scheman från PostgreSQL – styrt av konfigurationstabellerna
@@ -1313,6 +2043,7 @@ def _reconcile_geoserver_schemas(cur, db_config, gs_client, db_label="", all_pg_
                 "hoppar över startavstämning och fortsätter till LISTEN-loopen",
                 tag, e,
             )
+            result = "geoserver_unavailable"
             return
 
         if resp.status_code != 200:
@@ -1321,6 +2052,7 @@ def _reconcile_geoserver_schemas(cur, db_config, gs_client, db_label="", all_pg_
                 "hoppar över startavstämning",
                 tag, resp.status_code,
             )
+            result = "geoserver_unavailable"
             return
 
         ws_data = resp.json().get("workspaces") or {}
@@ -1330,13 +2062,9 @@ def _reconcile_geoserver_schemas(cur, db_config, gs_client, db_label="", all_pg_
             tag, len(gs_workspaces),
         )
 
-        # c) Alla scheman: skapa saknade workspaces och uppdatera autentiseringsuppgifter
-        #    för befintliga. handle_schema_notification är idempotent (skapar bara om
-        #    något saknas, PUT:ar alltid nya credentials till befintliga datastores).
-        #    Detta säkerställer att lösenordsändringar (t.ex. 'lösenord backfyllt' efter
-        #    ominstallation) slår igenom automatiskt vid omstart av tjänsten.
+        # c) Scheman utan workspace: full publicering via handle_schema_notification.
         missing_in_gs = pg_schemas - gs_workspaces
-        for schema_name in sorted(pg_schemas):
+        for schema_name in sorted(missing_in_gs):
             try:
                 ok = handle_schema_notification(
                     schema_name,
@@ -1345,8 +2073,8 @@ def _reconcile_geoserver_schemas(cur, db_config, gs_client, db_label="", all_pg_
                     gs_client,
                     db_label=db_label,
                 )
-                # d) Logga nyligen skapade workspaces (befintliga uppdateras tyst)
-                if ok and schema_name in missing_in_gs:
+                # d) Logga nyligen skapade workspaces
+                if ok:
                     log.info(
                         "%sStartavstämning: skapat saknat GeoServer-workspace '%s'",
                         tag, schema_name,
@@ -1357,21 +2085,35 @@ def _reconcile_geoserver_schemas(cur, db_config, gs_client, db_label="", all_pg_
                     tag, schema_name, e,
                 )
 
+        # c2) Scheman med befintlig workspace: diffa mot GeoServer-tillstånd som
+        #     hämtas i bulk (roller + ACL-regelkarta) och skriv bara det som avviker.
+        #     Datastore-autentiseringsuppgifter stäms alltid av så att lösenordsändringar
+        #     (t.ex. 'lösenord backfyllt' efter ominstallation) slår igenom.
+        existing_in_gs = sorted(pg_schemas & gs_workspaces)
+        if existing_in_gs:
+            _reconcile_existing_schemas(
+                existing_in_gs, cur.connection, db_config, gs_client, tag,
+                fallback=lambda name: handle_schema_notification(
+                    name, db_config, cur.connection, gs_client, db_label=db_label,
+                ),
+            )
+
         # e) Workspaces i GeoServer utan motsvarande PG-schema – logga varning, gör inget.
         #    I multi-DB-läge (all_pg_schemas angiven) begränsas varningar till de prefix
         #    som denna databas faktiskt hanterar, så att varje äkta föräldralös workspace
         #    bara rapporteras av rätt databas (sk0_oppen → sk0_*, skx_utveckling → skx_*).
         #    Databaser utan egna scheman hoppas över helt i multi-DB-läge.
         known_schemas = all_pg_schemas if all_pg_schemas is not None else pg_schemas
+        pattern = _schema_patterns.get(db_label, cur.connection)
         own_prefixes = {name.split("_")[0] for name in pg_schemas}
         if own_prefixes:
             extra_in_gs = {
                 ws for ws in gs_workspaces - known_schemas
-                if SCHEMA_PATTERN.match(ws) and ws.split("_")[0] in own_prefixes
+                if pattern.match(ws) and ws.split("_")[0] in own_prefixes
             }
         elif all_pg_schemas is None:
             # Enskild databas utan egna scheman: rapportera alla matchande föräldralösa
-            extra_in_gs = {ws for ws in gs_workspaces - known_schemas if SCHEMA_PATTERN.match(ws)}
+            extra_in_gs = {ws for ws in gs_workspaces - known_schemas if pattern.match(ws)}
         else:
             # Multi-DB utan egna scheman: denna databas äger inga prefix – hoppa över
             extra_in_gs = set()
@@ -1385,6 +2127,7 @@ def _reconcile_geoserver_schemas(cur, db_config, gs_client, db_label="", all_pg_
 
         if not missing_in_gs and not extra_in_gs:
             log.info("%sStartavstämning: GeoServer och PostgreSQL är i synk", tag)
+        result = "ok"
 
     except Exception as e:
         # f) Startavstämning får aldrig avbryta uppstarten
@@ -1393,12 +2136,554 @@ def _reconcile_geoserver_schemas(cur, db_config, gs_client, db_label="", all_pg_
             "fortsätter till LISTEN-loopen",
             tag, e,
         )
+    finally:
+        _metrics.observe("hex_reconcile_seconds", time.monotonic() - started, db=db_label)
+        _metrics.inc("hex_reconcile_runs_total", db=db_label, result=result)
+
+
+# =============================================================================
+# ARBETSPOOL
+# =============================================================================
+
+class SchemaWorkerPool:
+    """Begränsad arbetspool för schema-notifieringar med ordning per schema.
+
+    LISTEN-tråden lägger notifieringar i poolen via submit() och återgår
+    direkt till select(), så att ett långsamt GeoServer-anrop (timeout ×
+    retry) inte blockerar andra scheman i samma databas.
+
+    Ordningsgaranti: händelser för SAMMA schema körs en i taget i den ordning
+    de togs emot (t.ex. CREATE följt av DROP). Händelser för OLIKA scheman
+    körs parallellt av upp till max_workers trådar.
+
+    Args:
+        handler:        Anropas som handler(channel, schema_name, *args) i en
+                        arbetartråd, där args är de extra argumenten till submit().
+        max_workers:    Max antal samtidiga arbetartrådar.
+        name:           Namn för trådar och loggning (normalt databasnamnet).
+        on_worker_exit: Anropas (utan argument) i varje arbetartråd när den
+                        avslutas, t.ex. för att stänga trådlokala PG-anslutningar.
+    """
+
+    def __init__(self, handler, max_workers=4, name="", on_worker_exit=None):
+        self._handler = handler
+        self._on_worker_exit = on_worker_exit
+        self._cond = threading.Condition()
+        self._name = name
+        self._pending = {}           # schema -> deque med väntande (kanal, args, mottagen)
+        self._ready = deque()        # scheman med väntande händelser som ingen arbetare kör
+        self._active = set()         # scheman som en arbetare just nu hanterar
+        self._closed = False
+        self._threads = []
+        for i in range(max(1, max_workers)):
+            t = threading.Thread(
+                target=self._worker,
+                name=f"worker-{name}-{i + 1}",
+                daemon=True,
+            )
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, channel, schema_name, *args):
+        """Köar en notifiering. Returnerar False om poolen är stängd."""
+        with self._cond:
+            if self._closed:
+                return False
+            queue = self._pending.setdefault(schema_name, deque())
+            queue.append((channel, args, time.monotonic()))
+            # Schemat är redo om ingen arbetare kör det och det inte redan står i kö
+            if schema_name not in self._active and len(queue) == 1:
+                self._ready.append(schema_name)
+                self._cond.notify()
+            return True
+
+    def pending_count(self):
+        """Antal köade notifieringar som ännu inte påbörjats."""
+        with self._cond:
+            return sum(len(q) for q in self._pending.values())
+
+    def shutdown(self, timeout=5.0):
+        """Stänger poolen. Köade men ej påbörjade notifieringar kastas.
+
+        Pågående anrop får slutföras inom timeout; därefter överges trådarna
+        (de är daemon-trådar). Förlorade händelser fångas av avstämningen.
+        """
+        with self._cond:
+            self._closed = True
+            dropped = sum(len(q) for q in self._pending.values())
+            self._pending.clear()
+            self._ready.clear()
+            self._cond.notify_all()
+        if dropped:
+            log.warning("%d köad(e) notifiering(ar) kastades vid avstängning", dropped)
+        deadline = time.monotonic() + timeout
+        for t in self._threads:
+            t.join(timeout=max(0, deadline - time.monotonic()))
+
+    def _next(self):
+        """Väntar på nästa redo schema. Returnerar (schema, (kanal, args, mottagen)) eller None vid stängning."""
+        with self._cond:
+            while not self._ready and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return None
+            schema_name = self._ready.popleft()
+            entry = self._pending[schema_name].popleft()
+            self._active.add(schema_name)
+            return schema_name, entry
+
+    def _done(self, schema_name):
+        """Markerar schemat som klart och köar det igen om fler händelser väntar."""
+        with self._cond:
+            self._active.discard(schema_name)
+            queue = self._pending.get(schema_name)
+            if queue:
+                self._ready.append(schema_name)
+                self._cond.notify()
+            else:
+                self._pending.pop(schema_name, None)
+
+    def _worker(self):
+        try:
+            while True:
+                item = self._next()
+                if item is None:
+                    return
+                schema_name, (channel, args, received) = item
+                _metrics.observe(
+                    "hex_notification_queue_seconds", time.monotonic() - received, pool=self._name,
+                )
+                try:
+                    self._handler(channel, schema_name, *args)
+                except Exception as e:
+                    # handler ska själv hantera sina fel – detta är sista skyddsnätet
+                    log.error("Oväntat fel i arbetartråd för schema '%s': %s", schema_name, e)
+                finally:
+                    self._done(schema_name)
+        finally:
+            if self._on_worker_exit is not None:
+                try:
+                    self._on_worker_exit()
+                except Exception:
+                    pass
+
+
+class NotificationCoalescer:
+    """Samlar notifieringar under ett kort fönster innan de lämnas till arbetspoolen.
+
+    Underhållskörningar (underhall_hex()) och skriptade schemaskapanden ger
+    skurar av notifieringar, ofta med dubbletter. Notifieringar för samma
+    databas och schema som väntar i fönstret slås ihop:
+
+      - Samma kanal igen (dubblett)     → slås ihop till en hantering.
+      - Borttagning efter väntande skapa → skapandet ställs in; bara
+                                          borttagningen körs.
+      - Skapa efter väntande borttagning → borttagningen lämnas genast till
+                                          poolen och skapandet väntar som ny
+                                          post (schemat återskapas).
+
+    Händelse-id:n (handelse_id) från sammanslagna notifieringar följer med
+    den notifiering som faktiskt körs och kvitteras med dess utfall.
+
+    Används enbart från LISTEN-tråden (add/flush), så ingen låsning behövs.
+
+    Args:
+        pool:           Arbetspool med submit(channel, schema_name, *args).
+        window_seconds: Hur länge en notifiering väntar på följeslagare
+                        (0 = bara notifieringar från samma poll slås ihop).
+    """
+
+    def __init__(self, pool, window_seconds=2.0):
+        self._pool = pool
+        self.window_seconds = max(0.0, float(window_seconds))
+        self._pending = {}   # (lyssnare, schema) -> [kanal, [handelse_id...], förfallotid]
+
+    def add(self, channel, schema_name, listener, *handelse_ids):
+        """Lägger en notifiering i fönstret. Returnerar alltid True."""
+        key = (listener, schema_name)
+        db_label = getattr(listener, "db_label", "")
+        entry = self._pending.get(key)
+        if entry is not None:
+            if entry[0] == channel:
+                entry[1].extend(handelse_ids)
+                _metrics.inc("hex_notifications_coalesced_total", db=db_label, reason="duplicate")
+                return True
+            if channel == CHANNEL_SCHEMA_DROP:
+                log.info("[%s] Skapande av '%s' ställs in – schemat togs bort innan det hanterats",
+                         db_label, schema_name)
+                entry[0] = channel
+                entry[1].extend(handelse_ids)
+                _metrics.inc("hex_notifications_coalesced_total", db=db_label, reason="cancelled")
+                return True
+            # Återskapat schema: borttagningen måste köras före det nya skapandet
+            self._submit(key, self._pending.pop(key))
+        self._pending[key] = [channel, list(handelse_ids), time.monotonic() + self.window_seconds]
+        return True
+
+    def flush(self, force=False):
+        """Lämnar notifieringar vars fönster löpt ut (alla om force) till poolen.
+
+        Returns:
+            Antal notifieringar som lämnades.
+        """
+        now = time.monotonic()
+        due = [key for key, entry in self._pending.items() if force or entry[2] <= now]
+        for key in due:
+            self._submit(key, self._pending.pop(key))
+        return len(due)
+
+    def next_due(self):
+        """Sekunder tills nästa notifiering ska lämnas, eller None om inget väntar."""
+        if not self._pending:
+            return None
+        return max(0.0, min(entry[2] for entry in self._pending.values()) - time.monotonic())
+
+    def pending_count(self):
+        return len(self._pending)
+
+    def _submit(self, key, entry):
+        listener, schema_name = key
+        channel, handelse_ids, _ = entry
+        if not self._pool.submit(channel, schema_name, listener, *handelse_ids):
+            outbox = getattr(listener, "outbox", None)
+            for handelse_id in handelse_ids:
+                outbox.complete(None, handelse_id, False)
+
+
+# =============================================================================
+# HÄNDELSEKÖ
+# =============================================================================
+
+# Händelsetyper i hex_geoserver_handelser och motsvarande pg_notify-kanal
+_HANDELSE_KANAL = {
+    "skapa": CHANNEL_SCHEMA_CREATE,
+    "ta_bort": CHANNEL_SCHEMA_DROP,
+}
+
+
+class GeoServerOutbox:
+    """Konsument för händelsekön public.hex_geoserver_handelser i en databas.
+
+    notifiera_geoserver() och notifiera_geoserver_borttagning() skriver en rad
+    per händelse i samma transaktion som pg_notify. Lyssnaren använder
+    notifieringen enbart som väckning och hämtar själva händelserna härifrån,
+    så att händelser som inträffar medan lyssnaren är nere (eller upptagen)
+    spelas upp vid nästa anslutning i stället för att kräva full avstämning.
+
+    claim() reserverar en batch med FOR UPDATE SKIP LOCKED och sätter en lease
+    (last_till), så att flera lyssnarinstanser kan dela på kön. En händelse
+    reserveras inte så länge en tidigare ohanterad händelse för samma schema är
+    reserverad, vilket bevarar ordningen (CREATE före DROP) även mellan
+    instanser. complete() kvitterar händelsen; misslyckade händelser får nytt
+    försök med växande fördröjning och ges upp efter MAX_ATTEMPTS.
+    """
+
+    BATCH_SIZE = 100
+    LEASE_SECONDS = 300
+    MAX_ATTEMPTS = 5
+    RETRY_DELAY_SECONDS = 60    # × antal försök
+    RETENTION_DAYS = 30
+
+    _CLAIM_SQL = """
+        UPDATE public.hex_geoserver_handelser h
+           SET last_till = now() + make_interval(secs => %s),
+               forsok    = h.forsok + 1
+         WHERE h.id IN (
+               SELECT k.id
+                 FROM public.hex_geoserver_handelser k
+                WHERE k.behandlad IS NULL
+                  AND (k.last_till IS NULL OR k.last_till < now())
+                  AND k.id <> ALL(%s)
+                  AND NOT EXISTS (
+                      SELECT 1
+                        FROM public.hex_geoserver_handelser t
+                       WHERE t.schema_namn = k.schema_namn
+                         AND t.behandlad IS NULL
+                         AND t.id < k.id
+                         AND t.last_till >= now()
+                  )
+                ORDER BY k.id
+                LIMIT %s
+                  FOR UPDATE SKIP LOCKED
+         )
+        RETURNING h.id, h.schema_namn, h.handelse
+    """
+
+    def __init__(self, db_label=""):
+        self.db_label = db_label
+        self._inflight = set()
+        self._lock = threading.Lock()
+
+    def available(self, conn):
+        """Returnerar True om händelsekön finns och kan läsas av lyssnaren.
+
+        Äldre installationer saknar tabellen – då används notifieringarnas
+        payload direkt och startavstämningen fångar missade händelser.
+        """
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT CASE WHEN to_regclass('public.hex_geoserver_handelser') IS NULL"
+                    " THEN false"
+                    # Flera privilegier i samma anrop betyder "något av dem" –
+                    # lyssnaren behöver alla tre.
+                    " ELSE has_table_privilege('public.hex_geoserver_handelser', 'SELECT')"
+                    "  AND has_table_privilege('public.hex_geoserver_handelser', 'INSERT')"
+                    "  AND has_table_privilege('public.hex_geoserver_handelser', 'UPDATE')"
+                    " END"
+                )
+                ok = bool(cur.fetchone()[0])
+        except psycopg2.Error as e:
+            ok = False
+            log.warning("%sKunde inte kontrollera händelsekön: %s", _db_tag(self.db_label), e)
+        if not ok:
+            log.warning(
+                "%sHändelsekön hex_geoserver_handelser saknas eller är inte läs-/skrivbar "
+                "för lyssnaren – använder notifieringarnas payload och startavstämning",
+                _db_tag(self.db_label),
+            )
+        return ok
+
+    def enqueue(self, conn, channel, schema_name):
+        """Lägger en manuellt skickad notifiering i kön.
+
+        Notifieringar från triggrarna har redan en rad i kön (skriven i samma
+        transaktion). En manuell återutsändning (NOTIFY geoserver_schema, '...')
+        saknar rad och läggs därför till här – om ingen ohanterad eller nyss
+        behandlad rad för samma schema och händelse redan finns.
+
+        Returns:
+            True om en ny rad lades till.
+        """
+        handelse = next(h for h, kanal in _HANDELSE_KANAL.items() if kanal == channel)
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "INSERT INTO public.hex_geoserver_handelser (schema_namn, handelse)"
+                    " SELECT %s, %s"
+                    " WHERE NOT EXISTS ("
+                    "   SELECT 1 FROM public.hex_geoserver_handelser"
+                    "    WHERE schema_namn = %s AND handelse = %s"
+                    "      AND (behandlad IS NULL OR behandlad > now() - interval '1 minute')"
+                    " )",
+                    (schema_name, handelse, schema_name, handelse),
+                )
+                added = cur.rowcount == 1
+        except psycopg2.Error as e:
+            log.warning(
+                "%sKunde inte lägga notifiering för '%s' i händelsekön: %s",
+                _db_tag(self.db_label), schema_name, e,
+            )
+            return False
+        if added:
+            log.info(
+                "%sManuell notifiering för '%s' lagd i händelsekön",
+                _db_tag(self.db_label), schema_name,
+            )
+        return added
+
+    def claim(self, conn):
+        """Reserverar nästa batch ohanterade händelser.
+
+        Returns:
+            Lista med (id, kanal, schemanamn) i köordning.
+        """
+        with self._lock:
+            inflight = sorted(self._inflight)
+        with conn.cursor() as cur:
+            cur.execute(self._CLAIM_SQL, (self.LEASE_SECONDS, inflight, self.BATCH_SIZE))
+            rows = cur.fetchall()
+
+        events = []
+        with self._lock:
+            for handelse_id, schema_name, handelse in sorted(rows):
+                self._inflight.add(handelse_id)
+                events.append((handelse_id, _HANDELSE_KANAL[handelse], schema_name))
+        if events:
+            log.info("%sHändelsekö: %d händelse(r) reserverade", _db_tag(self.db_label), len(events))
+        return events
+
+    def complete(self, conn, handelse_id, ok):
+        """Kvitterar en händelse. Släpper alltid reservationen lokalt.
+
+        Lyckad händelse markeras som behandlad. Misslyckad händelse får nytt
+        försök efter RETRY_DELAY_SECONDS × antal försök; efter MAX_ATTEMPTS
+        markeras den som behandlad med senaste_fel satt.
+        """
+        try:
+            if conn is None:
+                return
+            with conn.cursor() as cur:
+                if ok:
+                    cur.execute(
+                        "UPDATE public.hex_geoserver_handelser"
+                        " SET behandlad = now(), last_till = NULL, senaste_fel = NULL"
+                        " WHERE id = %s",
+                        (handelse_id,),
+                    )
+                else:
+                    cur.execute(
+                        "UPDATE public.hex_geoserver_handelser"
+                        " SET senaste_fel = %s,"
+                        "     last_till = now() + make_interval(secs => %s * forsok),"
+                        "     behandlad = CASE WHEN forsok >= %s THEN now() END"
+                        " WHERE id = %s",
+                        ("Hanteringen misslyckades – se lyssnarens logg",
+                         self.RETRY_DELAY_SECONDS, self.MAX_ATTEMPTS, handelse_id),
+                    )
+        except Exception as e:
+            # Reservationen löper ut av sig själv – händelsen tas om senare
+            log.warning(
+                "%sKunde inte kvittera händelse %s i hex_geoserver_handelser: %s",
+                _db_tag(self.db_label), handelse_id, e,
+            )
+        finally:
+            with self._lock:
+                self._inflight.discard(handelse_id)
+
+    def purge(self, conn):
+        """Tar bort behandlade händelser äldre än RETENTION_DAYS."""
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM public.hex_geoserver_handelser"
+                    " WHERE behandlad < now() - make_interval(days => %s)",
+                    (self.RETENTION_DAYS,),
+                )
+                if cur.rowcount:
+                    log.info(
+                        "%sHändelsekö: %d gammal/gamla behandlad(e) händelse(r) borttagna",
+                        _db_tag(self.db_label), cur.rowcount,
+                    )
+        except psycopg2.Error as e:
+            log.warning("%sKunde inte rensa hex_geoserver_handelser: %s", _db_tag(self.db_label), e)
 
 
 # =============================================================================
 # POSTGRESQL LISTENER
 # =============================================================================
 
+def _connect_pg(db_config):
+    """Öppnar en psycopg2-anslutning i AUTOCOMMIT-läge med UTF-8-klientkodning."""
+    conn = psycopg2.connect(
+        host=db_config["host"],
+        port=db_config["port"],
+        dbname=db_config["dbname"],
+        user=db_config["user"],
+        password=db_config["password"],
+        connect_timeout=10,
+        client_encoding="utf8",
+    )
+    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    return conn
+
+
+class PgConnectionPool:
+    """Liten begränsad pool av PostgreSQL-anslutningar mot en databas.
+
+    Delas av databasens arbetartrådar, avstämningen och uppstartens
+    schemahämtning, så att antalet anslutningar per databas begränsas till
+    max_connections oberoende av antalet trådar. Anslutningar öppnas först
+    när de behövs och återanvänds; en anslutning som tappats (eller gav
+    OperationalError) kastas och ersätts vid nästa lån. Lån utöver
+    max_connections väntar tills en anslutning lämnas tillbaka.
+    """
+
+    def __init__(self, db_config, max_connections=2):
+        self.db_config = db_config
+        self.max_connections = max(1, int(max_connections))
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._closed = False
+
+    @contextmanager
+    def connection(self):
+        """Lånar en anslutning (AUTOCOMMIT) under with-blocket."""
+        self._slots.acquire()
+        conn = None
+        try:
+            with self._lock:
+                while self._idle and conn is None:
+                    candidate = self._idle.pop()
+                    if not candidate.closed:
+                        conn = candidate
+            if conn is None:
+                conn = _connect_pg(self.db_config)
+            yield conn
+        except psycopg2.OperationalError:
+            if conn is not None:
+                self._discard(conn)
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                with self._lock:
+                    keep = not self._closed and not conn.closed
+                    if keep:
+                        self._idle.append(conn)
+                if not keep:
+                    self._discard(conn)
+            self._slots.release()
+
+    def close(self):
+        """Stänger lediga anslutningar; utlånade stängs när de lämnas tillbaka."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._discard(conn)
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            if not conn.closed:
+                conn.close()
+        except Exception:
+            pass
+
+
+def _run_reconcile(db_config, gs_client, db_label="", all_pg_schemas=None, interval_seconds=0, pg_pool=None):
+    """Kör en avstämning på en egen anslutning (ur pg_pool om angiven).
+
+    Kastar aldrig undantag – anslutnings- och oväntade fel loggas.
+    """
+    tag = _db_tag(db_label)
+    log.info("%sPeriodisk avstämning: startar kontroll...", tag)
+    try:
+        if pg_pool is not None:
+            with pg_pool.connection() as conn:
+                with conn.cursor() as cur:
+                    _reconcile_geoserver_schemas(cur, db_config, gs_client, db_label, all_pg_schemas)
+            return
+        conn = psycopg2.connect(
+            host=db_config["host"],
+            port=db_config["port"],
+            dbname=db_config["dbname"],
+            user=db_config["user"],
+            password=db_config["password"],
+            connect_timeout=10,
+            client_encoding="utf8",
+        )
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        try:
+            with conn.cursor() as cur:
+                _reconcile_geoserver_schemas(cur, db_config, gs_client, db_label, all_pg_schemas)
+        finally:
+            conn.close()
+    except psycopg2.OperationalError as e:
+        log.warning(
+            "%sPeriodisk avstämning: kan inte ansluta till PostgreSQL (%s)"
+            " – försöker igen om %d sekunder.",
+            tag, e, interval_seconds,
+        )
+    except Exception as e:
+        log.error(
+            "%sPeriodisk avstämning: oväntat fel: %s – försöker igen om %d sekunder.",
+            tag, e, interval_seconds,
+        )
+
+
 def _periodic_reconcile_loop(db_config, gs_client, stop_event, interval_seconds, db_label="", all_pg_schemas=None):
     """Periodisk avstämning som kör _reconcile_geoserver_schemas på ett fast intervall.
 
@@ -1420,38 +2705,39 @@ def _periodic_reconcile_loop(db_config, gs_client, stop_event, interval_seconds,
     )
 
     while not stop_event.wait(interval_seconds):
-        log.info("%sPeriodisk avstämning: startar kontroll...", tag)
-        try:
-            conn = psycopg2.connect(
-                host=db_config["host"],
-                port=db_config["port"],
-                dbname=db_config["dbname"],
-                user=db_config["user"],
-                password=db_config["password"],
-                connect_timeout=10,
-                client_encoding="utf8",
-            )
-            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
-            try:
-                with conn.cursor() as cur:
-                    _reconcile_geoserver_schemas(cur, db_config, gs_client, db_label, all_pg_schemas)
-            finally:
-                conn.close()
-        except psycopg2.OperationalError as e:
-            log.warning(
-                "%sPeriodisk avstämning: kan inte ansluta till PostgreSQL (%s)"
-                " – försöker igen om %d sekunder.",
-                tag, e, interval_seconds,
-            )
-        except Exception as e:
-            log.error(
-                "%sPeriodisk avstämning: oväntat fel: %s – försöker igen om %d sekunder.",
-                tag, e, interval_seconds,
-            )
+        _run_reconcile(db_config, gs_client, db_label, all_pg_schemas, interval_seconds)
 
     log.info("%sPeriodisk avstämning avslutad.", tag)
 
 
+def _periodic_reconcile_all(targets, gs_client, stop_event, interval_seconds, all_pg_schemas=None):
+    """Periodisk avstämning för flera databaser i en gemensam tråd.
+
+    Databaserna stäms av i tur och ordning med en anslutning lånad ur
+    respektive databas PgConnectionPool.
+
+    Args:
+        targets:          Lista med (db_config, pg_pool).
+        gs_client:        GeoServerClient-instans.
+        stop_event:       threading.Event – sätts vid graceful shutdown.
+        interval_seconds: Sekunder mellan körningarna.
+        all_pg_schemas:   Samlad schema-mängd från alla övervakade databaser.
+    """
+    log.info(
+        "Periodisk avstämning aktiv för %d databas(er) – körs var %d sekunder (%.0f min).",
+        len(targets), interval_seconds, interval_seconds / 60,
+    )
+    while not stop_event.wait(interval_seconds):
+        for db_config, pg_pool in targets:
+            if stop_event.is_set():
+                break
+            _run_reconcile(
+                db_config, gs_client, db_config["dbname"], all_pg_schemas,
+                interval_seconds, pg_pool,
+            )
+    log.info("Periodisk avstämning avslutad.")
+
+
 def _dispatch_notification_error(channel, db_label, schema_name, error, notifier, transient=False):
     """Centraliserad felhantering för schema-notifieringar.
 
@@ -1495,9 +2781,493 @@ def _dispatch_notification_error(channel, db_label, schema_name, error, notifier
         if notifier:
             notifier.notify_schema_failure(schema_name, db_label, error)
 
-def listen_loop(db_config, reconnect_delay, gs_client, stop_event=None, notifier=None, all_pg_schemas=None, reconcile_interval=0):
+
+def _process_notification(channel, schema_name, db_config, pg_conn, gs_client, notifier=None, db_label=""):
+    """Kör rätt hanterare för en notifiering och hanterar dess fel.
+
+    Kastar aldrig undantag – transienta GeoServer-fel och oväntade fel
+    skickas vidare till _dispatch_notification_error.
+
+    Returns:
+        True om hanteraren lyckades, annars False.
+    """
+    started = time.monotonic()
+    result = "error"
+    try:
+        if channel == CHANNEL_SCHEMA_DROP:
+            ok = handle_schema_removal_notification(
+                schema_name,
+                gs_client,
+                pg_conn=pg_conn,
+                db_label=db_label,
+            )
+        else:
+            ok = handle_schema_notification(
+                schema_name,
+                db_config,
+                pg_conn,
+                gs_client,
+                db_label=db_label,
+            )
+        if not ok:
+            log.warning(
+                "[%s] Hantering av schema '%s' misslyckades - "
+                "se tidigare loggposter för detaljer",
+                db_label, schema_name,
+            )
+        result = "ok" if ok else "failed"
+        return bool(ok)
+    except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+        # Transienta fel - alla retry i _request_with_retry är förbrukade.
+        result = "transient"
+        _dispatch_notification_error(
+            channel, db_label, schema_name, e, notifier, transient=True
+        )
+    except Exception as e:
+        _dispatch_notification_error(
+            channel, db_label, schema_name, e, notifier, transient=False
+        )
+    finally:
+        _metrics.observe(
+            "hex_notification_seconds", time.monotonic() - started, db=db_label, channel=channel,
+        )
+        _metrics.inc("hex_notifications_handled_total", db=db_label, channel=channel, result=result)
+    return False
+
+
+def _drain_outbox(outbox, conn, pool):
+    """Reserverar ohanterade händelser ur kön och lämnar dem till arbetspoolen."""
+    for handelse_id, channel, schema_name in outbox.claim(conn):
+        if not pool.submit(channel, schema_name, handelse_id):
+            outbox.complete(None, handelse_id, False)
+
+
+def _make_worker_handler(db_config, gs_client, notifier=None, db_label="", outbox=None, pg_pool=None):
+    """Skapar hanterarfunktionen för en databas notifieringar.
+
+    Arbetartrådarna lånar PG-anslutningar ur pg_pool (standard: en egen
+    PgConnectionPool för databasen), så att de aldrig delar LISTEN-anslutningen
+    med select()-loopen och antalet anslutningar inte växer med antalet
+    arbetare.
+
+    Händelser från händelsekön (ett eller flera handelse_id, se
+    NotificationCoalescer) kvitteras via outbox när de hanterats.
+
+    Returns:
+        (handler, pg_pool)
+    """
+    if pg_pool is None:
+        pg_pool = PgConnectionPool(db_config)
+
+    def handler(channel, schema_name, *handelse_ids):
+        try:
+            with pg_pool.connection() as conn:
+                ok = _process_notification(
+                    channel, schema_name, db_config, conn, gs_client, notifier, db_label
+                )
+                for handelse_id in handelse_ids:
+                    outbox.complete(conn, handelse_id, ok)
+        except psycopg2.OperationalError as e:
+            _dispatch_notification_error(
+                channel, db_label, schema_name, e, notifier, transient=False
+            )
+            for handelse_id in handelse_ids:
+                # Ingen anslutning att kvittera på – reservationen löper ut
+                outbox.complete(None, handelse_id, False)
+
+    return handler, pg_pool
+
+
+class _DatabaseListener:
+    """LISTEN-anslutning och tillstånd för en databas i _multiplexed_listen_loop.
+
+    Äger databasens LISTEN-anslutning, händelsekö och hanterare. Själva
+    väntan (select) görs av den gemensamma loopen för alla databaser, som
+    anropar start_connect(), take_connection(), on_readable(), keepalive()
+    och fail().
+
+    Anslutning och startavstämning görs i en egen tråd (start_connect), så
+    att en databas som inte svarar (upp till connect_timeout per försök) eller
+    en långsam GeoServer inte stoppar loopen för de andra databaserna.
+
+    Notifieringarna läggs i en NotificationCoalescer framför arbetspoolen,
+    som kan delas mellan databaserna; submit() skickar med lyssnaren så att
+    rätt databas hanterare anropas.
+    """
+
+    def __init__(self, db_config, gs_client, coalescer, notifier=None, all_pg_schemas=None, pg_pool=None):
+        self.db_config = db_config
+        self.db_label = db_config["dbname"]
+        self.gs_client = gs_client
+        self.coalescer = coalescer
+        self.notifier = notifier
+        self.all_pg_schemas = all_pg_schemas
+        self.outbox = GeoServerOutbox(self.db_label)
+        self.handler, self.pg_pool = _make_worker_handler(
+            db_config, gs_client, notifier, self.db_label, self.outbox, pg_pool,
+        )
+        self.conn = None
+        self.cur = None
+        self.use_outbox = False
+        self.was_disconnected = False   # för återhämtningsnotifiering
+        self.retry_at = 0.0             # monotonic-tid då nästa anslutningsförsök får göras
+        self.last_activity = 0.0
+        self.connecting = None          # anslutningstråd (lever även under startavstämningen)
+        self._lock = threading.Lock()
+        self._ready = None              # (conn, cur, use_outbox) eller undantag från anslutningstråden
+        self._stopped = False
+
+    def submit(self, channel, schema_name, *args):
+        """Lägger en notifiering i samlingsfönstret framför arbetspoolen."""
+        return self.coalescer.add(channel, schema_name, self, *args)
+
+    def busy(self):
+        """True medan anslutningstråden (anslutning eller startavstämning) pågår."""
+        return self.connecting is not None and self.connecting.is_alive()
+
+    def start_connect(self, wake):
+        """Startar en anslutningstråd. wake() anropas när resultatet kan hämtas
+        med take_connection() och när tråden är klar."""
+        db_config = self.db_config
+        log.info("[%s] Ansluter till PostgreSQL %s@%s:%d/%s...",
+                 self.db_label, db_config["user"], db_config["host"],
+                 db_config["port"], db_config["dbname"])
+        self.connecting = threading.Thread(
+            target=self._connect_worker, args=(wake,),
+            name=f"connect-{self.db_label}", daemon=True,
+        )
+        self.connecting.start()
+
+    def _connect_worker(self, wake):
+        try:
+            try:
+                result = self._open()
+            except Exception as e:
+                result = e
+            with self._lock:
+                if self._stopped:
+                    if not isinstance(result, Exception):
+                        result[0].close()
+                    return
+                self._ready = result
+            wake()
+            if not isinstance(result, Exception) and not result[2]:
+                self._startup_reconcile()
+        finally:
+            wake()
+
+    def _open(self):
+        """Ansluter och startar LISTEN (körs i anslutningstråden)."""
+        conn = _connect_pg(self.db_config)
+        try:
+            cur = conn.cursor()
+            cur.execute(f"LISTEN {CHANNEL_SCHEMA_CREATE};")
+            cur.execute(f"LISTEN {CHANNEL_SCHEMA_DROP};")
+            cur.execute(f"LISTEN {CHANNEL_SCHEMA_CONFIG};")
+
+            # Ladda schemanamnsmönster från konfigurationstabellerna. Ändringar
+            # medan anslutningen var nere har inte notifierats – läs alltid om.
+            _schema_patterns.invalidate(self.db_label)
+            _schema_patterns.get(self.db_label, conn)
+
+            use_outbox = self.outbox.available(conn)
+            if use_outbox:
+                self.outbox.purge(conn)
+        except Exception:
+            conn.close()
+            raise
+        return conn, cur, use_outbox
+
+    def _startup_reconcile(self):
+        """Startavstämning när händelsekön saknas (körs i anslutningstråden).
+
+        Fångar upp scheman som skapades medan lyssnaren var nere. Körs på en
+        anslutning ur pg_pool medan LISTEN-anslutningen redan tagits över av
+        loopen, så notifieringar under avstämningen hanteras som vanligt.
+        """
+        try:
+            with self.pg_pool.connection() as conn:
+                with conn.cursor() as cur:
+                    _reconcile_geoserver_schemas(
+                        cur, self.db_config, self.gs_client, self.db_label, self.all_pg_schemas,
+                    )
+        except Exception as e:
+            log.error("[%s] Startavstämning misslyckades: %s", self.db_label, e)
+
+    def take_connection(self):
+        """Tar över anslutningen från anslutningstråden.
+
+        Returns:
+            None om inget resultat finns, True när anslutningen tagits över.
+            Ett misslyckat anslutningsförsök kastas vidare.
+        """
+        with self._lock:
+            result, self._ready = self._ready, None
+        if result is None:
+            return None
+        if isinstance(result, Exception):
+            raise result
+
+        self.conn, self.cur, self.use_outbox = result
+        log.info("[%s] Lyssnar på kanaler '%s', '%s' och '%s'...",
+                 self.db_label, CHANNEL_SCHEMA_CREATE, CHANNEL_SCHEMA_DROP,
+                 CHANNEL_SCHEMA_CONFIG)
+        log.info("[%s] Väntar på schema-händelser...", self.db_label)
+        _metrics.set_gauge("hex_listen_connected", 1, db=self.db_label)
+
+        if self.use_outbox:
+            # Spela upp händelser som inträffade medan lyssnaren var nere
+            _drain_outbox(self.outbox, self.conn, self)
+
+        # Skicka återhämtningsnotifiering om vi tappat anslutning tidigare
+        if self.was_disconnected:
+            if self.notifier:
+                self.notifier.notify_pg_reconnected(self.db_label)
+            self.was_disconnected = False
+        self.last_activity = time.monotonic()
+        return True
+
+    def keepalive(self):
+        """Håller en tyst anslutning vid liv (och hämtar händelser vars väntetid löpt ut)."""
+        woke = time.monotonic()
+        _metrics.inc("hex_listen_wakeups_total", db=self.db_label, reason="timeout")
+        if self.use_outbox:
+            _drain_outbox(self.outbox, self.conn, self)
+        else:
+            self.cur.execute("SELECT 1")
+        self.last_activity = time.monotonic()
+        _metrics.observe("hex_listen_cycle_seconds", self.last_activity - woke, db=self.db_label)
+
+    def on_readable(self):
+        """Läser och delar ut väntande notifieringar."""
+        woke = time.monotonic()
+        _metrics.inc("hex_listen_wakeups_total", db=self.db_label, reason="notify")
+        self.conn.poll()
+        wake = False
+        while self.conn.notifies:
+            notify = self.conn.notifies.pop(0)
+            schema_name = notify.payload
+            _metrics.inc("hex_notifications_received_total", db=self.db_label, channel=notify.channel)
+
+            if notify.channel == CHANNEL_SCHEMA_CONFIG:
+                # Payload = ändrad tabell; mönstret laddas om vid nästa behov
+                log.info("[%s] Konfigurationstabell ändrad (%s) – "
+                         "schemanamnsmönstret laddas om", self.db_label, schema_name)
+                _schema_patterns.invalidate(self.db_label)
+                continue
+
+            if not schema_name:
+                log.warning("[%s] Tom notifiering mottagen - ignorerar", self.db_label)
+                continue
+
+            if self.use_outbox:
+                # Triggrarnas händelser ligger redan i kön; en manuell
+                # NOTIFY (giltigt schemanamn) läggs till innan hämtning.
+                if _schema_patterns.get(self.db_label, self.conn).match(schema_name):
+                    self.outbox.enqueue(self.conn, notify.channel, schema_name)
+                wake = True
+            else:
+                self.submit(notify.channel, schema_name)
+
+        if wake:
+            _drain_outbox(self.outbox, self.conn, self)
+        self.last_activity = time.monotonic()
+        _metrics.observe("hex_listen_cycle_seconds", self.last_activity - woke, db=self.db_label)
+
+    def fail(self, error, reconnect_delay):
+        """Loggar och notifierar ett anslutningsfel, stänger och schemalägger återanslutning."""
+        if isinstance(error, psycopg2.OperationalError):
+            log.error("[%s] PostgreSQL-anslutning förlorad: %s", self.db_label, error)
+            if self.notifier:
+                self.notifier.notify_pg_connection_lost(self.db_label, error)
+        else:
+            log.error("[%s] Oväntat fel: %s", self.db_label, error)
+            if self.notifier:
+                self.notifier.notify_unexpected_error(self.db_label, error)
+        _metrics.inc("hex_listen_connection_errors_total", db=self.db_label)
+        self.was_disconnected = True
+        self.close()
+        self.retry_at = time.monotonic() + reconnect_delay
+        log.info("[%s] Återansluter om %d sekunder...", self.db_label, reconnect_delay)
+
+    def close(self):
+        _metrics.set_gauge("hex_listen_connected", 0, db=self.db_label)
+        conn, self.conn, self.cur = self.conn, None, None
+        if conn is not None and not conn.closed:
+            conn.close()
+
+    def stop(self):
+        """Stänger anslutningen, även en som anslutningstråden inte lämnat över än."""
+        with self._lock:
+            self._stopped = True
+            result, self._ready = self._ready, None
+        if result is not None and not isinstance(result, Exception):
+            result[0].close()
+        self.close()
+
+
+# Sekunder utan aktivitet innan en LISTEN-anslutning får en keepalive
+LISTEN_KEEPALIVE_SECONDS = 5
+
+
+def _multiplexed_listen_loop(listeners, reconnect_delay, stop_event, coalescer=None):
+    """Väntar på notifieringar från alla databaser i en enda tråd.
+
+    Alla LISTEN-anslutningar registreras i en selector. Läsbara anslutningar
+    pollas och deras notifieringar läggs i arbetspoolen; anslutningar som
+    varit tysta i LISTEN_KEEPALIVE_SECONDS får en keepalive. En databas som
+    tappar anslutningen påverkar inte de andra – den återansluts efter
+    reconnect_delay sekunder medan övriga databaser fortsätter lyssna.
+    Notifieringar vars samlingsfönster löpt ut lämnas till arbetspoolen
+    efter varje varv.
+
+    (Åter)anslutning och startavstämning görs i lyssnarens anslutningstråd;
+    tråden väcker loopen via ett socketpar i selectorn när anslutningen kan
+    tas över, så att loopen aldrig blockeras av en databas som inte svarar.
+
+    Args:
+        listeners:       Lista med _DatabaseListener.
+        reconnect_delay: Sekunder att vänta innan återanslutning.
+        stop_event:      threading.Event som avslutar loopen.
+        coalescer:       NotificationCoalescer som lyssnarna lägger notifieringar i.
+    """
+    selector = selectors.DefaultSelector()
+
+    # Registrerat med filnumret, eftersom en stängd psycopg2-anslutning
+    # inte längre kan ge sitt fileno() när den ska avregistreras
+    registered = {}   # lyssnare -> fd
+
+    # Väckning från anslutningstrådarna
+    wake_r, wake_w = socket.socketpair()
+    wake_r.setblocking(False)
+    wake_w.setblocking(False)
+    selector.register(wake_r, selectors.EVENT_READ, None)
+
+    def wake():
+        try:
+            wake_w.send(b"\0")
+        except OSError:
+            pass   # bufferten full (loopen väcks ändå) eller redan stängd
+
+    def drop(listener, error):
+        fd = registered.pop(listener, None)
+        if fd is not None:
+            selector.unregister(fd)
+        listener.fail(error, reconnect_delay)
+
+    try:
+        while not stop_event.is_set():
+            # Ta över färdiga anslutningar och starta försök vars väntetid löpt ut
+            for listener in listeners:
+                if stop_event.is_set():
+                    break
+                try:
+                    if listener.take_connection():
+                        fd = listener.conn.fileno()
+                        selector.register(fd, selectors.EVENT_READ, listener)
+                        registered[listener] = fd
+                        continue
+                except Exception as e:
+                    drop(listener, e)
+                if (listener.conn is None and not listener.busy()
+                        and time.monotonic() >= listener.retry_at):
+                    listener.start_connect(wake)
+
+            # Kort timeout så att stop_event, keepalive och återanslutning kontrolleras regelbundet
+            timeout = LISTEN_KEEPALIVE_SECONDS
+            waiting = [lst.retry_at for lst in listeners if lst.conn is None and not lst.busy()]
+            if waiting:
+                timeout = min(timeout, max(0.0, min(waiting) - time.monotonic()))
+            if coalescer is not None:
+                coalescer.flush()
+                due = coalescer.next_due()
+                if due is not None:
+                    timeout = min(timeout, due)
+
+            for key, _ in selector.select(timeout):
+                listener = key.data
+                if listener is None:
+                    try:
+                        while wake_r.recv(4096):
+                            pass
+                    except OSError:
+                        pass   # tömd
+                    continue
+                try:
+                    listener.on_readable()
+                except Exception as e:
+                    drop(listener, e)
+
+            now = time.monotonic()
+            for listener in listeners:
+                if listener.conn is not None and now - listener.last_activity >= LISTEN_KEEPALIVE_SECONDS:
+                    try:
+                        listener.keepalive()
+                    except Exception as e:
+                        drop(listener, e)
+
+            if coalescer is not None:
+                coalescer.flush()
+    finally:
+        for listener, fd in registered.items():
+            selector.unregister(fd)
+        for listener in listeners:
+            listener.stop()
+        selector.unregister(wake_r)
+        selector.close()
+        wake_r.close()
+        wake_w.close()
+
+
+def _serve_databases(databases, reconnect_delay, gs_client, stop_event, notifier=None,
+                     all_pg_schemas=None, worker_count=4, name="", coalesce_window=2.0):
+    """Lyssnar på alla databaser i anropande tråd tills stop_event sätts.
+
+    Args:
+        databases: Lista med (db_config, pg_pool); pg_pool kan vara None.
+        name:      Namn på den gemensamma arbetspoolen (trådnamn och metrik).
+        coalesce_window: Sekunder som notifieringar samlas innan de hanteras
+                         (se NotificationCoalescer).
+
+    Alla databaser delar en SchemaWorkerPool med worker_count arbetare.
+    """
+    pool = SchemaWorkerPool(
+        lambda channel, schema_name, listener, *args: listener.handler(channel, schema_name, *args),
+        worker_count,
+        name=name,
+    )
+    _metrics.set_gauge("hex_worker_queue_depth", pool.pending_count, pool=name)
+    coalescer = NotificationCoalescer(pool, coalesce_window)
+    listeners = [
+        _DatabaseListener(db_config, gs_client, coalescer, notifier, all_pg_schemas, pg_pool)
+        for db_config, pg_pool in databases
+    ]
+    for listener in listeners:
+        _metrics.set_gauge("hex_listen_connected", 0, db=listener.db_label)
+    try:
+        _multiplexed_listen_loop(listeners, reconnect_delay, stop_event, coalescer)
+    finally:
+        if coalescer.pending_count():
+            log.warning("%d notifiering(ar) i samlingsfönstret kastades vid avstängning",
+                        coalescer.pending_count())
+        pool.shutdown()
+        for listener in listeners:
+            listener.pg_pool.close()
+            log.info("[%s] Lyssnaren avslutad.", listener.db_label)
+
+
+def listen_loop(db_config, reconnect_delay, gs_client, stop_event=None, notifier=None, all_pg_schemas=None, reconcile_interval=0, worker_count=4):
     """Huvudloop som lyssnar på pg_notify och hanterar notifieringar för en databas.
 
+    LISTEN-tråden gör bara select()/poll() och lägger notifieringarna i en
+    SchemaWorkerPool; själva GeoServer-anropen görs av poolens arbetartrådar.
+    run_all_listeners använder samma loop för alla databaser samtidigt.
+
+    Om händelsekön hex_geoserver_handelser finns används notifieringarna bara
+    som väckning: händelserna hämtas ur kön (vid anslutning, vid varje
+    notifiering och vid keepalive), och vid (åter)anslutning spelas bara de
+    ohanterade händelserna upp i stället för en full startavstämning.
+
     Args:
         db_config:          Databaskonfiguration med host, port, dbname, user, password
         reconnect_delay:    Sekunder att vänta innan återanslutning
@@ -1508,9 +3278,9 @@ def listen_loop(db_config, reconnect_delay, gs_client, stop_event=None, notifier
         all_pg_schemas:     Samlad schema-mängd från alla övervakade databaser,
                             förbyggd av run_all_listeners för korrekt orphan-kontroll.
         reconcile_interval: Sekunder mellan periodiska avstämningar (0 = avaktiverat).
+        worker_count:       Max antal notifieringar som hanteras parallellt.
     """
     db_label = db_config["dbname"]
-    was_disconnected = False  # Sparar om vi tappat anslutning för återhämtningsnotifiering
 
     # Normalisera stop_event – _periodic_reconcile_loop kräver ett riktigt Event
     if stop_event is None:
@@ -1527,177 +3297,85 @@ def listen_loop(db_config, reconnect_delay, gs_client, stop_event=None, notifier
         )
         t.start()
 
-    while not (stop_event and stop_event.is_set()):
-        conn = None
-        try:
-            log.info("[%s] Ansluter till PostgreSQL %s@%s:%d/%s...",
-                     db_label, db_config["user"], db_config["host"],
-                     db_config["port"], db_config["dbname"])
-
-            conn = psycopg2.connect(
-                host=db_config["host"],
-                port=db_config["port"],
-                dbname=db_config["dbname"],
-                user=db_config["user"],
-                password=db_config["password"],
-                connect_timeout=10,
-                client_encoding="utf8",
-            )
-            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
-
-            cur = conn.cursor()
-            cur.execute(f"LISTEN {CHANNEL_SCHEMA_CREATE};")
-            cur.execute(f"LISTEN {CHANNEL_SCHEMA_DROP};")
-            log.info("[%s] Lyssnar på kanaler '%s' och '%s'...",
-                     db_label, CHANNEL_SCHEMA_CREATE, CHANNEL_SCHEMA_DROP)
-            log.info("[%s] Väntar på schema-händelser...", db_label)
-
-            # Ladda schemanamnsmönster från konfigurationstabellerna
-            _load_schema_pattern(cur)
-
-            # Startavstämning – körs vid varje (åter)anslutning för att fånga upp
-            # scheman som skapades medan lyssnaren var nere.
-            _reconcile_geoserver_schemas(cur, db_config, gs_client, db_label, all_pg_schemas)
-
-            # Skicka återhämtningsnotifiering om vi tappat anslutning tidigare
-            if was_disconnected:
-                if notifier:
-                    notifier.notify_pg_reconnected(db_label)
-                was_disconnected = False
-
-            while not (stop_event and stop_event.is_set()):
-                # Vänta på notifiering med 5s timeout
-                # Kort timeout så att stop_event kontrolleras regelbundet
-                if select.select([conn], [], [], 5) == ([], [], []):
-                    # Timeout - skicka keepalive
-                    cur.execute("SELECT 1")
-                    continue
-
-                conn.poll()
-                while conn.notifies:
-                    notify = conn.notifies.pop(0)
-                    schema_name = notify.payload
-
-                    if not schema_name:
-                        log.warning("[%s] Tom notifiering mottagen - ignorerar", db_label)
-                        continue
-
-                    try:
-                        if notify.channel == CHANNEL_SCHEMA_DROP:
-                            ok = handle_schema_removal_notification(
-                                schema_name,
-                                gs_client,
-                                pg_conn=conn,
-                                db_label=db_label,
-                            )
-                        else:
-                            ok = handle_schema_notification(
-                                schema_name,
-                                db_config,
-                                conn,
-                                gs_client,
-                                db_label=db_label,
-                            )
-                        if not ok:
-                            log.warning(
-                                "[%s] Hantering av schema '%s' misslyckades - "
-                                "se tidigare loggposter för detaljer",
-                                db_label, schema_name,
-                            )
-                    except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
-                        # Transienta fel - alla retry i _request_with_retry är förbrukade.
-                        _dispatch_notification_error(
-                            notify.channel, db_label, schema_name, e, notifier, transient=True
-                        )
-                    except Exception as e:
-                        _dispatch_notification_error(
-                            notify.channel, db_label, schema_name, e, notifier, transient=False
-                        )
-
-        except psycopg2.OperationalError as e:
-            log.error("[%s] PostgreSQL-anslutning förlorad: %s", db_label, e)
-            was_disconnected = True
-            if notifier:
-                notifier.notify_pg_connection_lost(db_label, e)
-        except Exception as e:
-            log.error("[%s] Oväntat fel: %s", db_label, e)
-            was_disconnected = True
-            if notifier:
-                notifier.notify_unexpected_error(db_label, e)
-        finally:
-            if conn and not conn.closed:
-                conn.close()
-
-        if stop_event and stop_event.is_set():
-            break
-
-        log.info("[%s] Återansluter om %d sekunder...", db_label, reconnect_delay)
-        time.sleep(reconnect_delay)
-
-    log.info("[%s] Lyssnaren avslutad.", db_label)
+    _serve_databases(
+        [(db_config, None)], reconnect_delay, gs_client, stop_event, notifier,
+        all_pg_schemas, worker_count, name=db_label,
+    )
 
 
 def run_all_listeners(config, dry_run=False, stop_event=None):
     """Startar lyssnare för alla konfigurerade databaser.
 
-    En databas körs direkt i anropande tråd.
-    Flera databaser får varsin tråd.
+    Alla databaser hanteras av en enda LISTEN-tråd (anropande tråd) som gör
+    select() över samtliga LISTEN-anslutningar och lämnar notifieringarna
+    till en gemensam arbetspool. Arbetarna, avstämningen och uppstartens
+    schemahämtning lånar anslutningar ur en liten PgConnectionPool per
+    databas (HEX_PG_POOL_SIZE), och den periodiska avstämningen körs för
+    alla databaser i en gemensam tråd.
     """
     if stop_event is None:
         stop_event = threading.Event()
 
     databases = config["databases"]
     notifier = EmailNotifier(config["smtp"])
+    pg_pools = [PgConnectionPool(db, config.get("pg_pool_size", 2)) for db in databases]
 
-    # Bygg en samlad schema-mängd över alla databaser för korrekt orphan-kontroll
-    # i startavstämningen. Varje enskild databas-tråd jämför annars bara mot sina
-    # egna scheman och larmar falskt om workspaces som tillhör en annan databas.
-    all_pg_schemas = set()
-    for db_config in databases:
-        all_pg_schemas |= _fetch_publishable_schemas(db_config)
-
-    if len(databases) == 1:
-        # En databas - kör direkt utan extra tråd
+    try:
+        # Bygg en samlad schema-mängd över alla databaser för korrekt orphan-kontroll
+        # i startavstämningen. Varje enskild databas jämför annars bara mot sina
+        # egna scheman och larmar falskt om workspaces som tillhör en annan databas.
+        all_pg_schemas = set()
+        for db_config, pg_pool in zip(databases, pg_pools):
+            all_pg_schemas |= _fetch_publishable_schemas(db_config, pg_pool)
+
+        # En gemensam fingeravtryckscache för alla databaser (nycklad på workspace/store)
+        fingerprint_cache = DatastoreFingerprintCache(config.get("datastore_cache_file") or None)
+        # En gemensam HTTP-pool så att samtidighetstaket gäller hela processen
+        http_pool = GeoServerHttpPool(config.get("gs_max_connections", 8), stop_event)
+        # En klient räcker – sessionerna är trådlokala och delar http_pool
         gs_client = GeoServerClient(
             base_url=config["gs_url"],
             user=config["gs_user"],
             password=config["gs_password"],
             dry_run=dry_run,
             namespace_uri_base=config.get("gs_namespace_base", ""),
+            fingerprint_cache=fingerprint_cache,
+            http_pool=http_pool,
         )
-        listen_loop(databases[0], config["reconnect_delay"], gs_client, stop_event, notifier, all_pg_schemas, config.get("reconcile_interval", 0))
-        return
 
-    # Flera databaser - en tråd per databas
-    threads = []
-    for db_config in databases:
-        # Varje tråd får sin egen GeoServerClient (requests.Session är inte trådsäker)
-        gs_client = GeoServerClient(
-            base_url=config["gs_url"],
-            user=config["gs_user"],
-            password=config["gs_password"],
-            dry_run=dry_run,
-            namespace_uri_base=config.get("gs_namespace_base", ""),
-        )
-        t = threading.Thread(
-            target=listen_loop,
-            args=(db_config, config["reconnect_delay"], gs_client, stop_event, notifier, all_pg_schemas, config.get("reconcile_interval", 0)),
-            name=f"listener-{db_config['dbname']}",
-            daemon=True,
-        )
-        t.start()
-        threads.append(t)
-        log.info("Startade lyssnartråd för databas '%s'", db_config["dbname"])
+        reconcile_interval = config.get("reconcile_interval", 0)
+        if reconcile_interval > 0:
+            t = threading.Thread(
+                target=_periodic_reconcile_all,
+                args=(list(zip(databases, pg_pools)), gs_client, stop_event,
+                      reconcile_interval, all_pg_schemas),
+                name="reconcile",
+                daemon=True,
+            )
+            t.start()
 
-    try:
-        while any(t.is_alive() for t in threads):
-            for t in threads:
-                t.join(timeout=1.0)
-    except KeyboardInterrupt:
-        log.info("Avbruten av användaren - avslutar alla lyssnare...")
+        metrics_server = start_metrics_server(
+            config.get("metrics_port", 0), config.get("metrics_host", "127.0.0.1"),
+        )
+        log.info("Lyssnar på %d databas(er) i en gemensam tråd", len(databases))
+        try:
+            _serve_databases(
+                list(zip(databases, pg_pools)), config["reconnect_delay"], gs_client,
+                stop_event, notifier, all_pg_schemas, config.get("worker_count", 4),
+                name=databases[0]["dbname"] if len(databases) == 1 else "alla",
+                coalesce_window=config.get("coalesce_window", 2.0),
+            )
+        except KeyboardInterrupt:
+            log.info("Avbruten av användaren - avslutar alla lyssnare...")
+            stop_event.set()
+        finally:
+            if metrics_server is not None:
+                metrics_server.shutdown()
+                metrics_server.server_close()
+    finally:
         stop_event.set()
-        for t in threads:
-            t.join(timeout=5.0)
+        for pg_pool in pg_pools:
+            pg_pool.close()
 
 
 # =============================================================================
@@ -0,0 +1,29 @@
+/******************************************************************************
+ * Returnerar värdet för en inställning i hex_installningar, eller
+ * p_standard om nyckeln saknas.
+ *
+ * Exempel:
+ *   SELECT hex_installning('kolumnordning', 'fysisk');
+ *
+ * STABLE: värdet kan ändras mellan satser men inte inom en sats.
+ ******************************************************************************/
+CREATE OR REPLACE FUNCTION public.hex_installning(
+    p_nyckel text,
+    p_standard text DEFAULT NULL
+)
+    RETURNS text
+    LANGUAGE sql
+    STABLE
+AS $BODY$
+    SELECT COALESCE(
+        (SELECT varde FROM public.hex_installningar WHERE nyckel = p_nyckel),
+        p_standard
+    );
+$BODY$;
+
+ALTER FUNCTION public.hex_installning(text, text)
+    OWNER TO postgres;
+
+COMMENT ON FUNCTION public.hex_installning(text, text)
+    IS 'Returnerar värdet för en inställning i hex_installningar, '
+       'eller p_standard om nyckeln saknas.';
@@ -10,10 +10,10 @@
 -- för att identifiera geometrityp. En tom tabell ger NULL och QGIS
 -- faller tillbaka på en manuell dialogruta. En dummy-rad löser detta.
 --
--- Dummy-raden tas automatiskt bort av triggern hex_ta_bort_dummy när
--- den första riktiga raden läggs in i tabellen. Dessförinnan kan den
--- tas bort manuellt – triggern hex_ta_bort_dummy inaktiveras då också
--- automatiskt via hex_dummy_geometrier (tom = triggern gör ingenting).
+-- Dummy-raden tas automatiskt bort av satstriggern hex_ta_bort_dummy när
+-- den första riktiga raden läggs in i tabellen, varefter triggern tar bort
+-- sig själv. Dessförinnan kan dummyn tas bort manuellt – triggern ser då
+-- att hex_dummy_geometrier saknar poster och tar bort sig vid nästa INSERT.
 --
 -- Observera: om en dummy tas bort av den automatiska triggern skapas
 -- en 'D'-post i historiktabellen (om tabellen har historik). Raden är
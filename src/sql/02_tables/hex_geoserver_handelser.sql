@@ -0,0 +1,60 @@
+-- Table: public.hex_geoserver_handelser
+
+CREATE TABLE IF NOT EXISTS public.hex_geoserver_handelser (
+    id          bigint      NOT NULL GENERATED ALWAYS AS IDENTITY,
+    schema_namn text        NOT NULL,
+    handelse    text        NOT NULL,
+    skapad      timestamptz NOT NULL DEFAULT now(),
+    last_till   timestamptz,
+    forsok      integer     NOT NULL DEFAULT 0,
+    behandlad   timestamptz,
+    senaste_fel text,
+
+    CONSTRAINT hex_geoserver_handelser_pkey PRIMARY KEY (id),
+    CONSTRAINT hex_geoserver_handelser_handelse_check CHECK (handelse IN ('skapa', 'ta_bort'))
+);
+
+-- Ohanterade händelser i köordning – det enda lyssnaren frågar efter
+CREATE INDEX IF NOT EXISTS hex_geoserver_handelser_ohanterade_idx
+    ON public.hex_geoserver_handelser (id)
+    WHERE behandlad IS NULL;
+
+-- Ordningskontrollen per schema (tidigare ohanterad händelse för samma schema)
+CREATE INDEX IF NOT EXISTS hex_geoserver_handelser_schema_idx
+    ON public.hex_geoserver_handelser (schema_namn, id)
+    WHERE behandlad IS NULL;
+
+ALTER TABLE public.hex_geoserver_handelser
+    OWNER TO postgres;
+
+COMMENT ON TABLE public.hex_geoserver_handelser
+    IS 'Beständig händelsekö (outbox) för GeoServer-publicering.
+Skrivs av notifiera_geoserver() (skapa) och notifiera_geoserver_borttagning() (ta_bort)
+i samma transaktion som pg_notify. GeoServer-lyssnaren reserverar ohanterade rader i
+batchar med FOR UPDATE SKIP LOCKED och markerar dem som behandlade, så att händelser
+som inträffar medan lyssnaren är nere spelas upp vid nästa start och flera
+lyssnarinstanser kan dela på kön.';
+
+COMMENT ON COLUMN public.hex_geoserver_handelser.handelse
+    IS '''skapa'' (CREATE SCHEMA) eller ''ta_bort'' (DROP SCHEMA).';
+
+COMMENT ON COLUMN public.hex_geoserver_handelser.last_till
+    IS 'Raden är reserverad (eller väntar på nytt försök efter fel) fram till denna tidpunkt.
+NULL eller passerad tidpunkt = kan reserveras av valfri lyssnare.';
+
+COMMENT ON COLUMN public.hex_geoserver_handelser.forsok
+    IS 'Antal gånger raden reserverats. Efter för många misslyckade försök markeras raden
+som behandlad med senaste_fel satt; avstämningen i lyssnaren tar över därifrån.';
+
+COMMENT ON COLUMN public.hex_geoserver_handelser.behandlad
+    IS 'Tidpunkt då lyssnaren slutförde händelsen. NULL = ohanterad.';
+
+-- Begränsa åtkomst: event triggers skriver (SECURITY DEFINER), hex_listener läser, kvitterar
+-- och lägger till manuellt skickade notifieringar
+REVOKE ALL ON public.hex_geoserver_handelser FROM PUBLIC;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'hex_listener') THEN
+        EXECUTE 'GRANT SELECT, INSERT, UPDATE, DELETE ON public.hex_geoserver_handelser TO hex_listener';
+    END IF;
+END$$;
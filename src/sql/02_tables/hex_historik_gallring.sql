@@ -0,0 +1,41 @@
+-- TABELL: public.hex_historik_gallring
+--
+-- Gallringsregler för historiktabeller (<tabell>_h). En regel gäller alla
+-- scheman vars namn börjar med schema_prefix (t.ex. 'sk1_kba_' eller ett fullt
+-- schemanamn; '' = alla scheman) och antingen alla tabeller (tabell_namn = '')
+-- eller en enskild modertabell. Mest specifik regel vinner: tabellregel före
+-- schemaregel, längre prefix före kortare. Tabeller utan matchande regel
+-- gallras aldrig.
+--
+-- Underhålls av:  DBA / systemadministratör
+-- Läses av:       gallra_historik()
+
+CREATE TABLE IF NOT EXISTS public.hex_historik_gallring (
+    schema_prefix  text     NOT NULL,
+    tabell_namn    text     NOT NULL DEFAULT '',
+    bevara_dagar   integer  NOT NULL CHECK (bevara_dagar > 0),
+    atgard         text     NOT NULL DEFAULT 'radera' CHECK (atgard IN ('radera', 'arkivera')),
+    beskrivning    text,
+    PRIMARY KEY (schema_prefix, tabell_namn)
+);
+
+ALTER TABLE public.hex_historik_gallring OWNER TO gis_admin;
+
+GRANT SELECT ON public.hex_historik_gallring TO PUBLIC;
+GRANT INSERT, UPDATE, DELETE ON public.hex_historik_gallring TO gis_admin;
+
+COMMENT ON TABLE public.hex_historik_gallring IS
+    'Gallringsregler för historiktabeller. Tillämpas av CALL gallra_historik().
+     Tabeller utan matchande regel behåller all historik.';
+
+COMMENT ON COLUMN public.hex_historik_gallring.schema_prefix IS
+    'Början av schemanamnet regeln gäller, t.ex. sk1_kba_ eller sk1_kba_parkering. Tom = alla scheman.';
+COMMENT ON COLUMN public.hex_historik_gallring.tabell_namn IS
+    'Modertabellens namn (utan _h). Tom = alla tabeller i matchande scheman.';
+COMMENT ON COLUMN public.hex_historik_gallring.bevara_dagar IS
+    'Historikrader äldre än så här många dagar (h_tidpunkt) gallras.';
+COMMENT ON COLUMN public.hex_historik_gallring.atgard IS
+    'radera = ta bort raderna; arkivera = flytta dem till <tabell>_h_arkiv i samma schema
+     (hela tidspartitioner kopplas i stället loss med DETACH PARTITION).';
+COMMENT ON COLUMN public.hex_historik_gallring.beskrivning IS
+    'Fritext, t.ex. beslut eller diarienummer för gallringen.';
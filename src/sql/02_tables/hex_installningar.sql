@@ -0,0 +1,76 @@
+-- TABELL: public.hex_installningar
+--
+-- Nyckel/värde-inställningar som styr hur Hex-funktionerna beter sig, t.ex.
+-- hur kolumner ordnas om vid ALTER TABLE. Läses via hex_installning(), som
+-- faller tillbaka på funktionens standardvärde om nyckeln saknas – en rad
+-- behövs alltså bara för att avvika från standard.
+--
+-- Underhålls av:  DBA / systemadministratör
+-- Läses av:       hex_installning()
+
+CREATE TABLE IF NOT EXISTS public.hex_installningar (
+    nyckel       text  PRIMARY KEY,
+    varde        text  NOT NULL,
+    beskrivning  text
+);
+
+ALTER TABLE public.hex_installningar OWNER TO gis_admin;
+
+-- Händelsetriggerfunktioner körs i den anropande användarens säkerhetskontext.
+-- Läsrättighet krävs av alla; ändringar görs enbart av ägarrollen.
+GRANT SELECT ON public.hex_installningar TO PUBLIC;
+GRANT INSERT, UPDATE, DELETE ON public.hex_installningar TO gis_admin;
+
+-- Förval
+INSERT INTO public.hex_installningar (nyckel, varde, beskrivning)
+VALUES ('kolumnordning', 'fysisk',
+        'Hur hantera_kolumntillagg placerar standardkolumner och geom sist efter ALTER TABLE. '
+        'fysisk = flytta kolumnerna med en enda omskrivning av tabellen; '
+        'logisk = ingen fysisk flytt (kolumnordningen följer standardiserade_kolumner '
+        'bara i nya tabeller – ingen omskrivning vid ALTER TABLE).')
+ON CONFLICT DO NOTHING;
+
+INSERT INTO public.hex_installningar (nyckel, varde, beskrivning)
+VALUES ('historik_trigger', 'rad',
+        'Hur skapa_qa_trigger fångar historik för nya historiktabeller. '
+        'rad = en BEFORE UPDATE OR DELETE-radtrigger som skriver en historikrad per rad; '
+        'sats = radtriggern sätter bara QA-kolumner och AFTER ... FOR EACH STATEMENT-triggers '
+        'med REFERENCING OLD TABLE skriver hela satsens historik med en INSERT.')
+ON CONFLICT DO NOTHING;
+
+INSERT INTO public.hex_installningar (nyckel, varde, beskrivning)
+VALUES ('historik_partitionering', 'ingen',
+        'Om skapa_historik_qa skapar nya historiktabeller range-partitionerade på h_tidpunkt. '
+        'ingen = en vanlig tabell; manad/ar = en partition per månad/år '
+        '(<tabell>_h_pÅÅÅÅMM / _pÅÅÅÅ) plus standardpartitionen <tabell>_h_pdefault. '
+        'underhall_hex() skapar kommande partitioner; gamla kan kopplas loss med DETACH PARTITION.')
+ON CONFLICT DO NOTHING;
+
+INSERT INTO public.hex_installningar (nyckel, varde, beskrivning)
+VALUES ('historik_index', 'btree',
+        'Indexstrategi för nya historiktabeller (skapa_historikindex). '
+        'btree = ett btree-index på (gid, h_tidpunkt DESC); '
+        'brin = ett litet btree-index på gid plus ett BRIN-index på h_tidpunkt – '
+        'en bråkdel av lagringen och mindre skrivkostnad per historikrad.')
+ON CONFLICT DO NOTHING;
+
+INSERT INTO public.hex_installningar (nyckel, varde, beskrivning)
+VALUES ('geometrivalidering', 'trigger_och_check',
+        'Hur skapa_geometrivalidering validerar geometrin i tabeller vars datakategori har '
+        'validera_geometri = true. trigger_och_check = triggern hex_kontrollera_geom '
+        '(läsbart fel) plus CHECK-constrainten validera_geom_<tabell> – varje rad valideras två gånger; '
+        'trigger = enbart triggern – varje rad valideras en gång, men valideringen kringgås '
+        'om triggers stängs av (session_replication_role = replica). underhall_hex() tar bort '
+        'befintliga validera_geom_-constraints i läget trigger.')
+ON CONFLICT DO NOTHING;
+
+COMMENT ON TABLE public.hex_installningar IS
+    'Nyckel/värde-inställningar för Hex-funktionerna. Läses via hex_installning();
+     saknad nyckel ger funktionens standardvärde.';
+
+COMMENT ON COLUMN public.hex_installningar.nyckel IS
+    'Inställningens namn, t.ex. kolumnordning.';
+COMMENT ON COLUMN public.hex_installningar.varde IS
+    'Inställningens värde (text – tolkas av den funktion som läser det).';
+COMMENT ON COLUMN public.hex_installningar.beskrivning IS
+    'Vad inställningen styr och vilka värden som är giltiga.';
@@ -0,0 +1,41 @@
+-- TABELL: public.hex_schema_matchningar
+--
+-- Förberäknat resultat av schema_uttryck per schema. Varje rad anger om en
+-- standardkolumn (kalla = 'kolumn') eller standardroll (kalla = 'roll')
+-- gäller för ett visst schema, så att tabell- och schemaskapande kan slå upp
+-- matchningarna med en indexerad läsning i stället för att evaluera varje
+-- schema_uttryck med dynamisk SQL.
+--
+-- Livscykel:
+--   Fylls/förnyas av uppdatera_schema_matchningar():
+--     – triggrar på standardiserade_kolumner/standardiserade_roller (alla scheman)
+--     – hantera_standardiserade_roller() vid CREATE SCHEMA (det nya schemat)
+--     – hamta_schema_matchningar() om schemat saknas i tabellen
+--     – underhall_hex() efter installation/uppgradering (alla scheman)
+--   Rensas av ta_bort_schemaroller() vid DROP SCHEMA.
+
+CREATE TABLE IF NOT EXISTS public.hex_schema_matchningar (
+    schema_namn  text     NOT NULL,
+    kalla        text     NOT NULL CHECK (kalla IN ('kolumn', 'roll')),
+    namn         text     NOT NULL,
+    matchar      boolean  NOT NULL,
+    PRIMARY KEY (schema_namn, kalla, namn)
+);
+
+ALTER TABLE public.hex_schema_matchningar OWNER TO gis_admin;
+
+-- Läses av alla; skrivs enbart via uppdatera_schema_matchningar() (SECURITY DEFINER)
+GRANT SELECT ON public.hex_schema_matchningar TO PUBLIC;
+
+COMMENT ON TABLE public.hex_schema_matchningar IS
+    'Förberäknade schema_uttryck-matchningar per schema för standardiserade_kolumner
+     och standardiserade_roller. Underhålls av uppdatera_schema_matchningar().';
+
+COMMENT ON COLUMN public.hex_schema_matchningar.schema_namn IS
+    'Schemat som uttrycket evaluerats för.';
+COMMENT ON COLUMN public.hex_schema_matchningar.kalla IS
+    'kolumn = standardiserade_kolumner, roll = standardiserade_roller.';
+COMMENT ON COLUMN public.hex_schema_matchningar.namn IS
+    'kolumnnamn respektive rollnamn (med {schema}-mall) i källtabellen.';
+COMMENT ON COLUMN public.hex_schema_matchningar.matchar IS
+    'Resultatet av <schema_namn> <schema_uttryck>. false även om uttrycket gav fel.';
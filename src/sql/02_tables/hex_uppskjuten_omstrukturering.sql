@@ -0,0 +1,82 @@
+-- TABELL: public.hex_uppskjuten_omstrukturering
+--
+-- Arbetskö för omstruktureringar som är för dyra att göra synkront i
+-- användarens ALTER TABLE. När en tabell överskrider storleksgränserna i
+-- hex_installningar (omstrukturering_max_rader / omstrukturering_max_bytes)
+-- registrerar hantera_kolumntillagg() jobbet här i stället för att skriva om
+-- tabellen eller bygga index direkt – ALTER TABLE returnerar omedelbart.
+--
+-- Åtgärder:
+--   kolumnordning      – flytta kolumner sist (flytta_kolumner_sist); flyttas
+--                        geom byggs GiST-index och geometrivalidering om
+--   gist_index         – skapa GiST-index på geometrikolumnen
+--   validera_constraint – VALIDATE CONSTRAINT för en CHECK som lagts till
+--                         NOT VALID (validera_geom_<tabell>), så att
+--                         skanningen inte görs under ACCESS EXCLUSIVE-låset
+--
+-- Livscykel:
+--   INSERT: hantera_kolumntillagg()          — tabellen överskrider gränsen
+--   INSERT: skapa_geometrivalidering()       — constraint tillagd NOT VALID
+--   DELETE: kor_uppskjuten_omstrukturering() — jobbet slutfört, eller tabellen finns inte längre
+--   DELETE: hantera_borttagen_tabell()       — tabellen droppas
+
+CREATE TABLE IF NOT EXISTS public.hex_uppskjuten_omstrukturering (
+    schema_namn     text        NOT NULL,
+    tabell_namn     text        NOT NULL,
+    atgard          text        NOT NULL CHECK (atgard IN ('kolumnordning', 'gist_index', 'validera_constraint')),
+    kolumner        text[],
+    definitioner    text[],
+    index_namn      text,
+    constraint_namn text,
+    registrerad     timestamptz NOT NULL DEFAULT now(),
+    registrerad_av  text        NOT NULL DEFAULT current_user,
+    forsok          integer     NOT NULL DEFAULT 0,
+    senaste_fel     text,
+    PRIMARY KEY (schema_namn, tabell_namn, atgard)
+);
+
+ALTER TABLE public.hex_uppskjuten_omstrukturering OWNER TO gis_admin;
+
+-- Händelsetriggerfunktioner körs i den anropande användarens säkerhetskontext.
+-- Skrivrättigheter krävs från alla.
+GRANT SELECT, INSERT, UPDATE, DELETE ON public.hex_uppskjuten_omstrukturering TO PUBLIC;
+
+-- Förval för storleksgränserna
+INSERT INTO public.hex_installningar (nyckel, varde, beskrivning)
+VALUES
+    ('omstrukturering_max_rader', '1000000',
+     'Tabeller med fler rader (uppskattat, pg_class.reltuples) omstruktureras inte i ALTER TABLE '
+     'utan registreras i hex_uppskjuten_omstrukturering. 0 = ingen radgräns.'),
+    ('omstrukturering_max_bytes', '1073741824',
+     'Tabeller vars data (pg_relation_size) är större omstruktureras inte i ALTER TABLE '
+     'utan registreras i hex_uppskjuten_omstrukturering. 0 = ingen storleksgräns.')
+ON CONFLICT DO NOTHING;
+
+COMMENT ON TABLE public.hex_uppskjuten_omstrukturering IS
+    'Arbetskö för omstruktureringar av stora tabeller som skjutits upp från
+     ALTER TABLE, och för NOT VALID-constraints som väntar på VALIDATE CONSTRAINT.
+     Bearbetas av CALL kor_uppskjuten_omstrukturering().';
+
+COMMENT ON COLUMN public.hex_uppskjuten_omstrukturering.schema_namn IS
+    'Schema för tabellen som ska omstruktureras.';
+COMMENT ON COLUMN public.hex_uppskjuten_omstrukturering.tabell_namn IS
+    'Tabellen som ska omstruktureras (modertabell eller historiktabell).';
+COMMENT ON COLUMN public.hex_uppskjuten_omstrukturering.atgard IS
+    'kolumnordning = flytta kolumner sist; gist_index = skapa GiST-index;
+     validera_constraint = VALIDATE CONSTRAINT för en NOT VALID-constraint.';
+COMMENT ON COLUMN public.hex_uppskjuten_omstrukturering.kolumner IS
+    'kolumnordning: kolumner i önskad slutordning. gist_index: geometrikolumnen.';
+COMMENT ON COLUMN public.hex_uppskjuten_omstrukturering.definitioner IS
+    'kolumnordning: datatyp (ev. med DEFAULT) per kolumn, samma ordning som kolumner.';
+COMMENT ON COLUMN public.hex_uppskjuten_omstrukturering.index_namn IS
+    'gist_index: namnet på indexet som ska skapas.';
+COMMENT ON COLUMN public.hex_uppskjuten_omstrukturering.constraint_namn IS
+    'validera_constraint: namnet på constrainten som ska valideras.';
+COMMENT ON COLUMN public.hex_uppskjuten_omstrukturering.registrerad IS
+    'Tidpunkt då jobbet registrerades (eller senast ersattes).';
+COMMENT ON COLUMN public.hex_uppskjuten_omstrukturering.registrerad_av IS
+    'Användare som körde ALTER TABLE.';
+COMMENT ON COLUMN public.hex_uppskjuten_omstrukturering.forsok IS
+    'Antal misslyckade körningar av jobbet.';
+COMMENT ON COLUMN public.hex_uppskjuten_omstrukturering.senaste_fel IS
+    'Felmeddelande från senaste misslyckade körning.';
@@ -0,0 +1,40 @@
+-- TABELL: public.hex_version
+--
+-- Installerade Hex-komponenter: en rad per SQL-fil i installationsordningen
+-- (typ = 'fil') och per genomförd migrering i src/sql/migrations
+-- (typ = 'migrering'), med kontrollsumman (sha256) för det som kördes.
+-- install_hex.py --upgrade jämför kontrollsummorna mot källkoden och kör
+-- bara nya migreringar och ändrade filer, i en och samma transaktion.
+--
+-- Installerad schemaversion = senaste migreringen:
+--   SELECT max(komponent) FROM hex_version WHERE typ = 'migrering';
+--
+-- Underhålls av:  install_hex.py (ändra inte för hand)
+-- Läses av:       install_hex.py
+
+CREATE TABLE IF NOT EXISTS public.hex_version (
+    komponent      text         PRIMARY KEY,
+    typ            text         NOT NULL CHECK (typ IN ('fil', 'migrering')),
+    kontrollsumma  text         NOT NULL,
+    installerad    timestamptz  NOT NULL DEFAULT now(),
+    installerad_av text         NOT NULL DEFAULT session_user
+);
+
+ALTER TABLE public.hex_version OWNER TO gis_admin;
+
+GRANT SELECT ON public.hex_version TO PUBLIC;
+
+COMMENT ON TABLE public.hex_version IS
+    'Installerade Hex-filer och genomförda migreringar med kontrollsumma.
+     Skrivs av install_hex.py och styr vilka filer --upgrade kör om.';
+
+COMMENT ON COLUMN public.hex_version.komponent IS
+    'Sökväg relativt repots rot, t.ex. src/sql/02_tables/hex_metadata.sql eller src/sql/migrations/001_exempel.sql.';
+COMMENT ON COLUMN public.hex_version.typ IS
+    'fil = fil i installationsordningen (körs om när den ändras); migrering = engångsmigrering (körs aldrig om).';
+COMMENT ON COLUMN public.hex_version.kontrollsumma IS
+    'sha256 av SQL-texten som kördes (efter ersättning av OWNER TO).';
+COMMENT ON COLUMN public.hex_version.installerad IS
+    'När komponenten senast installerades.';
+COMMENT ON COLUMN public.hex_version.installerad_av IS
+    'Rollen som körde installationen.';
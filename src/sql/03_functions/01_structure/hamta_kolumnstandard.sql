@@ -85,14 +85,16 @@ AS $BODY$
  * 4. Geometrikolumn sist om den finns
  *
  * TVÅSTEGSPROCESS:
- * 1. Filtrera standardkolumner baserat på schema_uttryck i en loop
+ * 1. Filtrera standardkolumner baserat på schema_uttryck (förberäknat i
+ *    hex_schema_matchningar, hämtat via hamta_schema_matchningar)
  * 2. Använd vanlig UNION ALL för att kombinera alla kolumntyper
  ******************************************************************************/
 DECLARE 
     resultat kolumnkonfig[];          -- Resultatarray som returneras
     create_kolumn record;             -- För loggning av kolumninformation
     standardkolumn record;            -- För loop genom standardiserade_kolumner
-    matchar boolean;                  -- För evaluering av schema_uttryck
+    matchar boolean;                  -- Om kolumnen gäller för schemat
+    matchande text[];                 -- Standardkolumner vars schema_uttryck matchar schemat
     sql_sats text;                    -- För loggning av SQL-satser
     antal_standardkolumner integer;   -- Antal kolumner från standardiserade_kolumner
     antal_filtrerade integer;         -- Antal kolumner efter schema-filtrering
@@ -130,17 +132,18 @@ BEGIN
         FROM standardiserade_kolumner 
         WHERE false; -- Tom tabell med rätt struktur
 
-    -- Loop genom alla standardkolumner och testa schema_uttryck
+    -- Matchningarna är förberäknade i hex_schema_matchningar – en indexerad
+    -- läsning i stället för en dynamisk EXECUTE per standardkolumn.
+    matchande := hamta_schema_matchningar(p_schema_namn, 'kolumn');
+
+    -- Loop genom alla standardkolumner och testa mot matchningarna
     FOR standardkolumn IN 
         SELECT kolumnnamn, ordinal_position, datatyp, schema_uttryck, historik_qa, default_varde
         FROM standardiserade_kolumner 
         ORDER BY ordinal_position
     LOOP
         BEGIN
-            -- EXECUTE: Kör dynamisk SQL som byggts som sträng
-            -- format(): Säker formatering av SQL med %L (quoted literal) och %s (string)
-            -- Constraint har redan validerat att schema_uttryck är säkert att använda
-            EXECUTE format('SELECT %L %s', p_schema_namn, standardkolumn.schema_uttryck) INTO matchar;
+            matchar := standardkolumn.kolumnnamn = ANY(matchande);
             
             IF matchar THEN
                 INSERT INTO temp_filtrerade_standardkolumner 
@@ -220,34 +223,26 @@ BEGIN
         -- DEL 2: Kolumner från användarens CREATE TABLE-sats
         -- Exempel: meter_till_berg integer (behåller sin ursprungliga position)
         -- Denna sektion hanterar även GENERATED kolumner (beräknade kolumner)
+        -- (en läsning av pg_attribute via hamta_kolumnbeskrivning)
         SELECT 
-            c.column_name,
-            c.ordinal_position,
+            k.kolumnnamn,
+            k.attnum,
             CASE 
-                WHEN a.attgenerated = 's' THEN
+                WHEN k.genereringsuttryck IS NOT NULL THEN
                     -- GENERATED ALWAYS AS ... STORED kolumner
                     format('%s GENERATED ALWAYS AS %s STORED',
-                        c.udt_name,
-                        pg_get_expr(d.adbin, d.adrelid)
+                        k.typnamn,
+                        k.genereringsuttryck
                     )
                 ELSE
                     -- Vanliga kolumner
-                    c.udt_name::text
+                    k.typnamn
             END as datatyp,
-            CASE WHEN a.attgenerated = 's' THEN true 
-                 ELSE false END as is_generated,
-            CASE WHEN a.attgenerated = 's' THEN pg_get_expr(d.adbin, d.adrelid)
-                 ELSE NULL END as generated_expr
-        FROM information_schema.columns c
-        JOIN pg_attribute a ON (
-            a.attrelid = format('%I.%I', p_schema_namn, p_tabell_namn)::regclass
-            AND a.attname = c.column_name
-        )
-        LEFT JOIN pg_attrdef d ON (a.attrelid, a.attnum) = (d.adrelid, d.adnum)
-        WHERE c.table_schema = p_schema_namn
-        AND c.table_name = p_tabell_namn
-        AND c.column_name NOT IN (SELECT kolumnnamn FROM standardiserade_kolumner)
-        AND c.column_name != 'geom'
+            k.genereringsuttryck IS NOT NULL as is_generated,
+            k.genereringsuttryck as generated_expr
+        FROM hamta_kolumnbeskrivning(format('%I.%I', p_schema_namn, p_tabell_namn)::regclass) k
+        WHERE k.kolumnnamn NOT IN (SELECT sk.kolumnnamn FROM standardiserade_kolumner sk)
+        AND k.kolumnnamn != 'geom'
 
         UNION ALL
 
@@ -371,6 +366,6 @@ COMMENT ON FUNCTION public.hamta_kolumnstandard(text, text, geom_info)
 kolumner från standardiserade_kolumner (filtrerade baserat på schema_uttryck) 
 och originaltabellen samt eventuell geometri. Hanterar historik_qa-flaggan för
 att avgöra om DEFAULT ska läggas till eller hanteras av triggers. Använder 
-tvåstegsfiltrering: 1) Loop för schema_uttryck-evaluering 2) Vanlig UNION ALL 
+tvåstegsfiltrering: 1) schema_uttryck-matchning via hex_schema_matchningar 2) Vanlig UNION ALL 
 för sammansättning. Returnerar en array med kolumnkonfig-objekt som används 
 för att skapa den standardiserade tabellstrukturen.';
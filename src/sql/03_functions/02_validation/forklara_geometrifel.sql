@@ -5,7 +5,7 @@ CREATE OR REPLACE FUNCTION public.forklara_geometrifel(
 )
     RETURNS text
     LANGUAGE 'plpgsql'
-    IMMUTABLE
+    IMMUTABLE PARALLEL SAFE
 AS $BODY$
 /******************************************************************************
  * Diagnostiserar geometriproblem och returnerar en läsbar förklaring.
@@ -25,7 +25,9 @@ AS $BODY$
  *
  * ANVÄNDNING:
  *   Anropas av kontrollera_geometri_trigger() för att ge QGIS-användare
- *   ett meningsfullt felmeddelande istället för ett generiskt constraint-fel.
+ *   ett meningsfullt felmeddelande istället för ett generiskt constraint-fel,
+ *   och av granska_geometrier() (PARALLEL SAFE – kan köras i parallella
+ *   arbetare).
  ******************************************************************************/
 BEGIN
     IF geom IS NULL THEN
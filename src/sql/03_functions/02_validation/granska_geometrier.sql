@@ -0,0 +1,87 @@
+CREATE OR REPLACE FUNCTION public.granska_geometrier(
+    p_schema_namn text,
+    p_tabell_namn text DEFAULT NULL
+)
+    RETURNS TABLE (
+        schema_namn text,
+        tabell_namn text,
+        gid         bigint,
+        fel         text
+    )
+    LANGUAGE 'plpgsql'
+    STABLE
+AS $BODY$
+/******************************************************************************
+ * Granskar befintliga geometrier mot validera_geometri() och returnerar en
+ * rad per ogiltig geometri med gid och förklaringen från
+ * forklara_geometrifel().
+ *
+ * Körs innan geometrivalidering slås på för ett schema (validera_geometri =
+ * true i standardiserade_datakategorier) eller innan en CHECK-constraint
+ * validera_geom_<tabell> läggs till på en fylld tabell – så att man vet vad
+ * som kommer att fallera och kan rätta det först.
+ *
+ * Omfattning:
+ *   p_tabell_namn angivet – enbart den tabellen
+ *   p_tabell_namn NULL    – alla tabeller i p_schema_namn med kolumnerna
+ *                           geom (geometry) och gid; historiktabeller
+ *                           (h_typ) undantas
+ *
+ * Frågan per tabell körs med RETURN QUERY och kan därmed använda parallell
+ * sekventiell skanning (validera_geometri och forklara_geometrifel är
+ * PARALLEL SAFE). forklara_geometrifel anropas bara för rader som redan
+ * fallerat validera_geometri.
+ *
+ * Exempel:
+ *   SELECT * FROM granska_geometrier('sk0_ext_lantmateriet');
+ *   SELECT fel, count(*) FROM granska_geometrier('sk1_kba_parkering') GROUP BY fel;
+ ******************************************************************************/
+DECLARE
+    t record;
+BEGIN
+    FOR t IN
+        SELECT c.relname
+        FROM   pg_class     c
+        JOIN   pg_namespace n ON n.oid = c.relnamespace
+        WHERE  n.nspname  = p_schema_namn
+          AND  c.relkind IN ('r', 'p')
+          AND  NOT c.relispartition
+          AND  (p_tabell_namn IS NULL OR c.relname = p_tabell_namn)
+          AND  EXISTS (
+                   SELECT 1
+                   FROM   pg_attribute a
+                   JOIN   pg_type      ty ON ty.oid = a.atttypid
+                   WHERE  a.attrelid = c.oid
+                     AND  a.attname  = 'geom'
+                     AND  ty.typname = 'geometry'
+                     AND  NOT a.attisdropped
+               )
+          AND  EXISTS (
+                   SELECT 1 FROM pg_attribute a
+                   WHERE  a.attrelid = c.oid AND a.attname = 'gid' AND NOT a.attisdropped
+               )
+          AND  NOT EXISTS (
+                   SELECT 1 FROM pg_attribute a
+                   WHERE  a.attrelid = c.oid AND a.attname = 'h_typ' AND NOT a.attisdropped
+               )
+        ORDER BY c.relname
+    LOOP
+        RETURN QUERY EXECUTE format(
+            'SELECT %L::text, %L::text, gid::bigint, public.forklara_geometrifel(geom)
+             FROM   %I.%I
+             WHERE  NOT public.validera_geometri(geom)
+             ORDER BY gid',
+            p_schema_namn, t.relname, p_schema_namn, t.relname
+        );
+    END LOOP;
+END;
+$BODY$;
+
+ALTER FUNCTION public.granska_geometrier(text, text)
+    OWNER TO postgres;
+
+COMMENT ON FUNCTION public.granska_geometrier(text, text)
+    IS 'Granskar befintliga geometrier i en tabell (eller alla geometritabeller i
+ett schema) mot validera_geometri() och returnerar schema, tabell, gid och
+forklara_geometrifel()-förklaringen för varje ogiltig geometri. Körs före
+geometrivalidering slås på för en fylld tabell. Kan använda parallell skanning.';
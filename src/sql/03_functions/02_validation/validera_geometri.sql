@@ -4,8 +4,8 @@ CREATE OR REPLACE FUNCTION public.validera_geometri(
     geom geometry
 )
     RETURNS boolean
-    LANGUAGE 'plpgsql'
-    IMMUTABLE
+    LANGUAGE 'sql'
+    IMMUTABLE PARALLEL SAFE
 AS $BODY$
 /******************************************************************************
  * Validerar geometrins kvalitet för användning i _kba_-scheman.
@@ -31,18 +31,20 @@ AS $BODY$
  *   - Används endast för _kba_-scheman (manuellt redigerade data)
  *   - _ext_-scheman undantas då bulkladdning valideras i FME
  *   - NULL-geometrier hanteras av PostgreSQL:s CHECK-semantik (NULL = ok)
+ *   - Skriven i SQL (ett uttryck) så att den kan inlinas i CHECK-constrainten
+ *     utan PL/pgSQL-anrop. De billiga kontrollerna (tomhet, kurvor, antal
+ *     punkter) körs före ST_IsValid, som är dyrast (GEOS).
+ *   - PARALLEL SAFE så att granskningar av hela tabeller
+ *     (granska_geometrier) kan använda parallell skanning.
+ *   - Med hex_installning('geometrivalidering') = 'trigger' skapas ingen
+ *     CHECK – hex_kontrollera_geom validerar då varje rad en gång
+ *     (se skapa_geometrivalidering).
  ******************************************************************************/
-BEGIN
-    IF geom IS NULL THEN
-        RETURN true;
-    END IF;
-
-    RETURN
-        ST_IsValid(geom)
-        AND NOT ST_IsEmpty(geom)
-        AND ST_NPoints(geom) = ST_NPoints(ST_RemoveRepeatedPoints(geom))
-        AND NOT ST_HasArc(geom);
-END;
+    SELECT geom IS NULL
+        OR (NOT ST_IsEmpty(geom)
+            AND NOT ST_HasArc(geom)
+            AND ST_NPoints(geom) = ST_NPoints(ST_RemoveRepeatedPoints(geom))
+            AND ST_IsValid(geom));
 $BODY$;
 
 ALTER FUNCTION public.validera_geometri(geometry)
@@ -0,0 +1,52 @@
+CREATE OR REPLACE FUNCTION public.ar_stor_tabell(
+    p_schema_namn text,
+    p_tabell_namn text
+)
+    RETURNS boolean
+    LANGUAGE 'plpgsql'
+    STABLE
+AS $BODY$
+/******************************************************************************
+ * Avgör om en tabell är så stor att omstrukturering ska skjutas upp till
+ * kor_uppskjuten_omstrukturering() i stället för att köras i ALTER TABLE.
+ *
+ * Gränserna läses från hex_installningar:
+ *   omstrukturering_max_rader – uppskattat radantal (pg_class.reltuples)
+ *   omstrukturering_max_bytes – tabelldatans storlek (pg_relation_size)
+ * Värdet 0 stänger av respektive gräns.
+ *
+ * Båda måtten är billiga katalogslagningar – ingen tabellskanning görs.
+ * reltuples är -1 för tabeller som aldrig analyserats; då avgör storleken.
+ * För partitionerade tabeller summeras måtten över alla partitioner.
+ ******************************************************************************/
+DECLARE
+    tabell_oid regclass := to_regclass(format('%I.%I', p_schema_namn, p_tabell_namn));
+    max_rader bigint := public.hex_installning('omstrukturering_max_rader', '1000000')::bigint;
+    max_bytes bigint := public.hex_installning('omstrukturering_max_bytes', '1073741824')::bigint;
+    rader bigint;
+    storlek bigint;
+BEGIN
+    IF tabell_oid IS NULL THEN
+        RETURN false;
+    END IF;
+
+    -- Partitionerade tabeller (t.ex. tidspartitionerade historiktabeller)
+    -- saknar egen lagring – summera över partitionerna
+    SELECT sum(GREATEST(c.reltuples, 0))::bigint, sum(pg_relation_size(c.oid))
+    INTO rader, storlek
+    FROM pg_partition_tree(tabell_oid) t
+    JOIN pg_class c ON c.oid = t.relid
+    WHERE t.isleaf;
+
+    RETURN (max_rader > 0 AND rader >= max_rader)
+        OR (max_bytes > 0 AND storlek >= max_bytes);
+END;
+$BODY$;
+
+ALTER FUNCTION public.ar_stor_tabell(text, text)
+    OWNER TO postgres;
+
+COMMENT ON FUNCTION public.ar_stor_tabell(text, text)
+    IS 'Returnerar true om tabellen överskrider omstrukturering_max_rader eller
+omstrukturering_max_bytes i hex_installningar, dvs. om omstrukturering ska
+skjutas upp till kor_uppskjuten_omstrukturering().';
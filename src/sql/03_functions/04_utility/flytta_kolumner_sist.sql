@@ -0,0 +1,243 @@
+CREATE OR REPLACE FUNCTION public.flytta_kolumner_sist(
+    p_schema_namn text,
+    p_tabell_namn text,
+    p_kolumner text[],
+    p_definitioner text[]
+)
+    RETURNS integer
+    LANGUAGE 'plpgsql'
+AS $BODY$
+/******************************************************************************
+ * Flyttar kolumner sist i en tabell, i den ordning de anges.
+ *
+ * PostgreSQL saknar ALTER TABLE ... MOVE COLUMN. Varje kolumn ersätts därför
+ * av en kopia (ADD + UPDATE + DROP + RENAME), men alla kolumner hanteras
+ * tillsammans så att tabellen skrivs om EN gång oavsett antal kolumner:
+ *   1. ALTER TABLE med en ADD COLUMN <kolumn>_temp0001 per kolumn
+ *   2. En UPDATE som kopierar alla kolumner samtidigt
+ *   3. ALTER TABLE med en DROP COLUMN per originalkolumn
+ *   4. RENAME COLUMN per kolumn (enbart katalogändring)
+ *
+ * Det temporära namnet är kolumnnamnet kapat till 54 tecken + _tempNNNN.
+ * Numret räknas upp om namnet redan finns i tabellen eller används av en
+ * annan kolumn i samma flytt (två långa namn med samma början).
+ *
+ * Misslyckas den samlade flytten (t.ex. en definition som inte passar en
+ * kolumns data) rullas den tillbaka och kolumnerna flyttas i stället en och
+ * en, var och en i en egen subtransaktion. En kolumn som inte går att flytta
+ * blir då kvar på sin plats (WARNING) utan att hindra de övriga.
+ *
+ * Triggrar som beror på en flyttad kolumn (UPDATE OF <kolumn> eller ett
+ * WHEN-villkor, t.ex. hex_kontrollera_geom) hindrar DROP COLUMN. De tas
+ * därför bort före flytten och återskapas efteråt med samma definition
+ * (pg_get_triggerdef) och samma av/på-läge, i samma transaktion. Index och
+ * CHECK-constraints på en flyttad kolumn försvinner däremot med kolumnen –
+ * anroparen återskapar dem (GiST-index och validera_geom_<tabell>).
+ *
+ * Kolumner som saknas i tabellen hoppas över. Om kolumnerna redan ligger
+ * sist i rätt ordning görs ingenting (ingen omskrivning).
+ *
+ * Läget styrs av hex_installning('kolumnordning'):
+ *   fysisk (standard) – flytta enligt ovan
+ *   logisk            – ingen fysisk flytt, ingen omskrivning
+ *
+ * Anroparen ansvarar för att inaktivera radtriggrar (t.ex. QA-triggern)
+ * som inte ska köras för kopieringen i steg 2.
+ *
+ * Parametrar:
+ *   p_kolumner     – kolumnnamn i önskad slutordning
+ *   p_definitioner – datatyp (ev. med DEFAULT) per kolumn, samma ordning
+ *
+ * Returnerar antal flyttade kolumner (0 om inget behövde flyttas).
+ ******************************************************************************/
+DECLARE
+    tabell_oid regclass := format('%I.%I', p_schema_namn, p_tabell_namn)::regclass;
+    laege text := public.hex_installning('kolumnordning', 'fysisk');
+    kolumner text[] := ARRAY[]::text[];
+    definitioner text[] := ARRAY[]::text[];
+    temp_namn text[] := ARRAY[]::text[];
+    tillagg text[] := ARRAY[]::text[];
+    kopiering text[] := ARRAY[]::text[];
+    borttag text[] := ARRAY[]::text[];
+    nuvarande_slut text[];
+    trigger_namn text[] := ARRAY[]::text[];
+    trigger_def text[] := ARRAY[]::text[];
+    trigger_avstangd boolean[] := ARRAY[]::boolean[];
+    kandidat text;
+    nummer integer;
+    antal integer := 0;
+    sql_sats text;
+    i integer;
+BEGIN
+    -- Behåll bara kolumner som finns i tabellen
+    FOR i IN 1..COALESCE(array_length(p_kolumner, 1), 0) LOOP
+        IF EXISTS (
+            SELECT 1 FROM pg_attribute
+            WHERE attrelid = tabell_oid
+              AND attname = p_kolumner[i]
+              AND attnum > 0
+              AND NOT attisdropped
+        ) THEN
+            nummer := 1;
+            LOOP
+                kandidat := left(p_kolumner[i], 54) || '_temp' || lpad(nummer::text, 4, '0');
+                EXIT WHEN NOT kandidat = ANY(temp_namn)
+                      AND NOT EXISTS (
+                          SELECT 1 FROM pg_attribute
+                          WHERE attrelid = tabell_oid
+                            AND attname = kandidat
+                            AND attnum > 0
+                            AND NOT attisdropped
+                      );
+                nummer := nummer + 1;
+            END LOOP;
+
+            kolumner := array_append(kolumner, p_kolumner[i]);
+            definitioner := array_append(definitioner, p_definitioner[i]);
+            temp_namn := array_append(temp_namn, kandidat);
+            tillagg := array_append(tillagg,
+                format('ADD COLUMN %I %s', kandidat, p_definitioner[i]));
+            kopiering := array_append(kopiering,
+                format('%I = %I', kandidat, p_kolumner[i]));
+            borttag := array_append(borttag, format('DROP COLUMN %I', p_kolumner[i]));
+        ELSE
+            RAISE NOTICE '[flytta_kolumner_sist]   Kolumn "%" saknas i %.% – hoppar över',
+                p_kolumner[i], p_schema_namn, p_tabell_namn;
+        END IF;
+    END LOOP;
+
+    IF COALESCE(array_length(kolumner, 1), 0) = 0 THEN
+        RETURN 0;
+    END IF;
+
+    -- Ligger kolumnerna redan sist i rätt ordning? Då behövs ingen omskrivning.
+    SELECT array_agg(attname::text ORDER BY attnum)
+    INTO nuvarande_slut
+    FROM (
+        SELECT attname, attnum
+        FROM pg_attribute
+        WHERE attrelid = tabell_oid AND attnum > 0 AND NOT attisdropped
+        ORDER BY attnum DESC
+        LIMIT array_length(kolumner, 1)
+    ) sista;
+
+    IF nuvarande_slut = kolumner THEN
+        RAISE NOTICE '[flytta_kolumner_sist]   %.%: kolumnerna ligger redan sist – ingen flytt',
+            p_schema_namn, p_tabell_namn;
+        RETURN 0;
+    END IF;
+
+    IF laege = 'logisk' THEN
+        RAISE NOTICE '[flytta_kolumner_sist]   %.%: kolumnordning = logisk – % kolumn(er) flyttas inte fysiskt',
+            p_schema_namn, p_tabell_namn, array_length(kolumner, 1);
+        RETURN 0;
+    END IF;
+
+    -- Triggrar som beror på någon av kolumnerna (hindrar DROP COLUMN)
+    SELECT COALESCE(array_agg(t.tgname::text ORDER BY t.tgname), ARRAY[]::text[]),
+           COALESCE(array_agg(pg_get_triggerdef(t.oid) ORDER BY t.tgname), ARRAY[]::text[]),
+           COALESCE(array_agg(t.tgenabled = 'D' ORDER BY t.tgname), ARRAY[]::boolean[])
+    INTO trigger_namn, trigger_def, trigger_avstangd
+    FROM pg_trigger t
+    WHERE t.tgrelid = tabell_oid
+      AND NOT t.tgisinternal
+      AND EXISTS (
+          SELECT 1
+          FROM pg_depend d
+          JOIN pg_attribute a ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid
+          WHERE d.classid = 'pg_trigger'::regclass
+            AND d.objid = t.oid
+            AND d.refclassid = 'pg_class'::regclass
+            AND d.refobjid = tabell_oid
+            AND a.attname = ANY(kolumner)
+      );
+
+    BEGIN
+        FOR i IN 1..COALESCE(array_length(trigger_namn, 1), 0) LOOP
+            EXECUTE format('DROP TRIGGER %I ON %I.%I', trigger_namn[i], p_schema_namn, p_tabell_namn);
+        END LOOP;
+
+        sql_sats := format('ALTER TABLE %I.%I %s',
+            p_schema_namn, p_tabell_namn, array_to_string(tillagg, ', '));
+        RAISE NOTICE '[flytta_kolumner_sist]   SQL [1/4]: %', sql_sats;
+        EXECUTE sql_sats;
+
+        sql_sats := format('UPDATE %I.%I SET %s',
+            p_schema_namn, p_tabell_namn, array_to_string(kopiering, ', '));
+        RAISE NOTICE '[flytta_kolumner_sist]   SQL [2/4]: %', sql_sats;
+        EXECUTE sql_sats;
+
+        sql_sats := format('ALTER TABLE %I.%I %s',
+            p_schema_namn, p_tabell_namn, array_to_string(borttag, ', '));
+        RAISE NOTICE '[flytta_kolumner_sist]   SQL [3/4]: %', sql_sats;
+        EXECUTE sql_sats;
+
+        RAISE NOTICE '[flytta_kolumner_sist]   SQL [4/4]: RENAME COLUMN × %', array_length(kolumner, 1);
+        FOR i IN 1..array_length(kolumner, 1) LOOP
+            EXECUTE format('ALTER TABLE %I.%I RENAME COLUMN %I TO %I',
+                p_schema_namn, p_tabell_namn, temp_namn[i], kolumner[i]);
+        END LOOP;
+
+        -- Återskapa triggrarna (kolumnerna har nu sina ursprungliga namn)
+        FOR i IN 1..COALESCE(array_length(trigger_namn, 1), 0) LOOP
+            EXECUTE trigger_def[i];
+            IF trigger_avstangd[i] THEN
+                EXECUTE format('ALTER TABLE %I.%I DISABLE TRIGGER %I',
+                    p_schema_namn, p_tabell_namn, trigger_namn[i]);
+            END IF;
+        END LOOP;
+
+        RETURN array_length(kolumner, 1);
+    EXCEPTION
+        WHEN OTHERS THEN
+            RAISE WARNING '[flytta_kolumner_sist]   %.%: samlad flytt misslyckades (%) – flyttar kolumnerna en och en',
+                p_schema_namn, p_tabell_namn, SQLERRM;
+    END;
+
+    -- Reserv: en omskrivning per kolumn, var och en i en egen subtransaktion
+    FOR i IN 1..COALESCE(array_length(trigger_namn, 1), 0) LOOP
+        EXECUTE format('DROP TRIGGER %I ON %I.%I', trigger_namn[i], p_schema_namn, p_tabell_namn);
+    END LOOP;
+
+    FOR i IN 1..array_length(kolumner, 1) LOOP
+        BEGIN
+            EXECUTE format('ALTER TABLE %I.%I ADD COLUMN %I %s',
+                p_schema_namn, p_tabell_namn, temp_namn[i], definitioner[i]);
+            EXECUTE format('UPDATE %I.%I SET %I = %I',
+                p_schema_namn, p_tabell_namn, temp_namn[i], kolumner[i]);
+            EXECUTE format('ALTER TABLE %I.%I DROP COLUMN %I',
+                p_schema_namn, p_tabell_namn, kolumner[i]);
+            EXECUTE format('ALTER TABLE %I.%I RENAME COLUMN %I TO %I',
+                p_schema_namn, p_tabell_namn, temp_namn[i], kolumner[i]);
+            antal := antal + 1;
+        EXCEPTION
+            WHEN OTHERS THEN
+                RAISE WARNING '[flytta_kolumner_sist]   ✗ Kolumn "%" i %.% kunde inte flyttas: %',
+                    kolumner[i], p_schema_namn, p_tabell_namn, SQLERRM;
+        END;
+    END LOOP;
+
+    FOR i IN 1..COALESCE(array_length(trigger_namn, 1), 0) LOOP
+        EXECUTE trigger_def[i];
+        IF trigger_avstangd[i] THEN
+            EXECUTE format('ALTER TABLE %I.%I DISABLE TRIGGER %I',
+                p_schema_namn, p_tabell_namn, trigger_namn[i]);
+        END IF;
+    END LOOP;
+
+    RETURN antal;
+END;
+$BODY$;
+
+ALTER FUNCTION public.flytta_kolumner_sist(text, text, text[], text[])
+    OWNER TO postgres;
+
+COMMENT ON FUNCTION public.flytta_kolumner_sist(text, text, text[], text[])
+    IS 'Flyttar angivna kolumner sist i tabellen (i given ordning) med en enda
+omskrivning: alla temporära kolumner läggs till i en ALTER TABLE, kopieras i
+en UPDATE och originalen tas bort i en ALTER TABLE. Triggrar som beror på
+kolumnerna (t.ex. UPDATE OF geom) tas bort och återskapas runt flytten.
+Misslyckas det flyttas kolumnerna en och en, så att en felande kolumn inte
+stoppar de övriga. Gör ingenting om kolumnerna redan ligger sist, eller om
+hex_installning(''kolumnordning'') är ''logisk''. Returnerar antal flyttade
+kolumner.';
@@ -0,0 +1,222 @@
+CREATE OR REPLACE PROCEDURE public.gallra_historik(
+    p_batchstorlek integer DEFAULT 10000,
+    p_schema_namn text DEFAULT NULL
+)
+    LANGUAGE 'plpgsql'
+AS $BODY$
+/******************************************************************************
+ * Gallrar historiktabeller (<tabell>_h) enligt reglerna i
+ * hex_historik_gallring: rader med h_tidpunkt äldre än bevara_dagar tas bort
+ * (atgard = 'radera') eller flyttas till <tabell>_h_arkiv i samma schema
+ * (atgard = 'arkivera').
+ *
+ * Raderna hanteras i omgångar om p_batchstorlek rader, utvalda via
+ * (tableoid, ctid), med COMMIT efter varje omgång. Låsen hålls därmed bara
+ * kort och autovacuum kan ta hand om de döda raderna medan gallringen pågår.
+ * lock_timeout sätts till 5 s per omgång.
+ *
+ * Tidspartitionerade historiktabeller (se skapa_historikpartitioner):
+ * partitioner vars hela intervall är äldre än gränsen tas bort med DROP
+ * TABLE (radera) eller kopplas loss med DETACH PARTITION (arkivera) – ingen
+ * radvis DELETE. Varje partition hanteras i en egen transaktion, så en
+ * partition som inte kan tas bort (låstimeout, beroende) hindrar inte de
+ * övriga. Resterande rader (delvis äldre partition, standardpartitionen)
+ * gallras i omgångar som ovan.
+ *
+ * Rapporterar antal gallrade rader och partitioner per tabell (NOTICE).
+ *
+ * Måste anropas utanför en transaktion (CALL i autocommit-läge), t.ex.
+ * schemalagt via pg_cron eller cron + psql:
+ *   CALL gallra_historik();
+ *   CALL gallra_historik(50000, 'sk1_kba_parkering');
+ ******************************************************************************/
+DECLARE
+    schema_regex text;
+    t record;
+    del record;
+    grans timestamptz;
+    arkiv_namn text;
+    arkiv_kolumner text;
+    kol record;
+    antal integer;
+    antal_rader bigint;
+    antal_partitioner integer;
+    totalt_rader bigint := 0;
+    totalt_tabeller integer := 0;
+BEGIN
+    RAISE NOTICE E'[gallra_historik] ======== START ========';
+
+    IF p_batchstorlek IS NULL OR p_batchstorlek < 1 THEN
+        RAISE EXCEPTION '[gallra_historik] p_batchstorlek måste vara minst 1';
+    END IF;
+
+    schema_regex := public.hex_schema_regex();
+
+    FOR t IN
+        SELECT n.nspname AS s,
+               c.relname AS h,
+               c.oid     AS h_oid,
+               c.relkind,
+               g.bevara_dagar,
+               g.atgard
+        FROM   pg_class     c
+        JOIN   pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN public.hex_metadata m
+               ON m.history_schema = n.nspname AND m.history_table = c.relname
+        CROSS JOIN LATERAL (
+            SELECT r.bevara_dagar, r.atgard
+            FROM   public.hex_historik_gallring r
+            WHERE  starts_with(n.nspname, r.schema_prefix)
+              AND  r.tabell_namn IN ('', COALESCE(m.parent_table, regexp_replace(c.relname, '_h$', '')))
+            ORDER BY (r.tabell_namn <> '') DESC, length(r.schema_prefix) DESC
+            LIMIT 1
+        ) g
+        WHERE  c.relkind IN ('r', 'p')
+          AND  NOT c.relispartition
+          AND  c.relname ~ '_h$'
+          AND  n.nspname ~ schema_regex
+          AND  (p_schema_namn IS NULL OR n.nspname = p_schema_namn)
+          AND  EXISTS (
+                   SELECT 1 FROM pg_attribute a
+                   WHERE  a.attrelid = c.oid
+                     AND  a.attname  = 'h_tidpunkt'
+                     AND  NOT a.attisdropped
+               )
+        ORDER BY n.nspname, c.relname
+    LOOP
+        grans := now() - make_interval(days => t.bevara_dagar);
+        antal_rader := 0;
+        antal_partitioner := 0;
+        RAISE NOTICE '[gallra_historik] %.%: % äldre än % (% dagar)',
+            t.s, t.h, t.atgard, grans, t.bevara_dagar;
+
+        -- 1. Hela partitioner som ligger före gränsen, en transaktion per
+        --    partition så att ett fel inte rullar tillbaka de redan gallrade
+        IF t.relkind = 'p' THEN
+            FOR del IN
+                SELECT pc.relname,
+                       substring(pg_get_expr(pc.relpartbound, pc.oid)
+                                 FROM $$TO \('([^']+)'\)$$)::timestamptz AS ovre
+                FROM   pg_inherits i
+                JOIN   pg_class    pc ON pc.oid = i.inhrelid
+                WHERE  i.inhparent = t.h_oid
+                ORDER BY pc.relname
+            LOOP
+                CONTINUE WHEN del.ovre IS NULL OR del.ovre > grans;  -- standardpartitionen / för ny
+
+                -- DETACH är en ALTER TABLE – hantera_kolumntillagg ska inte reagera
+                PERFORM set_config('temp.reorganization_in_progress', 'true', true);
+                PERFORM set_config('lock_timeout', '5s', true);
+                BEGIN
+                    IF t.atgard = 'radera' THEN
+                        EXECUTE format('DROP TABLE %I.%I', t.s, del.relname);
+                    ELSE
+                        EXECUTE format('ALTER TABLE %I.%I DETACH PARTITION %I.%I',
+                            t.s, t.h, t.s, del.relname);
+                    END IF;
+                    antal_partitioner := antal_partitioner + 1;
+                EXCEPTION
+                    WHEN OTHERS THEN
+                        RAISE WARNING '[gallra_historik]   ✗ Partition %.% kunde inte gallras: %',
+                            t.s, del.relname, SQLERRM;
+                END;
+                COMMIT;
+            END LOOP;
+        END IF;
+
+        -- 2. Arkivtabell med historiktabellens kolumner (nya kolumner läggs till)
+        IF t.atgard = 'arkivera' THEN
+            arkiv_namn := left(t.h, 57) || '_arkiv';
+            PERFORM set_config('temp.tabellstrukturering_pagar', 'true', true);
+            PERFORM set_config('temp.reorganization_in_progress', 'true', true);
+
+            IF to_regclass(format('%I.%I', t.s, arkiv_namn)) IS NULL THEN
+                EXECUTE format('CREATE TABLE %I.%I (LIKE %I.%I)', t.s, arkiv_namn, t.s, t.h);
+                EXECUTE format('COMMENT ON TABLE %I.%I IS %L', t.s, arkiv_namn,
+                    format('Arkiverad historik från %s.%s (gallra_historik).', t.s, t.h));
+                RAISE NOTICE '[gallra_historik]   ✓ Arkivtabell skapad: %.%', t.s, arkiv_namn;
+            END IF;
+
+            FOR kol IN
+                SELECT k.kolumnnamn, k.datatyp
+                FROM   hamta_kolumnbeskrivning(t.h_oid) k
+                WHERE  NOT EXISTS (
+                           SELECT 1 FROM pg_attribute a
+                           WHERE  a.attrelid = format('%I.%I', t.s, arkiv_namn)::regclass
+                             AND  a.attname  = k.kolumnnamn
+                             AND  a.attnum   > 0
+                             AND  NOT a.attisdropped
+                       )
+            LOOP
+                EXECUTE format('ALTER TABLE %I.%I ADD COLUMN %I %s',
+                    t.s, arkiv_namn, kol.kolumnnamn, kol.datatyp);
+            END LOOP;
+
+            SELECT string_agg(format('%I', k.kolumnnamn), ', ' ORDER BY k.attnum)
+            INTO   arkiv_kolumner
+            FROM   hamta_kolumnbeskrivning(t.h_oid) k;
+            COMMIT;
+        END IF;
+
+        -- 3. Resterande rader i omgångar
+        LOOP
+            BEGIN
+                PERFORM set_config('lock_timeout', '5s', true);
+                IF t.atgard = 'radera' THEN
+                    EXECUTE format(
+                        'WITH omgang AS (
+                             SELECT tableoid AS t, ctid AS c FROM %1$I.%2$I
+                             WHERE h_tidpunkt < $1 LIMIT $2)
+                         DELETE FROM %1$I.%2$I h USING omgang
+                         WHERE h.tableoid = omgang.t AND h.ctid = omgang.c',
+                        t.s, t.h)
+                    USING grans, p_batchstorlek;
+                ELSE
+                    EXECUTE format(
+                        'WITH omgang AS (
+                             SELECT tableoid AS t, ctid AS c FROM %1$I.%2$I
+                             WHERE h_tidpunkt < $1 LIMIT $2),
+                         flyttade AS (
+                             DELETE FROM %1$I.%2$I h USING omgang
+                             WHERE h.tableoid = omgang.t AND h.ctid = omgang.c
+                             RETURNING h.*)
+                         INSERT INTO %1$I.%3$I (%4$s) SELECT %4$s FROM flyttade',
+                        t.s, t.h, arkiv_namn, arkiv_kolumner)
+                    USING grans, p_batchstorlek;
+                END IF;
+                GET DIAGNOSTICS antal = ROW_COUNT;
+            EXCEPTION
+                WHEN OTHERS THEN
+                    RAISE WARNING '[gallra_historik]   ✗ %.% avbruten efter % rader: %',
+                        t.s, t.h, antal_rader, SQLERRM;
+                    antal := 0;
+            END;
+            COMMIT;
+
+            antal_rader := antal_rader + antal;
+            EXIT WHEN antal < p_batchstorlek;
+        END LOOP;
+
+        RAISE NOTICE '[gallra_historik]   ✓ %.%: % rader %, % partition(er) %',
+            t.s, t.h,
+            antal_rader, CASE WHEN t.atgard = 'radera' THEN 'raderade' ELSE 'arkiverade' END,
+            antal_partitioner, CASE WHEN t.atgard = 'radera' THEN 'borttagna' ELSE 'lösgjorda' END;
+
+        totalt_rader := totalt_rader + antal_rader;
+        totalt_tabeller := totalt_tabeller + 1;
+    END LOOP;
+
+    RAISE NOTICE '[gallra_historik] Tabeller: %, gallrade rader: %', totalt_tabeller, totalt_rader;
+    RAISE NOTICE E'[gallra_historik] ======== SLUT ========';
+END;
+$BODY$;
+
+ALTER PROCEDURE public.gallra_historik(integer, text)
+    OWNER TO postgres;
+
+COMMENT ON PROCEDURE public.gallra_historik(integer, text)
+    IS 'Gallrar historiktabeller enligt hex_historik_gallring: raderar eller
+arkiverar (till <tabell>_h_arkiv) rader äldre än bevara_dagar i omgångar om
+p_batchstorlek rader med COMMIT emellan. Hela tidspartitioner tas bort eller
+kopplas loss. Rapporterar gallrade rader per tabell. Anropas med CALL utanför
+en transaktion.';
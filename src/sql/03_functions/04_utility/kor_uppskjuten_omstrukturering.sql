@@ -0,0 +1,198 @@
+CREATE OR REPLACE PROCEDURE public.kor_uppskjuten_omstrukturering(
+    p_max_antal integer DEFAULT NULL
+)
+    LANGUAGE 'plpgsql'
+AS $BODY$
+/******************************************************************************
+ * Bearbetar arbetskön hex_uppskjuten_omstrukturering: omstruktureringar av
+ * stora tabeller som hantera_kolumntillagg() sköt upp i stället för att köra
+ * dem inuti användarens ALTER TABLE, samt NOT VALID-constraints som
+ * skapa_geometrivalidering() lagt till (validera_constraint).
+ *
+ * kolumnordning flyttar kolumnerna med flytta_kolumner_sist(). Ingår geom
+ * försvinner GiST-indexet och CHECK-constrainten validera_geom_<tabell> med
+ * den gamla kolumnen; indexet byggs då om direkt (tabellen är ändå
+ * exklusivt låst av flytten) och skapa_geometrivalidering() anropas om
+ * datakategorin har validera_geometri = true eller tabellen hade
+ * geometrivalidering före flytten. För en stor tabell läggs constrainten
+ * till NOT VALID och ett validera_constraint-jobb registreras.
+ *
+ * validera_constraint kör ALTER TABLE ... VALIDATE CONSTRAINT. Det tar bara
+ * ett SHARE UPDATE EXCLUSIVE-lås, så läsning och skrivning mot tabellen
+ * fortsätter under skanningen. Har tabellen ogiltiga geometrier misslyckas
+ * jobbet (senaste_fel) – hitta dem med granska_geometrier(), rätta och kör
+ * igen. Nya och ändrade rader kontrolleras redan av constrainten.
+ *
+ * Varje jobb körs i en egen transaktion (COMMIT efter varje jobb), så att
+ * låsen på en tabell släpps innan nästa tabell påbörjas och ett misslyckat
+ * jobb inte rullar tillbaka de som lyckats. Misslyckade jobb ligger kvar med
+ * forsok/senaste_fel ifyllda och prövas igen vid nästa körning.
+ *
+ * lock_timeout sätts till 5 s per jobb – en tabell som används flitigt
+ * blockerar inte körningen utan hoppas över och prövas igen senare.
+ *
+ * Måste anropas utanför en transaktion (CALL i autocommit-läge), t.ex.
+ * schemalagt via pg_cron eller cron + psql:
+ *   CALL kor_uppskjuten_omstrukturering();
+ *   CALL kor_uppskjuten_omstrukturering(10);   -- högst 10 jobb
+ *
+ * CREATE INDEX CONCURRENTLY kan inte köras från en funktion eller procedur
+ * i PostgreSQL. gist_index-jobb bygger därför indexet med vanlig CREATE
+ * INDEX (skrivningar mot tabellen väntar under bygget). För att bygga utan
+ * skrivlås, kör indexsatserna via psql först – jobben blir då no-ops:
+ *   SELECT format('CREATE INDEX CONCURRENTLY IF NOT EXISTS %I ON %I.%I USING GIST (%I)',
+ *                 index_namn, schema_namn, tabell_namn, kolumner[1])
+ *   FROM hex_uppskjuten_omstrukturering WHERE atgard = 'gist_index' \gexec
+ ******************************************************************************/
+DECLARE
+    jobb          record;
+    tabell_oid    regclass;
+    qa_inaktiverad boolean;
+    antal_klara   integer := 0;
+    antal_fel     integer := 0;
+    antal_flyttade integer;
+    har_validering boolean;
+    gist_namn     text;
+    r             record;
+BEGIN
+    RAISE NOTICE E'[kor_uppskjuten_omstrukturering] ======== START ========';
+
+    FOR jobb IN
+        SELECT j.schema_namn, j.tabell_namn, j.atgard, j.kolumner, j.definitioner, j.index_namn,
+               j.constraint_namn
+        FROM public.hex_uppskjuten_omstrukturering j
+        ORDER BY j.registrerad, j.schema_namn, j.tabell_namn, j.atgard
+        LIMIT p_max_antal
+    LOOP
+        RAISE NOTICE '[kor_uppskjuten_omstrukturering] % på %.%',
+            jobb.atgard, jobb.schema_namn, jobb.tabell_namn;
+
+        BEGIN
+            -- Hindra hantera_kolumntillagg från att reagera på våra egna ALTER TABLE
+            PERFORM set_config('temp.reorganization_in_progress', 'true', true);
+            PERFORM set_config('lock_timeout', '5s', true);
+
+            tabell_oid := to_regclass(format('%I.%I', jobb.schema_namn, jobb.tabell_namn));
+
+            IF tabell_oid IS NULL THEN
+                RAISE NOTICE '[kor_uppskjuten_omstrukturering]   Tabellen finns inte längre – jobbet tas bort';
+
+            ELSIF jobb.atgard = 'kolumnordning' THEN
+                -- Geometrivalidering före flytten (CHECK-constrainten försvinner med kolumnen)
+                har_validering := 'geom' = ANY(jobb.kolumner) AND (
+                    EXISTS (
+                        SELECT 1 FROM pg_constraint
+                        WHERE conrelid = tabell_oid AND conname = 'validera_geom_' || jobb.tabell_namn
+                    )
+                    OR EXISTS (
+                        SELECT 1 FROM pg_trigger
+                        WHERE tgrelid = tabell_oid AND tgname = 'hex_kontrollera_geom'
+                    )
+                    OR EXISTS (
+                        SELECT 1 FROM public.standardiserade_datakategorier d
+                        WHERE d.validera_geometri = true
+                          AND jobb.schema_namn ~ (public.hex_schema_regex() || d.prefix || '_')
+                    )
+                );
+
+                -- QA-triggrarna skulle annars skriva historik för varje rad i UPDATE-steget
+                qa_inaktiverad := public.vaxla_qa_triggrar(tabell_oid, false) > 0;
+
+                antal_flyttade := public.flytta_kolumner_sist(
+                    jobb.schema_namn, jobb.tabell_namn, jobb.kolumner, jobb.definitioner);
+
+                IF qa_inaktiverad THEN
+                    PERFORM public.vaxla_qa_triggrar(tabell_oid, true);
+                END IF;
+                RAISE NOTICE '[kor_uppskjuten_omstrukturering]   ✓ % kolumn(er) flyttade', antal_flyttade;
+
+                -- Flyttad geom: bygg om GiST-indexet och geometrivalideringen
+                IF 'geom' = ANY(jobb.kolumner) AND NOT EXISTS (
+                    SELECT 1 FROM pg_indexes
+                    WHERE schemaname = jobb.schema_namn
+                      AND tablename  = jobb.tabell_namn
+                      AND indexdef   LIKE '%USING gist%'
+                ) THEN
+                    gist_namn := left(jobb.tabell_namn, 50) || '_geom_gidx';
+                    EXECUTE format(
+                        'CREATE INDEX IF NOT EXISTS %I ON %I.%I USING GIST (geom)',
+                        gist_namn, jobb.schema_namn, jobb.tabell_namn
+                    );
+                    RAISE NOTICE '[kor_uppskjuten_omstrukturering]   ✓ GiST-index återskapat: %', gist_namn;
+                END IF;
+
+                IF har_validering THEN
+                    PERFORM public.skapa_geometrivalidering(jobb.schema_namn, jobb.tabell_namn);
+                    RAISE NOTICE '[kor_uppskjuten_omstrukturering]   ✓ Geometrivalidering återskapad';
+                END IF;
+
+            ELSIF jobb.atgard = 'gist_index' THEN
+                -- Ta bort GiST-index med annat namn (t.ex. FME-skapade) för att undvika dubbletter
+                FOR r IN
+                    SELECT indexname FROM pg_indexes
+                    WHERE schemaname = jobb.schema_namn
+                      AND tablename  = jobb.tabell_namn
+                      AND indexdef   LIKE '%USING gist%'
+                      AND indexname  <> jobb.index_namn
+                LOOP
+                    EXECUTE format('DROP INDEX %I.%I', jobb.schema_namn, r.indexname);
+                    RAISE NOTICE '[kor_uppskjuten_omstrukturering]   ✓ Dubblerat GiST-index borttaget: %', r.indexname;
+                END LOOP;
+                EXECUTE format(
+                    'CREATE INDEX IF NOT EXISTS %I ON %I.%I USING GIST (%I)',
+                    jobb.index_namn, jobb.schema_namn, jobb.tabell_namn, jobb.kolumner[1]
+                );
+                RAISE NOTICE '[kor_uppskjuten_omstrukturering]   ✓ GiST-index skapat: %', jobb.index_namn;
+
+            ELSIF jobb.atgard = 'validera_constraint' THEN
+                IF NOT EXISTS (
+                    SELECT 1 FROM pg_constraint
+                    WHERE conrelid = tabell_oid AND conname = jobb.constraint_namn
+                ) THEN
+                    RAISE NOTICE '[kor_uppskjuten_omstrukturering]   Constrainten % finns inte längre – jobbet tas bort',
+                        jobb.constraint_namn;
+                ELSE
+                    -- No-op om constrainten redan är validerad
+                    EXECUTE format('ALTER TABLE %I.%I VALIDATE CONSTRAINT %I',
+                        jobb.schema_namn, jobb.tabell_namn, jobb.constraint_namn);
+                    RAISE NOTICE '[kor_uppskjuten_omstrukturering]   ✓ Constraint validerad: %', jobb.constraint_namn;
+                END IF;
+            END IF;
+
+            DELETE FROM public.hex_uppskjuten_omstrukturering j
+            WHERE j.schema_namn = jobb.schema_namn
+              AND j.tabell_namn = jobb.tabell_namn
+              AND j.atgard      = jobb.atgard;
+            antal_klara := antal_klara + 1;
+        EXCEPTION
+            WHEN OTHERS THEN
+                -- Jobbets ändringar är redan tillbakarullade av undantagsblocket
+                antal_fel := antal_fel + 1;
+                RAISE WARNING '[kor_uppskjuten_omstrukturering]   ✗ % på %.% misslyckades: %',
+                    jobb.atgard, jobb.schema_namn, jobb.tabell_namn, SQLERRM;
+                UPDATE public.hex_uppskjuten_omstrukturering j
+                SET forsok = j.forsok + 1,
+                    senaste_fel = SQLERRM
+                WHERE j.schema_namn = jobb.schema_namn
+                  AND j.tabell_namn = jobb.tabell_namn
+                  AND j.atgard      = jobb.atgard;
+        END;
+
+        COMMIT;
+    END LOOP;
+
+    RAISE NOTICE '[kor_uppskjuten_omstrukturering] Klara: %, misslyckade: %', antal_klara, antal_fel;
+    RAISE NOTICE E'[kor_uppskjuten_omstrukturering] ======== SLUT ========';
+END;
+$BODY$;
+
+ALTER PROCEDURE public.kor_uppskjuten_omstrukturering(integer)
+    OWNER TO postgres;
+
+COMMENT ON PROCEDURE public.kor_uppskjuten_omstrukturering(integer)
+    IS 'Bearbetar hex_uppskjuten_omstrukturering: flyttar kolumner (och bygger
+om GiST-index och geometrivalidering när geom flyttas) och bygger GiST-index
+för stora tabeller vars omstrukturering sköts upp från ALTER TABLE,
+och validerar NOT VALID-constraints (VALIDATE CONSTRAINT, utan exklusivt lås).
+Ett jobb per transaktion, lock_timeout 5 s. Anropas med CALL utanför en
+transaktion; p_max_antal begränsar antalet jobb per körning.';
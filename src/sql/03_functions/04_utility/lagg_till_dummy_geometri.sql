@@ -28,9 +28,9 @@ AS $BODY$
  *
  * LIVSCYKEL
  *   Dummy-raden registreras i hex_dummy_geometrier.
- *   En AFTER INSERT-trigger (hex_ta_bort_dummy) läggs till på tabellen.
+ *   En AFTER INSERT-satstrigger (hex_ta_bort_dummy) läggs till på tabellen.
  *   Triggern tar automatiskt bort dummyn när den första riktiga raden
- *   läggs in.
+ *   läggs in och tar sedan bort sig själv.
  *
  * Hela funktionen är omgiven av ett EXCEPTION-block – fel vid dummy-insättning
  * (t.ex. obligatoriska kolumner utan standardvärde) loggas som NOTICE och
@@ -72,13 +72,14 @@ BEGIN
     INSERT INTO public.hex_dummy_geometrier (schema_namn, tabell_namn, gid)
     VALUES (p_schema_namn, p_tabell_namn, dummy_gid);
 
-    -- Lägg till AFTER INSERT-trigger som tar bort dummyn när riktig data anländer.
+    -- Lägg till AFTER INSERT-satstrigger som tar bort dummyn när riktig data anländer.
     -- Triggern skapas EFTER insättningen, vilket innebär att den inte avfyras
     -- för dummy-raden själv (den finns redan i tabellen när triggern skapas).
     EXECUTE format(
         'CREATE TRIGGER hex_ta_bort_dummy'
         ' AFTER INSERT ON %I.%I'
-        ' FOR EACH ROW EXECUTE FUNCTION public.ta_bort_dummy_rad()',
+        ' REFERENCING NEW TABLE AS nya'
+        ' FOR EACH STATEMENT EXECUTE FUNCTION public.ta_bort_dummy_rad()',
         p_schema_namn, p_tabell_namn
     );
 
@@ -104,6 +105,6 @@ COMMENT ON FUNCTION public.lagg_till_dummy_geometri(text, text, geom_info)
 ska kunna identifiera geometritypen via normal DB-anslutning (utan manuell dialog).
 Dummy-koordinaterna ligger i Kungsbacka-området (EPSG 3007, ~160000 6395000) och
 uppfyller alla validera_geometri()-krav. Dummy-gid registreras i hex_dummy_geometrier
-och en AFTER INSERT-trigger (hex_ta_bort_dummy) läggs till för att automatiskt
+och en AFTER INSERT-satstrigger (hex_ta_bort_dummy) läggs till för att automatiskt
 städa bort dummyn när den första riktiga raden infogats. Fel loggas som NOTICE
 och stoppar inte tabellskapandet.';
@@ -0,0 +1,143 @@
+DROP FUNCTION IF EXISTS public.skapa_geometrivalidering(text, text, text);
+
+CREATE OR REPLACE FUNCTION public.skapa_geometrivalidering(
+    p_schema_namn text,
+    p_tabell_namn text,
+    p_laege text DEFAULT NULL,
+    p_ej_validerad boolean DEFAULT NULL
+)
+    RETURNS integer
+    LANGUAGE 'plpgsql'
+AS $BODY$
+/******************************************************************************
+ * Lägger till geometrivalidering på en tabell med kolumnen geom enligt valt
+ * läge (p_laege, annars hex_installning('geometrivalidering',
+ * 'trigger_och_check')):
+ *
+ *   trigger_och_check – triggern hex_kontrollera_geom (läsbart felmeddelande)
+ *                       plus CHECK-constrainten validera_geom_<tabell>.
+ *                       Varje infogad/ändrad rad valideras två gånger, men
+ *                       CHECK gäller även när triggers är avstängda.
+ *   trigger           – enbart triggern hex_kontrollera_geom. Varje rad
+ *                       valideras en gång; en befintlig validera_geom_<tabell>
+ *                       tas bort. Triggern kringgås av
+ *                       session_replication_role = replica och
+ *                       ALTER TABLE ... DISABLE TRIGGER.
+ *
+ * Triggern skapas som BEFORE INSERT OR UPDATE OF geom, så att ändringar av
+ * enbart attribut inte validerar om geometrin (se
+ * kontrollera_geometri_trigger). En hex_kontrollera_geom utan kolumnlista
+ * (äldre versioner) återskapas. CHECK-constrainten utvärderas däremot vid
+ * varje UPDATE oavsett kolumner – läget trigger undviker även det.
+ *
+ * p_ej_validerad = true lägger till CHECK-constrainten som NOT VALID: bara
+ * nya och ändrade rader kontrolleras och ingen skanning görs under det
+ * exklusiva låset. Constrainten registreras som ett validera_constraint-jobb
+ * i hex_uppskjuten_omstrukturering, och kor_uppskjuten_omstrukturering() kör
+ * sedan ALTER TABLE ... VALIDATE CONSTRAINT, som bara tar ett SHARE UPDATE
+ * EXCLUSIVE-lås (läsning och skrivning fortsätter under skanningen).
+ * p_ej_validerad NULL = NOT VALID om tabellen är stor (ar_stor_tabell).
+ * En befintlig NOT VALID-constraint som saknar jobb registreras också.
+ *
+ * Anropas av hantera_ny_tabell(), hantera_kolumntillagg() och
+ * underhall_hex() (alltid NOT VALID – befintliga data kan vara ogiltiga).
+ *
+ * Returnerar antal skapade eller borttagna objekt (trigger/constraint).
+ ******************************************************************************/
+DECLARE
+    laege text := COALESCE(p_laege, public.hex_installning('geometrivalidering', 'trigger_och_check'));
+    tabell regclass := format('%I.%I', p_schema_namn, p_tabell_namn)::regclass;
+    constraint_namn text := 'validera_geom_' || p_tabell_namn;
+    har_check boolean;
+    ar_validerad boolean;
+    har_trigger boolean;
+    ej_validerad boolean := COALESCE(p_ej_validerad, public.ar_stor_tabell(p_schema_namn, p_tabell_namn));
+    antal integer := 0;
+BEGIN
+    IF laege NOT IN ('trigger_och_check', 'trigger') THEN
+        RAISE EXCEPTION '[skapa_geometrivalidering] Okänt läge "%" (tillåtna: trigger_och_check, trigger)', laege;
+    END IF;
+
+    SELECT EXISTS (
+               SELECT 1 FROM pg_trigger
+               WHERE tgrelid = tabell AND tgname = 'hex_kontrollera_geom'
+           )
+    INTO har_trigger;
+
+    -- Äldre trigger utan UPDATE OF geom (tom kolumnlista) återskapas
+    IF har_trigger AND EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgrelid = tabell AND tgname = 'hex_kontrollera_geom'
+          AND cardinality(tgattr::int2[]) = 0
+    ) THEN
+        EXECUTE format('DROP TRIGGER hex_kontrollera_geom ON %I.%I', p_schema_namn, p_tabell_namn);
+        har_trigger := false;
+    END IF;
+
+    IF NOT har_trigger THEN
+        EXECUTE format(
+            'CREATE TRIGGER hex_kontrollera_geom'
+            ' BEFORE INSERT OR UPDATE OF geom ON %I.%I'
+            ' FOR EACH ROW EXECUTE FUNCTION public.kontrollera_geometri_trigger()',
+            p_schema_namn, p_tabell_namn
+        );
+        antal := antal + 1;
+        RAISE NOTICE '[skapa_geometrivalidering]   ✓ Geometritrigger tillagd: hex_kontrollera_geom';
+    END IF;
+
+    SELECT true, convalidated
+    INTO   har_check, ar_validerad
+    FROM   pg_constraint
+    WHERE  conrelid = tabell AND conname = constraint_namn;
+    har_check := COALESCE(har_check, false);
+
+    IF laege = 'trigger_och_check' AND NOT har_check THEN
+        EXECUTE format(
+            'ALTER TABLE %I.%I ADD CONSTRAINT %I CHECK (public.validera_geometri(geom))%s',
+            p_schema_namn, p_tabell_namn, constraint_namn,
+            CASE WHEN ej_validerad THEN ' NOT VALID' ELSE '' END
+        );
+        antal := antal + 1;
+        ar_validerad := NOT ej_validerad;
+        RAISE NOTICE '[skapa_geometrivalidering]   ✓ Geometrivalidering tillagd: %',
+            constraint_namn || CASE WHEN ej_validerad THEN ' (NOT VALID)' ELSE '' END;
+    ELSIF laege = 'trigger' AND har_check THEN
+        EXECUTE format('ALTER TABLE %I.%I DROP CONSTRAINT %I',
+            p_schema_namn, p_tabell_namn, constraint_namn);
+        antal := antal + 1;
+        RAISE NOTICE '[skapa_geometrivalidering]   ✓ Geometrivalidering borttagen (enbart trigger): %', constraint_namn;
+    END IF;
+
+    -- Valideringen av befintliga rader görs av kor_uppskjuten_omstrukturering()
+    IF laege = 'trigger_och_check' AND NOT ar_validerad THEN
+        INSERT INTO public.hex_uppskjuten_omstrukturering
+            (schema_namn, tabell_namn, atgard, constraint_namn)
+        VALUES (p_schema_namn, p_tabell_namn, 'validera_constraint', constraint_namn)
+        ON CONFLICT ON CONSTRAINT hex_uppskjuten_omstrukturering_pkey DO NOTHING;
+        IF FOUND THEN
+            RAISE NOTICE '[skapa_geometrivalidering]   % registrerad för VALIDATE CONSTRAINT i hex_uppskjuten_omstrukturering',
+                constraint_namn;
+        END IF;
+    ELSIF laege = 'trigger' THEN
+        DELETE FROM public.hex_uppskjuten_omstrukturering j
+        WHERE j.schema_namn = p_schema_namn
+          AND j.tabell_namn = p_tabell_namn
+          AND j.atgard      = 'validera_constraint';
+    END IF;
+
+    RETURN antal;
+END;
+$BODY$;
+
+ALTER FUNCTION public.skapa_geometrivalidering(text, text, text, boolean)
+    OWNER TO postgres;
+
+COMMENT ON FUNCTION public.skapa_geometrivalidering(text, text, text, boolean)
+    IS 'Lägger till geometrivalidering på en tabell: triggern hex_kontrollera_geom
+(BEFORE INSERT OR UPDATE OF geom) och, i läget trigger_och_check,
+CHECK-constrainten validera_geom_<tabell>. I läget trigger tas constrainten
+bort så att varje rad bara valideras en gång. Utan p_laege gäller
+hex_installning(''geometrivalidering''). Med p_ej_validerad (standard: stora
+tabeller) läggs constrainten till NOT VALID och valideras senare av
+kor_uppskjuten_omstrukturering(). Returnerar antal skapade eller borttagna
+objekt.';
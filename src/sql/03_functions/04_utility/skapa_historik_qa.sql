@@ -19,11 +19,18 @@ AS $BODY$
  *
  * UPPDATERAD: Använder nu hamta_geometri_definition() för korrekt 
  * geometrihantering i historiktabeller.
+ *
+ * Triggerfunktion och triggers skapas av skapa_qa_trigger – per rad eller,
+ * med hex_installning('historik_trigger') = 'sats', per sats.
+ *
+ * Med hex_installning('historik_partitionering') = 'manad' eller 'ar' blir
+ * historiktabellen range-partitionerad på h_tidpunkt (skapa_historikpartitioner).
+ * Indexstrategin (btree eller BRIN på h_tidpunkt) styrs av
+ * hex_installning('historik_index'), se skapa_historikindex.
  ******************************************************************************/
 DECLARE
     qa_kolumner text[];
     qa_uttryck text[];
-    trigger_satser text := '';
     trigger_funktionsnamn text;
     i integer;
     kolumn_lista text;
@@ -35,6 +42,8 @@ DECLARE
     -- Nya variabler för geometrihantering
     har_geometri boolean := false;
     geometriinfo geom_info;
+    tabell_oid regclass := format('%I.%I', p_schema_namn, p_tabell_namn)::regclass;
+    partitionering text := hex_installning('historik_partitionering', 'ingen');
 BEGIN
     RAISE NOTICE E'[skapa_historik_qa] === START ===';
     RAISE NOTICE '[skapa_historik_qa] Skapar historik/QA för %.%', p_schema_namn, p_tabell_namn;
@@ -51,10 +60,11 @@ BEGIN
     WHERE sk.historik_qa = true
     AND sk.default_varde IS NOT NULL
     AND EXISTS (
-        SELECT 1 FROM information_schema.columns c
-        WHERE c.table_schema = p_schema_namn 
-        AND c.table_name = p_tabell_namn 
-        AND c.column_name = sk.kolumnnamn
+        SELECT 1 FROM pg_attribute a
+        WHERE a.attrelid = tabell_oid
+        AND a.attname = sk.kolumnnamn
+        AND a.attnum > 0
+        AND NOT a.attisdropped
     );
     
     antal_qa_kolumner := COALESCE(array_length(qa_kolumner, 1), 0);
@@ -94,52 +104,35 @@ BEGIN
     op_steg := 'hämta kolumndefinitioner';
     RAISE NOTICE '[skapa_historik_qa] Steg 3: Analyserar originaltabellens struktur';
     
+    -- En läsning av pg_attribute ger både definitioner och INSERT-kolumnlista
     SELECT 
         string_agg(
             format('%I %s%s',
-                c.column_name,
-                -- Datatyp med specialhantering för geometri
+                k.kolumnnamn,
+                -- Datatyp (inkl. typmod); geometri via hjälpfunktionen
                 CASE 
-                    WHEN c.data_type = 'USER-DEFINED' AND c.udt_name = 'geometry' AND har_geometri THEN
-                        -- Använd hjälpfunktionen för korrekt geometridefinition
+                    WHEN k.typnamn = 'geometry' AND har_geometri THEN
                         geometriinfo.definition
-                    WHEN c.data_type = 'USER-DEFINED' THEN 
-                        c.udt_name
-                    WHEN c.data_type = 'character varying' THEN 
-                        'character varying' || 
-                        CASE WHEN c.character_maximum_length IS NOT NULL 
-                             THEN '(' || c.character_maximum_length || ')'
-                             ELSE ''
-                        END
-                    WHEN c.data_type = 'numeric' AND c.numeric_precision IS NOT NULL THEN 
-                        'numeric(' || c.numeric_precision || ',' || c.numeric_scale || ')'
-                    ELSE c.data_type
+                    ELSE k.datatyp
                 END,
                 -- COLLATE om det finns
                 CASE 
-                    WHEN c.collation_name IS NOT NULL 
-                    THEN ' COLLATE ' || c.collation_name 
+                    WHEN k.kollation IS NOT NULL 
+                    THEN ' COLLATE ' || k.kollation 
                     ELSE '' 
                 END
             ),
             E',\n        '
-            ORDER BY c.ordinal_position
+            ORDER BY k.attnum
         ),
+        -- Kolumnnamn för INSERT (citerade med %I för att hantera reserverade ord)
+        string_agg(format('%I', k.kolumnnamn), ', ' ORDER BY k.attnum),
         COUNT(*)
-    INTO kolumn_definitioner, antal_original_kolumner
-    FROM information_schema.columns c
-    WHERE c.table_schema = p_schema_namn
-    AND c.table_name = p_tabell_namn;
+    INTO kolumn_definitioner, kolumn_lista, antal_original_kolumner
+    FROM hamta_kolumnbeskrivning(tabell_oid) k;
     
     RAISE NOTICE '[skapa_historik_qa]   » Originaltabell har % kolumner', antal_original_kolumner;
     
-    -- Hämta kolumnnamn för INSERT (citerade med %I för att hantera reserverade ord)
-    SELECT string_agg(format('%I', c.column_name), ', ' ORDER BY c.ordinal_position)
-    INTO kolumn_lista
-    FROM information_schema.columns c
-    WHERE c.table_schema = p_schema_namn
-    AND c.table_name = p_tabell_namn;
-    
     RAISE NOTICE '[skapa_historik_qa]   » Kolumnlista för INSERT: %',
         substring(kolumn_lista from 1 for 50) ||
         CASE WHEN length(kolumn_lista) > 50 THEN '...' ELSE '' END;
@@ -157,83 +150,46 @@ BEGIN
         h_tidpunkt timestamptz NOT NULL DEFAULT NOW(),
         h_av text NOT NULL DEFAULT session_user,
         %s
-    )',
+    )%s',
         p_schema_namn, p_tabell_namn || '_h',
-        kolumn_definitioner
+        kolumn_definitioner,
+        CASE WHEN partitionering IN ('manad', 'ar') THEN ' PARTITION BY RANGE (h_tidpunkt)' ELSE '' END
     );
     RAISE NOTICE '[skapa_historik_qa]   ✓ Historiktabell skapad';
+
+    -- Tidspartitionering (hex_installning('historik_partitionering')): en
+    -- standardpartition som fångar allt utanför de skapade perioderna, plus
+    -- partitioner för innevarande och kommande perioder. underhall_hex()
+    -- skapar nya partitioner i takt med att tiden går.
+    IF partitionering IN ('manad', 'ar') THEN
+        EXECUTE format(
+            'CREATE TABLE %I.%I PARTITION OF %I.%I DEFAULT',
+            p_schema_namn, left(p_tabell_namn || '_h', 54) || '_pdefault',
+            p_schema_namn, p_tabell_namn || '_h'
+        );
+        RAISE NOTICE '[skapa_historik_qa]   ✓ Partitionerad per % – % partition(er) skapade',
+            partitionering,
+            skapa_historikpartitioner(p_schema_namn, left(p_tabell_namn || '_h', 63), partitionering);
+    END IF;
     
     -- Steg 5: Skapa index
     op_steg := 'skapa index';
     RAISE NOTICE '[skapa_historik_qa] Steg 5: Skapar index för prestanda';
     
-    -- Index name capped at 56 chars to avoid colliding with the 63-char history
-    -- table name when p_tabell_namn is 61+ characters long.
-    EXECUTE format(
-        'CREATE INDEX %I ON %I.%I (gid, h_tidpunkt DESC)',
-        left(p_tabell_namn, 50) || '_h_idx',
-        p_schema_namn, p_tabell_namn || '_h'
-    );
-    RAISE NOTICE '[skapa_historik_qa]   ✓ Index skapat: %', left(p_tabell_namn, 50) || '_h_idx';
-    
-    -- Steg 6: Bygg trigger-satser
-    op_steg := 'bygg trigger-satser';
-    RAISE NOTICE '[skapa_historik_qa] Steg 6: Bygger trigger-satser för QA-uppdatering';
-    
-    FOR i IN 1..antal_qa_kolumner LOOP
-        trigger_satser := trigger_satser || format(
-            E'        rad.%I = %s;\n',
-            qa_kolumner[i], qa_uttryck[i]
-        );
-    END LOOP;
-    RAISE NOTICE '[skapa_historik_qa]   » Trigger kommer sätta % QA-värden', antal_qa_kolumner;
+    -- btree (gid, h_tidpunkt DESC) eller btree (gid) + BRIN (h_tidpunkt)
+    -- beroende på hex_installning('historik_index'), se skapa_historikindex
+    RAISE NOTICE '[skapa_historik_qa]   ✓ % index skapade',
+        skapa_historikindex(p_schema_namn, p_tabell_namn);
     
-    -- Steg 7: Skapa triggerfunktion
-    -- ÄNDRING: Använder session_user istället för current_user
+    -- Steg 6: Skapa triggerfunktion och triggers
+    -- Läget (radtrigger eller satstriggrar med REFERENCING OLD TABLE) styrs av
+    -- hex_installning('historik_trigger'), se skapa_qa_trigger.
     op_steg := 'skapa triggerfunktion';
-    trigger_funktionsnamn := 'trg_fn_' || p_tabell_namn || '_qa';
-    RAISE NOTICE '[skapa_historik_qa] Steg 7: Skapar triggerfunktion %', trigger_funktionsnamn;
-    
-    EXECUTE format($TRIG$
-        CREATE OR REPLACE FUNCTION %I.%I()
-        RETURNS TRIGGER AS $$
-        DECLARE
-            rad %I.%I%%ROWTYPE;
-        BEGIN
-            IF TG_OP = 'UPDATE' THEN
-                rad := NEW;
-                
-                -- Sätt QA-värden
-%s                
-                -- Kopiera gamla värdet till historik
-                INSERT INTO %I.%I (h_typ, h_tidpunkt, h_av, %s)
-                SELECT 'U', NOW(), session_user, OLD.*;
-                
-                RETURN rad;
-            ELSE -- DELETE
-                rad := OLD;
-                
-                -- Sätt QA-värden även för DELETE (för konsistens)
-%s                
-                -- Kopiera till historik
-                INSERT INTO %I.%I (h_typ, h_tidpunkt, h_av, %s)
-                SELECT 'D', NOW(), session_user, rad.*;
-                
-                RETURN OLD;
-            END IF;
-        END;
-        $$ LANGUAGE plpgsql;
-    $TRIG$,
-        p_schema_namn, trigger_funktionsnamn,
-        p_schema_namn, p_tabell_namn,
-        trigger_satser,
-        p_schema_namn, p_tabell_namn || '_h', kolumn_lista,
-        trigger_satser,
-        p_schema_namn, p_tabell_namn || '_h', kolumn_lista
-    );
-    RAISE NOTICE '[skapa_historik_qa]   ✓ Triggerfunktion skapad';
+    RAISE NOTICE '[skapa_historik_qa] Steg 6: Skapar triggerfunktion och triggers';
+    trigger_funktionsnamn := skapa_qa_trigger(p_schema_namn, p_tabell_namn);
+    RAISE NOTICE '[skapa_historik_qa]   ✓ Triggerfunktion skapad: %', trigger_funktionsnamn;
     
-    -- Steg 7.5: Registrera OID → historiktabell-mappning i hex_metadata
+    -- Steg 7: Registrera OID → historiktabell-mappning i hex_metadata
     -- Gör det möjligt att spåra historiktabellen även efter RENAME TO,
     -- eftersom OID är stabilt medan namnkonventionen (tabell_h) bryts vid rename.
     op_steg := 'registrera i hex_metadata';
@@ -265,22 +221,9 @@ BEGIN
         END IF;
     END;
 
-    -- Steg 8: Skapa trigger
-    op_steg := 'skapa trigger';
-    RAISE NOTICE '[skapa_historik_qa] Steg 8: Skapar trigger på modertabell';
-    
-    EXECUTE format(
-        'CREATE TRIGGER trg_%s_qa 
-        BEFORE UPDATE OR DELETE ON %I.%I
-        FOR EACH ROW EXECUTE FUNCTION %I.%I()',
-        p_tabell_namn, p_schema_namn, p_tabell_namn,
-        p_schema_namn, trigger_funktionsnamn
-    );
-    RAISE NOTICE '[skapa_historik_qa]   ✓ Trigger skapad: trg_%_qa', p_tabell_namn;
-    
-    -- Steg 9: Dokumentera
+    -- Steg 8: Dokumentera
     op_steg := 'dokumentera';
-    RAISE NOTICE '[skapa_historik_qa] Steg 9: Lägger till dokumentation';
+    RAISE NOTICE '[skapa_historik_qa] Steg 8: Lägger till dokumentation';
     
     EXECUTE format(
         'COMMENT ON TABLE %I.%I IS %L',
@@ -0,0 +1,80 @@
+CREATE OR REPLACE FUNCTION public.skapa_historikindex(
+    p_schema_namn text,
+    p_tabell_namn text,
+    p_strategi text DEFAULT NULL
+)
+    RETURNS integer
+    LANGUAGE 'plpgsql'
+AS $BODY$
+/******************************************************************************
+ * Skapar index på historiktabellen <tabell>_h enligt vald indexstrategi och
+ * tar bort index som hör till den andra strategin.
+ *
+ * Strategier (p_strategi, annars hex_installning('historik_index', 'btree')):
+ *   btree – <tabell>_h_idx: btree på (gid, h_tidpunkt DESC)
+ *   brin  – <tabell>_h_gid_idx: btree på gid
+ *           <tabell>_h_brin:    BRIN på h_tidpunkt
+ *
+ * Historikrader skrivs bara till (append-only) i tidsordning, så h_tidpunkt
+ * korrelerar med den fysiska ordningen. Ett BRIN-index sparar då min/max per
+ * block-intervall och blir en bråkdel av ett btree-index, och varje historik-
+ * rad kostar ett mindre btree-index att underhålla. Tidsintervallfrågor
+ * (t.ex. gallra_historik) använder BRIN-indexet, uppslag per gid btree på gid.
+ *
+ * Indexnamnen kapas till 50 tecken + suffix för att inte kollidera med
+ * historiktabellens namn när p_tabell_namn är 61+ tecken.
+ *
+ * Returnerar antal skapade index.
+ ******************************************************************************/
+DECLARE
+    historik_tabell text := left(p_tabell_namn || '_h', 63);
+    strategi text := COALESCE(p_strategi, public.hex_installning('historik_index', 'btree'));
+    btree_idx text := left(p_tabell_namn, 50) || '_h_idx';
+    gid_idx text := left(p_tabell_namn, 50) || '_h_gid_idx';
+    brin_idx text := left(p_tabell_namn, 50) || '_h_brin';
+    antal integer := 0;
+BEGIN
+    IF strategi NOT IN ('btree', 'brin') THEN
+        RAISE EXCEPTION '[skapa_historikindex] Okänd indexstrategi "%" (tillåtna: btree, brin)', strategi;
+    END IF;
+
+    IF strategi = 'btree' THEN
+        EXECUTE format('DROP INDEX IF EXISTS %I.%I', p_schema_namn, brin_idx);
+        EXECUTE format('DROP INDEX IF EXISTS %I.%I', p_schema_namn, gid_idx);
+
+        IF to_regclass(format('%I.%I', p_schema_namn, btree_idx)) IS NULL THEN
+            EXECUTE format('CREATE INDEX %I ON %I.%I (gid, h_tidpunkt DESC)',
+                btree_idx, p_schema_namn, historik_tabell);
+            antal := antal + 1;
+            RAISE NOTICE '[skapa_historikindex]   ✓ Index skapat: %', btree_idx;
+        END IF;
+    ELSE
+        EXECUTE format('DROP INDEX IF EXISTS %I.%I', p_schema_namn, btree_idx);
+
+        IF to_regclass(format('%I.%I', p_schema_namn, gid_idx)) IS NULL THEN
+            EXECUTE format('CREATE INDEX %I ON %I.%I (gid)',
+                gid_idx, p_schema_namn, historik_tabell);
+            antal := antal + 1;
+            RAISE NOTICE '[skapa_historikindex]   ✓ Index skapat: %', gid_idx;
+        END IF;
+
+        IF to_regclass(format('%I.%I', p_schema_namn, brin_idx)) IS NULL THEN
+            EXECUTE format('CREATE INDEX %I ON %I.%I USING brin (h_tidpunkt)',
+                brin_idx, p_schema_namn, historik_tabell);
+            antal := antal + 1;
+            RAISE NOTICE '[skapa_historikindex]   ✓ Index skapat: %', brin_idx;
+        END IF;
+    END IF;
+
+    RETURN antal;
+END;
+$BODY$;
+
+ALTER FUNCTION public.skapa_historikindex(text, text, text)
+    OWNER TO postgres;
+
+COMMENT ON FUNCTION public.skapa_historikindex(text, text, text)
+    IS 'Skapar index på <tabell>_h enligt strategi btree ((gid, h_tidpunkt DESC))
+eller brin (btree på gid + BRIN på h_tidpunkt) och tar bort den andra
+strategins index. Utan p_strategi gäller hex_installning(''historik_index'').
+Returnerar antal skapade index.';
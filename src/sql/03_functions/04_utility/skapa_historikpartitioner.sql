@@ -0,0 +1,109 @@
+CREATE OR REPLACE FUNCTION public.skapa_historikpartitioner(
+    p_schema_namn text,
+    p_historik_tabell text,
+    p_intervall text DEFAULT NULL,
+    p_antal_framat integer DEFAULT 2
+)
+    RETURNS integer
+    LANGUAGE 'plpgsql'
+AS $BODY$
+/******************************************************************************
+ * Skapar saknade tidspartitioner för en historiktabell som är
+ * range-partitionerad på h_tidpunkt (se skapa_historik_qa).
+ *
+ * En partition per månad eller år, från innevarande period och
+ * p_antal_framat perioder framåt. Partitionerna heter
+ * <historiktabell>_pÅÅÅÅMM (månad) eller <historiktabell>_pÅÅÅÅ (år), så att
+ * gamla perioder kan kopplas loss (DETACH PARTITION) och arkiveras eller
+ * tas bort utan att röra resten av historiken.
+ *
+ * Intervallet väljs i ordningen:
+ *   1. p_intervall ('manad' eller 'ar')
+ *   2. befintliga partitioners namn
+ *   3. hex_installning('historik_partitionering') om det är 'manad' eller 'ar'
+ *   4. 'manad'
+ *
+ * Rader som hamnar utanför alla partitioner (om underhall_hex inte körts på
+ * länge) landar i standardpartitionen <historiktabell>_pdefault. En ny
+ * partition vars intervall redan har rader i standardpartitionen kan inte
+ * skapas – det rapporteras som WARNING och perioden hoppas över.
+ *
+ * Returnerar antal skapade partitioner (0 om tabellen inte är partitionerad).
+ ******************************************************************************/
+DECLARE
+    historik_oid regclass := to_regclass(format('%I.%I', p_schema_namn, p_historik_tabell));
+    intervall text := p_intervall;
+    steg interval;
+    namnformat text;
+    period_start timestamptz;
+    partition_namn text;
+    antal integer := 0;
+    i integer;
+BEGIN
+    IF historik_oid IS NULL OR NOT EXISTS (
+        SELECT 1 FROM pg_class WHERE oid = historik_oid AND relkind = 'p'
+    ) THEN
+        RETURN 0;
+    END IF;
+
+    IF intervall IS NULL THEN
+        SELECT CASE WHEN bool_or(c.relname ~ '_p\d{6}$') THEN 'manad'
+                    WHEN bool_or(c.relname ~ '_p\d{4}$') THEN 'ar' END
+        INTO intervall
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = historik_oid;
+    END IF;
+
+    intervall := COALESCE(intervall,
+        NULLIF(public.hex_installning('historik_partitionering', 'manad'), 'ingen'),
+        'manad');
+
+    IF intervall = 'manad' THEN
+        steg := interval '1 month';
+        namnformat := 'YYYYMM';
+    ELSIF intervall = 'ar' THEN
+        steg := interval '1 year';
+        namnformat := 'YYYY';
+    ELSE
+        RAISE EXCEPTION '[skapa_historikpartitioner] Okänt intervall "%" (tillåtna: manad, ar)', intervall;
+    END IF;
+
+    period_start := date_trunc(CASE WHEN intervall = 'manad' THEN 'month' ELSE 'year' END, now());
+
+    FOR i IN 0..GREATEST(p_antal_framat, 0) LOOP
+        partition_namn := left(p_historik_tabell, 54) || '_p' || to_char(period_start, namnformat);
+
+        IF to_regclass(format('%I.%I', p_schema_namn, partition_namn)) IS NULL THEN
+            BEGIN
+                EXECUTE format(
+                    'CREATE TABLE %I.%I PARTITION OF %I.%I FOR VALUES FROM (%L) TO (%L)',
+                    p_schema_namn, partition_namn,
+                    p_schema_namn, p_historik_tabell,
+                    period_start, period_start + steg
+                );
+                antal := antal + 1;
+                RAISE NOTICE '[skapa_historikpartitioner]   ✓ Partition skapad: %.%', p_schema_namn, partition_namn;
+            EXCEPTION
+                WHEN check_violation THEN
+                    RAISE WARNING '[skapa_historikpartitioner] %.%: standardpartitionen har redan rader för % – '
+                        'flytta dem (DETACH standardpartitionen, skapa partitionen, INSERT ... SELECT) och kör igen',
+                        p_schema_namn, p_historik_tabell, to_char(period_start, namnformat);
+            END;
+        END IF;
+
+        period_start := period_start + steg;
+    END LOOP;
+
+    RETURN antal;
+END;
+$BODY$;
+
+ALTER FUNCTION public.skapa_historikpartitioner(text, text, text, integer)
+    OWNER TO postgres;
+
+COMMENT ON FUNCTION public.skapa_historikpartitioner(text, text, text, integer)
+    IS 'Skapar saknade månads- eller årspartitioner (<historiktabell>_pÅÅÅÅMM /
+_pÅÅÅÅ) för en historiktabell som är range-partitionerad på h_tidpunkt, från
+innevarande period och p_antal_framat perioder framåt. Anropas av
+skapa_historik_qa och underhall_hex. Returnerar antal skapade partitioner.';
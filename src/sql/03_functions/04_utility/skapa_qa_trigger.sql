@@ -0,0 +1,244 @@
+CREATE OR REPLACE FUNCTION public.skapa_qa_trigger(
+    p_schema_namn text,
+    p_tabell_namn text,
+    p_laege text DEFAULT NULL
+)
+    RETURNS text
+    LANGUAGE 'plpgsql'
+AS $BODY$
+/******************************************************************************
+ * Skapar (eller återskapar) QA-triggerfunktionen trg_fn_<tabell>_qa och de
+ * triggers som använder den. Historiktabellen (<tabell>_h) måste finnas.
+ *
+ * Två lägen:
+ *   rad  – trg_<tabell>_qa BEFORE UPDATE OR DELETE FOR EACH ROW sätter
+ *          QA-kolumnerna och skriver en historikrad per påverkad rad.
+ *   sats – trg_<tabell>_qa BEFORE UPDATE FOR EACH ROW sätter enbart
+ *          QA-kolumnerna. Historiken skrivs av två AFTER ... FOR EACH
+ *          STATEMENT-triggers (trg_<tabell>_qa_u / _qa_d) med
+ *          REFERENCING OLD TABLE, dvs. en INSERT ... SELECT per sats i
+ *          stället för en per rad. Lönar sig vid massuppdateringar
+ *          (FME, batchredigering i QGIS) på stora tabeller.
+ *
+ * Läget väljs i ordningen:
+ *   1. p_laege om det anges (byter läge om tabellen har det andra)
+ *   2. tabellens nuvarande läge (finns en satstrigger är det 'sats')
+ *   3. hex_installning('historik_trigger', 'rad')
+ *
+ * Kolumnlistan hämtas från modertabellen vid varje anrop, så funktionen
+ * används även för att regenerera triggerfunktionen när kolumner lagts till.
+ * Befintliga triggers i rätt läge lämnas orörda.
+ *
+ * Returnerar triggerfunktionens namn.
+ ******************************************************************************/
+DECLARE
+    tabell_oid regclass := format('%I.%I', p_schema_namn, p_tabell_namn)::regclass;
+    historik_tabell text := left(p_tabell_namn || '_h', 63);
+    funktionsnamn text := left('trg_fn_' || p_tabell_namn || '_qa', 63);
+    rad_trigger text := left('trg_' || p_tabell_namn || '_qa', 63);
+    uppdatering_trigger text := 'trg_' || left(p_tabell_namn, 50) || '_qa_u';
+    borttagning_trigger text := 'trg_' || left(p_tabell_namn, 50) || '_qa_d';
+    har_sats boolean;
+    nuvarande_laege text;
+    laege text;
+    qa_kolumner text[];
+    qa_uttryck text[];
+    trigger_satser text := '';
+    kolumn_lista text;
+    borttagning_lista text;
+    trg record;
+    i integer;
+BEGIN
+    -- Nuvarande läge utläses från befintliga triggers (NULL = inga triggers)
+    SELECT bool_or((t.tgtype & 1) = 0)  -- TRIGGER_TYPE_ROW = 1
+    INTO har_sats
+    FROM pg_trigger t
+    JOIN pg_proc p ON p.oid = t.tgfoid
+    JOIN pg_namespace n ON n.oid = p.pronamespace
+    WHERE t.tgrelid = tabell_oid
+      AND n.nspname = p_schema_namn
+      AND p.proname = funktionsnamn
+      AND NOT t.tgisinternal;
+
+    nuvarande_laege := CASE WHEN har_sats THEN 'sats'
+                            WHEN har_sats IS NOT NULL THEN 'rad' END;
+    laege := COALESCE(p_laege, nuvarande_laege,
+                      public.hex_installning('historik_trigger', 'rad'));
+
+    IF laege NOT IN ('rad', 'sats') THEN
+        RAISE EXCEPTION '[skapa_qa_trigger] Okänt historikläge "%" (tillåtna: rad, sats)', laege;
+    END IF;
+
+    RAISE NOTICE '[skapa_qa_trigger] %.%: läge % (nuvarande: %)',
+        p_schema_namn, p_tabell_namn, laege, COALESCE(nuvarande_laege, 'inga triggers');
+
+    -- QA-kolumner och deras uttryck
+    SELECT
+        array_agg(sk.kolumnnamn ORDER BY sk.ordinal_position),
+        array_agg(sk.default_varde ORDER BY sk.ordinal_position)
+    INTO qa_kolumner, qa_uttryck
+    FROM standardiserade_kolumner sk
+    WHERE sk.historik_qa = true
+    AND sk.default_varde IS NOT NULL
+    AND EXISTS (
+        SELECT 1 FROM pg_attribute a
+        WHERE a.attrelid = tabell_oid
+        AND a.attname = sk.kolumnnamn
+        AND a.attnum > 0
+        AND NOT a.attisdropped
+    );
+
+    FOR i IN 1..COALESCE(array_length(qa_kolumner, 1), 0) LOOP
+        trigger_satser := trigger_satser || format(
+            E'        rad.%I = %s;\n',
+            qa_kolumner[i], qa_uttryck[i]
+        );
+    END LOOP;
+
+    -- Kolumnlista för INSERT (citerade med %I för att hantera reserverade ord).
+    -- För DELETE i satsläge ersätts QA-kolumnerna med sina uttryck, vilket
+    -- motsvarar radlägets "sätt QA-värden även för DELETE".
+    SELECT
+        string_agg(format('%I', k.kolumnnamn), ', ' ORDER BY k.attnum),
+        string_agg(
+            CASE WHEN k.kolumnnamn = ANY(qa_kolumner)
+                 THEN qa_uttryck[array_position(qa_kolumner, k.kolumnnamn)]
+                 ELSE format('gamla.%I', k.kolumnnamn)
+            END,
+            ', ' ORDER BY k.attnum)
+    INTO kolumn_lista, borttagning_lista
+    FROM hamta_kolumnbeskrivning(tabell_oid) k;
+
+    -- Triggerfunktion
+    IF laege = 'rad' THEN
+        EXECUTE format($TRIG$
+        CREATE OR REPLACE FUNCTION %I.%I()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            rad %I.%I%%ROWTYPE;
+        BEGIN
+            IF TG_OP = 'UPDATE' THEN
+                rad := NEW;
+
+                -- Sätt QA-värden
+%s
+                -- Kopiera gamla värdet till historik
+                INSERT INTO %I.%I (h_typ, h_tidpunkt, h_av, %s)
+                SELECT 'U', NOW(), session_user, OLD.*;
+
+                RETURN rad;
+            ELSE -- DELETE
+                rad := OLD;
+
+                -- Sätt QA-värden även för DELETE (för konsistens)
+%s
+                -- Kopiera till historik
+                INSERT INTO %I.%I (h_typ, h_tidpunkt, h_av, %s)
+                SELECT 'D', NOW(), session_user, rad.*;
+
+                RETURN OLD;
+            END IF;
+        END;
+        $$ LANGUAGE plpgsql;
+        $TRIG$,
+            p_schema_namn, funktionsnamn,
+            p_schema_namn, p_tabell_namn,
+            trigger_satser,
+            p_schema_namn, historik_tabell, kolumn_lista,
+            trigger_satser,
+            p_schema_namn, historik_tabell, kolumn_lista
+        );
+    ELSE
+        EXECUTE format($TRIG$
+        CREATE OR REPLACE FUNCTION %I.%I()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            rad %I.%I%%ROWTYPE;
+        BEGIN
+            IF TG_LEVEL = 'ROW' THEN
+                -- BEFORE UPDATE: sätt QA-värden (historiken skrivs per sats)
+                rad := NEW;
+%s
+                RETURN rad;
+            ELSIF TG_OP = 'UPDATE' THEN
+                -- Hela satsens gamla rader till historik i en INSERT
+                INSERT INTO %I.%I (h_typ, h_tidpunkt, h_av, %s)
+                SELECT 'U', NOW(), session_user, gamla.* FROM gamla;
+            ELSE -- DELETE
+                INSERT INTO %I.%I (h_typ, h_tidpunkt, h_av, %s)
+                SELECT 'D', NOW(), session_user, %s FROM gamla;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        $TRIG$,
+            p_schema_namn, funktionsnamn,
+            p_schema_namn, p_tabell_namn,
+            trigger_satser,
+            p_schema_namn, historik_tabell, kolumn_lista,
+            p_schema_namn, historik_tabell, kolumn_lista, borttagning_lista
+        );
+    END IF;
+    RAISE NOTICE '[skapa_qa_trigger]   ✓ Triggerfunktion %.% skapad', p_schema_namn, funktionsnamn;
+
+    -- Byte av läge: ta bort triggers som hör till det andra läget
+    IF nuvarande_laege IS NOT NULL AND nuvarande_laege <> laege THEN
+        FOR trg IN
+            SELECT t.tgname
+            FROM pg_trigger t
+            JOIN pg_proc p ON p.oid = t.tgfoid
+            WHERE t.tgrelid = tabell_oid
+              AND p.proname = funktionsnamn
+              AND NOT t.tgisinternal
+        LOOP
+            EXECUTE format('DROP TRIGGER %I ON %I.%I', trg.tgname, p_schema_namn, p_tabell_namn);
+            RAISE NOTICE '[skapa_qa_trigger]   ✓ Trigger % borttagen (lägesbyte)', trg.tgname;
+        END LOOP;
+    END IF;
+
+    -- Triggers som saknas
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgrelid = tabell_oid AND tgname = rad_trigger) THEN
+        EXECUTE format(
+            'CREATE TRIGGER %I BEFORE %s ON %I.%I FOR EACH ROW EXECUTE FUNCTION %I.%I()',
+            rad_trigger,
+            CASE WHEN laege = 'rad' THEN 'UPDATE OR DELETE' ELSE 'UPDATE' END,
+            p_schema_namn, p_tabell_namn, p_schema_namn, funktionsnamn
+        );
+        RAISE NOTICE '[skapa_qa_trigger]   ✓ Trigger skapad: %', rad_trigger;
+    END IF;
+
+    IF laege = 'sats' THEN
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgrelid = tabell_oid AND tgname = uppdatering_trigger) THEN
+            EXECUTE format(
+                'CREATE TRIGGER %I AFTER UPDATE ON %I.%I REFERENCING OLD TABLE AS gamla '
+                'FOR EACH STATEMENT EXECUTE FUNCTION %I.%I()',
+                uppdatering_trigger, p_schema_namn, p_tabell_namn, p_schema_namn, funktionsnamn
+            );
+            RAISE NOTICE '[skapa_qa_trigger]   ✓ Trigger skapad: %', uppdatering_trigger;
+        END IF;
+
+        -- Transitionstabeller tillåts bara för triggers med en händelse
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgrelid = tabell_oid AND tgname = borttagning_trigger) THEN
+            EXECUTE format(
+                'CREATE TRIGGER %I AFTER DELETE ON %I.%I REFERENCING OLD TABLE AS gamla '
+                'FOR EACH STATEMENT EXECUTE FUNCTION %I.%I()',
+                borttagning_trigger, p_schema_namn, p_tabell_namn, p_schema_namn, funktionsnamn
+            );
+            RAISE NOTICE '[skapa_qa_trigger]   ✓ Trigger skapad: %', borttagning_trigger;
+        END IF;
+    END IF;
+
+    RETURN funktionsnamn;
+END;
+$BODY$;
+
+ALTER FUNCTION public.skapa_qa_trigger(text, text, text)
+    OWNER TO postgres;
+
+COMMENT ON FUNCTION public.skapa_qa_trigger(text, text, text)
+    IS 'Skapar/regenererar QA-triggerfunktionen trg_fn_<tabell>_qa och dess triggers.
+Läge rad: en BEFORE UPDATE OR DELETE-radtrigger som skriver historik per rad.
+Läge sats: radtriggern sätter bara QA-kolumner; AFTER UPDATE/DELETE FOR EACH
+STATEMENT-triggers med REFERENCING OLD TABLE skriver historiken med en INSERT
+per sats. Utan p_laege behålls tabellens nuvarande läge, annars gäller
+hex_installning(''historik_trigger''). Returnerar triggerfunktionens namn.';
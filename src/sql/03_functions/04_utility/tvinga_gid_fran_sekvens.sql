@@ -16,27 +16,61 @@ AS $BODY$
  * Effekten är att sekvensen alltid är den enda källan till gid-värden.
  * En klient som skickar gid=100 får raden tillbaka med gid=3 om det är
  * sekvensens nästa värde.
+ *
+ * Triggern körs för varje infogad rad och hålls därför billig:
+ * - Sekvensen slås upp med pg_get_serial_sequence() första gången triggern
+ *   körs för tabellen i sessionen och cachas sedan i en sessionsinställning
+ *   (hex_tvinga_gid.r<tabell-OID>). Varken tabellens eller sekvensens OID
+ *   lagras i triggerdefinitionen, så triggern överlever pg_dump/pg_restore
+ *   (nya OID) och uppdatera_sekvensnamn() (OID oförändrat vid namnbyte).
+ *   Argument från äldre versioner (TG_ARGV) ignoreras.
+ * - currval() kastar fel om sekvensen inte använts i sessionen, vilket kräver
+ *   ett EXCEPTION-block (= en subtransaktion per rad). När currval väl är
+ *   tillgängligt noteras det i en transaktionslokal inställning
+ *   (hex_tvinga_gid.s<sekvens-OID>) och resten av transaktionens rader kör
+ *   bara currval/jämförelse utan undantagsblock. Flaggan gäller bara
+ *   transaktionen: DISCARD SEQUENCES/DISCARD ALL (t.ex. från en
+ *   anslutningspool mellan transaktioner) gör currval otillgängligt igen,
+ *   och nästa transaktion börjar därför alltid med undantagsvägen.
  ******************************************************************************/
 DECLARE
-    seq_name text;
-    seq_curr bigint;
+    cache_nyckel text := 'hex_tvinga_gid.r' || TG_RELID::oid;
+    cachad text := current_setting(cache_nyckel, true);
+    sekvens regclass;
+    flagga text;
 BEGIN
-    seq_name := pg_get_serial_sequence(
-        quote_ident(TG_TABLE_SCHEMA) || '.' || quote_ident(TG_TABLE_NAME),
-        'gid'
-    );
+    IF cachad IS NULL OR cachad = '' THEN
+        sekvens := pg_get_serial_sequence(
+            quote_ident(TG_TABLE_SCHEMA) || '.' || quote_ident(TG_TABLE_NAME),
+            'gid'
+        )::regclass;
+        -- Sessionsnivå; '-' = tabellen saknar gid-sekvens
+        PERFORM set_config(cache_nyckel, COALESCE(sekvens::oid::text, '-'), false);
+    ELSIF cachad <> '-' THEN
+        sekvens := cachad::oid::regclass;
+    END IF;
+
+    IF sekvens IS NULL THEN
+        RETURN NEW;
+    END IF;
+
+    -- For a normal INSERT, the identity mechanism calls nextval() before this
+    -- trigger fires and sets NEW.gid to that value. currval() will match NEW.gid.
+    --
+    -- For OVERRIDING SYSTEM VALUE (e.g. QGIS), the identity mechanism does NOT
+    -- call nextval() – the client's value is placed directly in NEW.gid.
+    -- currval() will therefore NOT match NEW.gid, and we override it.
+    flagga := 'hex_tvinga_gid.s' || sekvens::oid;
 
-    IF seq_name IS NOT NULL THEN
-        -- For a normal INSERT, the identity mechanism calls nextval() before this
-        -- trigger fires and sets NEW.gid to that value. currval() will match NEW.gid.
-        --
-        -- For OVERRIDING SYSTEM VALUE (e.g. QGIS), the identity mechanism does NOT
-        -- call nextval() – the client's value is placed directly in NEW.gid.
-        -- currval() will therefore NOT match NEW.gid, and we override it.
+    IF current_setting(flagga, true) = 'on' THEN
+        -- currval() är känt tillgängligt i transaktionen – ingen subtransaktion
+        IF currval(sekvens) IS DISTINCT FROM NEW.gid THEN
+            NEW.gid := nextval(sekvens);
+        END IF;
+    ELSE
         BEGIN
-            seq_curr := currval(seq_name);
-            IF seq_curr IS DISTINCT FROM NEW.gid THEN
-                NEW.gid := nextval(seq_name);
+            IF currval(sekvens) IS DISTINCT FROM NEW.gid THEN
+                NEW.gid := nextval(sekvens);
             END IF;
         EXCEPTION WHEN object_not_in_prerequisite_state THEN
             -- nextval() has never been called in this session for this sequence.
@@ -44,8 +78,10 @@ BEGIN
             -- (which makes currval() available), so reaching this handler proves
             -- the identity mechanism did NOT advance the sequence – meaning the
             -- client used OVERRIDING SYSTEM VALUE. Replace the client's value.
-            NEW.gid := nextval(seq_name);
+            NEW.gid := nextval(sekvens);
         END;
+        -- Transaktionslokal (is_local = true), se ovan
+        PERFORM set_config(flagga, 'on', true);
     END IF;
 
     RETURN NEW;
@@ -59,4 +95,7 @@ COMMENT ON FUNCTION public.tvinga_gid_fran_sekvens()
     IS 'BEFORE INSERT-trigger som alltid åsidosätter klientens gid-värde med
 nästa sekvensvärde. Förhindrar att klienter (t.ex. QGIS med OVERRIDING SYSTEM
 VALUE) kan välja ett godtyckligt gid. Triggeranropet hex_tvinga_gid skapas
-automatiskt av hantera_ny_tabell() på alla Hex-hanterade tabeller.';
+automatiskt av hantera_ny_tabell() på alla Hex-hanterade tabeller. Sekvensen
+slås upp en gång per tabell och session (cachas i hex_tvinga_gid.r<tabell-OID>)
+och currval-kontrollen kräver en subtransaktion bara för första raden i varje
+transaktion.';
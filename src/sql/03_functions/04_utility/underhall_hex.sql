@@ -18,30 +18,47 @@ AS $BODY$
  * Schemaprefix hämtas dynamiskt från standardiserade_skyddsnivaer, så att
  * egna prefix (t.ex. sc1, sk3) fungerar utan kodändringar.
  *
- * Hanterar nio åtgärdstyper:
+ * Hanterar tio åtgärdstyper:
  *
  *   schemamigrering      Uppgraderar hex_role_credentials och standardiserade_roller
- *                        till aktuellt schema idempotent (ADD COLUMN IF NOT EXISTS).
- *                        Körs alltid först.
+ *                        till aktuellt schema idempotent (ADD COLUMN IF NOT EXISTS)
+ *                        och fyller hex_schema_matchningar. Körs alltid först.
  *
  *   hex_tvinga_gid       BEFORE INSERT på alla Hex-tabeller med en gid
  *                        IDENTITY-kolumn. Förhindrar att klienter (t.ex. QGIS)
  *                        väljer eget gid via OVERRIDING SYSTEM VALUE.
+ *                        Triggers med sekvens-OID som argument (föregående
+ *                        version – OID:t blir fel efter pg_restore)
+ *                        återskapas utan argument ('uppdaterad').
  *
- *   hex_kontrollera_geom BEFORE INSERT OR UPDATE på geometritabeller vars
- *                        datakategori har validera_geometri = true.
- *                        Validerar OGC-giltighet.
+ *   hex_kontrollera_geom BEFORE INSERT OR UPDATE OF geom på geometritabeller
+ *                        vars datakategori har validera_geometri = true,
+ *                        via skapa_geometrivalidering(). Validerar
+ *                        OGC-giltighet. Triggers utan kolumnlista (äldre
+ *                        versioner) återskapas ('uppdaterad'). I läget
+ *                        trigger_och_check läggs en saknad validera_geom_-
+ *                        constraint till NOT VALID och köas för VALIDATE
+ *                        CONSTRAINT (kor_uppskjuten_omstrukturering); i
+ *                        läget trigger tas den bort ('uppdaterad').
  *
- *   hex_ta_bort_dummy    AFTER INSERT på geometritabeller som fortfarande har
- *                        en dummy-rad registrerad i hex_dummy_geometrier.
- *                        Transient – tar bort sig själv när första riktiga
- *                        raden infogas. Återkopplas bara om dummy-raden finns.
+ *   hex_ta_bort_dummy    AFTER INSERT-satstrigger på geometritabeller som
+ *                        fortfarande har en dummy-rad registrerad i
+ *                        hex_dummy_geometrier. Transient – tar bort sig själv
+ *                        när första riktiga raden infogas. Återkopplas bara om
+ *                        dummy-raden finns; radtriggrar från äldre versioner
+ *                        ersätts ('uppdaterad') och kvarblivna triggers utan
+ *                        dummy tas bort ('borttagen').
  *
- *   trg_<tabell>_qa      BEFORE UPDATE OR DELETE på tabeller med historik.
+ *   trg_<tabell>_qa      BEFORE UPDATE OR DELETE på tabeller med historik
+ *                        (i satsläge BEFORE UPDATE plus satstriggrarna
+ *                        trg_<tabell>_qa_u/_qa_d, se skapa_qa_trigger).
  *                        Identifieras via triggerfunktioner (trg_fn_%_qa) som
  *                        lever i respektive Hex-schema och överlever en
  *                        oinstallation av Hex.
  *
+ *   historikpartitioner  Skapar kommande månads-/årspartitioner för
+ *                        tidspartitionerade historiktabeller.
+ *
  *   rollstruktur         Verifierar och reparerar alla fyra roller per schema:
  *                          r_{schema}    NOLOGIN behörighetsgrupp (läs)
  *                          w_{schema}    NOLOGIN behörighetsgrupp (skriv)
@@ -67,7 +84,7 @@ AS $BODY$
  *
  * Funktionen är idempotent – befintliga triggers och rättigheter rörs inte
  * i onödan. Returnerar en rad per undersökt åtgärd med resultatet
- * 'skapad'/'beviljad'/'uppdaterade' eller 'redan finns'.
+ * 'skapad'/'beviljad'/'uppdaterad(e)'/'borttagen' eller 'redan finns'.
  ******************************************************************************/
 DECLARE
     r                  record;
@@ -79,6 +96,7 @@ DECLARE
     arvs_rollnamn      text;
     schema_regex       text;
     generated_password text;
+    antal_andrade      integer;
 BEGIN
     -- -------------------------------------------------------------------------
     -- 0. Schemamigrering
@@ -90,6 +108,10 @@ BEGIN
     EXECUTE 'ALTER TABLE public.hex_role_credentials ADD COLUMN IF NOT EXISTS rolcanlogin boolean NOT NULL DEFAULT true';
     EXECUTE 'ALTER TABLE public.standardiserade_roller ADD COLUMN IF NOT EXISTS arvs_fran text DEFAULT NULL';
 
+    -- Förberäkna schema_uttryck-matchningar för alla befintliga scheman
+    -- (hex_schema_matchningar är tom direkt efter installation/uppgradering)
+    PERFORM public.uppdatera_schema_matchningar();
+
     -- Bygg regex från standardiserade_skyddsnivaer en gång.
     -- Alla schemanamnkontroller i denna funktion använder denna variabel
     -- så att egna prefix fungerar utan kodändringar.
@@ -99,7 +121,9 @@ BEGIN
 
     -- -------------------------------------------------------------------------
     -- 1. hex_tvinga_gid
-    --    Alla tabeller i Hex-scheman med en gid IDENTITY-kolumn.
+    --    Alla tabeller i Hex-scheman med en gid IDENTITY-kolumn. Triggern tar
+    --    inga argument (sekvensen slås upp och cachas av triggerfunktionen);
+    --    triggers med sekvens-OID som argument återskapas.
     -- -------------------------------------------------------------------------
     FOR r IN
         SELECT n.nspname AS s, c.relname AS t
@@ -131,16 +155,28 @@ BEGIN
         tabell_namn  := r.t;
         trigger_namn := 'hex_tvinga_gid';
 
-        IF NOT trig_exists THEN
+        IF trig_exists AND EXISTS (
+            SELECT 1
+            FROM   pg_trigger t
+            WHERE  t.tgrelid = format('%I.%I', r.s, r.t)::regclass
+              AND  t.tgname  = 'hex_tvinga_gid'
+              AND  t.tgnargs > 0
+        ) THEN
+            EXECUTE format('DROP TRIGGER hex_tvinga_gid ON %I.%I', r.s, r.t);
+            atgard := 'uppdaterad';
+        ELSIF NOT trig_exists THEN
+            atgard := 'skapad';
+        ELSE
+            atgard := 'redan finns';
+        END IF;
+
+        IF atgard <> 'redan finns' THEN
             EXECUTE format(
                 'CREATE TRIGGER hex_tvinga_gid'
                 ' BEFORE INSERT ON %I.%I'
                 ' FOR EACH ROW EXECUTE FUNCTION public.tvinga_gid_fran_sekvens()',
                 r.s, r.t
             );
-            atgard := 'skapad';
-        ELSE
-            atgard := 'redan finns';
         END IF;
 
         RETURN NEXT;
@@ -194,30 +230,56 @@ BEGIN
         tabell_namn  := r.t;
         trigger_namn := 'hex_kontrollera_geom';
 
-        IF NOT trig_exists THEN
-            EXECUTE format(
-                'CREATE TRIGGER hex_kontrollera_geom'
-                ' BEFORE INSERT OR UPDATE ON %I.%I'
-                ' FOR EACH ROW EXECUTE FUNCTION public.kontrollera_geometri_trigger()',
-                r.s, r.t
-            );
-            atgard := 'skapad';
-        ELSE
-            atgard := 'redan finns';
-        END IF;
+        -- Trigger (UPDATE OF geom) och ev. CHECK enligt
+        -- hex_installning('geometrivalidering'). En saknad CHECK läggs till
+        -- NOT VALID och valideras av kor_uppskjuten_omstrukturering() – ingen
+        -- skanning under ACCESS EXCLUSIVE-lås och inget fel om befintliga
+        -- geometrier är ogiltiga. Ingen kolumnändring – hantera_kolumntillagg
+        -- ska inte reagera.
+        PERFORM set_config('temp.reorganization_in_progress', 'true', true);
+        antal_andrade := public.skapa_geometrivalidering(r.s, r.t, NULL, true);
+        PERFORM set_config('temp.reorganization_in_progress', 'false', true);
+
+        atgard := CASE WHEN NOT trig_exists  THEN 'skapad'
+                       WHEN antal_andrade > 0 THEN 'uppdaterad'
+                       ELSE 'redan finns' END;
 
         RETURN NEXT;
     END LOOP;
 
     -- -------------------------------------------------------------------------
     -- 3. hex_ta_bort_dummy
-    --    AFTER INSERT på geometritabeller som fortfarande har en dummy-rad
-    --    registrerad i hex_dummy_geometrier. Triggern är transient – den tar
-    --    bort sig själv när första riktiga raden infogas – och ska bara
+    --    AFTER INSERT-satstrigger på geometritabeller som fortfarande har en
+    --    dummy-rad registrerad i hex_dummy_geometrier. Triggern är transient –
+    --    den tar bort sig själv när första riktiga raden infogas – och ska bara
     --    återkopplas om dummy-raden faktiskt finns kvar.
+    --
+    --    Triggern kan bli kvar om den som infogade raden inte äger tabellen;
+    --    sådana triggers (utan registrerad dummy) tas bort här.
     -- -------------------------------------------------------------------------
     FOR r IN
-        SELECT d.schema_namn AS s, d.tabell_namn AS t
+        SELECT n.nspname AS s, c.relname AS t
+        FROM   pg_trigger   t
+        JOIN   pg_class     c ON c.oid = t.tgrelid
+        JOIN   pg_namespace n ON n.oid = c.relnamespace
+        WHERE  t.tgname = 'hex_ta_bort_dummy'
+          AND  NOT EXISTS (
+                   SELECT 1 FROM public.hex_dummy_geometrier d
+                   WHERE  d.schema_namn = n.nspname AND d.tabell_namn = c.relname
+               )
+        ORDER BY n.nspname, c.relname
+    LOOP
+        EXECUTE format('DROP TRIGGER hex_ta_bort_dummy ON %I.%I', r.s, r.t);
+
+        schema_namn  := r.s;
+        tabell_namn  := r.t;
+        trigger_namn := 'hex_ta_bort_dummy';
+        atgard       := 'borttagen';
+        RETURN NEXT;
+    END LOOP;
+
+    FOR r IN
+        SELECT DISTINCT d.schema_namn AS s, d.tabell_namn AS t
         FROM   public.hex_dummy_geometrier d
         ORDER BY d.schema_namn, d.tabell_namn
     LOOP
@@ -247,16 +309,30 @@ BEGIN
         tabell_namn  := r.t;
         trigger_namn := 'hex_ta_bort_dummy';
 
-        IF NOT trig_exists THEN
+        -- Radtrigger från en äldre version (tgtype bit 0 = FOR EACH ROW)?
+        IF trig_exists AND EXISTS (
+            SELECT 1
+            FROM   pg_trigger t
+            WHERE  t.tgrelid = format('%I.%I', r.s, r.t)::regclass
+              AND  t.tgname  = 'hex_ta_bort_dummy'
+              AND  (t.tgtype & 1) = 1
+        ) THEN
+            EXECUTE format('DROP TRIGGER hex_ta_bort_dummy ON %I.%I', r.s, r.t);
+            atgard := 'uppdaterad';
+        ELSIF NOT trig_exists THEN
+            atgard := 'skapad';
+        ELSE
+            atgard := 'redan finns';
+        END IF;
+
+        IF atgard <> 'redan finns' THEN
             EXECUTE format(
                 'CREATE TRIGGER hex_ta_bort_dummy'
                 ' AFTER INSERT ON %I.%I'
-                ' FOR EACH ROW EXECUTE FUNCTION public.ta_bort_dummy_rad()',
+                ' REFERENCING NEW TABLE AS nya'
+                ' FOR EACH STATEMENT EXECUTE FUNCTION public.ta_bort_dummy_rad()',
                 r.s, r.t
             );
-            atgard := 'skapad';
-        ELSE
-            atgard := 'redan finns';
         END IF;
 
         RETURN NEXT;
@@ -296,27 +372,52 @@ BEGIN
             CONTINUE;
         END IF;
 
-        SELECT EXISTS (
-            SELECT 1
-            FROM   pg_trigger   t
-            JOIN   pg_class     c ON c.oid = t.tgrelid
-            JOIN   pg_namespace n ON n.oid = c.relnamespace
-            WHERE  n.nspname = r.s
-              AND  c.relname = tabell
-              AND  t.tgname  = 'trg_' || tabell || '_qa'
-        ) INTO trig_exists;
+        -- Radläge har en QA-trigger, satsläge tre (rad + _qa_u + _qa_d)
+        SELECT count(*) >= CASE WHEN bool_or((t.tgtype & 1) = 0) THEN 3 ELSE 1 END
+        INTO   trig_exists
+        FROM   pg_trigger   t
+        JOIN   pg_class     c ON c.oid = t.tgrelid
+        JOIN   pg_namespace n ON n.oid = c.relnamespace
+        WHERE  n.nspname = r.s
+          AND  c.relname = tabell
+          AND  t.tgfoid  = format('%I.%I()', r.s, r.fn)::regprocedure;
 
         schema_namn  := r.s;
         tabell_namn  := tabell;
         trigger_namn := 'trg_' || tabell || '_qa';
 
         IF NOT trig_exists THEN
-            EXECUTE format(
-                'CREATE TRIGGER trg_%s_qa'
-                ' BEFORE UPDATE OR DELETE ON %I.%I'
-                ' FOR EACH ROW EXECUTE FUNCTION %I.%I()',
-                tabell, r.s, tabell, r.s, r.fn
-            );
+            -- Behåller tabellens läge om någon av triggrarna finns kvar
+            PERFORM skapa_qa_trigger(r.s, tabell);
+            atgard := 'skapad';
+        ELSE
+            atgard := 'redan finns';
+        END IF;
+
+        RETURN NEXT;
+    END LOOP;
+
+    -- -------------------------------------------------------------------------
+    -- 4b. historikpartitioner
+    --    Tidspartitionerade historiktabeller (relkind 'p', se
+    --    hex_installningar.historik_partitionering) får partitioner för
+    --    innevarande och kommande perioder. Körs underhall_hex inte regelbundet
+    --    hamnar nya rader i standardpartitionen (_pdefault).
+    -- -------------------------------------------------------------------------
+    FOR r IN
+        SELECT n.nspname AS s, c.relname AS t
+        FROM   pg_class     c
+        JOIN   pg_namespace n ON n.oid = c.relnamespace
+        WHERE  c.relkind = 'p'
+          AND  n.nspname ~ schema_regex
+          AND  c.relname ~ '_h$'
+        ORDER BY n.nspname, c.relname
+    LOOP
+        schema_namn  := r.s;
+        tabell_namn  := r.t;
+        trigger_namn := 'historikpartitioner';
+
+        IF public.skapa_historikpartitioner(r.s, r.t) > 0 THEN
             atgard := 'skapad';
         ELSE
             atgard := 'redan finns';
@@ -357,12 +458,7 @@ BEGIN
             FROM   public.standardiserade_roller
             ORDER BY gid
         LOOP
-            BEGIN
-                EXECUTE format('SELECT %L %s', r.s, rol.schema_uttryck)
-                    INTO matchar;
-            EXCEPTION WHEN OTHERS THEN
-                matchar := false;
-            END;
+            matchar := rol.rollnamn = ANY(public.hamta_schema_matchningar(r.s, 'roll'));
 
             CONTINUE WHEN NOT matchar;
 
@@ -612,12 +708,7 @@ BEGIN
             FROM   public.standardiserade_roller
             ORDER BY gid
         LOOP
-            BEGIN
-                EXECUTE format('SELECT %L %s', r.s, rol.schema_uttryck)
-                    INTO matchar;
-            EXCEPTION WHEN OTHERS THEN
-                matchar := false;
-            END;
+            matchar := rol.rollnamn = ANY(public.hamta_schema_matchningar(r.s, 'roll'));
 
             CONTINUE WHEN NOT matchar;
 
@@ -711,6 +802,7 @@ COMMENT ON FUNCTION public.underhall_hex()
 Uppgraderar tabellscheman (hex_role_credentials, standardiserade_roller) idempotent.
 Återkopplar saknade rad-nivå-triggers (hex_tvinga_gid, hex_kontrollera_geom,
 hex_ta_bort_dummy, trg_<tabell>_qa).
+Skapar kommande partitioner för tidspartitionerade historiktabeller.
 Verifierar och reparerar alla fyra roller per schema:
   r_{schema}/w_{schema}       NOLOGIN behörighetsgrupper – tilldelas AD-användare
   gs_r_{schema}/gs_w_{schema} LOGIN GeoServer-tjänstekonton – i hex_geoserver_roller
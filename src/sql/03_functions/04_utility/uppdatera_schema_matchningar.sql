@@ -0,0 +1,135 @@
+CREATE OR REPLACE FUNCTION public.uppdatera_schema_matchningar(
+    p_schema_namn text DEFAULT NULL,
+    p_kalla text DEFAULT NULL
+)
+    RETURNS integer
+    LANGUAGE 'plpgsql'
+    SECURITY DEFINER
+    SET search_path = public
+AS $BODY$
+/******************************************************************************
+ * Evaluerar schema_uttryck i standardiserade_kolumner och
+ * standardiserade_roller och sparar resultatet i hex_schema_matchningar.
+ *
+ * Parametrar (NULL = alla):
+ *   p_schema_namn – schema att evaluera. NULL = alla scheman utom
+ *                   systemscheman (pg_*, information_schema, public).
+ *   p_kalla       – 'kolumn' eller 'roll'.
+ *
+ * Befintliga rader för valda schema/källa ersätts helt, så att borttagna
+ * kolumner/roller inte lämnar kvar inaktuella rader.
+ *
+ * Ett schema_uttryck som ger fel räknas som ingen matchning (WARNING loggas),
+ * precis som när uttrycken evaluerades direkt vid tabellskapande.
+ *
+ * SECURITY DEFINER: hex_schema_matchningar är skrivskyddad för vanliga
+ * användare, så att ingen kan tillföra egna matchningar (t.ex. roller).
+ *
+ * Returnerar antal matchande rader som skrevs.
+ ******************************************************************************/
+DECLARE
+    scheman text[];
+    s text;
+    k record;
+    matchar boolean;
+    antal integer := 0;
+BEGIN
+    IF p_schema_namn IS NOT NULL THEN
+        scheman := ARRAY[p_schema_namn];
+    ELSE
+        SELECT COALESCE(array_agg(nspname::text ORDER BY nspname), ARRAY[]::text[])
+        INTO scheman
+        FROM pg_namespace
+        WHERE nspname !~ '^pg_'
+          AND nspname NOT IN ('information_schema', 'public');
+    END IF;
+
+    DELETE FROM public.hex_schema_matchningar m
+    WHERE (p_schema_namn IS NULL OR m.schema_namn = p_schema_namn)
+      AND (p_kalla IS NULL OR m.kalla = p_kalla);
+
+    FOREACH s IN ARRAY scheman LOOP
+        FOR k IN
+            SELECT 'kolumn'::text AS kalla, kolumnnamn AS namn, schema_uttryck
+            FROM public.standardiserade_kolumner
+            WHERE p_kalla IS NULL OR p_kalla = 'kolumn'
+            UNION ALL
+            SELECT 'roll'::text, rollnamn, schema_uttryck
+            FROM public.standardiserade_roller
+            WHERE p_kalla IS NULL OR p_kalla = 'roll'
+        LOOP
+            BEGIN
+                -- Constraint på källtabellerna har redan validerat att uttrycket är säkert
+                EXECUTE format('SELECT %L %s', s, k.schema_uttryck) INTO matchar;
+            EXCEPTION
+                WHEN OTHERS THEN
+                    RAISE WARNING '[uppdatera_schema_matchningar] Fel vid evaluering av schema_uttryck för % %: % (Fel: %)',
+                        k.kalla, k.namn, k.schema_uttryck, SQLERRM;
+                    matchar := false;
+            END;
+
+            INSERT INTO public.hex_schema_matchningar (schema_namn, kalla, namn, matchar)
+            VALUES (s, k.kalla, k.namn, COALESCE(matchar, false))
+            ON CONFLICT DO NOTHING;
+
+            IF matchar THEN
+                antal := antal + 1;
+            END IF;
+        END LOOP;
+    END LOOP;
+
+    RETURN antal;
+END;
+$BODY$;
+
+ALTER FUNCTION public.uppdatera_schema_matchningar(text, text)
+    OWNER TO postgres;
+
+COMMENT ON FUNCTION public.uppdatera_schema_matchningar(text, text)
+    IS 'Evaluerar schema_uttryck för standardkolumner och standardroller och
+sparar resultatet i hex_schema_matchningar. NULL-parametrar betyder alla
+scheman respektive båda källorna. Returnerar antal matchningar.';
+
+
+CREATE OR REPLACE FUNCTION public.hamta_schema_matchningar(
+    p_schema_namn text,
+    p_kalla text
+)
+    RETURNS text[]
+    LANGUAGE 'plpgsql'
+AS $BODY$
+/******************************************************************************
+ * Returnerar namnen på de standardkolumner (p_kalla = 'kolumn') eller
+ * standardroller (p_kalla = 'roll') vars schema_uttryck matchar schemat.
+ *
+ * En indexerad läsning ur hex_schema_matchningar. Saknas schemat där (t.ex.
+ * ett schema som fanns innan Hex installerades) evalueras det först med
+ * uppdatera_schema_matchningar().
+ ******************************************************************************/
+DECLARE
+    resultat text[];
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM public.hex_schema_matchningar m
+        WHERE m.schema_namn = p_schema_namn AND m.kalla = p_kalla
+    ) THEN
+        PERFORM public.uppdatera_schema_matchningar(p_schema_namn, p_kalla);
+    END IF;
+
+    SELECT COALESCE(array_agg(m.namn), ARRAY[]::text[])
+    INTO resultat
+    FROM public.hex_schema_matchningar m
+    WHERE m.schema_namn = p_schema_namn
+      AND m.kalla = p_kalla
+      AND m.matchar;
+
+    RETURN resultat;
+END;
+$BODY$;
+
+ALTER FUNCTION public.hamta_schema_matchningar(text, text)
+    OWNER TO postgres;
+
+COMMENT ON FUNCTION public.hamta_schema_matchningar(text, text)
+    IS 'Returnerar namnen på standardkolumner (kolumn) eller standardroller (roll)
+vars schema_uttryck matchar schemat, via hex_schema_matchningar.';
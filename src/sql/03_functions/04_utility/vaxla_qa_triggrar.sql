@@ -0,0 +1,52 @@
+CREATE OR REPLACE FUNCTION public.vaxla_qa_triggrar(
+    p_tabell regclass,
+    p_aktivera boolean
+)
+    RETURNS integer
+    LANGUAGE 'plpgsql'
+AS $BODY$
+/******************************************************************************
+ * Inaktiverar eller aktiverar alla QA-triggers på en tabell, dvs. alla
+ * triggers som kör en trg_fn_<tabell>_qa-funktion. I radläge är det enbart
+ * trg_<tabell>_qa; i satsläge även satstriggrarna trg_<tabell>_qa_u/_qa_d
+ * (se skapa_qa_trigger).
+ *
+ * Används runt omstruktureringar som kör UPDATE på hela tabellen (t.ex.
+ * flytta_kolumner_sist) och inte ska skriva historik.
+ *
+ * Returnerar antal triggers som faktiskt ändrades – 0 betyder att det inte
+ * fanns några (eller att alla redan hade önskat tillstånd).
+ ******************************************************************************/
+DECLARE
+    trg record;
+    antal integer := 0;
+BEGIN
+    FOR trg IN
+        SELECT t.tgname, n.nspname, c.relname
+        FROM pg_trigger t
+        JOIN pg_proc p ON p.oid = t.tgfoid
+        JOIN pg_class c ON c.oid = t.tgrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE t.tgrelid = p_tabell
+          AND NOT t.tgisinternal
+          AND p.proname ~ '^trg_fn_.+_qa$'
+          AND (t.tgenabled = 'D') = p_aktivera
+    LOOP
+        EXECUTE format('ALTER TABLE %I.%I %s TRIGGER %I',
+            trg.nspname, trg.relname,
+            CASE WHEN p_aktivera THEN 'ENABLE' ELSE 'DISABLE' END,
+            trg.tgname);
+        antal := antal + 1;
+    END LOOP;
+
+    RETURN antal;
+END;
+$BODY$;
+
+ALTER FUNCTION public.vaxla_qa_triggrar(regclass, boolean)
+    OWNER TO postgres;
+
+COMMENT ON FUNCTION public.vaxla_qa_triggrar(regclass, boolean)
+    IS 'Inaktiverar (p_aktivera = false) eller aktiverar alla triggers på tabellen
+som kör en trg_fn_*_qa-funktion, både radtrigger och eventuella satstriggrar.
+Returnerar antal ändrade triggers.';
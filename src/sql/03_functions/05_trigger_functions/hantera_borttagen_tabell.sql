@@ -79,11 +79,7 @@ BEGIN
         END;
 
         -- Ta bort historiktabell om den finns
-        IF EXISTS (
-            SELECT 1 FROM information_schema.tables
-            WHERE table_schema = schema_namn
-            AND table_name = historik_tabell
-        ) THEN
+        IF to_regclass(format('%I.%I', schema_namn, historik_tabell)) IS NOT NULL THEN
             EXECUTE format('DROP TABLE %I.%I', schema_namn, historik_tabell);
             RAISE NOTICE '[hantera_borttagen_tabell] ✓ Historiktabell borttagen: %.%',
                 schema_namn, historik_tabell;
@@ -123,6 +119,14 @@ BEGIN
                 schema_namn, tabell_namn;
         END IF;
 
+        -- Rensa eventuella uppskjutna omstruktureringar (modertabell och historiktabell)
+        EXECUTE 'DELETE FROM public.hex_uppskjuten_omstrukturering WHERE schema_namn = $1 AND tabell_namn IN ($2, $3)'
+            USING schema_namn, tabell_namn, left(tabell_namn || '_h', 63);
+        IF FOUND THEN
+            RAISE NOTICE '[hantera_borttagen_tabell] ✓ Uppskjuten omstrukturering borttagen: %.%',
+                schema_namn, tabell_namn;
+        END IF;
+
         -- Rensa eventuella dummy-geometriposter (triggern hex_ta_bort_dummy
         -- droppas automatiskt av PostgreSQL när tabellen tas bort)
         EXECUTE 'DELETE FROM public.hex_dummy_geometrier WHERE schema_namn = $1 AND tabell_namn = $2'
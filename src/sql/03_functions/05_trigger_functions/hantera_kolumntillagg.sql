@@ -22,6 +22,10 @@ AS $BODY$
  * 4. UPPDATERAD: Lägger automatiskt till saknade kolumner i historiktabeller
  * 5. Ger användaren instruktioner för manuell synkronisering vid typskillnader
  *
+ * Stora tabeller (ar_stor_tabell, gränser i hex_installningar) skrivs inte
+ * om i ALTER TABLE: kolumnflytt och GiST-index registreras i stället i
+ * hex_uppskjuten_omstrukturering och utförs av kor_uppskjuten_omstrukturering().
+ *
  * Steg 5b/5c: FME-tvåstegsmönster och liknande omvägar
  * - 5b: tabell var afvaktande (skapades utan geom, geom anländer via ALTER TABLE)
  *       → suffix+SRID valideras, GiST/validering/dummy slutförs
@@ -44,10 +48,10 @@ DECLARE
     kommando record;           -- Information om ALTER TABLE-kommandot
     schema_namn text;          -- Schema för tabellen
     tabell_namn text;          -- Namn på tabellen
+    tabell_oid regclass;       -- Tabellens OID (katalogslagningar utan information_schema)
     
     -- Variabler för kolumnhantering
     flyttkolumner kolumnkonfig[];     -- Kolumner som ska flyttas
-    kolumn kolumnkonfig;             -- För iteration över kolumner
     geometriinfo geom_info;          -- Strukturerad geometriinformation
     sql_sats text;                   -- För att bygga SQL-satser
     
@@ -60,6 +64,7 @@ DECLARE
     -- Variabler för historiktabellhantering
     historik_tabell_namn text;        -- Namnet på historiktabellen
     har_historiktabell boolean;       -- Om historiktabell existerar
+    historik_oid regclass;            -- Historiktabellens OID (NULL om den saknas)
     antal_skillnader integer := 0;    -- Antal strukturskillnader mellan moder- och historiktabell
     qa_trigger_inaktiverad boolean := false;  -- Flagga för QA-trigger status
     afvaktande_tabell boolean := false;       -- Om nuvarande tabell väntar på geometri (FME-tvåstegsmönster)
@@ -153,6 +158,7 @@ BEGIN
         schema_namn := replace(split_part(kommando.object_identity, '.', 1), '"', '');
         tabell_namn := replace(split_part(kommando.object_identity, '.', 2), '"', '');
         geometriinfo := NULL;  -- Återställ per iteration (förhindrar spill från föregående tabell)
+        tabell_oid := kommando.objid;  -- OID är stabil genom hela omstruktureringen
 
         RAISE NOTICE E'[hantera_kolumntillagg] --------------------------------------------------';
         RAISE NOTICE '[hantera_kolumntillagg] Bearbetar tabell %.%', schema_namn, tabell_namn;
@@ -164,12 +170,10 @@ BEGIN
                 fme_kol record;
             BEGIN
                 FOR fme_kol IN
-                    SELECT column_name, data_type, ordinal_position
-                    FROM information_schema.columns
-                    WHERE table_schema = schema_namn AND table_name = tabell_namn
-                    ORDER BY ordinal_position
+                    SELECT k.kolumnnamn, k.datatyp, k.attnum
+                    FROM hamta_kolumnbeskrivning(tabell_oid) k
                 LOOP
-                    RAISE NOTICE '[hantera_kolumntillagg] [FME-DEBUG]   #% % (%)', fme_kol.ordinal_position, fme_kol.column_name, fme_kol.data_type;
+                    RAISE NOTICE '[hantera_kolumntillagg] [FME-DEBUG]   #% % (%)', fme_kol.attnum, fme_kol.kolumnnamn, fme_kol.datatyp;
                 END LOOP;
             END;
         END IF;
@@ -178,16 +182,22 @@ BEGIN
         -- UPPDATERAT: Tar bort undantaget för historiktabeller (%\_h)
         -- Nu behandlas även historiktabeller för att få korrekt kolumnordning
         IF schema_namn = 'public' OR
+            EXISTS (
+                SELECT 1 FROM pg_class WHERE oid = tabell_oid AND relispartition
+            ) OR
             EXISTS (
                 SELECT 1 
-                FROM information_schema.columns 
-                WHERE table_schema = schema_namn
-                AND table_name = tabell_namn
-                AND column_name LIKE '%_temp0001'
+                FROM pg_attribute
+                WHERE attrelid = tabell_oid
+                AND attname ~ '_temp[0-9]{4}$'
+                AND attnum > 0
+                AND NOT attisdropped
         ) THEN
             RAISE NOTICE '[hantera_kolumntillagg] Hoppar över tabell: %', 
                 CASE 
                     WHEN schema_namn = 'public' THEN 'public-schema'
+                    WHEN EXISTS (SELECT 1 FROM pg_class WHERE oid = tabell_oid AND relispartition)
+                        THEN 'partition (kolumner hanteras via föräldertabellen)'
                     ELSE 'temporär operation pågår'
                 END;
             CONTINUE;
@@ -200,34 +210,32 @@ BEGIN
         -- "INSERT has more expressions than target columns" och lämnar föräldralösa
         -- _temp0001-kolumner kvar.
         BEGIN
-            EXECUTE format('ALTER TABLE %I.%I DISABLE TRIGGER trg_%s_qa',
-                schema_namn, tabell_namn, tabell_namn);
-            qa_trigger_inaktiverad := true;
-            RAISE NOTICE '[hantera_kolumntillagg] QA-trigger inaktiverad inför omstrukturering';
+            IF vaxla_qa_triggrar(tabell_oid, false) > 0 THEN
+                qa_trigger_inaktiverad := true;
+                RAISE NOTICE '[hantera_kolumntillagg] QA-trigger inaktiverad inför omstrukturering';
+            END IF;
         EXCEPTION
             WHEN OTHERS THEN
                 RAISE NOTICE '[hantera_kolumntillagg] Ingen QA-trigger att inaktivera (eller fel): %', SQLERRM;
         END;
 
         -- Steg 3: Hämta standardkolumner som ska flyttas (filtrerade per schema_uttryck)
-        -- Speglar hamta_kolumnstandard: evaluera schema_uttryck dynamiskt per kolumn
+        -- Speglar hamta_kolumnstandard: matchningen hämtas ur hex_schema_matchningar
         -- så att t.ex. skapad_av (LIKE '%_kba_%') inte försöks flyttas på _ext_-tabeller.
         RAISE NOTICE '[hantera_kolumntillagg] (3/4) Identifierar kolumner som ska flyttas';
         DECLARE
             stdkol       record;
-            kol_matchar  boolean;
+            matchande    text[] := hamta_schema_matchningar(schema_namn, 'kolumn');
         BEGIN
             flyttkolumner := ARRAY[]::kolumnkonfig[];
             FOR stdkol IN
                 SELECT kolumnnamn, ordinal_position, datatyp, default_varde,
-                       historik_qa, schema_uttryck
+                       historik_qa
                 FROM standardiserade_kolumner
                 WHERE ordinal_position < 0
                 ORDER BY ordinal_position
             LOOP
-                EXECUTE format('SELECT %L %s', schema_namn, stdkol.schema_uttryck)
-                    INTO kol_matchar;
-                IF kol_matchar THEN
+                IF stdkol.kolumnnamn = ANY(matchande) THEN
                     flyttkolumner := array_append(
                         flyttkolumner,
                         ROW(
@@ -257,86 +265,10 @@ BEGIN
             RAISE NOTICE '[hantera_kolumntillagg] Inga standardkolumner att flytta';
         END IF;
 
-        -- Steg 4: Flytta varje standardkolumn
-        FOR i IN 1..COALESCE(array_length(flyttkolumner, 1), 0) LOOP
-            IF i <= array_length(flyttkolumner, 1) THEN
-                kolumn := flyttkolumner[i];
-                RAISE NOTICE E'[hantera_kolumntillagg] ----------';
-                RAISE NOTICE '[hantera_kolumntillagg] Flyttar kolumn %/% - %',
-                    i, array_length(flyttkolumner, 1), kolumn.kolumnnamn;
-
-                -- Kontrollera att originalkolumnen faktiskt finns innan vi försöker flytta den.
-                -- Om den saknas (t.ex. efter DROP COLUMN av en standardkolumn) hoppar vi över
-                -- steget för att undvika att lämna kvar en föräldralös _temp0001-kolumn.
-                IF NOT EXISTS (
-                    SELECT 1 FROM information_schema.columns
-                    WHERE table_schema = schema_namn
-                      AND table_name   = tabell_namn
-                      AND column_name  = kolumn.kolumnnamn
-                ) THEN
-                    RAISE NOTICE '[hantera_kolumntillagg]   Kolumn "%" saknas i tabellen – hoppar över flytt', kolumn.kolumnnamn;
-                    CONTINUE;
-                END IF;
-
-                BEGIN
-                    -- Steg 4.1: Skapa temporär kolumn
-                    op_steg := 'skapar temporär kolumn';
-                    sql_sats := format(
-                        'ALTER TABLE %I.%I ADD COLUMN %I_temp0001 %s',
-                        schema_namn, tabell_namn,
-                        kolumn.kolumnnamn, kolumn.datatyp
-                    );
-                    RAISE NOTICE '[hantera_kolumntillagg]   SQL [1/4]: %', sql_sats;
-                    EXECUTE sql_sats;
-                    RAISE NOTICE '[hantera_kolumntillagg]   Temporär kolumn skapad';
-
-                    -- Steg 4.2: Kopiera data till temporär kolumn
-                    op_steg := 'kopierar data';
-                    sql_sats := format(
-                        'UPDATE %I.%I SET %I_temp0001 = %I',
-                        schema_namn, tabell_namn,
-                        kolumn.kolumnnamn, kolumn.kolumnnamn
-                    );
-                    RAISE NOTICE '[hantera_kolumntillagg]   SQL [2/4]: %', sql_sats;
-                    EXECUTE sql_sats;
-                    RAISE NOTICE '[hantera_kolumntillagg]   Data kopierad';
-
-                    -- Steg 4.3: Ta bort originalkolumnen
-                    op_steg := 'tar bort originalkolumn';
-                    sql_sats := format(
-                        'ALTER TABLE %I.%I DROP COLUMN %I',
-                        schema_namn, tabell_namn,
-                        kolumn.kolumnnamn
-                    );
-                    RAISE NOTICE '[hantera_kolumntillagg]   SQL [3/4]: %', sql_sats;
-                    EXECUTE sql_sats;
-                    RAISE NOTICE '[hantera_kolumntillagg]   Originalkolumn borttagen';
-
-                    -- Steg 4.4: Döp om temporär kolumn till originalnamn
-                    op_steg := 'döper om temporär kolumn';
-                    sql_sats := format(
-                        'ALTER TABLE %I.%I RENAME COLUMN %I_temp0001 TO %I',
-                        schema_namn, tabell_namn,
-                        kolumn.kolumnnamn, kolumn.kolumnnamn
-                    );
-                    RAISE NOTICE '[hantera_kolumntillagg]   SQL [4/4]: %', sql_sats;
-                    EXECUTE sql_sats;
-                    RAISE NOTICE '[hantera_kolumntillagg]   Kolumn omdöpt till %', kolumn.kolumnnamn;
-
-                    antal_flyttade := antal_flyttade + 1;
-                    RAISE NOTICE '[hantera_kolumntillagg]   Kolumnflytt slutförd';
-                EXCEPTION
-                    WHEN OTHERS THEN
-                        antal_fel := antal_fel + 1;
-                        RAISE WARNING '[hantera_kolumntillagg] FEL vid flyttning av standardkolumn "%"', kolumn.kolumnnamn;
-                        RAISE WARNING '[hantera_kolumntillagg] Operation: %', op_steg;
-                        RAISE WARNING '[hantera_kolumntillagg] SQL: %', sql_sats;
-                        RAISE WARNING '[hantera_kolumntillagg] Felmeddelande: %', SQLERRM;
-                END;
-            END IF;
-        END LOOP;
-
-        -- Steg 5: Hantera geometrikolumnen
+        -- Steg 4: Flytta standardkolumner och geometrikolumnen sist
+        -- Alla kolumner flyttas i ett enda anrop till flytta_kolumner_sist() så att
+        -- tabellen skrivs om högst en gång (i stället för en gång per kolumn), och
+        -- inte alls om ordningen redan är korrekt eller kolumnordning = 'logisk'.
         RAISE NOTICE E'[hantera_kolumntillagg] ----------';
         RAISE NOTICE '[hantera_kolumntillagg] Kontrollerar om geometrikolumn finns...';
         IF EXISTS (
@@ -347,67 +279,12 @@ BEGIN
         ) THEN
             RAISE NOTICE '[hantera_kolumntillagg] Geometrikolumn "geom" hittad';
             RAISE NOTICE '[hantera_kolumntillagg] Hämtar geometridefinition (detaljerad analys sker i hjälpfunktion)';
-            
+
             -- Hämta strukturerad geometriinformation
             geometriinfo := hamta_geometri_definition(schema_namn, tabell_namn);
-            
-            -- Flytta geometrikolumnen om vi fick en korrekt definition
+
             IF geometriinfo IS NOT NULL AND geometriinfo.definition IS NOT NULL THEN
                 RAISE NOTICE '[hantera_kolumntillagg] Använder geometridefinition: %', geometriinfo.definition;
-                
-                BEGIN
-                    -- Steg 5.1: Skapa temporär geometrikolumn
-                    op_steg := 'skapar temporär geometrikolumn';
-                    sql_sats := format(
-                        'ALTER TABLE %I.%I ADD COLUMN geom_temp0001 %s',
-                        schema_namn, tabell_namn, geometriinfo.definition
-                    );
-                    RAISE NOTICE '[hantera_kolumntillagg]   SQL [1/4]: %', sql_sats;
-                    EXECUTE sql_sats;
-                    RAISE NOTICE '[hantera_kolumntillagg]   Temporär geometrikolumn skapad';
-                    
-                    -- Steg 5.2: Kopiera geometridata
-                    op_steg := 'kopierar geometridata';
-                    sql_sats := format(
-                        'UPDATE %I.%I SET geom_temp0001 = geom',
-                        schema_namn, tabell_namn
-                    );
-                    RAISE NOTICE '[hantera_kolumntillagg]   SQL [2/4]: %', sql_sats;
-                    EXECUTE sql_sats;
-                    RAISE NOTICE '[hantera_kolumntillagg]   Geometridata kopierad';
-                    
-                    -- Steg 5.3: Ta bort original geometrikolumn
-                    op_steg := 'tar bort originalgeometri';
-                    sql_sats := format(
-                        'ALTER TABLE %I.%I DROP COLUMN geom',
-                        schema_namn, tabell_namn
-                    );
-                    RAISE NOTICE '[hantera_kolumntillagg]   SQL [3/4]: %', sql_sats;
-                    EXECUTE sql_sats;
-                    RAISE NOTICE '[hantera_kolumntillagg]   Original geometrikolumn borttagen';
-                    
-                    -- Steg 5.4: Döp om temporär kolumn
-                    op_steg := 'döper om temporär geometrikolumn';
-                    sql_sats := format(
-                        'ALTER TABLE %I.%I RENAME COLUMN geom_temp0001 TO geom',
-                        schema_namn, tabell_namn
-                    );
-                    RAISE NOTICE '[hantera_kolumntillagg]   SQL [4/4]: %', sql_sats;
-                    EXECUTE sql_sats;
-                    RAISE NOTICE '[hantera_kolumntillagg]   Geometrikolumn omdöpt till "geom"';
-                    
-                    antal_flyttade := antal_flyttade + 1;
-                    RAISE NOTICE '[hantera_kolumntillagg]   Geometriflytt slutförd';
-                EXCEPTION
-                    WHEN OTHERS THEN
-                        antal_fel := antal_fel + 1;
-                        RAISE WARNING '[hantera_kolumntillagg] FEL vid flyttning av geometrikolumn';
-                        RAISE WARNING '[hantera_kolumntillagg] Operation: %', op_steg;
-                        RAISE WARNING '[hantera_kolumntillagg] SQL: %', sql_sats;
-                        RAISE WARNING '[hantera_kolumntillagg] Geometriinfo: %',
-                            coalesce(geometriinfo.definition, 'NULL');
-                        RAISE WARNING '[hantera_kolumntillagg] Felmeddelande: %', SQLERRM;
-                END;
             ELSE
                 RAISE WARNING '[hantera_kolumntillagg] ⚠ Geometrikolumn hittad men ingen giltig definition returnerades';
                 RAISE WARNING '[hantera_kolumntillagg] ⚠ Geometriinfo: %', geometriinfo;
@@ -417,6 +294,56 @@ BEGIN
             RAISE NOTICE '[hantera_kolumntillagg] Ingen geometrikolumn att hantera';
         END IF;
 
+        DECLARE
+            flytt_namn  text[] := ARRAY[]::text[];
+            flytt_def   text[] := ARRAY[]::text[];
+        BEGIN
+            FOR i IN 1..COALESCE(array_length(flyttkolumner, 1), 0) LOOP
+                flytt_namn := array_append(flytt_namn, flyttkolumner[i].kolumnnamn);
+                flytt_def  := array_append(flytt_def, flyttkolumner[i].datatyp);
+            END LOOP;
+            IF geometriinfo IS NOT NULL AND geometriinfo.definition IS NOT NULL THEN
+                flytt_namn := array_append(flytt_namn, 'geom');
+                flytt_def  := array_append(flytt_def, geometriinfo.definition);
+            END IF;
+
+            IF array_length(flytt_namn, 1) > 0 AND ar_stor_tabell(schema_namn, tabell_namn) THEN
+                -- Stor tabell: omskrivningen skjuts upp till kor_uppskjuten_omstrukturering()
+                -- så att användarens ALTER TABLE returnerar direkt.
+                op_steg := 'registrerar uppskjuten kolumnflytt';
+                INSERT INTO public.hex_uppskjuten_omstrukturering
+                    (schema_namn, tabell_namn, atgard, kolumner, definitioner)
+                VALUES (hkt.schema_namn, hkt.tabell_namn, 'kolumnordning', flytt_namn, flytt_def)
+                ON CONFLICT ON CONSTRAINT hex_uppskjuten_omstrukturering_pkey
+                    DO UPDATE SET kolumner       = EXCLUDED.kolumner,
+                                  definitioner   = EXCLUDED.definitioner,
+                                  registrerad    = now(),
+                                  registrerad_av = current_user,
+                                  forsok         = 0,
+                                  senaste_fel    = NULL;
+                RAISE NOTICE '[hantera_kolumntillagg] Stor tabell – flytt av % kolumn(er) registrerad i hex_uppskjuten_omstrukturering',
+                    array_length(flytt_namn, 1);
+            ELSIF array_length(flytt_namn, 1) > 0 THEN
+                op_steg := 'flyttar kolumner sist';
+                sql_sats := format('SELECT flytta_kolumner_sist(%L, %L, %L, %L)',
+                    schema_namn, tabell_namn, flytt_namn, flytt_def);
+                RAISE NOTICE '[hantera_kolumntillagg] Flyttar % kolumn(er) sist: %',
+                    array_length(flytt_namn, 1), array_to_string(flytt_namn, ', ');
+                antal_flyttade := antal_flyttade
+                    + flytta_kolumner_sist(schema_namn, tabell_namn, flytt_namn, flytt_def);
+                RAISE NOTICE '[hantera_kolumntillagg]   Kolumnflytt slutförd';
+            END IF;
+        EXCEPTION
+            WHEN OTHERS THEN
+                antal_fel := antal_fel + 1;
+                RAISE WARNING '[hantera_kolumntillagg] FEL vid flyttning av kolumner';
+                RAISE WARNING '[hantera_kolumntillagg] Operation: %', op_steg;
+                RAISE WARNING '[hantera_kolumntillagg] SQL: %', sql_sats;
+                RAISE WARNING '[hantera_kolumntillagg] Geometriinfo: %',
+                    coalesce(geometriinfo.definition, 'NULL');
+                RAISE WARNING '[hantera_kolumntillagg] Felmeddelande: %', SQLERRM;
+        END;
+
         -- Steg 5b: Slutför afvaktande tabell om geometrikolumn precis anlände
         -- Om tabellen registrerades i hex_afvaktande_geometri av hantera_ny_tabell()
         -- (dvs. systemanvändare skapade tabellen utan geom), kör vi nu de steg som
@@ -490,22 +417,38 @@ BEGIN
                     r          record;
                 BEGIN
                     op_steg := 'skapar GiST-index (afvaktande tabell)';
-                    -- Ta bort GiST-index med annat namn (t.ex. FME-skapade) för att undvika dubbletter
-                    FOR r IN
-                        SELECT indexname FROM pg_indexes
-                        WHERE schemaname = schema_namn
-                          AND tablename  = tabell_namn
-                          AND indexdef   LIKE '%USING gist%'
-                          AND indexname  <> index_namn
-                    LOOP
-                        EXECUTE format('DROP INDEX %I.%I', schema_namn, r.indexname);
-                        RAISE NOTICE '[hantera_kolumntillagg]   ✓ Dubblerat GiST-index borttaget: %', r.indexname;
-                    END LOOP;
-                    EXECUTE format(
-                        'CREATE INDEX IF NOT EXISTS %I ON %I.%I USING GIST (%I)',
-                        index_namn, schema_namn, tabell_namn, geometriinfo.kolumnnamn
-                    );
-                    RAISE NOTICE '[hantera_kolumntillagg]   ✓ GiST-index skapat: %', index_namn;
+                    IF ar_stor_tabell(schema_namn, tabell_namn) THEN
+                        -- Stor tabell: indexbygget skjuts upp till kor_uppskjuten_omstrukturering()
+                        INSERT INTO public.hex_uppskjuten_omstrukturering
+                            (schema_namn, tabell_namn, atgard, kolumner, index_namn)
+                        VALUES (hkt.schema_namn, hkt.tabell_namn, 'gist_index',
+                                ARRAY[geometriinfo.kolumnnamn], index_namn)
+                        ON CONFLICT ON CONSTRAINT hex_uppskjuten_omstrukturering_pkey
+                            DO UPDATE SET kolumner       = EXCLUDED.kolumner,
+                                          index_namn     = EXCLUDED.index_namn,
+                                          registrerad    = now(),
+                                          registrerad_av = current_user,
+                                          forsok         = 0,
+                                          senaste_fel    = NULL;
+                        RAISE NOTICE '[hantera_kolumntillagg]   Stor tabell – GiST-index % registrerat i hex_uppskjuten_omstrukturering', index_namn;
+                    ELSE
+                        -- Ta bort GiST-index med annat namn (t.ex. FME-skapade) för att undvika dubbletter
+                        FOR r IN
+                            SELECT indexname FROM pg_indexes
+                            WHERE schemaname = schema_namn
+                              AND tablename  = tabell_namn
+                              AND indexdef   LIKE '%USING gist%'
+                              AND indexname  <> index_namn
+                        LOOP
+                            EXECUTE format('DROP INDEX %I.%I', schema_namn, r.indexname);
+                            RAISE NOTICE '[hantera_kolumntillagg]   ✓ Dubblerat GiST-index borttaget: %', r.indexname;
+                        END LOOP;
+                        EXECUTE format(
+                            'CREATE INDEX IF NOT EXISTS %I ON %I.%I USING GIST (%I)',
+                            index_namn, schema_namn, tabell_namn, geometriinfo.kolumnnamn
+                        );
+                        RAISE NOTICE '[hantera_kolumntillagg]   ✓ GiST-index skapat: %', index_namn;
+                    END IF;
                 END;
             END IF;
 
@@ -518,35 +461,8 @@ BEGIN
                      AND schema_namn ~ (public.hex_schema_regex() || d.prefix || '_')
                )
             THEN
-                DECLARE
-                    constraint_namn text := 'validera_geom_' || tabell_namn;
-                BEGIN
-                    op_steg := 'lägger till geometrivalidering (afvaktande tabell)';
-                    EXECUTE format(
-                        'ALTER TABLE %I.%I ADD CONSTRAINT %I CHECK (public.validera_geometri(geom))',
-                        schema_namn, tabell_namn, constraint_namn
-                    );
-                    RAISE NOTICE '[hantera_kolumntillagg]   ✓ Geometrivalidering tillagd: %', constraint_namn;
-                    op_steg := 'lägger till geometritrigger (afvaktande tabell)';
-                    IF NOT EXISTS (
-                        SELECT 1 FROM pg_trigger t
-                        JOIN pg_class c ON c.oid = t.tgrelid
-                        JOIN pg_namespace n ON n.oid = c.relnamespace
-                        WHERE n.nspname = schema_namn
-                          AND c.relname = tabell_namn
-                          AND t.tgname  = 'hex_kontrollera_geom'
-                    ) THEN
-                        EXECUTE format(
-                            'CREATE TRIGGER hex_kontrollera_geom'
-                            ' BEFORE INSERT OR UPDATE ON %I.%I'
-                            ' FOR EACH ROW EXECUTE FUNCTION public.kontrollera_geometri_trigger()',
-                            schema_namn, tabell_namn
-                        );
-                        RAISE NOTICE '[hantera_kolumntillagg]   ✓ Geometritrigger tillagd: hex_kontrollera_geom';
-                    ELSE
-                        RAISE NOTICE '[hantera_kolumntillagg]   ✓ Geometritrigger finns redan: hex_kontrollera_geom';
-                    END IF;
-                END;
+                op_steg := 'lägger till geometrivalidering (afvaktande tabell)';
+                PERFORM public.skapa_geometrivalidering(schema_namn, tabell_namn);
             END IF;
 
             -- Steg 5b.5: Ta bort från afvaktande-registret
@@ -569,6 +485,13 @@ BEGIN
                     AND tablename  = tabell_namn
                     AND indexdef   LIKE '%USING gist%'
               )
+              -- Ett uppskjutet GiST-index (stor tabell) räknas som befintligt
+              AND NOT EXISTS (
+                  SELECT 1 FROM public.hex_uppskjuten_omstrukturering j
+                  WHERE j.schema_namn = hkt.schema_namn
+                    AND j.tabell_namn = hkt.tabell_namn
+                    AND j.atgard      = 'gist_index'
+              )
         THEN
             -- Steg 5c: Geom-kolumn har precis lagts till i en tabell som INTE är
             -- afvaktande och som INTE har GiST-index – dvs. tabellen har inte
@@ -634,22 +557,38 @@ BEGIN
                     r          record;
                 BEGIN
                     op_steg := 'skapar GiST-index (ny geom utan afvaktande)';
-                    -- Ta bort GiST-index med annat namn (t.ex. FME-skapade) för att undvika dubbletter
-                    FOR r IN
-                        SELECT indexname FROM pg_indexes
-                        WHERE schemaname = schema_namn
-                          AND tablename  = tabell_namn
-                          AND indexdef   LIKE '%USING gist%'
-                          AND indexname  <> index_namn
-                    LOOP
-                        EXECUTE format('DROP INDEX %I.%I', schema_namn, r.indexname);
-                        RAISE NOTICE '[hantera_kolumntillagg]   ✓ Dubblerat GiST-index borttaget: %', r.indexname;
-                    END LOOP;
-                    EXECUTE format(
-                        'CREATE INDEX IF NOT EXISTS %I ON %I.%I USING GIST (%I)',
-                        index_namn, schema_namn, tabell_namn, geometriinfo.kolumnnamn
-                    );
-                    RAISE NOTICE '[hantera_kolumntillagg]   ✓ GiST-index skapat: %', index_namn;
+                    IF ar_stor_tabell(schema_namn, tabell_namn) THEN
+                        -- Stor tabell: indexbygget skjuts upp till kor_uppskjuten_omstrukturering()
+                        INSERT INTO public.hex_uppskjuten_omstrukturering
+                            (schema_namn, tabell_namn, atgard, kolumner, index_namn)
+                        VALUES (hkt.schema_namn, hkt.tabell_namn, 'gist_index',
+                                ARRAY[geometriinfo.kolumnnamn], index_namn)
+                        ON CONFLICT ON CONSTRAINT hex_uppskjuten_omstrukturering_pkey
+                            DO UPDATE SET kolumner       = EXCLUDED.kolumner,
+                                          index_namn     = EXCLUDED.index_namn,
+                                          registrerad    = now(),
+                                          registrerad_av = current_user,
+                                          forsok         = 0,
+                                          senaste_fel    = NULL;
+                        RAISE NOTICE '[hantera_kolumntillagg]   Stor tabell – GiST-index % registrerat i hex_uppskjuten_omstrukturering', index_namn;
+                    ELSE
+                        -- Ta bort GiST-index med annat namn (t.ex. FME-skapade) för att undvika dubbletter
+                        FOR r IN
+                            SELECT indexname FROM pg_indexes
+                            WHERE schemaname = schema_namn
+                              AND tablename  = tabell_namn
+                              AND indexdef   LIKE '%USING gist%'
+                              AND indexname  <> index_namn
+                        LOOP
+                            EXECUTE format('DROP INDEX %I.%I', schema_namn, r.indexname);
+                            RAISE NOTICE '[hantera_kolumntillagg]   ✓ Dubblerat GiST-index borttaget: %', r.indexname;
+                        END LOOP;
+                        EXECUTE format(
+                            'CREATE INDEX IF NOT EXISTS %I ON %I.%I USING GIST (%I)',
+                            index_namn, schema_namn, tabell_namn, geometriinfo.kolumnnamn
+                        );
+                        RAISE NOTICE '[hantera_kolumntillagg]   ✓ GiST-index skapat: %', index_namn;
+                    END IF;
                 END;
 
                 -- Geometrivalidering (datakategorier med validera_geometri = true)
@@ -658,35 +597,8 @@ BEGIN
                     WHERE d.validera_geometri = true
                       AND schema_namn ~ (public.hex_schema_regex() || d.prefix || '_')
                 ) THEN
-                    DECLARE
-                        constraint_namn text := 'validera_geom_' || tabell_namn;
-                    BEGIN
-                        op_steg := 'lägger till geometrivalidering (ny geom utan afvaktande)';
-                        EXECUTE format(
-                            'ALTER TABLE %I.%I ADD CONSTRAINT %I CHECK (public.validera_geometri(geom))',
-                            schema_namn, tabell_namn, constraint_namn
-                        );
-                        RAISE NOTICE '[hantera_kolumntillagg]   ✓ Geometrivalidering tillagd: %', constraint_namn;
-                        op_steg := 'lägger till geometritrigger (ny geom utan afvaktande)';
-                        IF NOT EXISTS (
-                            SELECT 1 FROM pg_trigger t
-                            JOIN pg_class c ON c.oid = t.tgrelid
-                            JOIN pg_namespace n ON n.oid = c.relnamespace
-                            WHERE n.nspname = schema_namn
-                              AND c.relname = tabell_namn
-                              AND t.tgname  = 'hex_kontrollera_geom'
-                        ) THEN
-                            EXECUTE format(
-                                'CREATE TRIGGER hex_kontrollera_geom'
-                                ' BEFORE INSERT OR UPDATE ON %I.%I'
-                                ' FOR EACH ROW EXECUTE FUNCTION public.kontrollera_geometri_trigger()',
-                                schema_namn, tabell_namn
-                            );
-                            RAISE NOTICE '[hantera_kolumntillagg]   ✓ Geometritrigger tillagd: hex_kontrollera_geom';
-                        ELSE
-                            RAISE NOTICE '[hantera_kolumntillagg]   ✓ Geometritrigger finns redan: hex_kontrollera_geom';
-                        END IF;
-                    END;
+                    op_steg := 'lägger till geometrivalidering (ny geom utan afvaktande)';
+                    PERFORM public.skapa_geometrivalidering(schema_namn, tabell_namn);
                 END IF;
 
                 -- Dummy-geometri för QGIS
@@ -707,11 +619,8 @@ BEGIN
         
         IF NOT tabell_namn ~ '_h$' THEN
             -- Detta är en modertabell, kontrollera om det finns motsvarande historiktabell
-            SELECT EXISTS(
-                SELECT 1 FROM information_schema.tables 
-                WHERE table_schema = schema_namn 
-                AND table_name = historik_tabell_namn
-            ) INTO har_historiktabell;
+            historik_oid := to_regclass(format('%I.%I', schema_namn, historik_tabell_namn));
+            har_historiktabell := historik_oid IS NOT NULL;
             
             IF har_historiktabell THEN
                 RAISE NOTICE '[hantera_kolumntillagg] Hittade historiktabell %.% - analyserar och synkroniserar',
@@ -727,49 +636,27 @@ BEGIN
                 BEGIN
                     -- Hitta kolumner som finns i modertabell men saknas i historiktabell
                     -- (exkluderar h_-kolumner som bara finns i historik)
-                    SELECT array_agg(m.column_name ORDER BY m.ordinal_position)
-                    INTO saknade_i_historik
-                    FROM information_schema.columns m
-                    WHERE m.table_schema = schema_namn 
-                    AND m.table_name = tabell_namn
-                    AND NOT EXISTS (
-                        SELECT 1 FROM information_schema.columns h
-                        WHERE h.table_schema = schema_namn
-                        AND h.table_name = historik_tabell_namn
-                        AND h.column_name = m.column_name
-                    );
-                    
-                    -- Hitta kolumner som finns i historiktabell men saknas i modertabell
-                    -- (exkluderar h_-kolumner som är normala i historik)
-                    SELECT array_agg(h.column_name ORDER BY h.ordinal_position)
-                    INTO extra_i_historik
-                    FROM information_schema.columns h
-                    WHERE h.table_schema = schema_namn 
-                    AND h.table_name = historik_tabell_namn
-                    AND h.column_name NOT LIKE 'h\_%'  -- Hoppa över historikkolumner
-                    AND NOT EXISTS (
-                        SELECT 1 FROM information_schema.columns m
-                        WHERE m.table_schema = schema_namn
-                        AND m.table_name = tabell_namn
-                        AND m.column_name = h.column_name
-                    );
-                    
-                    -- Hitta kolumner med olika datatyper
-                    SELECT array_agg(
-                        format('%s (moder: %s, historik: %s)', 
-                            m.column_name, m.data_type, h.data_type)
-                        ORDER BY m.ordinal_position
-                    )
-                    INTO typ_skillnader
-                    FROM information_schema.columns m
-                    JOIN information_schema.columns h ON (
-                        h.table_schema = schema_namn
-                        AND h.table_name = historik_tabell_namn
-                        AND h.column_name = m.column_name
-                        AND h.data_type != m.data_type
-                    )
-                    WHERE m.table_schema = schema_namn
-                    AND m.table_name = tabell_namn;
+                    -- En katalogläsning per tabell (pg_attribute via OID); jämförelsen
+                    -- görs sedan i minnet i stället för korrelerade information_schema-frågor.
+                    -- Datatyper jämförs på typ-OID (typmod ignoreras, som tidigare data_type).
+                    WITH m AS (SELECT * FROM hamta_kolumnbeskrivning(tabell_oid)),
+                         h AS (SELECT * FROM hamta_kolumnbeskrivning(historik_oid))
+                    SELECT
+                        (SELECT array_agg(m.kolumnnamn ORDER BY m.attnum)
+                         FROM m
+                         WHERE NOT EXISTS (SELECT 1 FROM h WHERE h.kolumnnamn = m.kolumnnamn)),
+                        -- (exkluderar h_-kolumner som är normala i historik)
+                        (SELECT array_agg(h.kolumnnamn ORDER BY h.attnum)
+                         FROM h
+                         WHERE h.kolumnnamn NOT LIKE 'h\_%'  -- Hoppa över historikkolumner
+                         AND NOT EXISTS (SELECT 1 FROM m WHERE m.kolumnnamn = h.kolumnnamn)),
+                        (SELECT array_agg(
+                             format('%s (moder: %s, historik: %s)',
+                                 m.kolumnnamn, m.datatyp, h.datatyp)
+                             ORDER BY m.attnum)
+                         FROM m
+                         JOIN h ON h.kolumnnamn = m.kolumnnamn AND h.typ_oid <> m.typ_oid)
+                    INTO saknade_i_historik, extra_i_historik, typ_skillnader;
                     
                     -- Räkna totalt antal skillnader (sätt på funktion-nivå variabel)
                     antal_skillnader := COALESCE(array_length(saknade_i_historik, 1), 0) +
@@ -779,9 +666,9 @@ BEGIN
                     -- Om strukturskillnader finns, inaktivera QA-triggers temporärt för säker kolumnflyttning
                     IF antal_skillnader > 0 THEN
                         BEGIN
-                            EXECUTE format('ALTER TABLE %I.%I DISABLE TRIGGER trg_%s_qa', 
-                                schema_namn, tabell_namn, tabell_namn);
-                            qa_trigger_inaktiverad := true;
+                            IF vaxla_qa_triggrar(tabell_oid, false) > 0 THEN
+                                qa_trigger_inaktiverad := true;
+                            END IF;
                             RAISE NOTICE '[hantera_kolumntillagg] QA-trigger tillfälligt inaktiverad för säker strukturändring';
                         EXCEPTION
                             WHEN OTHERS THEN
@@ -797,24 +684,11 @@ BEGIN
                         
                         FOR kolumn_info IN 
                             SELECT 
-                                m.column_name,
-                                CASE 
-                                    WHEN m.data_type = 'USER-DEFINED' THEN m.udt_name
-                                    WHEN m.data_type = 'character varying' THEN 
-                                        'character varying' || 
-                                        CASE WHEN m.character_maximum_length IS NOT NULL 
-                                             THEN '(' || m.character_maximum_length || ')'
-                                             ELSE ''
-                                        END
-                                    WHEN m.data_type = 'numeric' AND m.numeric_precision IS NOT NULL THEN 
-                                        'numeric(' || m.numeric_precision || ',' || COALESCE(m.numeric_scale, 0) || ')'
-                                    ELSE m.data_type
-                                END as full_data_type
-                            FROM information_schema.columns m
-                            WHERE m.table_schema = schema_namn 
-                            AND m.table_name = tabell_namn
-                            AND m.column_name = ANY(saknade_i_historik)
-                            ORDER BY m.ordinal_position
+                                m.kolumnnamn AS column_name,
+                                m.datatyp || COALESCE(' COLLATE ' || m.kollation, '') AS full_data_type
+                            FROM hamta_kolumnbeskrivning(tabell_oid) m
+                            WHERE m.kolumnnamn = ANY(saknade_i_historik)
+                            ORDER BY m.attnum
                         LOOP
                             BEGIN
                                 sql_sats := format(
@@ -839,169 +713,55 @@ BEGIN
                         IF antal_tillagda > 0 THEN
                             RAISE NOTICE '[hantera_kolumntillagg] Regenererar trigger-funktion för att inkludera nya kolumner...';
                             
-                            DECLARE
-                                ny_kolumn_lista text;
-                                trigger_funktionsnamn text := 'trg_fn_' || tabell_namn || '_qa';
-                                qa_kolumner text[];
-                                qa_uttryck text[];
-                                trigger_satser text := '';
-                                j integer;
+                            -- skapa_qa_trigger läser kolumnlistan på nytt och behåller
+                            -- tabellens historikläge (rad/sats)
                             BEGIN
-                                -- Hämta uppdaterad kolumnlista från modertabellen (citerade med %I för att hantera reserverade ord)
-                                SELECT string_agg(format('%I', c.column_name), ', ' ORDER BY c.ordinal_position)
-                                INTO ny_kolumn_lista
-                                FROM information_schema.columns c
-                                WHERE c.table_schema = schema_namn
-                                AND c.table_name = tabell_namn;
-                                
-                                -- Hämta QA-kolumner och deras uttryck
-                                SELECT 
-                                    array_agg(sk.kolumnnamn ORDER BY sk.ordinal_position),
-                                    array_agg(sk.default_varde ORDER BY sk.ordinal_position)
-                                INTO qa_kolumner, qa_uttryck
-                                FROM standardiserade_kolumner sk
-                                WHERE sk.historik_qa = true
-                                AND sk.default_varde IS NOT NULL
-                                AND EXISTS (
-                                    SELECT 1 FROM information_schema.columns c
-                                    WHERE c.table_schema = schema_namn 
-                                    AND c.table_name = tabell_namn 
-                                    AND c.column_name = sk.kolumnnamn
-                                );
-                                
-                                -- Bygg trigger-satser för QA-uppdatering
-                                FOR j IN 1..COALESCE(array_length(qa_kolumner, 1), 0) LOOP
-                                    trigger_satser := trigger_satser || format(
-                                        E'        rad.%I = %s;\n',
-                                        qa_kolumner[j], qa_uttryck[j]
-                                    );
-                                END LOOP;
-                                
-                                -- Återskapa trigger-funktionen med ny kolumnlista
-                                EXECUTE format($TRIG$
-                                    CREATE OR REPLACE FUNCTION %I.%I()
-                                    RETURNS TRIGGER AS $$
-                                    DECLARE
-                                        rad %I.%I%%ROWTYPE;
-                                    BEGIN
-                                        IF TG_OP = 'UPDATE' THEN
-                                            rad := NEW;
-                                            
-                                            -- Sätt QA-värden
-%s                
-                                            -- Kopiera gamla värdet till historik
-                                            INSERT INTO %I.%I (h_typ, h_tidpunkt, h_av, %s)
-                                            SELECT 'U', NOW(), session_user, OLD.*;
-                                            
-                                            RETURN rad;
-                                        ELSE -- DELETE
-                                            rad := OLD;
-                                            
-                                            -- Sätt QA-värden även för DELETE (för konsistens)
-%s                
-                                            -- Kopiera till historik
-                                            INSERT INTO %I.%I (h_typ, h_tidpunkt, h_av, %s)
-                                            SELECT 'D', NOW(), session_user, rad.*;
-                                            
-                                            RETURN OLD;
-                                        END IF;
-                                    END;
-                                    $$ LANGUAGE plpgsql;
-                                $TRIG$,
-                                    schema_namn, trigger_funktionsnamn,
-                                    schema_namn, tabell_namn,
-                                    trigger_satser,
-                                    schema_namn, historik_tabell_namn, ny_kolumn_lista,
-                                    trigger_satser,
-                                    schema_namn, historik_tabell_namn, ny_kolumn_lista
-                                );
-                                
-                                RAISE NOTICE '[hantera_kolumntillagg]   ✓ Trigger-funktion % regenererad', trigger_funktionsnamn;
+                                RAISE NOTICE '[hantera_kolumntillagg]   ✓ Trigger-funktion % regenererad',
+                                    skapa_qa_trigger(schema_namn, tabell_namn);
                             EXCEPTION
                                 WHEN OTHERS THEN
                                     RAISE WARNING '[hantera_kolumntillagg]   ✗ Kunde inte regenerera trigger-funktion: %', SQLERRM;
                             END;
                         END IF;
                         
-                        -- Flytta standardkolumner med negativ ordinal_position till rätt plats i historiktabellen
-                        RAISE NOTICE '[hantera_kolumntillagg] Reorganiserar standardkolumner i historiktabellen...';
+                        -- Flytta standardkolumner med negativ ordinal_position och geom till
+                        -- slutet av historiktabellen – en omskrivning för alla kolumner.
+                        RAISE NOTICE '[hantera_kolumntillagg] Reorganiserar standardkolumner och geom i historiktabellen...';
                         
                         DECLARE
-                            h_kolumn record;
-                            h_kolumn_typ text;
+                            h_namn      text[];
+                            h_def       text[];
+                            h_geom_def  text;
+                            h_antal     integer;
                         BEGIN
-                            FOR h_kolumn IN 
-                                SELECT sk.kolumnnamn
-                                FROM standardiserade_kolumner sk
-                                WHERE sk.ordinal_position < 0
-                                AND EXISTS (
-                                    SELECT 1 FROM information_schema.columns c
-                                    WHERE c.table_schema = schema_namn
-                                    AND c.table_name = historik_tabell_namn
-                                    AND c.column_name = sk.kolumnnamn
-                                )
-                                ORDER BY sk.ordinal_position
-                            LOOP
-                                -- Hämta kolumntyp från historiktabellen
-                                SELECT 
-                                    CASE 
-                                        WHEN c.data_type = 'USER-DEFINED' THEN c.udt_name
-                                        WHEN c.data_type = 'character varying' THEN 
-                                            'character varying' || 
-                                            CASE WHEN c.character_maximum_length IS NOT NULL 
-                                                 THEN '(' || c.character_maximum_length || ')'
-                                                 ELSE ''
-                                            END
-                                        ELSE c.data_type
-                                    END
-                                INTO h_kolumn_typ
-                                FROM information_schema.columns c
-                                WHERE c.table_schema = schema_namn
-                                AND c.table_name = historik_tabell_namn
-                                AND c.column_name = h_kolumn.kolumnnamn;
-                                
-                                -- Flytta kolumnen med temp-kolumn-teknik
-                                EXECUTE format(
-                                    'ALTER TABLE %I.%I ADD COLUMN %I_temp0001 %s',
-                                    schema_namn, historik_tabell_namn, h_kolumn.kolumnnamn, h_kolumn_typ
-                                );
-                                EXECUTE format(
-                                    'UPDATE %I.%I SET %I_temp0001 = %I',
-                                    schema_namn, historik_tabell_namn, h_kolumn.kolumnnamn, h_kolumn.kolumnnamn
-                                );
-                                EXECUTE format(
-                                    'ALTER TABLE %I.%I DROP COLUMN %I',
-                                    schema_namn, historik_tabell_namn, h_kolumn.kolumnnamn
-                                );
-                                EXECUTE format(
-                                    'ALTER TABLE %I.%I RENAME COLUMN %I_temp0001 TO %I',
-                                    schema_namn, historik_tabell_namn, h_kolumn.kolumnnamn, h_kolumn.kolumnnamn
-                                );
-                                
-                                RAISE NOTICE '[hantera_kolumntillagg]   ✓ Flyttade % till slutet av %', 
-                                    h_kolumn.kolumnnamn, historik_tabell_namn;
-                            END LOOP;
-                        EXCEPTION
-                            WHEN OTHERS THEN
-                                RAISE WARNING '[hantera_kolumntillagg]   ✗ Kunde inte reorganisera standardkolumner i historiktabell: %', SQLERRM;
-                        END;
-                        
-                        -- Flytta geom till slutet av historiktabellen om den finns
-                        IF EXISTS (
-                            SELECT 1 FROM information_schema.columns
-                            WHERE table_schema = schema_namn
-                            AND table_name = historik_tabell_namn
-                            AND column_name = 'geom'
-                        ) THEN
-                            RAISE NOTICE '[hantera_kolumntillagg] Flyttar geom till slutet av historiktabellen...';
-                            
-                            DECLARE
-                                h_geom_def text;
-                            BEGIN
+                            -- Kolumntyper hämtas från historiktabellen själv (format_type ger
+                            -- fullständig typ inkl. längd/precision). Inga DEFAULT – historik-
+                            -- tabellen fylls enbart av triggern.
+                            SELECT array_agg(sk.kolumnnamn ORDER BY sk.ordinal_position),
+                                   array_agg(format_type(a.atttypid, a.atttypmod) ORDER BY sk.ordinal_position)
+                            INTO h_namn, h_def
+                            FROM standardiserade_kolumner sk
+                            JOIN pg_attribute a
+                              ON a.attrelid = historik_oid
+                             AND a.attname = sk.kolumnnamn
+                             AND a.attnum > 0
+                             AND NOT a.attisdropped
+                            WHERE sk.ordinal_position < 0;
+
+                            h_namn := COALESCE(h_namn, ARRAY[]::text[]);
+                            h_def  := COALESCE(h_def, ARRAY[]::text[]);
+
+                            IF EXISTS (
+                                SELECT 1 FROM pg_attribute
+                                WHERE attrelid = historik_oid
+                                AND attname = 'geom'
+                                AND attnum > 0
+                                AND NOT attisdropped
+                            ) THEN
                                 -- Hämta geometridefinition från modertabellen
-                                SELECT geometriinfo.definition INTO h_geom_def;
+                                h_geom_def := geometriinfo.definition;
                                 
-                                -- Om vi inte har geometriinfo, hämta från history table
+                                -- Om vi inte har geometriinfo, hämta från historiktabellen
                                 IF h_geom_def IS NULL THEN
                                     SELECT format('geometry(%s,%s)', type, srid)
                                     INTO h_geom_def
@@ -1010,36 +770,34 @@ BEGIN
                                     AND f_table_name = historik_tabell_namn
                                     AND f_geometry_column = 'geom';
                                 END IF;
-                                
+
                                 IF h_geom_def IS NOT NULL THEN
-                                    -- Temp kolumn
-                                    EXECUTE format(
-                                        'ALTER TABLE %I.%I ADD COLUMN geom_temp0001 %s',
-                                        schema_namn, historik_tabell_namn, h_geom_def
-                                    );
-                                    -- Kopiera data
-                                    EXECUTE format(
-                                        'UPDATE %I.%I SET geom_temp0001 = geom',
-                                        schema_namn, historik_tabell_namn
-                                    );
-                                    -- Ta bort original
-                                    EXECUTE format(
-                                        'ALTER TABLE %I.%I DROP COLUMN geom',
-                                        schema_namn, historik_tabell_namn
-                                    );
-                                    -- Döp om
-                                    EXECUTE format(
-                                        'ALTER TABLE %I.%I RENAME COLUMN geom_temp0001 TO geom',
-                                        schema_namn, historik_tabell_namn
-                                    );
-                                    
-                                    RAISE NOTICE '[hantera_kolumntillagg]   ✓ geom flyttad till slutet av %', historik_tabell_namn;
+                                    h_namn := array_append(h_namn, 'geom');
+                                    h_def  := array_append(h_def, h_geom_def);
                                 END IF;
-                            EXCEPTION
-                                WHEN OTHERS THEN
-                                    RAISE WARNING '[hantera_kolumntillagg]   ✗ Kunde inte flytta geom i historiktabell: %', SQLERRM;
-                            END;
-                        END IF;
+                            END IF;
+
+                            IF array_length(h_namn, 1) > 0 AND ar_stor_tabell(schema_namn, historik_tabell_namn) THEN
+                                INSERT INTO public.hex_uppskjuten_omstrukturering
+                                    (schema_namn, tabell_namn, atgard, kolumner, definitioner)
+                                VALUES (hkt.schema_namn, historik_tabell_namn, 'kolumnordning', h_namn, h_def)
+                                ON CONFLICT ON CONSTRAINT hex_uppskjuten_omstrukturering_pkey
+                                    DO UPDATE SET kolumner       = EXCLUDED.kolumner,
+                                                  definitioner   = EXCLUDED.definitioner,
+                                                  registrerad    = now(),
+                                                  registrerad_av = current_user,
+                                                  forsok         = 0,
+                                                  senaste_fel    = NULL;
+                                RAISE NOTICE '[hantera_kolumntillagg]   Stor historiktabell – flytt registrerad i hex_uppskjuten_omstrukturering';
+                            ELSE
+                                h_antal := flytta_kolumner_sist(schema_namn, historik_tabell_namn, h_namn, h_def);
+                                RAISE NOTICE '[hantera_kolumntillagg]   ✓ Flyttade % kolumn(er) till slutet av %',
+                                    h_antal, historik_tabell_namn;
+                            END IF;
+                        EXCEPTION
+                            WHEN OTHERS THEN
+                                RAISE WARNING '[hantera_kolumntillagg]   ✗ Kunde inte reorganisera kolumner i historiktabell: %', SQLERRM;
+                        END;
                     END IF;
                     
                     -- Visa kolumner som finns extra i historik (bara info, ingen åtgärd)
@@ -1073,15 +831,14 @@ BEGIN
         -- Återaktivera QA-trigger om den inaktiverades
         IF qa_trigger_inaktiverad THEN
             BEGIN
-                EXECUTE format('ALTER TABLE %I.%I ENABLE TRIGGER trg_%s_qa', 
-                    schema_namn, tabell_namn, tabell_namn);
+                PERFORM vaxla_qa_triggrar(tabell_oid, true);
                 RAISE NOTICE '[hantera_kolumntillagg] QA-trigger återaktiverad efter strukturändring';
                 
             EXCEPTION
                 WHEN OTHERS THEN
                     RAISE WARNING '[hantera_kolumntillagg] KRITISKT: Kunde inte återaktivera QA-trigger: %', SQLERRM;
-                    RAISE WARNING '[hantera_kolumntillagg] Du måste manuellt aktivera: ALTER TABLE %I.%I ENABLE TRIGGER trg_%I_qa;', 
-                        schema_namn, tabell_namn, tabell_namn;
+                    RAISE WARNING '[hantera_kolumntillagg] Du måste manuellt aktivera: SELECT vaxla_qa_triggrar(%L, true);', 
+                        format('%I.%I', schema_namn, tabell_namn);
             END;
         END IF;
 
@@ -1092,12 +849,10 @@ BEGIN
                 fme_kol record;
             BEGIN
                 FOR fme_kol IN
-                    SELECT column_name, data_type, ordinal_position
-                    FROM information_schema.columns
-                    WHERE table_schema = schema_namn AND table_name = tabell_namn
-                    ORDER BY ordinal_position
+                    SELECT k.kolumnnamn, k.datatyp, k.attnum
+                    FROM hamta_kolumnbeskrivning(tabell_oid) k
                 LOOP
-                    RAISE NOTICE '[hantera_kolumntillagg] [FME-DEBUG]   #% % (%)', fme_kol.ordinal_position, fme_kol.column_name, fme_kol.data_type;
+                    RAISE NOTICE '[hantera_kolumntillagg] [FME-DEBUG]   #% % (%)', fme_kol.attnum, fme_kol.kolumnnamn, fme_kol.datatyp;
                 END LOOP;
             END;
         END IF;
@@ -105,15 +105,19 @@ BEGIN
             CONTINUE;
         END IF;
 
+        -- Kontrollera undantag: partitioner (t.ex. tidspartitioner av historik-
+        -- tabeller från skapa_historikpartitioner). Strukturen ärvs från
+        -- föräldertabellen och en partition kan inte byggas om för sig.
+        IF EXISTS (SELECT 1 FROM pg_class WHERE oid = kommando.objid AND relispartition) THEN
+            RAISE NOTICE 'Hoppar över tabell %.% - partition', schema_namn, tabell_namn;
+            CONTINUE;
+        END IF;
+
         -- Kontrollera undantag: _h-suffix (reserverat för historiktabeller)
         -- Systemets egna _h-tabeller (skapade av skapa_historik_qa i steg 10)
         -- når aldrig hit - de fångas av rekursionsskyddet (temp.tabellstrukturering_pagar)
         IF tabell_namn ~ '_h$' THEN
-            IF EXISTS (
-                SELECT 1 FROM information_schema.tables
-                WHERE table_schema = schema_namn
-                AND table_name = regexp_replace(tabell_namn, '_h$', '')
-            ) THEN
+            IF to_regclass(format('%I.%I', schema_namn, regexp_replace(tabell_namn, '_h$', ''))) IS NOT NULL THEN
                 RAISE NOTICE 'Hoppar över tabell %.% - historiktabell (modertabell finns)',
                     schema_namn, tabell_namn;
                 CONTINUE;
@@ -189,12 +193,10 @@ BEGIN
                     fme_kol record;
                 BEGIN
                     FOR fme_kol IN
-                        SELECT column_name, data_type, ordinal_position
-                        FROM information_schema.columns
-                        WHERE table_schema = schema_namn AND table_name = tabell_namn
-                        ORDER BY ordinal_position
+                        SELECT k.kolumnnamn, k.datatyp, k.attnum
+                        FROM hamta_kolumnbeskrivning(format('%I.%I', schema_namn, tabell_namn)::regclass) k
                     LOOP
-                        RAISE NOTICE '[hantera_ny_tabell] [FME-DEBUG]   #% % (%)', fme_kol.ordinal_position, fme_kol.column_name, fme_kol.data_type;
+                        RAISE NOTICE '[hantera_ny_tabell] [FME-DEBUG]   #% % (%)', fme_kol.attnum, fme_kol.kolumnnamn, fme_kol.datatyp;
                     END LOOP;
                 END;
             END IF;
@@ -257,12 +259,10 @@ BEGIN
                     fme_kol record;
                 BEGIN
                     FOR fme_kol IN
-                        SELECT column_name, data_type, ordinal_position
-                        FROM information_schema.columns
-                        WHERE table_schema = schema_namn AND table_name = tabell_namn
-                        ORDER BY ordinal_position
+                        SELECT k.kolumnnamn, k.datatyp, k.attnum
+                        FROM hamta_kolumnbeskrivning(format('%I.%I', schema_namn, tabell_namn)::regclass) k
                     LOOP
-                        RAISE NOTICE '[hantera_ny_tabell] [FME-DEBUG]   #% % (%)', fme_kol.ordinal_position, fme_kol.column_name, fme_kol.data_type;
+                        RAISE NOTICE '[hantera_ny_tabell] [FME-DEBUG]   #% % (%)', fme_kol.attnum, fme_kol.kolumnnamn, fme_kol.datatyp;
                     END LOOP;
                 END;
             END IF;
@@ -293,6 +293,8 @@ BEGIN
             -- sätter alltid NEW.gid = nextval(sekvens) innan raden skrivs.
             op_steg := 'tvinga gid från sekvens';
             RAISE NOTICE 'Steg 7.5/11: Skapar trigger hex_tvinga_gid';
+            -- Inga argument: sekvensen slås upp och cachas per session av
+            -- triggerfunktionen (ett OID i definitionen överlever inte pg_restore)
             EXECUTE format(
                 'CREATE TRIGGER hex_tvinga_gid'
                 ' BEFORE INSERT ON %I.%I'
@@ -346,33 +348,9 @@ BEGIN
                 WHERE d.validera_geometri = true
                   AND schema_namn ~ (public.hex_schema_regex() || d.prefix || '_')
             ) THEN
-                DECLARE
-                    constraint_namn text := 'validera_geom_' || tabell_namn;
-                BEGIN
-                    IF EXISTS (
-                        SELECT 1 FROM pg_constraint
-                        WHERE conrelid = format('%I.%I', schema_namn, tabell_namn)::regclass
-                          AND conname = constraint_namn
-                    ) THEN
-                        RAISE NOTICE '  - Geometrivalidering redan tillagd (återställd av aterskapa_kolumnegenskaper): %', constraint_namn;
-                    ELSE
-                        EXECUTE format(
-                            'ALTER TABLE %I.%I ADD CONSTRAINT %I CHECK (public.validera_geometri(geom))',
-                            schema_namn,
-                            tabell_namn,
-                            constraint_namn
-                        );
-                        RAISE NOTICE '  ✓ Geometrivalidering tillagd: %', constraint_namn;
-                    END IF;
-                    EXECUTE format(
-                        'CREATE TRIGGER hex_kontrollera_geom'
-                        ' BEFORE INSERT OR UPDATE ON %I.%I'
-                        ' FOR EACH ROW EXECUTE FUNCTION public.kontrollera_geometri_trigger()',
-                        schema_namn,
-                        tabell_namn
-                    );
-                    RAISE NOTICE '  ✓ Geometritrigger tillagd: hex_kontrollera_geom';
-                END;
+                -- Trigger + ev. CHECK enligt hex_installning('geometrivalidering').
+                -- En CHECK återställd av aterskapa_kolumnegenskaper behålls.
+                PERFORM public.skapa_geometrivalidering(schema_namn, tabell_namn);
             ELSE
                 IF geometriinfo IS NULL OR geometriinfo.kolumnnamn IS NULL THEN
                     RAISE NOTICE '  - Ingen geometri, validering ej relevant';
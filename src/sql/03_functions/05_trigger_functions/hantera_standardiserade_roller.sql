@@ -48,6 +48,7 @@ DECLARE
     slutligt_rollnamn   text;
     arvs_rollnamn       text;
     matchar             boolean;
+    matchande_roller    text[];
     generated_password  text;
     antal_roller        integer := 0;
 BEGIN
@@ -69,6 +70,12 @@ BEGIN
             CONTINUE;
         END IF;
 
+        -- Evaluera schema_uttryck för det nya schemat en gång och spara i
+        -- hex_schema_matchningar – även standardkolumnerna, så att första
+        -- CREATE TABLE i schemat bara behöver en indexerad läsning.
+        PERFORM uppdatera_schema_matchningar(schema_namn);
+        matchande_roller := hamta_schema_matchningar(schema_namn, 'roll');
+
         -- Loopa genom alla rollkonfigurationer (i gid-ordning, r_/w_ skapas före gs_r_/gs_w_)
         FOR rollkonfiguration IN
             SELECT * FROM standardiserade_roller ORDER BY gid
@@ -78,7 +85,7 @@ BEGIN
 
             -- Testa om schema_uttryck matchar detta schema
             BEGIN
-                EXECUTE format('SELECT %L %s', schema_namn, rollkonfiguration.schema_uttryck) INTO matchar;
+                matchar := rollkonfiguration.rollnamn = ANY(matchande_roller);
                 RAISE NOTICE '[hantera_standardiserade_roller]   Schema_uttryck "%" matchar: %',
                     rollkonfiguration.schema_uttryck, matchar;
 
@@ -10,22 +10,37 @@ CREATE OR REPLACE FUNCTION public.kontrollera_geometri_trigger()
 AS $BODY$
 
 /******************************************************************************
- * BEFORE INSERT OR UPDATE trigger som ger meningsfulla felmeddelanden när
- * ogiltig geometri sparas i _kba_-tabeller.
+ * BEFORE INSERT OR UPDATE OF geom trigger som ger meningsfulla
+ * felmeddelanden när ogiltig geometri sparas i _kba_-tabeller.
  *
  * Triggernamn på varje tabell: hex_kontrollera_geom
  *
+ * Attributändringar validerar inte om geometrin:
+ * - UPDATE OF geom gör att triggern inte avfyras alls när geom inte finns
+ *   i SET-listan (QGIS skickar bara ändrade kolumner).
+ * - Klienter som skriver alla kolumner (t.ex. FME) avfyrar triggern, men
+ *   om NEW.geom är identisk med OLD.geom (binär jämförelse via geometrins
+ *   =-operator) hoppas valideringen över – geometrin validerades redan när
+ *   den sparades.
+ *
  * Avfyras INNAN CHECK-constrainten validera_geom_<tabell> utvärderas.
  * Det innebär att QGIS och andra klienter ser en förklaring av vad som
  * är fel med geometrin, snarare än det generiska:
  *   "new row for relation … violates check constraint"
  *
  * Triggern installeras automatiskt av hantera_ny_tabell() och
- * hantera_kolumntillagg() på alla _kba_-tabeller med geometrikolumn (geom).
+ * hantera_kolumntillagg() på alla _kba_-tabeller med geometrikolumn (geom),
+ * via skapa_geometrivalidering(). Med hex_installning('geometrivalidering')
+ * = 'trigger' finns ingen CHECK-constraint och triggern är den enda
+ * valideringen – varje rad valideras då en gång i stället för två.
  ******************************************************************************/
 DECLARE
     fel text;
 BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.geom IS NOT DISTINCT FROM OLD.geom THEN
+        RETURN NEW;
+    END IF;
+
     fel := public.forklara_geometrifel(NEW.geom);
     IF fel IS NOT NULL THEN
         RAISE EXCEPTION 'Ogiltig geometri i tabellen "%": %',
@@ -40,7 +55,7 @@ ALTER FUNCTION public.kontrollera_geometri_trigger()
     OWNER TO postgres;
 
 COMMENT ON FUNCTION public.kontrollera_geometri_trigger()
-    IS 'BEFORE INSERT OR UPDATE trigger som avvisar ogiltig geometri med ett läsbart
-felmeddelande. Installeras automatiskt av Hex på alla _kba_-tabeller med geometrikolumn.
+    IS 'BEFORE INSERT OR UPDATE OF geom trigger som avvisar ogiltig geometri med ett läsbart
+felmeddelande. Oförändrad geometri vid UPDATE valideras inte om. Installeras automatiskt av Hex på alla _kba_-tabeller med geometrikolumn.
 Avfyras före CHECK-constrainten validera_geom_<tabell> för att ge QGIS-användare en
 tydlig förklaring av felet. Triggernamn per tabell: hex_kontrollera_geom.';
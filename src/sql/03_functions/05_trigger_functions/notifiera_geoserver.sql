@@ -3,6 +3,8 @@ CREATE OR REPLACE FUNCTION public.notifiera_geoserver()
     LANGUAGE 'plpgsql'
     COST 100
     VOLATILE NOT LEAKPROOF
+    SECURITY DEFINER
+    SET search_path = public
 AS $BODY$
 
 /******************************************************************************
@@ -15,7 +17,13 @@ AS $BODY$
  * FUNKTIONALITET:
  * 1. Identifierar nya scheman från DDL-händelsen
  * 2. Filtrerar bort systemscheman och scheman vars skyddsnivå inte publiceras
- * 3. Skickar pg_notify med schemanamnet som payload
+ * 3. Lägger händelsen i händelsekön hex_geoserver_handelser ('skapa')
+ * 4. Skickar pg_notify med schemanamnet som payload (väcker lyssnaren)
+ *
+ * SECURITY DEFINER: Körs som funktionens ägare (postgres) så att raden i
+ * hex_geoserver_handelser kan skrivas oavsett vilken användare som kör DDL.
+ * Kön gör att händelser som inträffar medan lyssnaren är nere inte går
+ * förlorade – de spelas upp vid nästa anslutning.
  *
  * KANAL: 'geoserver_schema'
  *
@@ -63,6 +71,8 @@ BEGIN
 
         -- Skicka notifiering till Python-lyssnaren
         RAISE NOTICE '[notifiera_geoserver]   Skickar notifiering for schema: % (prefix: %)', schema_namn, schema_prefix;
+        INSERT INTO public.hex_geoserver_handelser (schema_namn, handelse)
+        VALUES (schema_namn, 'skapa');
         PERFORM pg_notify('geoserver_schema', schema_namn);
         antal_notifieringar := antal_notifieringar + 1;
 
@@ -92,4 +102,5 @@ COMMENT ON FUNCTION public.notifiera_geoserver()
 Publicerar scheman vars skyddsnivå har publiceras_geoserver = true i standardiserade_skyddsnivaer
 (standardkonfiguration: sk0 och sk1). Notifieringen används av en extern Python-process
 för att skapa workspace och direkt PostGIS-datastore i GeoServer via REST API.
-Datastore-autentiseringen hämtas från hex_role_credentials (läsrollen r_{schema}).';
+Datastore-autentiseringen hämtas från hex_role_credentials (läsrollen r_{schema}).
+Händelsen skrivs också till händelsekön hex_geoserver_handelser (skapa).';
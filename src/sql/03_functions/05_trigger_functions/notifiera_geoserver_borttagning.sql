@@ -3,6 +3,8 @@ CREATE OR REPLACE FUNCTION public.notifiera_geoserver_borttagning()
     LANGUAGE 'plpgsql'
     COST 100
     VOLATILE NOT LEAKPROOF
+    SECURITY DEFINER
+    SET search_path = public
 AS $BODY$
 
 /******************************************************************************
@@ -17,7 +19,13 @@ AS $BODY$
  * FUNKTIONALITET:
  * 1. Identifierar borttagna scheman från DDL-händelsen
  * 2. Filtrerar bort systemscheman och scheman vars skyddsnivå inte publicerats
- * 3. Skickar pg_notify med schemanamnet som payload
+ * 3. Lägger händelsen i händelsekön hex_geoserver_handelser ('ta_bort')
+ * 4. Skickar pg_notify med schemanamnet som payload (väcker lyssnaren)
+ *
+ * SECURITY DEFINER: Körs som funktionens ägare (postgres) så att raden i
+ * hex_geoserver_handelser kan skrivas oavsett vilken användare som kör DDL.
+ * Kön gör att händelser som inträffar medan lyssnaren är nere inte går
+ * förlorade – de spelas upp vid nästa anslutning.
  *
  * KANAL: 'geoserver_schema_drop'
  *
@@ -66,6 +74,8 @@ BEGIN
         -- Skicka borttagningsnotifiering till Python-lyssnaren
         RAISE NOTICE '[notifiera_geoserver_borttagning]   Skickar borttagningsnotifiering för schema: % (prefix: %)',
             schema_namn, schema_prefix;
+        INSERT INTO public.hex_geoserver_handelser (schema_namn, handelse)
+        VALUES (schema_namn, 'ta_bort');
         PERFORM pg_notify('geoserver_schema_drop', schema_namn);
         antal_notifieringar := antal_notifieringar + 1;
 
@@ -95,4 +105,5 @@ COMMENT ON FUNCTION public.notifiera_geoserver_borttagning()
 Skickar notifiering på kanalen geoserver_schema_drop för scheman vars skyddsnivå har
 publiceras_geoserver = true (standardkonfiguration: sk0 och sk1). Notifieringen används av
 en extern Python-process för att ta bort workspace och datastore i GeoServer via REST API,
-vilket förhindrar att GeoServer gör upprepade anrop mot ett schema som inte längre existerar.';
+vilket förhindrar att GeoServer gör upprepade anrop mot ett schema som inte längre existerar.
+Händelsen skrivs också till händelsekön hex_geoserver_handelser (ta_bort).';
@@ -0,0 +1,41 @@
+-- FUNCTION: public.notifiera_schemakonfiguration()
+
+CREATE OR REPLACE FUNCTION public.notifiera_schemakonfiguration()
+    RETURNS trigger
+    LANGUAGE 'plpgsql'
+    COST 100
+    VOLATILE NOT LEAKPROOF
+AS $BODY$
+/******************************************************************************
+ * AFTER ... FOR EACH STATEMENT trigger som meddelar GeoServer-lyssnaren att
+ * konfigurationen för schemanamn har ändrats.
+ *
+ * Installeras på: standardiserade_skyddsnivaer, standardiserade_datakategorier
+ * Triggernamn:    hex_notifiera_schemakonfiguration
+ *
+ * Lyssnaren cachar schemanamnsmönstret per databas och läser om det först
+ * när den här notifieringen kommer – en notifiering per sats, oavsett antal
+ * ändrade rader. Payload är namnet på den ändrade tabellen.
+ *
+ * pg_notify levereras först vid COMMIT, så lyssnaren läser aldrig en
+ * konfiguration som sedan rullas tillbaka.
+ ******************************************************************************/
+BEGIN
+    PERFORM pg_notify('hex_schemakonfiguration', TG_TABLE_NAME);
+    RETURN NULL;
+EXCEPTION
+    WHEN OTHERS THEN
+        -- Notifieringen får aldrig blockera en konfigurationsändring
+        RAISE WARNING '[notifiera_schemakonfiguration] Kunde inte skicka notifiering för %: %',
+            TG_TABLE_NAME, SQLERRM;
+        RETURN NULL;
+END;
+$BODY$;
+
+ALTER FUNCTION public.notifiera_schemakonfiguration()
+    OWNER TO postgres;
+
+COMMENT ON FUNCTION public.notifiera_schemakonfiguration()
+    IS 'Statement-trigger som skickar pg_notify på kanalen hex_schemakonfiguration när
+standardiserade_skyddsnivaer eller standardiserade_datakategorier ändras. GeoServer-lyssnaren
+ogiltigförklarar då sitt cachade schemanamnsmönster för databasen. Payload: tabellnamnet.';
@@ -7,65 +7,76 @@ CREATE OR REPLACE FUNCTION public.ta_bort_dummy_rad()
     VOLATILE NOT LEAKPROOF
 AS $BODY$
 /******************************************************************************
- * AFTER INSERT trigger som automatiskt tar bort dummy-geometriraden när den
- * första riktiga raden läggs till i en geometritabell.
+ * AFTER INSERT-satstrigger som automatiskt tar bort dummy-geometriraden när
+ * den första riktiga raden läggs till i en geometritabell.
  *
  * Triggernamn på varje tabell: hex_ta_bort_dummy
  * Installeras av: lagg_till_dummy_geometri()
+ * Definition:     AFTER INSERT ... REFERENCING NEW TABLE AS nya
+ *                 FOR EACH STATEMENT
+ *
+ * Triggern körs en gång per sats i stället för en gång per rad, så en COPY
+ * eller INSERT ... SELECT med 100 000 rader kostar en uppslagning i
+ * hex_dummy_geometrier, inte två per rad.
  *
  * Flöde:
- *   1. Om hex_dummy_geometrier inte har poster för denna tabell – gör ingenting.
- *   2. Om den nyinsatta raden ÄR en dummy (gid finns i hex_dummy_geometrier) –
- *      gör ingenting (skyddar mot att triggern avfyras på sin egen dummy-insert).
- *   3. Annars: ta bort alla dummy-rader ur tabellen och rensa hex_dummy_geometrier.
+ *   1. Hämta tabellens dummy-gid ur hex_dummy_geometrier (en uppslagning).
+ *   2. Om satsen bara infogade dummy-rader (eller inga rader alls) – gör
+ *      ingenting. Kontrolleras mot övergångstabellen nya.
+ *   3. Annars: ta bort dummy-raderna ur tabellen med en DELETE, rensa
+ *      hex_dummy_geometrier och ta bort triggern från tabellen.
+ *
+ * Triggern tar bort sig själv när dummyn är borta. DROP TRIGGER kräver
+ * tabellägarskap och ett exklusivt lås; om användaren inte äger tabellen
+ * eller låset inte kan tas inom 100 ms (t.ex. pågående läsning i QGIS) blir
+ * triggern kvar. Den gör då ingenting utöver en uppslagning per sats och
+ * tas bort av underhall_hex() eller vid nästa infogning.
  *
  * OBS: Om tabellen har en QA-trigger (trg_*_qa) kommer DELETE av dummy-raden
  * att skapa en 'D'-post i historiktabellen. Detta är acceptabelt systembrus –
  * posten är identifierbar via gid och tidpunkt.
  ******************************************************************************/
 DECLARE
-    schema_n  text   := TG_TABLE_SCHEMA;
-    tabell_n  text   := TG_TABLE_NAME;
-    dummy_gid bigint;
+    schema_n   text := TG_TABLE_SCHEMA;
+    tabell_n   text := TG_TABLE_NAME;
+    dummy_gids bigint[];
+    gammal_lock_timeout text;
 BEGIN
-    -- Snabbkontroll: finns det ens en dummy för denna tabell?
-    IF NOT EXISTS (
-        SELECT 1 FROM public.hex_dummy_geometrier
-        WHERE schema_namn = schema_n AND tabell_namn = tabell_n
-    ) THEN
-        RETURN NEW;
-    END IF;
+    SELECT array_agg(gid)
+    INTO   dummy_gids
+    FROM   public.hex_dummy_geometrier
+    WHERE  schema_namn = schema_n AND tabell_namn = tabell_n;
 
-    -- Är det dummy-raden SJÄLV som precis infogades? (skyddar mot rekursion)
-    IF EXISTS (
-        SELECT 1 FROM public.hex_dummy_geometrier
-        WHERE schema_namn = schema_n
-          AND tabell_namn = tabell_n
-          AND gid = NEW.gid
-    ) THEN
-        RETURN NEW;
-    END IF;
+    IF dummy_gids IS NOT NULL THEN
+        -- Infogade satsen någon riktig rad? (skyddar mot dummy-insert och tomma satser)
+        IF NOT EXISTS (SELECT 1 FROM nya WHERE gid <> ALL (dummy_gids)) THEN
+            RETURN NULL;
+        END IF;
 
-    -- En riktig rad har anlänt – ta bort dummy-rader
-    FOR dummy_gid IN
-        SELECT gid FROM public.hex_dummy_geometrier
-        WHERE schema_namn = schema_n AND tabell_namn = tabell_n
-    LOOP
-        EXECUTE format(
-            'DELETE FROM %I.%I WHERE gid = $1',
-            schema_n, tabell_n
-        ) USING dummy_gid;
+        -- En riktig rad har anlänt – ta bort dummy-rader
+        EXECUTE format('DELETE FROM %I.%I WHERE gid = ANY ($1)', schema_n, tabell_n)
+        USING dummy_gids;
 
         DELETE FROM public.hex_dummy_geometrier
-        WHERE schema_namn = schema_n
-          AND tabell_namn = tabell_n
-          AND gid = dummy_gid;
+        WHERE schema_namn = schema_n AND tabell_namn = tabell_n;
 
         RAISE NOTICE '[ta_bort_dummy_rad] ✓ Dummy-rad borttagen ur %.% (gid: %)',
-            schema_n, tabell_n, dummy_gid;
-    END LOOP;
+            schema_n, tabell_n, array_to_string(dummy_gids, ', ');
+    END IF;
+
+    -- Ingen dummy kvar – triggern behövs inte längre
+    gammal_lock_timeout := current_setting('lock_timeout');
+    BEGIN
+        PERFORM set_config('lock_timeout', '100ms', true);
+        EXECUTE format('DROP TRIGGER IF EXISTS hex_ta_bort_dummy ON %I.%I', schema_n, tabell_n);
+    EXCEPTION
+        WHEN lock_not_available OR insufficient_privilege THEN
+            RAISE DEBUG '[ta_bort_dummy_rad] Triggern på %.% kunde inte tas bort: %',
+                schema_n, tabell_n, SQLERRM;
+    END;
+    PERFORM set_config('lock_timeout', gammal_lock_timeout, true);
 
-    RETURN NEW;
+    RETURN NULL;
 END;
 $BODY$;
 
@@ -73,8 +84,10 @@ ALTER FUNCTION public.ta_bort_dummy_rad()
     OWNER TO postgres;
 
 COMMENT ON FUNCTION public.ta_bort_dummy_rad()
-    IS 'AFTER INSERT trigger som tar bort Hex-dummy-geometriraden när den första
-riktiga raden läggs in i en geometritabell. Installeras automatiskt av
-lagg_till_dummy_geometri() via hantera_ny_tabell() och hantera_kolumntillagg().
-Triggernamn per tabell: hex_ta_bort_dummy. Triggern är harmlös efter att dummyn
-tagits bort (hex_dummy_geometrier tom → tidig retur utan åtgärd).';
+    IS 'AFTER INSERT-satstrigger (övergångstabell nya) som tar bort Hex-dummy-
+geometriraden när den första riktiga raden läggs in i en geometritabell, och
+därefter tar bort sig själv. Körs en gång per sats, inte per rad. Installeras
+automatiskt av lagg_till_dummy_geometri() via hantera_ny_tabell() och
+hantera_kolumntillagg(). Triggernamn per tabell: hex_ta_bort_dummy. Kan triggern
+inte tas bort (ej tabellägare, låset upptaget) är den harmlös och städas av
+underhall_hex().';
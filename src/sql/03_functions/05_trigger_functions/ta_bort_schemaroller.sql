@@ -80,6 +80,11 @@ BEGIN
             END IF;
         END LOOP;
 
+        -- Rensa förberäknade schema_uttryck-matchningar för schemat
+        -- (EXECUTE USING: schema_namn är både kolumn och lokal variabel)
+        EXECUTE 'DELETE FROM public.hex_schema_matchningar WHERE schema_namn = $1'
+            USING schema_namn;
+
         RAISE NOTICE '[ta_bort_schemaroller] Sammanfattning för schema %: % roller borttagna',
             schema_namn, antal_borttagna;
         antal_borttagna := 0;
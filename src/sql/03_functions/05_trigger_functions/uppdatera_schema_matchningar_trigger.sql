@@ -0,0 +1,21 @@
+CREATE OR REPLACE FUNCTION public.uppdatera_schema_matchningar_trigger()
+    RETURNS trigger
+    LANGUAGE 'plpgsql'
+AS $BODY$
+/******************************************************************************
+ * Satsnivåtrigger på standardiserade_kolumner och standardiserade_roller.
+ * Förnyar hex_schema_matchningar för alla scheman när konfigurationen
+ * ändras. TG_ARGV[0] anger källan ('kolumn' eller 'roll').
+ ******************************************************************************/
+BEGIN
+    PERFORM public.uppdatera_schema_matchningar(NULL, TG_ARGV[0]);
+    RETURN NULL;
+END;
+$BODY$;
+
+ALTER FUNCTION public.uppdatera_schema_matchningar_trigger()
+    OWNER TO postgres;
+
+COMMENT ON FUNCTION public.uppdatera_schema_matchningar_trigger()
+    IS 'Satsnivåtrigger som förnyar hex_schema_matchningar när standardiserade_kolumner
+eller standardiserade_roller ändras. TG_ARGV[0] = kolumn | roll.';
@@ -0,0 +1,23 @@
+-- Triggers: hex_notifiera_schemakonfiguration on standardiserade_skyddsnivaer / standardiserade_datakategorier
+
+DROP TRIGGER IF EXISTS hex_notifiera_schemakonfiguration ON public.standardiserade_skyddsnivaer;
+
+CREATE TRIGGER hex_notifiera_schemakonfiguration
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE
+    ON public.standardiserade_skyddsnivaer
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION public.notifiera_schemakonfiguration();
+
+COMMENT ON TRIGGER hex_notifiera_schemakonfiguration ON public.standardiserade_skyddsnivaer
+    IS 'Meddelar GeoServer-lyssnaren (kanal hex_schemakonfiguration) att schemanamnsmönstret ska läsas om.';
+
+DROP TRIGGER IF EXISTS hex_notifiera_schemakonfiguration ON public.standardiserade_datakategorier;
+
+CREATE TRIGGER hex_notifiera_schemakonfiguration
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE
+    ON public.standardiserade_datakategorier
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION public.notifiera_schemakonfiguration();
+
+COMMENT ON TRIGGER hex_notifiera_schemakonfiguration ON public.standardiserade_datakategorier
+    IS 'Meddelar GeoServer-lyssnaren (kanal hex_schemakonfiguration) att schemanamnsmönstret ska läsas om.';
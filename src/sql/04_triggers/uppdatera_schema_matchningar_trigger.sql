@@ -0,0 +1,23 @@
+-- Triggers: hex_uppdatera_schema_matchningar on standardiserade_kolumner / standardiserade_roller
+
+DROP TRIGGER IF EXISTS hex_uppdatera_schema_matchningar ON public.standardiserade_kolumner;
+
+CREATE TRIGGER hex_uppdatera_schema_matchningar
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE
+    ON public.standardiserade_kolumner
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION public.uppdatera_schema_matchningar_trigger('kolumn');
+
+COMMENT ON TRIGGER hex_uppdatera_schema_matchningar ON public.standardiserade_kolumner
+    IS 'Förnyar hex_schema_matchningar (kalla = kolumn) när standardkolumnerna ändras.';
+
+DROP TRIGGER IF EXISTS hex_uppdatera_schema_matchningar ON public.standardiserade_roller;
+
+CREATE TRIGGER hex_uppdatera_schema_matchningar
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE
+    ON public.standardiserade_roller
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION public.uppdatera_schema_matchningar_trigger('roll');
+
+COMMENT ON TRIGGER hex_uppdatera_schema_matchningar ON public.standardiserade_roller
+    IS 'Förnyar hex_schema_matchningar (kalla = roll) när standardrollerna ändras.';
@@ -1,5 +1,5 @@
 -- =============================================================================
--- HEX STRESS TEST  (~35 tests)
+-- HEX STRESS TEST  (~45 tests)
 -- Run as: sudo -u postgres psql -d hex_test -f tests/stress_test.sql
 -- =============================================================================
 
@@ -736,6 +736,123 @@ EXCEPTION WHEN OTHERS THEN
     PERFORM _fail(41, 'GID override: hex_tvinga_gid', SQLERRM);
 END $$;
 
+-- TEST 43: hex_tvinga_gid has no OID argument (survives pg_dump/pg_restore)
+-- and caches the sequence per session under hex_tvinga_gid.r<table OID>
+CREATE TABLE sk1_kba_stress.gid_cache_test (naam text);
+INSERT INTO sk1_kba_stress.gid_cache_test (naam) VALUES ('cache');
+
+DO $$ DECLARE
+    nargs   integer;
+    cachad  text;
+    sekvens oid := pg_get_serial_sequence('sk1_kba_stress.gid_cache_test', 'gid')::regclass::oid;
+BEGIN
+    SELECT t.tgnargs INTO nargs
+    FROM   pg_trigger t
+    WHERE  t.tgrelid = 'sk1_kba_stress.gid_cache_test'::regclass
+      AND  t.tgname  = 'hex_tvinga_gid';
+    cachad := current_setting('hex_tvinga_gid.r' || 'sk1_kba_stress.gid_cache_test'::regclass::oid, true);
+
+    IF nargs = 0 AND cachad = sekvens::text THEN
+        PERFORM _pass(43, 'GID override: no OID in trigger, sequence cached per session');
+    ELSE
+        PERFORM _fail(43, 'GID override: no OID in trigger, sequence cached per session',
+            format('tgnargs=%s, cache=%s, sequence=%s', nargs, cachad, sekvens));
+    END IF;
+EXCEPTION WHEN OTHERS THEN
+    PERFORM _fail(43, 'GID override: no OID in trigger, sequence cached per session', SQLERRM);
+END $$;
+
+-- TEST 44: DISCARD SEQUENCES between transactions – currval() is gone again,
+-- an OVERRIDING SYSTEM VALUE insert must still be replaced (not raise)
+DISCARD SEQUENCES;
+
+DO $$ DECLARE
+    inserted_gid integer;
+BEGIN
+    INSERT INTO sk1_kba_stress.gid_cache_test (gid, naam)
+    OVERRIDING SYSTEM VALUE
+    VALUES (999, 'efter-discard-sequences');
+
+    SELECT gid INTO inserted_gid
+    FROM   sk1_kba_stress.gid_cache_test
+    WHERE  naam = 'efter-discard-sequences';
+
+    IF inserted_gid <> 999 THEN
+        PERFORM _pass(44, 'GID override: works after DISCARD SEQUENCES');
+    ELSE
+        PERFORM _fail(44, 'GID override: works after DISCARD SEQUENCES', 'gid 999 was stored');
+    END IF;
+EXCEPTION WHEN OTHERS THEN
+    PERFORM _fail(44, 'GID override: works after DISCARD SEQUENCES', SQLERRM);
+END $$;
+
+-- TEST 45: same after DISCARD ALL (connection pool reset; also clears the cache)
+INSERT INTO sk1_kba_stress.gid_cache_test (naam) VALUES ('fore-discard-all');
+DISCARD ALL;
+SET client_min_messages = WARNING;
+
+DO $$ DECLARE
+    inserted_gid integer;
+BEGIN
+    INSERT INTO sk1_kba_stress.gid_cache_test (gid, naam)
+    OVERRIDING SYSTEM VALUE
+    VALUES (998, 'efter-discard-all');
+
+    SELECT gid INTO inserted_gid
+    FROM   sk1_kba_stress.gid_cache_test
+    WHERE  naam = 'efter-discard-all';
+
+    IF inserted_gid <> 998 THEN
+        PERFORM _pass(45, 'GID override: works after DISCARD ALL');
+    ELSE
+        PERFORM _fail(45, 'GID override: works after DISCARD ALL', 'gid 998 was stored');
+    END IF;
+EXCEPTION WHEN OTHERS THEN
+    PERFORM _fail(45, 'GID override: works after DISCARD ALL', SQLERRM);
+END $$;
+
+-- TEST 46: a trigger from the previous version (stale sequence OID argument,
+-- as after pg_restore) still works and is recreated without it by underhall_hex()
+DO $$ DECLARE
+    inserted_gid integer;
+    atgard_text  text;
+    nargs        integer;
+BEGIN
+    DROP TRIGGER hex_tvinga_gid ON sk1_kba_stress.gid_cache_test;
+    CREATE TRIGGER hex_tvinga_gid
+        BEFORE INSERT ON sk1_kba_stress.gid_cache_test
+        FOR EACH ROW EXECUTE FUNCTION public.tvinga_gid_fran_sekvens('1');
+
+    INSERT INTO sk1_kba_stress.gid_cache_test (gid, naam)
+    OVERRIDING SYSTEM VALUE
+    VALUES (997, 'gammalt-argument');
+    SELECT gid INTO inserted_gid
+    FROM   sk1_kba_stress.gid_cache_test
+    WHERE  naam = 'gammalt-argument';
+
+    SELECT u.atgard INTO atgard_text
+    FROM   public.underhall_hex() u
+    WHERE  u.schema_namn  = 'sk1_kba_stress'
+      AND  u.tabell_namn  = 'gid_cache_test'
+      AND  u.trigger_namn = 'hex_tvinga_gid';
+
+    SELECT t.tgnargs INTO nargs
+    FROM   pg_trigger t
+    WHERE  t.tgrelid = 'sk1_kba_stress.gid_cache_test'::regclass
+      AND  t.tgname  = 'hex_tvinga_gid';
+
+    IF inserted_gid <> 997 AND atgard_text = 'uppdaterad' AND nargs = 0 THEN
+        PERFORM _pass(46, 'GID override: stale OID argument ignored, trigger recreated');
+    ELSE
+        PERFORM _fail(46, 'GID override: stale OID argument ignored, trigger recreated',
+            format('gid=%s, underhall_hex=%s, tgnargs=%s', inserted_gid, atgard_text, nargs));
+    END IF;
+EXCEPTION WHEN OTHERS THEN
+    PERFORM _fail(46, 'GID override: stale OID argument ignored, trigger recreated', SQLERRM);
+END $$;
+
+DROP TABLE sk1_kba_stress.gid_cache_test;
+
 
 -- =============================================================================
 -- CLEANUP
@@ -31,6 +31,23 @@
 -- G25  Trigger: degenerate polygon now accepted (size checks removed)
 -- G26  Trigger: degenerate line now accepted (size checks removed)
 -- G27  Trigger: curved geometry rejected with geometry type in message
+-- G28  Trigger: defined as UPDATE OF geom (attribute edits do not fire it)
+-- G29  Trigger: UPDATE that rewrites an unchanged geom is not revalidated
+-- G30  validera_geometri/forklara_geometrifel are PARALLEL SAFE
+-- G31  granska_geometrier() reports no rows for a table with only valid geometry
+-- G32  ADD COLUMN on a validated table: geom moved last, hex_kontrollera_geom
+--      (UPDATE OF geom) kept, CHECK constraint and GiST index restored
+-- G33  skapa_geometrivalidering(..., p_ej_validerad => true) adds the CHECK NOT VALID
+-- G34  ... and queues a validera_constraint job
+-- G35  Default mode (trigger_och_check): SET geom = geom on an existing invalid
+--      row is skipped by the trigger but rejected by the CHECK (G29 counterpart)
+-- G36  kor_uppskjuten_omstrukturering: job fails while invalid rows exist
+--      (forsok/senaste_fel), validates the constraint once they are fixed
+-- G37  geometrivalidering = 'trigger': skapa_geometrivalidering drops
+--      validera_geom_<tabell>, keeps hex_kontrollera_geom (UPDATE OF geom) and
+--      deletes the table's queued validera_constraint job
+-- G38  Trigger-only mode: invalid geometry still rejected (by the trigger alone)
+-- G39  Trigger-only mode: underhall_hex() removes an existing CHECK ('uppdaterad')
 --
 -- Schema used: sk1_kba_geomtest
 -- Convention: NOTICE = PASSED/INFO, WARNING = FAILED/BUG CONFIRMED
@@ -685,6 +702,418 @@ BEGIN
     END IF;
 END $$;
 
+-- ============================================================
+-- G28: hex_kontrollera_geom only fires on UPDATE when geom is in SET
+-- ============================================================
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_trigger t
+        WHERE t.tgrelid = 'sk1_kba_geomtest.testobj_y'::regclass
+          AND t.tgname  = 'hex_kontrollera_geom'
+          AND pg_get_triggerdef(t.oid) LIKE '%UPDATE OF geom%'
+    ) THEN
+        RAISE NOTICE 'TEST G28 PASSED: hex_kontrollera_geom is BEFORE INSERT OR UPDATE OF geom';
+    ELSE
+        RAISE WARNING 'TEST G28 FAILED: hex_kontrollera_geom missing or without UPDATE OF geom: %',
+            (SELECT pg_get_triggerdef(t.oid) FROM pg_trigger t
+             WHERE t.tgrelid = 'sk1_kba_geomtest.testobj_y'::regclass
+               AND t.tgname  = 'hex_kontrollera_geom');
+    END IF;
+END $$;
+
+-- ============================================================
+-- G29: SET geom = geom (all-column writers like FME) skips validation
+-- A row with repeated points is stored with the trigger disabled; rewriting
+-- the same geometry must not be rejected by the trigger.
+-- ============================================================
+DO $$
+DECLARE msg text;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = 'sk1_kba_geomtest.testobj_y'::regclass
+          AND conname  = 'validera_geom_testobj_y'
+    ) THEN
+        RAISE NOTICE 'TEST G29 INFO: skipped – validera_geom_testobj_y exists (geometrivalidering = trigger_och_check)';
+        RETURN;
+    END IF;
+
+    ALTER TABLE sk1_kba_geomtest.testobj_y DISABLE TRIGGER hex_kontrollera_geom;
+    INSERT INTO sk1_kba_geomtest.testobj_y (naam, geom)
+    VALUES ('dubbelpunkt', ST_GeomFromText('POLYGON((0 0,100 0,100 0,100 100,0 100,0 0))', 3006));
+    ALTER TABLE sk1_kba_geomtest.testobj_y ENABLE TRIGGER hex_kontrollera_geom;
+
+    UPDATE sk1_kba_geomtest.testobj_y SET naam = naam, geom = geom WHERE naam = 'dubbelpunkt';
+    DELETE FROM sk1_kba_geomtest.testobj_y WHERE naam = 'dubbelpunkt';
+    RAISE NOTICE 'TEST G29 PASSED: Unchanged geometry on UPDATE was not revalidated';
+EXCEPTION
+    WHEN OTHERS THEN
+        GET STACKED DIAGNOSTICS msg = MESSAGE_TEXT;
+        RAISE WARNING 'TEST G29 FAILED: UPDATE with unchanged geometry rejected: %', msg;
+END $$;
+
+-- ============================================================
+-- G30: Validation functions are PARALLEL SAFE (parallel audit scans)
+-- ============================================================
+DO $$
+DECLARE antal integer;
+BEGIN
+    SELECT count(*) INTO antal
+    FROM pg_proc
+    WHERE oid IN ('public.validera_geometri(geometry)'::regprocedure,
+                  'public.forklara_geometrifel(geometry)'::regprocedure)
+      AND proparallel = 's';
+    IF antal = 2 THEN
+        RAISE NOTICE 'TEST G30 PASSED: validera_geometri and forklara_geometrifel are PARALLEL SAFE';
+    ELSE
+        RAISE WARNING 'TEST G30 FAILED: Expected 2 PARALLEL SAFE functions, found %', antal;
+    END IF;
+END $$;
+
+-- ============================================================
+-- G31: granska_geometrier() on a table where validation is enforced
+-- ============================================================
+DO $$
+DECLARE antal integer;
+BEGIN
+    SELECT count(*) INTO antal
+    FROM public.granska_geometrier('sk1_kba_geomtest', 'testobj_y');
+    IF antal = 0 THEN
+        RAISE NOTICE 'TEST G31 PASSED: granska_geometrier reports no invalid geometry in testobj_y';
+    ELSE
+        RAISE WARNING 'TEST G31 FAILED: granska_geometrier reported % invalid rows in testobj_y', antal;
+    END IF;
+END $$;
+
+-- ============================================================
+-- G32: ADD COLUMN on a validated _kba_ table
+-- hex_kontrollera_geom (UPDATE OF geom) depends on the geom column; the
+-- column move must still put geom last and keep the validation in place.
+-- ============================================================
+ALTER TABLE sk1_kba_geomtest.testobj_y ADD COLUMN anteckning text;
+
+DO $$
+DECLARE
+    sista        text;
+    antal_temp   integer;
+    trigger_def  text;
+    har_check    boolean;
+    har_gist     boolean;
+    vill_check   boolean := public.hex_installning('geometrivalidering', 'trigger_och_check') = 'trigger_och_check';
+BEGIN
+    SELECT attname INTO sista FROM pg_attribute
+    WHERE attrelid = 'sk1_kba_geomtest.testobj_y'::regclass AND attnum > 0 AND NOT attisdropped
+    ORDER BY attnum DESC LIMIT 1;
+
+    SELECT count(*) INTO antal_temp FROM pg_attribute
+    WHERE attrelid = 'sk1_kba_geomtest.testobj_y'::regclass AND attname ~ '_temp[0-9]{4}$' AND NOT attisdropped;
+
+    SELECT pg_get_triggerdef(t.oid) INTO trigger_def FROM pg_trigger t
+    WHERE t.tgrelid = 'sk1_kba_geomtest.testobj_y'::regclass AND t.tgname = 'hex_kontrollera_geom';
+
+    SELECT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = 'sk1_kba_geomtest.testobj_y'::regclass AND conname = 'validera_geom_testobj_y'
+    ) INTO har_check;
+
+    SELECT EXISTS (
+        SELECT 1 FROM pg_indexes
+        WHERE schemaname = 'sk1_kba_geomtest' AND tablename = 'testobj_y' AND indexdef LIKE '%USING gist%'
+    ) INTO har_gist;
+
+    IF sista = 'geom' AND antal_temp = 0
+       AND trigger_def LIKE '%UPDATE OF geom%'
+       AND har_check = vill_check
+       AND har_gist THEN
+        RAISE NOTICE 'TEST G32 PASSED: geom moved last, trigger kept (UPDATE OF geom), CHECK=% and GiST index present', har_check;
+    ELSE
+        RAISE WARNING 'TEST G32 FAILED: last=%, temp=%, trigger=%, check=% (expected %), gist=%',
+            sista, antal_temp, trigger_def, har_check, vill_check, har_gist;
+    END IF;
+END $$;
+
+-- ============================================================
+-- G33–G36: NOT VALID constraint + deferred VALIDATE CONSTRAINT
+-- ejvalid_y gets one invalid row (repeated point) while validation is off,
+-- then the CHECK is added NOT VALID as for an existing large table.
+-- ============================================================
+CREATE TABLE sk1_kba_geomtest.ejvalid_y (
+    naam text,
+    geom geometry(Polygon, 3006)
+);
+
+DO $$
+BEGIN
+    PERFORM set_config('temp.reorganization_in_progress', 'true', true);
+    ALTER TABLE sk1_kba_geomtest.ejvalid_y DROP CONSTRAINT IF EXISTS validera_geom_ejvalid_y;
+    ALTER TABLE sk1_kba_geomtest.ejvalid_y DISABLE TRIGGER hex_kontrollera_geom;
+    INSERT INTO sk1_kba_geomtest.ejvalid_y (naam, geom)
+    VALUES ('ogiltig', ST_GeomFromText('POLYGON((0 0,100 0,100 0,100 100,0 100,0 0))', 3006)),
+           ('giltig',  ST_GeomFromText('POLYGON((0 0,100 0,100 100,0 100,0 0))', 3006));
+    ALTER TABLE sk1_kba_geomtest.ejvalid_y ENABLE TRIGGER hex_kontrollera_geom;
+    DELETE FROM public.hex_uppskjuten_omstrukturering
+    WHERE schema_namn = 'sk1_kba_geomtest' AND tabell_namn = 'ejvalid_y';
+END $$;
+
+-- ============================================================
+-- G33: CHECK added NOT VALID
+-- ============================================================
+DO $$
+DECLARE
+    antal     integer;
+    validerad boolean;
+BEGIN
+    IF public.hex_installning('geometrivalidering', 'trigger_och_check') <> 'trigger_och_check' THEN
+        RAISE NOTICE 'TEST G33 INFO: skipped – geometrivalidering = trigger (no CHECK constraint)';
+        RETURN;
+    END IF;
+
+    PERFORM set_config('temp.reorganization_in_progress', 'true', true);
+    antal := public.skapa_geometrivalidering('sk1_kba_geomtest', 'ejvalid_y', NULL, true);
+
+    SELECT convalidated INTO validerad FROM pg_constraint
+    WHERE conrelid = 'sk1_kba_geomtest.ejvalid_y'::regclass AND conname = 'validera_geom_ejvalid_y';
+
+    IF antal = 1 AND validerad = false THEN
+        RAISE NOTICE 'TEST G33 PASSED: validera_geom_ejvalid_y added NOT VALID despite an invalid row';
+    ELSE
+        RAISE WARNING 'TEST G33 FAILED: created=%, convalidated=%', antal, validerad;
+    END IF;
+END $$;
+
+-- ============================================================
+-- G34: validera_constraint job queued
+-- ============================================================
+DO $$
+BEGIN
+    IF public.hex_installning('geometrivalidering', 'trigger_och_check') <> 'trigger_och_check' THEN
+        RAISE NOTICE 'TEST G34 INFO: skipped – geometrivalidering = trigger';
+        RETURN;
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM public.hex_uppskjuten_omstrukturering
+        WHERE schema_namn = 'sk1_kba_geomtest' AND tabell_namn = 'ejvalid_y'
+          AND atgard = 'validera_constraint' AND constraint_namn = 'validera_geom_ejvalid_y'
+    ) THEN
+        RAISE NOTICE 'TEST G34 PASSED: validera_constraint job queued for validera_geom_ejvalid_y';
+    ELSE
+        RAISE WARNING 'TEST G34 FAILED: no validera_constraint job in hex_uppskjuten_omstrukturering';
+    END IF;
+END $$;
+
+-- ============================================================
+-- G35: Default mode – the trigger skips an unchanged geom, the CHECK
+-- (even NOT VALID) still checks every updated row
+-- ============================================================
+DO $$
+DECLARE
+    tillstand text;
+    msg       text;
+BEGIN
+    IF public.hex_installning('geometrivalidering', 'trigger_och_check') <> 'trigger_och_check' THEN
+        RAISE NOTICE 'TEST G35 INFO: skipped – geometrivalidering = trigger (covered by G29)';
+        RETURN;
+    END IF;
+
+    -- A valid row passes both the trigger and the CHECK
+    UPDATE sk1_kba_geomtest.ejvalid_y SET naam = naam, geom = geom WHERE naam = 'giltig';
+
+    BEGIN
+        UPDATE sk1_kba_geomtest.ejvalid_y SET naam = naam, geom = geom WHERE naam = 'ogiltig';
+        RAISE WARNING 'TEST G35 FAILED: UPDATE of an invalid row was not rejected by the CHECK';
+        RETURN;
+    EXCEPTION
+        WHEN OTHERS THEN
+            GET STACKED DIAGNOSTICS tillstand = RETURNED_SQLSTATE, msg = MESSAGE_TEXT;
+    END;
+
+    IF tillstand = '23514' AND msg LIKE '%validera_geom_ejvalid_y%' THEN
+        RAISE NOTICE 'TEST G35 PASSED: trigger skipped unchanged geom, CHECK rejected the invalid row';
+    ELSE
+        RAISE WARNING 'TEST G35 FAILED: expected check_violation from validera_geom_ejvalid_y, got %: %', tillstand, msg;
+    END IF;
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE WARNING 'TEST G35 FAILED: UPDATE of a valid row rejected: %', SQLERRM;
+END $$;
+
+-- G36a: the invalid row makes VALIDATE CONSTRAINT fail – job kept with the error
+CALL public.kor_uppskjuten_omstrukturering();
+
+DO $$
+DECLARE
+    jobb      record;
+    validerad boolean;
+BEGIN
+    IF public.hex_installning('geometrivalidering', 'trigger_och_check') <> 'trigger_och_check' THEN
+        RAISE NOTICE 'TEST G36a INFO: skipped – geometrivalidering = trigger';
+        RETURN;
+    END IF;
+
+    SELECT forsok, senaste_fel INTO jobb FROM public.hex_uppskjuten_omstrukturering
+    WHERE schema_namn = 'sk1_kba_geomtest' AND tabell_namn = 'ejvalid_y' AND atgard = 'validera_constraint';
+    SELECT convalidated INTO validerad FROM pg_constraint
+    WHERE conrelid = 'sk1_kba_geomtest.ejvalid_y'::regclass AND conname = 'validera_geom_ejvalid_y';
+
+    IF jobb.forsok = 1 AND jobb.senaste_fel IS NOT NULL AND validerad = false THEN
+        RAISE NOTICE 'TEST G36a PASSED: VALIDATE failed on the invalid row, job kept (senaste_fel: %)', left(jobb.senaste_fel, 80);
+    ELSE
+        RAISE WARNING 'TEST G36a FAILED: forsok=%, senaste_fel=%, convalidated=%', jobb.forsok, jobb.senaste_fel, validerad;
+    END IF;
+END $$;
+
+-- G36b: fix the data (granska_geometrier finds it) and run the queue again
+DELETE FROM sk1_kba_geomtest.ejvalid_y
+WHERE gid IN (SELECT g.gid FROM public.granska_geometrier('sk1_kba_geomtest', 'ejvalid_y') g);
+
+CALL public.kor_uppskjuten_omstrukturering();
+
+DO $$
+DECLARE
+    validerad boolean;
+BEGIN
+    IF public.hex_installning('geometrivalidering', 'trigger_och_check') <> 'trigger_och_check' THEN
+        RAISE NOTICE 'TEST G36b INFO: skipped – geometrivalidering = trigger';
+        RETURN;
+    END IF;
+
+    SELECT convalidated INTO validerad FROM pg_constraint
+    WHERE conrelid = 'sk1_kba_geomtest.ejvalid_y'::regclass AND conname = 'validera_geom_ejvalid_y';
+
+    IF validerad AND NOT EXISTS (
+        SELECT 1 FROM public.hex_uppskjuten_omstrukturering
+        WHERE schema_namn = 'sk1_kba_geomtest' AND tabell_namn = 'ejvalid_y'
+    ) THEN
+        RAISE NOTICE 'TEST G36b PASSED: validera_geom_ejvalid_y validated by kor_uppskjuten_omstrukturering, job removed';
+    ELSE
+        RAISE WARNING 'TEST G36b FAILED: convalidated=%, job still queued=%', validerad,
+            EXISTS (SELECT 1 FROM public.hex_uppskjuten_omstrukturering
+                    WHERE schema_namn = 'sk1_kba_geomtest' AND tabell_namn = 'ejvalid_y');
+    END IF;
+END $$;
+
+-- ============================================================
+-- G37–G39: geometrivalidering = 'trigger' (trigger only, no CHECK)
+-- The table starts with a CHECK and a queued validera_constraint job; the
+-- setting is restored afterwards.
+-- ============================================================
+CREATE TEMP TABLE g_installningar AS
+SELECT nyckel, varde, beskrivning FROM public.hex_installningar
+WHERE nyckel = 'geometrivalidering';
+
+CREATE TABLE sk1_kba_geomtest.endast_y (
+    naam text,
+    geom geometry(Polygon, 3006)
+);
+
+DO $$
+BEGIN
+    PERFORM set_config('temp.reorganization_in_progress', 'true', true);
+    PERFORM public.skapa_geometrivalidering('sk1_kba_geomtest', 'endast_y', 'trigger_och_check', false);
+    INSERT INTO public.hex_uppskjuten_omstrukturering (schema_namn, tabell_namn, atgard, constraint_namn)
+    VALUES ('sk1_kba_geomtest', 'endast_y', 'validera_constraint', 'validera_geom_endast_y')
+    ON CONFLICT ON CONSTRAINT hex_uppskjuten_omstrukturering_pkey DO NOTHING;
+END $$;
+
+INSERT INTO public.hex_installningar (nyckel, varde)
+VALUES ('geometrivalidering', 'trigger')
+ON CONFLICT (nyckel) DO UPDATE SET varde = EXCLUDED.varde;
+
+-- G37: switch the table to trigger-only validation
+DO $$
+DECLARE
+    antal       integer;
+    har_check   boolean;
+    trigger_ok  boolean;
+    har_jobb    boolean;
+BEGIN
+    PERFORM set_config('temp.reorganization_in_progress', 'true', true);
+    antal := public.skapa_geometrivalidering('sk1_kba_geomtest', 'endast_y');
+
+    SELECT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = 'sk1_kba_geomtest.endast_y'::regclass AND conname = 'validera_geom_endast_y'
+    ) INTO har_check;
+
+    SELECT EXISTS (
+        SELECT 1 FROM pg_trigger t
+        JOIN pg_attribute a ON a.attrelid = t.tgrelid AND a.attname = 'geom'
+        WHERE t.tgrelid = 'sk1_kba_geomtest.endast_y'::regclass
+          AND t.tgname = 'hex_kontrollera_geom'
+          AND t.tgenabled <> 'D'
+          AND t.tgattr::int2[] = ARRAY[a.attnum]
+    ) INTO trigger_ok;
+
+    SELECT EXISTS (
+        SELECT 1 FROM public.hex_uppskjuten_omstrukturering
+        WHERE schema_namn = 'sk1_kba_geomtest' AND tabell_namn = 'endast_y'
+          AND atgard = 'validera_constraint'
+    ) INTO har_jobb;
+
+    IF antal = 1 AND NOT har_check AND trigger_ok AND NOT har_jobb THEN
+        RAISE NOTICE 'TEST G37 PASSED: validera_geom_endast_y dropped, hex_kontrollera_geom (UPDATE OF geom) kept, job deleted';
+    ELSE
+        RAISE WARNING 'TEST G37 FAILED: changed=% (expected 1), check=%, trigger UPDATE OF geom=%, job queued=%',
+            antal, har_check, trigger_ok, har_jobb;
+    END IF;
+END $$;
+
+-- G38: invalid geometry rejected without a CHECK constraint
+DO $$
+DECLARE
+    tillstand text;
+    msg       text;
+BEGIN
+    INSERT INTO sk1_kba_geomtest.endast_y (naam, geom)
+    VALUES ('ogiltig', ST_GeomFromText('POLYGON((0 0,100 100,100 0,0 100,0 0))', 3006));
+    RAISE WARNING 'TEST G38 FAILED: invalid geometry accepted in trigger-only mode';
+EXCEPTION
+    WHEN OTHERS THEN
+        GET STACKED DIAGNOSTICS tillstand = RETURNED_SQLSTATE, msg = MESSAGE_TEXT;
+        IF tillstand = 'P0001' AND msg LIKE 'Ogiltig geometri i tabellen "endast_y"%' THEN
+            RAISE NOTICE 'TEST G38 PASSED: rejected by hex_kontrollera_geom alone: %', left(msg, 80);
+        ELSE
+            RAISE WARNING 'TEST G38 FAILED: expected the trigger''s exception, got %: %', tillstand, msg;
+        END IF;
+END $$;
+
+-- G39: underhall_hex() removes a CHECK that exists in trigger-only mode
+DO $$
+BEGIN
+    PERFORM set_config('temp.reorganization_in_progress', 'true', true);
+    PERFORM public.skapa_geometrivalidering('sk1_kba_geomtest', 'endast_y', 'trigger_och_check', false);
+END $$;
+
+DO $$
+DECLARE
+    resultat  text;
+    har_check boolean;
+BEGIN
+    SELECT u.atgard INTO resultat
+    FROM public.underhall_hex() u
+    WHERE u.schema_namn = 'sk1_kba_geomtest'
+      AND u.tabell_namn = 'endast_y'
+      AND u.trigger_namn = 'hex_kontrollera_geom';
+
+    SELECT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = 'sk1_kba_geomtest.endast_y'::regclass AND conname = 'validera_geom_endast_y'
+    ) INTO har_check;
+
+    IF resultat = 'uppdaterad' AND NOT har_check THEN
+        RAISE NOTICE 'TEST G39 PASSED: underhall_hex removed validera_geom_endast_y (uppdaterad)';
+    ELSE
+        RAISE WARNING 'TEST G39 FAILED: atgard=% (expected uppdaterad), check still present=%', resultat, har_check;
+    END IF;
+END $$;
+
+DELETE FROM public.hex_installningar WHERE nyckel = 'geometrivalidering';
+INSERT INTO public.hex_installningar (nyckel, varde, beskrivning)
+SELECT nyckel, varde, beskrivning FROM g_installningar;
+DROP TABLE g_installningar;
+
 -- ============================================================
 -- Cleanup
 -- ============================================================
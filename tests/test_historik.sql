@@ -0,0 +1,371 @@
+-- ============================================================
+-- HEX HISTORIK TEST SUITE — GROUP H
+--
+-- H  Historik i satsläge (hex_installning('historik_trigger') = 'sats')
+--    H1  Radtrigger BEFORE UPDATE + satstriggrar _qa_u/_qa_d skapas
+--    H2  UPDATE av flera rader: andrad_tidpunkt/andrad_av sätts på varje
+--        rad och varje rads gamla version hamnar i historiken
+--    H3  DELETE av flera rader: en D-rad per rad, andrad_av = session_user
+--    H4  vaxla_qa_triggrar(false/true) stänger av/på alla tre triggers
+--
+-- P  Tidspartitionerad historik (historik_partitionering = 'manad',
+--    historik_index = 'brin')
+--    P1  <tabell>_h är partitionerad: _pdefault + innevarande och två
+--        kommande månader
+--    P2  Historikrader hamnar i rätt partition (innevarande månad; gamla
+--        h_tidpunkt i standardpartitionen)
+--    P3  <tabell>_h_gid_idx (btree) och <tabell>_h_brin (BRIN på
+--        h_tidpunkt) finns, inget <tabell>_h_idx
+--
+-- Schema used: sk1_kba_histtest (gallringsregeln för schemat tas bort efteråt)
+-- Convention: NOTICE = PASSED/INFO, WARNING = FAILED/BUG CONFIRMED
+-- ============================================================
+
+\echo ''
+\echo '============================================================'
+\echo 'HEX HISTORIK TEST SUITE'
+\echo '============================================================'
+
+-- ============================================================
+-- Cleanup and setup
+-- ============================================================
+DROP SCHEMA IF EXISTS sk1_kba_histtest CASCADE;
+CREATE SCHEMA sk1_kba_histtest;
+
+CREATE TEMP TABLE h_installningar AS
+SELECT nyckel, varde, beskrivning FROM public.hex_installningar
+WHERE nyckel IN ('historik_trigger', 'historik_partitionering', 'historik_index');
+
+INSERT INTO public.hex_installningar (nyckel, varde)
+VALUES ('historik_trigger', 'sats')
+ON CONFLICT (nyckel) DO UPDATE SET varde = EXCLUDED.varde;
+
+\echo ''
+\echo '--- GROUP H: historik i satsläge ---'
+
+CREATE TABLE sk1_kba_histtest.sats_tabell (
+    namn text
+);
+
+INSERT INTO sk1_kba_histtest.sats_tabell (namn)
+VALUES ('ett'), ('två'), ('tre'), ('fyra');
+
+-- ============================================================
+-- H1: Triggers i satsläge
+-- ============================================================
+DO $$
+DECLARE
+    triggrar text[];
+BEGIN
+    SELECT array_agg(t.tgname::text || ':' || CASE WHEN (t.tgtype & 1) = 1 THEN 'rad' ELSE 'sats' END
+                     ORDER BY t.tgname)
+    INTO triggrar
+    FROM pg_trigger t
+    JOIN pg_proc p ON p.oid = t.tgfoid
+    WHERE t.tgrelid = 'sk1_kba_histtest.sats_tabell'::regclass
+      AND p.proname = 'trg_fn_sats_tabell_qa';
+
+    IF triggrar = ARRAY['trg_sats_tabell_qa:rad', 'trg_sats_tabell_qa_d:sats', 'trg_sats_tabell_qa_u:sats'] THEN
+        RAISE NOTICE 'TEST H1 PASSED: satsläge – %', triggrar;
+    ELSE
+        RAISE WARNING 'TEST H1 FAILED: förväntade en radtrigger och två satstriggrar, fick %', triggrar;
+    END IF;
+END $$;
+
+-- ============================================================
+-- H2: UPDATE av flera rader i en sats
+-- QA-kolumnerna sätts först till gamla värden med triggrarna avstängda.
+-- (Rekursionsflaggan hindrar hantera_kolumntillagg från att reagera på
+-- vaxla_qa_triggrar:s ALTER TABLE, som i kor_uppskjuten_omstrukturering.)
+-- ============================================================
+DO $$
+DECLARE
+    andrade     integer;
+    historik    integer;
+    gamla_av    integer;
+BEGIN
+    PERFORM set_config('temp.reorganization_in_progress', 'true', true);
+    PERFORM public.vaxla_qa_triggrar('sk1_kba_histtest.sats_tabell'::regclass, false);
+    UPDATE sk1_kba_histtest.sats_tabell
+    SET andrad_tidpunkt = now() - interval '1 day', andrad_av = 'gammal';
+    PERFORM public.vaxla_qa_triggrar('sk1_kba_histtest.sats_tabell'::regclass, true);
+
+    UPDATE sk1_kba_histtest.sats_tabell SET namn = namn || '!' WHERE namn IN ('ett', 'två', 'tre');
+
+    SELECT count(*) INTO andrade FROM sk1_kba_histtest.sats_tabell
+    WHERE namn LIKE '%!' AND andrad_tidpunkt = now() AND andrad_av = session_user;
+
+    SELECT count(*), count(*) FILTER (WHERE andrad_av = 'gammal')
+    INTO historik, gamla_av
+    FROM sk1_kba_histtest.sats_tabell_h
+    WHERE h_typ = 'U';
+
+    IF andrade = 3 AND historik = 3 AND gamla_av = 3
+       AND EXISTS (SELECT 1 FROM sk1_kba_histtest.sats_tabell WHERE namn = 'fyra' AND andrad_av = 'gammal') THEN
+        RAISE NOTICE 'TEST H2 PASSED: 3 rader fick andrad_tidpunkt/andrad_av, 3 U-rader med gamla värden i historiken';
+    ELSE
+        RAISE WARNING 'TEST H2 FAILED: ändrade rader med QA-värden=%, U-rader=%, varav med gamla andrad_av=%',
+            andrade, historik, gamla_av;
+    END IF;
+END $$;
+
+-- ============================================================
+-- H3: DELETE av flera rader i en sats
+-- ============================================================
+DO $$
+DECLARE
+    borttagna integer;
+    med_qa    integer;
+BEGIN
+    DELETE FROM sk1_kba_histtest.sats_tabell WHERE namn IN ('ett!', 'två!');
+
+    SELECT count(*), count(*) FILTER (WHERE andrad_av = session_user AND andrad_tidpunkt = now())
+    INTO borttagna, med_qa
+    FROM sk1_kba_histtest.sats_tabell_h
+    WHERE h_typ = 'D';
+
+    IF borttagna = 2 AND med_qa = 2 THEN
+        RAISE NOTICE 'TEST H3 PASSED: 2 D-rader med andrad_av = session_user';
+    ELSE
+        RAISE WARNING 'TEST H3 FAILED: D-rader=%, med QA-värden=%', borttagna, med_qa;
+    END IF;
+END $$;
+
+-- ============================================================
+-- H4: vaxla_qa_triggrar stänger av och på rad- och satstriggrar
+-- ============================================================
+DO $$
+DECLARE
+    avstangda   integer;
+    igen        integer;
+    pastangda   integer;
+    fore        bigint;
+    under       bigint;
+    efter       bigint;
+    av_under    text;
+BEGIN
+    PERFORM set_config('temp.reorganization_in_progress', 'true', true);
+    SELECT count(*) INTO fore FROM sk1_kba_histtest.sats_tabell_h;
+
+    avstangda := public.vaxla_qa_triggrar('sk1_kba_histtest.sats_tabell'::regclass, false);
+    igen := public.vaxla_qa_triggrar('sk1_kba_histtest.sats_tabell'::regclass, false);
+
+    UPDATE sk1_kba_histtest.sats_tabell SET andrad_av = 'omstrukturering' WHERE namn = 'fyra';
+    DELETE FROM sk1_kba_histtest.sats_tabell WHERE namn = 'tre!';
+    SELECT count(*) INTO under FROM sk1_kba_histtest.sats_tabell_h;
+    SELECT andrad_av INTO av_under FROM sk1_kba_histtest.sats_tabell WHERE namn = 'fyra';
+
+    pastangda := public.vaxla_qa_triggrar('sk1_kba_histtest.sats_tabell'::regclass, true);
+
+    UPDATE sk1_kba_histtest.sats_tabell SET namn = 'fyra!' WHERE namn = 'fyra';
+    SELECT count(*) INTO efter FROM sk1_kba_histtest.sats_tabell_h;
+
+    IF avstangda = 3 AND igen = 0 AND pastangda = 3
+       AND under = fore AND av_under = 'omstrukturering'
+       AND efter = fore + 1 THEN
+        RAISE NOTICE 'TEST H4 PASSED: 3 triggers av (ingen historik, QA-kolumner orörda) och på igen';
+    ELSE
+        RAISE WARNING 'TEST H4 FAILED: av=%, av igen=%, på=%, historik före/under/efter=%/%/%, andrad_av under=%',
+            avstangda, igen, pastangda, fore, under, efter, av_under;
+    END IF;
+END $$;
+
+-- ============================================================
+-- GROUP P: tidspartitionerad historik med BRIN-index
+-- ============================================================
+\echo ''
+\echo '--- GROUP P: partitionerad historik ---'
+
+INSERT INTO public.hex_installningar (nyckel, varde)
+VALUES ('historik_trigger', 'rad'), ('historik_partitionering', 'manad'), ('historik_index', 'brin')
+ON CONFLICT (nyckel) DO UPDATE SET varde = EXCLUDED.varde;
+
+CREATE TABLE sk1_kba_histtest.part_tabell (
+    namn text
+);
+
+INSERT INTO sk1_kba_histtest.part_tabell (namn) VALUES ('a'), ('b');
+
+-- ============================================================
+-- P1: Partitioner
+-- ============================================================
+DO $$
+DECLARE
+    partitioner text[];
+    forvantade  text[];
+BEGIN
+    SELECT array_agg(c.relname::text ORDER BY c.relname) INTO partitioner
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'sk1_kba_histtest.part_tabell_h'::regclass;
+
+    SELECT array_agg(n ORDER BY n) INTO forvantade
+    FROM (
+        SELECT 'part_tabell_h_p' || to_char(date_trunc('month', now()) + make_interval(months => m), 'YYYYMM') AS n
+        FROM generate_series(0, 2) m
+        UNION ALL
+        SELECT 'part_tabell_h_pdefault'
+    ) f;
+
+    IF (SELECT relkind FROM pg_class WHERE oid = 'sk1_kba_histtest.part_tabell_h'::regclass) = 'p'
+       AND partitioner = forvantade THEN
+        RAISE NOTICE 'TEST P1 PASSED: partitionerad historiktabell med %', partitioner;
+    ELSE
+        RAISE WARNING 'TEST P1 FAILED: partitioner %, förväntade %', partitioner, forvantade;
+    END IF;
+END $$;
+
+-- ============================================================
+-- P2: Routning av historikrader
+-- ============================================================
+DO $$
+DECLARE
+    aktuell   text;
+    gammal    text;
+BEGIN
+    UPDATE sk1_kba_histtest.part_tabell SET namn = 'a2' WHERE namn = 'a';
+
+    SELECT tableoid::regclass::text INTO aktuell
+    FROM sk1_kba_histtest.part_tabell_h WHERE namn = 'a';
+
+    -- En rad med tidpunkt före alla skapade partitioner
+    INSERT INTO sk1_kba_histtest.part_tabell_h (h_typ, h_tidpunkt, h_av, gid, namn)
+    VALUES ('U', now() - interval '2 years', 'test', -1, 'gammal');
+
+    SELECT tableoid::regclass::text INTO gammal
+    FROM sk1_kba_histtest.part_tabell_h WHERE namn = 'gammal';
+
+    IF aktuell = 'sk1_kba_histtest.part_tabell_h_p' || to_char(now(), 'YYYYMM')
+       AND gammal = 'sk1_kba_histtest.part_tabell_h_pdefault' THEN
+        RAISE NOTICE 'TEST P2 PASSED: ny historikrad i %, gammal i %', aktuell, gammal;
+    ELSE
+        RAISE WARNING 'TEST P2 FAILED: ny historikrad i %, gammal i %', aktuell, gammal;
+    END IF;
+END $$;
+
+-- ============================================================
+-- P3: Indexstrategi brin
+-- ============================================================
+DO $$
+DECLARE
+    index_typer text[];
+BEGIN
+    SELECT array_agg(c.relname::text || ':' || am.amname ORDER BY c.relname) INTO index_typer
+    FROM pg_index x
+    JOIN pg_class c ON c.oid = x.indexrelid
+    JOIN pg_am am ON am.oid = c.relam
+    WHERE x.indrelid = 'sk1_kba_histtest.part_tabell_h'::regclass;
+
+    IF index_typer = ARRAY['part_tabell_h_brin:brin', 'part_tabell_h_gid_idx:btree'] THEN
+        RAISE NOTICE 'TEST P3 PASSED: index %', index_typer;
+    ELSE
+        RAISE WARNING 'TEST P3 FAILED: index % (förväntade BRIN på h_tidpunkt + btree på gid)', index_typer;
+    END IF;
+END $$;
+
+-- ============================================================
+-- GROUP R: gallra_historik
+-- Regel: sk1_kba_histtest, 30 dagar, radera.
+-- ============================================================
+\echo ''
+\echo '--- GROUP R: gallra_historik ---'
+
+INSERT INTO public.hex_installningar (nyckel, varde)
+VALUES ('historik_partitionering', 'ingen'), ('historik_index', 'btree')
+ON CONFLICT (nyckel) DO UPDATE SET varde = EXCLUDED.varde;
+
+CREATE TABLE sk1_kba_histtest.gallra_tabell (
+    namn text
+);
+
+-- 3 rader äldre än 30 dagar, 2 nyare
+INSERT INTO sk1_kba_histtest.gallra_tabell_h (h_typ, h_tidpunkt, h_av, gid, namn)
+VALUES ('U', now() - interval '100 days', 'test', 1, 'gammal_1'),
+       ('U', now() - interval '60 days',  'test', 1, 'gammal_2'),
+       ('D', now() - interval '31 days',  'test', 2, 'gammal_3'),
+       ('U', now() - interval '29 days',  'test', 1, 'ny_1'),
+       ('U', now() - interval '1 day',    'test', 3, 'ny_2');
+
+-- Partitionerad: en månadspartition tre år bakåt, helt före gränsen
+-- (skapas förbi hantera_ny_tabell)
+DO $$
+DECLARE
+    start timestamptz := date_trunc('month', now() - interval '3 years');
+BEGIN
+    PERFORM set_config('temp.tabellstrukturering_pagar', 'true', true);
+    EXECUTE format(
+        'CREATE TABLE sk1_kba_histtest.%I PARTITION OF sk1_kba_histtest.part_tabell_h FOR VALUES FROM (%L) TO (%L)',
+        'part_tabell_h_p' || to_char(start, 'YYYYMM'), start, start + interval '1 month');
+END $$;
+
+INSERT INTO sk1_kba_histtest.part_tabell_h (h_typ, h_tidpunkt, h_av, gid, namn)
+VALUES ('U', now() - interval '3 years', 'test', -2, 'mycket_gammal'),
+       ('U', now() - interval '1 day',   'test', -3, 'ny');
+
+CREATE TEMP TABLE r_gammal_partition AS
+SELECT 'part_tabell_h_p' || to_char(date_trunc('month', now() - interval '3 years'), 'YYYYMM') AS namn;
+
+INSERT INTO public.hex_historik_gallring (schema_prefix, tabell_namn, bevara_dagar, atgard, beskrivning)
+VALUES ('sk1_kba_histtest', '', 30, 'radera', 'test_historik.sql')
+ON CONFLICT (schema_prefix, tabell_namn) DO UPDATE
+    SET bevara_dagar = EXCLUDED.bevara_dagar, atgard = EXCLUDED.atgard;
+
+CALL public.gallra_historik(2, 'sk1_kba_histtest');
+
+-- ============================================================
+-- R1: Vanlig historiktabell
+-- ============================================================
+DO $$
+DECLARE
+    kvar text[];
+BEGIN
+    SELECT array_agg(namn ORDER BY namn) INTO kvar FROM sk1_kba_histtest.gallra_tabell_h;
+
+    IF kvar = ARRAY['ny_1', 'ny_2'] THEN
+        RAISE NOTICE 'TEST R1 PASSED: 3 gamla rader raderade, kvar: %', kvar;
+    ELSE
+        RAISE WARNING 'TEST R1 FAILED: kvar i gallra_tabell_h: % (förväntade ny_1, ny_2)', kvar;
+    END IF;
+END $$;
+
+-- ============================================================
+-- R2: Partitionerad historiktabell
+-- ============================================================
+DO $$
+DECLARE
+    kvar        text[];
+    partitioner integer;
+BEGIN
+    SELECT array_agg(namn ORDER BY namn) INTO kvar FROM sk1_kba_histtest.part_tabell_h;
+
+    SELECT count(*) INTO partitioner
+    FROM pg_inherits i
+    WHERE i.inhparent = 'sk1_kba_histtest.part_tabell_h'::regclass;
+
+    IF kvar = ARRAY['a', 'ny']
+       AND to_regclass('sk1_kba_histtest.' || (SELECT namn FROM r_gammal_partition)) IS NULL
+       AND partitioner = 4 THEN
+        RAISE NOTICE 'TEST R2 PASSED: gammal partition borttagen, gammal rad i standardpartitionen raderad, kvar: %', kvar;
+    ELSE
+        RAISE WARNING 'TEST R2 FAILED: kvar i part_tabell_h: %, partitioner: %, gammal partition finns: %',
+            kvar, partitioner,
+            to_regclass('sk1_kba_histtest.' || (SELECT namn FROM r_gammal_partition)) IS NOT NULL;
+    END IF;
+END $$;
+
+DROP TABLE r_gammal_partition;
+DELETE FROM public.hex_historik_gallring WHERE schema_prefix = 'sk1_kba_histtest';
+
+-- ============================================================
+-- Cleanup
+-- ============================================================
+DELETE FROM public.hex_installningar WHERE nyckel IN ('historik_trigger', 'historik_partitionering', 'historik_index');
+INSERT INTO public.hex_installningar (nyckel, varde, beskrivning)
+SELECT nyckel, varde, beskrivning FROM h_installningar;
+DROP TABLE h_installningar;
+
+DROP SCHEMA IF EXISTS sk1_kba_histtest CASCADE;
+
+\echo ''
+\echo 'HEX HISTORIK COMPLETE'
+\echo 'NOTICE = PASSED/INFO,  WARNING = FAILED/BUG CONFIRMED'
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Test: install_hex.upgrade() - uppgradering på plats mot hex_version, samt
+att ohanterade outbox-händelser följer med vid ominstallation.
+
+Databasen ersätts av mockade anslutningar/markörer som registrerar alla
+execute()-anrop. SQL-filerna läses från en temporär katalog (base_path) där
+varje fil i INSTALL_ORDER innehåller en igenkännbar kommentar.
+
+Kör med:
+    python3 tests/test_install_hex.py
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from psycopg2 import sql as pgsql
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import install_hex  # noqa: E402
+
+
+DB = {
+    "host": "localhost",
+    "port": 5432,
+    "dbname": "testdb",
+    "user": "testuser",
+    "password": "testpass",
+    "owner_role": None,
+}
+
+
+def _file_sql(name):
+    return f"-- fil: {name}\nSELECT 1;\n"
+
+
+def _checksum(sql):
+    return install_hex._checksum(install_hex.process_sql(sql, DB["owner_role"]))
+
+
+class TestUpgrade(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmp.name)
+        for name in install_hex.INSTALL_ORDER:
+            path = self.base / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(_file_sql(name), encoding="utf-8")
+        (self.base / install_hex.MIGRATIONS_DIR).mkdir(parents=True, exist_ok=True)
+
+        # Allt installerat och oförändrat
+        self.recorded = {name: _checksum(_file_sql(name)) for name in install_hex.INSTALL_ORDER}
+        self.executed = []
+        self.fail_on = None
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    # -----------------------------------------------------------------------
+    # Hjälpare
+    # -----------------------------------------------------------------------
+    def _add_migration(self, filename, recorded=False):
+        rel = f"{install_hex.MIGRATIONS_DIR}/{filename}"
+        sql = f"-- migrering: {rel}\nSELECT 1;\n"
+        (self.base / rel).write_text(sql, encoding="utf-8")
+        if recorded:
+            self.recorded[rel] = _checksum(sql)
+        return rel
+
+    def _run(self):
+        """Kör upgrade() med två mockade anslutningar: kontroll + uppgradering."""
+        check_cur = MagicMock()
+        check_cur.fetchone.return_value = (1,)  # hex_version och hex_metadata finns
+        check_conn = MagicMock()
+        check_conn.cursor.return_value = check_cur
+
+        cur = MagicMock()
+        last_sql = []
+
+        def execute(sql, params=None):
+            if self.fail_on and self.fail_on in sql:
+                raise RuntimeError("syntaxfel")
+            last_sql[:] = [sql]
+            self.executed.append((sql, params))
+
+        def fetchall():
+            if "FROM public.hex_version" in last_sql[0]:
+                return list(self.recorded.items())
+            return []
+
+        cur.execute.side_effect = execute
+        cur.fetchall.side_effect = fetchall
+        self.conn = MagicMock()
+        self.conn.cursor.return_value = cur
+
+        with patch.object(install_hex.psycopg2, "connect", side_effect=[check_conn, self.conn]):
+            with patch("builtins.print"):
+                install_hex.upgrade(DB, base_path=str(self.base))
+
+    def _applied(self, marker):
+        """Filer/migreringar vars SQL kördes, i körordning."""
+        prefix = f"-- {marker}: "
+        return [sql.split("\n", 1)[0][len(prefix):]
+                for sql, _ in self.executed if sql.startswith(prefix)]
+
+    def _versions(self):
+        """(komponent, typ) för varje registrering i hex_version, i ordning."""
+        return [(params[0], params[1]) for sql, params in self.executed
+                if sql.startswith("INSERT INTO public.hex_version")]
+
+    def _maintenance_run(self):
+        return any("underhall_hex()" in sql for sql, _ in self.executed)
+
+    # -----------------------------------------------------------------------
+    # Tester
+    # -----------------------------------------------------------------------
+    def test_noop_when_checksums_match(self):
+        """Oförändrade kontrollsummor: inga filer körs, inget underhåll."""
+        self._add_migration("001_klar.sql", recorded=True)
+
+        self._run()
+
+        self.assertEqual(self._applied("fil"), [])
+        self.assertEqual(self._applied("migrering"), [])
+        self.assertEqual(self._versions(), [])
+        self.assertFalse(self._maintenance_run())
+        self.conn.commit.assert_called_once()
+        self.conn.rollback.assert_not_called()
+
+    def test_changed_files_reapplied_in_install_order(self):
+        """Ändrade och nya filer körs om i INSTALL_ORDER-ordning och registreras."""
+        order = install_hex.INSTALL_ORDER
+        self.recorded[order[5]] = "gammal"
+        self.recorded[order[1]] = "gammal"
+        del self.recorded[order[-1]]
+
+        self._run()
+
+        expected = [order[1], order[5], order[-1]]
+        self.assertEqual(self._applied("fil"), expected)
+        self.assertEqual(self._versions(), [(name, "fil") for name in expected])
+        self.assertTrue(self._maintenance_run())
+        self.conn.rollback.assert_not_called()
+
+    def test_migrations_run_in_name_order_before_files(self):
+        """Nya migreringar körs i namnordning, en gång, före ändrade filer."""
+        done = self._add_migration("001_klar.sql", recorded=True)
+        self.recorded[done] = "ändrad efter körning"  # körs inte igen
+        second = self._add_migration("010_andra.sql")
+        first = self._add_migration("002_forsta.sql")
+        self._add_migration("readme.sql")  # inte NNN_ - ingen migrering
+        self.recorded[install_hex.INSTALL_ORDER[0]] = "gammal"
+
+        self._run()
+
+        self.assertEqual(self._applied("migrering"), [first, second])
+        self.assertEqual(self._versions(), [
+            (first, "migrering"),
+            (second, "migrering"),
+            (install_hex.INSTALL_ORDER[0], "fil"),
+        ])
+        first_file = next(i for i, (sql, _) in enumerate(self.executed) if sql.startswith("-- fil: "))
+        last_migration = max(i for i, (sql, _) in enumerate(self.executed) if sql.startswith("-- migrering: "))
+        self.assertLess(last_migration, first_file)
+
+    def test_rollback_on_failure(self):
+        """Ett fel i en fil rullar tillbaka hela uppgraderingen och kastas vidare."""
+        order = install_hex.INSTALL_ORDER
+        self.recorded[order[2]] = "gammal"
+        self.recorded[order[3]] = "gammal"
+        self.fail_on = f"-- fil: {order[3]}"
+
+        with self.assertRaises(RuntimeError):
+            self._run()
+
+        self.assertEqual(self._applied("fil"), [order[2]])
+        self.conn.rollback.assert_called_once()
+        self.conn.commit.assert_not_called()
+        self.conn.close.assert_called_once()
+        self.assertFalse(self._maintenance_run())
+
+
+def _sql_text(query):
+    """Sammansatt psycopg2.sql-objekt som text (utan anslutning)."""
+    if isinstance(query, pgsql.Composed):
+        return "".join(_sql_text(part) for part in query.seq)
+    if isinstance(query, pgsql.Identifier):
+        return ".".join(f'"{s}"' for s in query.strings)
+    if isinstance(query, pgsql.Placeholder):
+        return f"%({query.name})s"
+    return query.string
+
+
+class TestPreserveOutbox(unittest.TestCase):
+    """hex_geoserver_handelser: bara ohanterade händelser sparas, i köordning."""
+
+    TABLE = "hex_geoserver_handelser"
+    COLUMNS = {"id", "schema_namn", "handelse", "skapad", "last_till",
+               "forsok", "behandlad", "senaste_fel"}
+
+    def setUp(self):
+        user_data = {self.TABLE: install_hex.PRESERVE_USER_DATA[self.TABLE]}
+        for patcher in (
+            patch.object(install_hex, "PRESERVE_CONFIG", {}),
+            patch.object(install_hex, "PRESERVE_USER_DATA", user_data),
+            patch.object(install_hex, "_table_exists", return_value=True),
+            patch.object(install_hex, "_table_columns", return_value=self.COLUMNS),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.cur = MagicMock()
+
+    def test_snapshot_selects_pending_events_in_order(self):
+        self.cur.fetchall.return_value = [("sk0_ext_a", "skapa", None, 2, "timeout")]
+
+        snapshot = install_hex.snapshot_settings(self.cur)
+
+        query = _sql_text(self.cur.execute.call_args[0][0])
+        self.assertTrue(query.endswith("WHERE behandlad IS NULL ORDER BY id"), query)
+        for col in ("id", "behandlad", "last_till"):
+            self.assertNotIn(f'"{col}"', query)
+        self.assertEqual(snapshot[self.TABLE]["rows"], self.cur.fetchall.return_value)
+
+    def test_restore_reinserts_events_in_snapshot_order(self):
+        cols = install_hex.PRESERVE_USER_DATA[self.TABLE]
+        rows = [("sk0_ext_b", "skapa", None, 0, None), ("sk0_ext_a", "ta_bort", None, 1, None)]
+        snapshot = {self.TABLE: {"rows": rows, "cols": cols}}
+
+        install_hex.restore_settings(self.cur, snapshot)
+
+        inserted = [params["schema_namn"] for _, params in
+                    (c[0] for c in self.cur.execute.call_args_list)]
+        self.assertEqual(inserted, ["sk0_ext_b", "sk0_ext_a"])
+        query = _sql_text(self.cur.execute.call_args_list[0][0][0])
+        self.assertTrue(query.startswith('INSERT INTO public."hex_geoserver_handelser"'), query)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
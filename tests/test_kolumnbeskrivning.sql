@@ -0,0 +1,183 @@
+-- ============================================================
+-- HEX KOLUMNBESKRIVNING TEST SUITE — GROUP T
+--
+-- T  hamta_kolumnbeskrivning (pg_attribute i stället för information_schema)
+--    T1  Samma namn, position, typ, kollation, DEFAULT och NOT NULL som
+--        information_schema.columns och format_type() – för varchar(n),
+--        numeric(p,s), COLLATE "C", geometry(PolygonZ,3007) och med en
+--        borttagen kolumn i tabellen
+--    T2  ADD COLUMN: hantera_kolumntillagg steg 6 lägger till kolumnerna i
+--        historiktabellen med samma typ (inkl. typmod) och kollation
+--    T3  Historiktabell som skapas av skapa_historik_qa har samma typer och
+--        kollationer som modertabellen
+--
+-- Schema used: sk1_kba_kolbesk
+-- Convention: NOTICE = PASSED/INFO, WARNING = FAILED/BUG CONFIRMED
+-- ============================================================
+
+\echo ''
+\echo '============================================================'
+\echo 'HEX KOLUMNBESKRIVNING TEST SUITE'
+\echo '============================================================'
+
+-- ============================================================
+-- Cleanup and setup
+-- Kolumnerna med typmod/kollation läggs till med ALTER TABLE: CREATE TABLE
+-- byggs om av hantera_ny_tabell med typnamn utan typmod.
+-- ============================================================
+DROP SCHEMA IF EXISTS sk1_kba_kolbesk CASCADE;
+CREATE SCHEMA sk1_kba_kolbesk;
+
+CREATE TABLE sk1_kba_kolbesk.typer_y (
+    namn text,
+    tas_bort integer,
+    geom geometry(PolygonZ, 3007)
+);
+
+ALTER TABLE sk1_kba_kolbesk.typer_y
+    ADD COLUMN kod varchar(12),
+    ADD COLUMN belopp numeric(10,2) NOT NULL DEFAULT 0,
+    ADD COLUMN sortnamn text COLLATE "C";
+
+ALTER TABLE sk1_kba_kolbesk.typer_y DROP COLUMN tas_bort;
+
+\echo ''
+\echo '--- GROUP T: hamta_kolumnbeskrivning ---'
+
+-- ============================================================
+-- T1: Jämförelse med information_schema.columns och format_type()
+-- ============================================================
+DO $$
+DECLARE
+    avvikelser  integer;
+    kolumner    integer;
+    borttagna   integer;
+    typer       text[];
+    kollation   text;
+BEGIN
+    WITH k AS (
+        SELECT * FROM public.hamta_kolumnbeskrivning('sk1_kba_kolbesk.typer_y'::regclass)
+    ),
+    i AS (
+        SELECT c.column_name::text AS kolumnnamn, c.ordinal_position::integer AS attnum,
+               c.udt_name::text AS typnamn,
+               CASE WHEN c.collation_name IS NOT NULL
+                    THEN format('%I.%I', c.collation_schema, c.collation_name) END AS kollation,
+               c.column_default::text AS standardvarde,
+               c.generation_expression::text AS genereringsuttryck,
+               c.is_nullable = 'NO' AS not_null
+        FROM information_schema.columns c
+        WHERE c.table_schema = 'sk1_kba_kolbesk' AND c.table_name = 'typer_y'
+    ),
+    a AS (
+        SELECT attname::text AS kolumnnamn, format_type(atttypid, atttypmod) AS datatyp
+        FROM pg_attribute
+        WHERE attrelid = 'sk1_kba_kolbesk.typer_y'::regclass AND attnum > 0 AND NOT attisdropped
+    )
+    SELECT count(*) FILTER (
+               WHERE k.kolumnnamn IS NULL OR i.kolumnnamn IS NULL
+                  OR k.attnum <> i.attnum
+                  OR k.typnamn <> i.typnamn
+                  OR k.datatyp IS DISTINCT FROM a.datatyp
+                  OR k.kollation IS DISTINCT FROM i.kollation
+                  OR k.standardvarde IS DISTINCT FROM i.standardvarde
+                  OR k.genereringsuttryck IS DISTINCT FROM i.genereringsuttryck
+                  OR k.not_null <> i.not_null),
+           count(*)
+    INTO avvikelser, kolumner
+    FROM k
+    FULL JOIN i ON i.kolumnnamn = k.kolumnnamn
+    LEFT JOIN a ON a.kolumnnamn = COALESCE(k.kolumnnamn, i.kolumnnamn);
+
+    SELECT count(*) INTO borttagna
+    FROM pg_attribute
+    WHERE attrelid = 'sk1_kba_kolbesk.typer_y'::regclass AND attisdropped;
+
+    SELECT array_agg(k.kolumnnamn || ' ' || k.datatyp ORDER BY k.kolumnnamn)
+    INTO typer
+    FROM public.hamta_kolumnbeskrivning('sk1_kba_kolbesk.typer_y'::regclass) k
+    WHERE k.kolumnnamn IN ('kod', 'belopp', 'geom');
+
+    SELECT k.kollation INTO kollation
+    FROM public.hamta_kolumnbeskrivning('sk1_kba_kolbesk.typer_y'::regclass) k
+    WHERE k.kolumnnamn = 'sortnamn';
+
+    IF avvikelser = 0 AND kolumner > 0 AND borttagna > 0
+       AND typer = ARRAY['belopp numeric(10,2)', 'geom geometry(PolygonZ,3007)', 'kod character varying(12)']
+       AND kollation = 'pg_catalog."C"' THEN
+        RAISE NOTICE 'TEST T1 PASSED: % kolumner överensstämmer med information_schema (% borttagen/na i tabellen)',
+            kolumner, borttagna;
+    ELSE
+        RAISE WARNING 'TEST T1 FAILED: avvikelser=% av %, borttagna=%, typer=%, kollation(sortnamn)=%',
+            avvikelser, kolumner, borttagna, typer, kollation;
+    END IF;
+END $$;
+
+-- ============================================================
+-- T2: Kolumner tillagda i historiktabellen av hantera_kolumntillagg
+-- ============================================================
+DO $$
+DECLARE
+    avvikelser text[];
+BEGIN
+    SELECT array_agg(format('%s: %s%s / %s%s', m.kolumnnamn,
+               m.datatyp, COALESCE(' ' || m.kollation, ''),
+               COALESCE(h.datatyp, 'saknas'), COALESCE(' ' || h.kollation, ''))
+           ORDER BY m.attnum)
+    INTO avvikelser
+    FROM public.hamta_kolumnbeskrivning('sk1_kba_kolbesk.typer_y'::regclass) m
+    LEFT JOIN public.hamta_kolumnbeskrivning('sk1_kba_kolbesk.typer_y_h'::regclass) h
+           ON h.kolumnnamn = m.kolumnnamn
+    WHERE m.kolumnnamn IN ('kod', 'belopp', 'sortnamn')
+      AND (h.kolumnnamn IS NULL
+           OR h.datatyp <> m.datatyp
+           OR h.kollation IS DISTINCT FROM m.kollation);
+
+    IF avvikelser IS NULL THEN
+        RAISE NOTICE 'TEST T2 PASSED: kod, belopp och sortnamn har samma typ och kollation i typer_y_h';
+    ELSE
+        RAISE WARNING 'TEST T2 FAILED: moder / historik skiljer sig: %', avvikelser;
+    END IF;
+END $$;
+
+-- ============================================================
+-- T3: skapa_historik_qa bygger historiktabellen från hamta_kolumnbeskrivning
+-- Historiktabellen tas bort och skapas om med rekursionsflaggan satt, som
+-- när hantera_ny_tabell anropar skapa_historik_qa.
+-- ============================================================
+DO $$
+DECLARE
+    skapad      boolean;
+    avvikelser  text[];
+BEGIN
+    PERFORM set_config('temp.tabellstrukturering_pagar', 'true', true);
+    DROP TABLE sk1_kba_kolbesk.typer_y_h;
+    skapad := public.skapa_historik_qa('sk1_kba_kolbesk', 'typer_y');
+
+    SELECT array_agg(format('%s: %s%s / %s%s', m.kolumnnamn,
+               m.datatyp, COALESCE(' ' || m.kollation, ''),
+               COALESCE(h.datatyp, 'saknas'), COALESCE(' ' || h.kollation, ''))
+           ORDER BY m.attnum)
+    INTO avvikelser
+    FROM public.hamta_kolumnbeskrivning('sk1_kba_kolbesk.typer_y'::regclass) m
+    LEFT JOIN public.hamta_kolumnbeskrivning('sk1_kba_kolbesk.typer_y_h'::regclass) h
+           ON h.kolumnnamn = m.kolumnnamn
+    WHERE h.kolumnnamn IS NULL
+       OR h.datatyp <> m.datatyp
+       OR h.kollation IS DISTINCT FROM m.kollation;
+
+    IF skapad AND avvikelser IS NULL THEN
+        RAISE NOTICE 'TEST T3 PASSED: skapa_historik_qa gav samma typer och kollationer som modertabellen';
+    ELSE
+        RAISE WARNING 'TEST T3 FAILED: skapad=%, moder / historik skiljer sig: %', skapad, avvikelser;
+    END IF;
+END $$;
+
+-- ============================================================
+-- Cleanup
+-- ============================================================
+DROP SCHEMA IF EXISTS sk1_kba_kolbesk CASCADE;
+
+\echo ''
+\echo 'HEX KOLUMNBESKRIVNING COMPLETE'
+\echo 'NOTICE = PASSED/INFO,  WARNING = FAILED/BUG CONFIRMED'
@@ -0,0 +1,370 @@
+-- ============================================================
+-- HEX OMSTRUKTURERING TEST SUITE — GROUP O
+--
+-- O  Kolumnflytt (flytta_kolumner_sist)
+--    O1  ADD COLUMN: standardkolumner + geom flyttas med EN omskrivning
+--        (en UPDATE per rad, inte en per flyttad kolumn)
+--    O2  Kolumner som redan ligger sist: ingen omskrivning alls
+--    O3  kolumnordning = 'logisk': ADD COLUMN flyttar ingenting
+--    O4  Långa kolumnnamn med samma 54 första tecken får olika
+--        temporära namn (och krockar inte med befintlig _temp0001)
+--    O5  En kolumn som inte går att flytta hindrar inte de övriga
+--
+-- Q  Uppskjuten omstrukturering (hex_uppskjuten_omstrukturering +
+--    kor_uppskjuten_omstrukturering) på en stor _kba_-tabell
+--    Q1  ADD COLUMN registrerar ett kolumnordning-jobb – ingen flytt i ALTER TABLE
+--    Q2  CALL flyttar geom sist; GiST-index, hex_kontrollera_geom och
+--        validera_geom_<tabell> (NOT VALID + validera_constraint-jobb) finns kvar
+--    Q3  Nästa CALL validerar constrainten och tömmer kön för tabellen
+--
+-- Schemas used: sk1_ext_omstr, sk1_kba_omstr
+-- Convention: NOTICE = PASSED/INFO, WARNING = FAILED/BUG CONFIRMED
+-- ============================================================
+
+\echo ''
+\echo '============================================================'
+\echo 'HEX OMSTRUKTURERING TEST SUITE'
+\echo '============================================================'
+
+-- ============================================================
+-- Cleanup and setup
+-- ============================================================
+DROP SCHEMA IF EXISTS sk1_ext_omstr CASCADE;
+CREATE SCHEMA sk1_ext_omstr;
+
+\echo ''
+\echo '--- GROUP O: flytta_kolumner_sist ---'
+
+-- ============================================================
+-- O1: ADD COLUMN → skapad_tidpunkt + geom flyttas i en omskrivning
+-- ALTER TABLE körs via EXECUTE i samma transaktion som mätningen, så att
+-- pg_stat_get_xact_tuples_updated ser UPDATE-satserna från hantera_kolumntillagg.
+-- ============================================================
+CREATE TABLE sk1_ext_omstr.rader_p (
+    namn text,
+    geom geometry(Point, 3007)
+);
+
+INSERT INTO sk1_ext_omstr.rader_p (namn, geom)
+SELECT 'punkt_' || i, ST_SetSRID(ST_MakePoint(i, i), 3007)
+FROM generate_series(1, 10) i;
+
+DO $$
+DECLARE
+    antal_rader   bigint;
+    fore          bigint;
+    uppdaterade   bigint;
+    sista         text[];
+BEGIN
+    SELECT count(*) INTO antal_rader FROM sk1_ext_omstr.rader_p;
+    fore := pg_stat_get_xact_tuples_updated('sk1_ext_omstr.rader_p'::regclass);
+
+    EXECUTE 'ALTER TABLE sk1_ext_omstr.rader_p ADD COLUMN extra text';
+
+    uppdaterade := pg_stat_get_xact_tuples_updated('sk1_ext_omstr.rader_p'::regclass) - fore;
+
+    SELECT array_agg(attname::text ORDER BY attnum) INTO sista
+    FROM (
+        SELECT attname, attnum FROM pg_attribute
+        WHERE attrelid = 'sk1_ext_omstr.rader_p'::regclass AND attnum > 0 AND NOT attisdropped
+        ORDER BY attnum DESC LIMIT 3
+    ) s;
+
+    IF sista = ARRAY['extra', 'skapad_tidpunkt', 'geom'] AND uppdaterade = antal_rader THEN
+        RAISE NOTICE 'TEST O1 PASSED: % rader, % radversioner – två kolumner flyttade med en omskrivning (%)',
+            antal_rader, uppdaterade, sista;
+    ELSE
+        RAISE WARNING 'TEST O1 FAILED: sista kolumner %, % uppdaterade radversioner för % rader (förväntat lika många)',
+            sista, uppdaterade, antal_rader;
+    END IF;
+END $$;
+
+-- ============================================================
+-- O2: Kolumnerna ligger redan sist → 0, ingen UPDATE
+-- ============================================================
+DO $$
+DECLARE
+    fore    bigint;
+    antal   integer;
+BEGIN
+    PERFORM set_config('temp.reorganization_in_progress', 'true', true);
+    fore := pg_stat_get_xact_tuples_updated('sk1_ext_omstr.rader_p'::regclass);
+
+    antal := public.flytta_kolumner_sist('sk1_ext_omstr', 'rader_p',
+        ARRAY['skapad_tidpunkt', 'geom'], ARRAY['timestamptz', 'geometry(Point,3007)']);
+
+    IF antal = 0 AND pg_stat_get_xact_tuples_updated('sk1_ext_omstr.rader_p'::regclass) = fore THEN
+        RAISE NOTICE 'TEST O2 PASSED: kolumnerna låg redan sist – ingen omskrivning';
+    ELSE
+        RAISE WARNING 'TEST O2 FAILED: flytta_kolumner_sist returnerade % / uppdaterade rader', antal;
+    END IF;
+END $$;
+
+-- ============================================================
+-- O3: kolumnordning = 'logisk' → ADD COLUMN lämnar ny kolumn sist
+-- ============================================================
+CREATE TABLE sk1_ext_omstr.logisk_p (
+    namn text,
+    geom geometry(Point, 3007)
+);
+
+CREATE TEMP TABLE o3_installning AS
+SELECT varde FROM public.hex_installningar WHERE nyckel = 'kolumnordning';
+
+UPDATE public.hex_installningar SET varde = 'logisk' WHERE nyckel = 'kolumnordning';
+
+ALTER TABLE sk1_ext_omstr.logisk_p ADD COLUMN extra text;
+
+DO $$
+DECLARE
+    sista   text;
+    antal_temp integer;
+BEGIN
+    SELECT attname INTO sista FROM pg_attribute
+    WHERE attrelid = 'sk1_ext_omstr.logisk_p'::regclass AND attnum > 0 AND NOT attisdropped
+    ORDER BY attnum DESC LIMIT 1;
+    SELECT count(*) INTO antal_temp FROM pg_attribute
+    WHERE attrelid = 'sk1_ext_omstr.logisk_p'::regclass AND attname ~ '_temp[0-9]{4}$' AND NOT attisdropped;
+
+    IF sista = 'extra' AND antal_temp = 0 THEN
+        RAISE NOTICE 'TEST O3 PASSED: kolumnordning = logisk – extra ligger sist, geom flyttades inte';
+    ELSE
+        RAISE WARNING 'TEST O3 FAILED: sista kolumn %, temporära kolumner %', sista, antal_temp;
+    END IF;
+END $$;
+
+-- Återställ inställningen
+UPDATE public.hex_installningar
+SET varde = (SELECT varde FROM o3_installning)
+WHERE nyckel = 'kolumnordning';
+DROP TABLE o3_installning;
+
+-- ============================================================
+-- O4: Temporära namn kapas till 54 tecken – två kolumner med samma
+-- början (och en befintlig kolumn med det första kandidatnamnet)
+-- ============================================================
+CREATE TABLE sk1_ext_omstr.langa_p (
+    kort text,
+    xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx_forsta text,
+    xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx_andra text,
+    xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx_temp0001 text,
+    geom geometry(Point, 3007)
+);
+
+INSERT INTO sk1_ext_omstr.langa_p (
+    kort,
+    xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx_forsta,
+    xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx_andra,
+    xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx_temp0001,
+    geom)
+VALUES ('k', 'ett', 'två', 'fälla', ST_SetSRID(ST_MakePoint(1, 1), 3007));
+
+DO $$
+DECLARE
+    prefix  text := repeat('x', 54);
+    antal   integer;
+    sista   text[];
+    varden  text[];
+BEGIN
+    PERFORM set_config('temp.reorganization_in_progress', 'true', true);
+
+    antal := public.flytta_kolumner_sist('sk1_ext_omstr', 'langa_p',
+        ARRAY[prefix || '_forsta', prefix || '_andra'], ARRAY['text', 'text']);
+
+    SELECT array_agg(attname::text ORDER BY attnum) INTO sista
+    FROM (
+        SELECT attname, attnum FROM pg_attribute
+        WHERE attrelid = 'sk1_ext_omstr.langa_p'::regclass AND attnum > 0 AND NOT attisdropped
+        ORDER BY attnum DESC LIMIT 2
+    ) s;
+
+    EXECUTE format('SELECT ARRAY[%I, %I, %I] FROM sk1_ext_omstr.langa_p WHERE kort = %L',
+        prefix || '_forsta', prefix || '_andra', prefix || '_temp0001', 'k')
+    INTO varden;
+
+    IF antal = 2
+       AND sista = ARRAY[prefix || '_forsta', prefix || '_andra']
+       AND varden = ARRAY['ett', 'två', 'fälla'] THEN
+        RAISE NOTICE 'TEST O4 PASSED: båda långa kolumnerna flyttade, data och befintlig _temp0001-kolumn intakta';
+    ELSE
+        RAISE WARNING 'TEST O4 FAILED: antal=%, sista=%, värden=%', antal, sista, varden;
+    END IF;
+END $$;
+
+-- ============================================================
+-- O5: Definitionen för "namn" passar inte dess data (text → integer).
+-- Den samlade flytten misslyckas; "nummer" flyttas ändå och "namn"
+-- blir kvar oförändrad.
+-- ============================================================
+CREATE TABLE sk1_ext_omstr.isolering_p (
+    namn   text,
+    nummer integer,
+    sist   text,
+    geom   geometry(Point, 3007)
+);
+
+INSERT INTO sk1_ext_omstr.isolering_p (namn, nummer, sist, geom)
+VALUES ('abc', 7, 'z', ST_SetSRID(ST_MakePoint(1, 1), 3007));
+
+DO $$
+DECLARE
+    antal   integer;
+    sista   text;
+    rad     record;
+    antal_temp integer;
+BEGIN
+    PERFORM set_config('temp.reorganization_in_progress', 'true', true);
+
+    antal := public.flytta_kolumner_sist('sk1_ext_omstr', 'isolering_p',
+        ARRAY['namn', 'nummer'], ARRAY['integer', 'integer']);
+
+    SELECT attname INTO sista FROM pg_attribute
+    WHERE attrelid = 'sk1_ext_omstr.isolering_p'::regclass AND attnum > 0 AND NOT attisdropped
+    ORDER BY attnum DESC LIMIT 1;
+    SELECT count(*) INTO antal_temp FROM pg_attribute
+    WHERE attrelid = 'sk1_ext_omstr.isolering_p'::regclass AND attname ~ '_temp[0-9]{4}$' AND NOT attisdropped;
+    SELECT namn, nummer INTO rad FROM sk1_ext_omstr.isolering_p WHERE sist = 'z';
+
+    IF antal = 1 AND sista = 'nummer' AND antal_temp = 0 AND rad.namn = 'abc' AND rad.nummer = 7 THEN
+        RAISE NOTICE 'TEST O5 PASSED: nummer flyttad trots att namn inte kunde flyttas, data intakt';
+    ELSE
+        RAISE WARNING 'TEST O5 FAILED: antal=%, sista=%, temporära=%, rad=%', antal, sista, antal_temp, rad;
+    END IF;
+END $$;
+
+-- ============================================================
+-- GROUP Q: uppskjuten omstrukturering
+-- omstrukturering_max_bytes = 1 gör varje tabell med data "stor".
+-- ============================================================
+\echo ''
+\echo '--- GROUP Q: hex_uppskjuten_omstrukturering / kor_uppskjuten_omstrukturering ---'
+
+DROP SCHEMA IF EXISTS sk1_kba_omstr CASCADE;
+CREATE SCHEMA sk1_kba_omstr;
+
+CREATE TABLE sk1_kba_omstr.stor_y (
+    namn text,
+    geom geometry(Polygon, 3006)
+);
+
+INSERT INTO sk1_kba_omstr.stor_y (namn, geom)
+SELECT 'yta_' || i,
+       ST_GeomFromText(format('POLYGON((%s 0,%s 0,%s 10,%s 10,%s 0))', i * 20, i * 20 + 10, i * 20 + 10, i * 20, i * 20), 3006)
+FROM generate_series(1, 50) i;
+
+CREATE TEMP TABLE q_installning AS
+SELECT nyckel, varde, beskrivning FROM public.hex_installningar
+WHERE nyckel = 'omstrukturering_max_bytes';
+
+INSERT INTO public.hex_installningar (nyckel, varde)
+VALUES ('omstrukturering_max_bytes', '1')
+ON CONFLICT (nyckel) DO UPDATE SET varde = EXCLUDED.varde;
+
+ALTER TABLE sk1_kba_omstr.stor_y ADD COLUMN extra text;
+
+-- ============================================================
+-- Q1: Jobbet registreras, tabellen skrivs inte om i ALTER TABLE
+-- ============================================================
+DO $$
+DECLARE
+    jobb_kolumner text[];
+    sista         text;
+BEGIN
+    SELECT kolumner INTO jobb_kolumner
+    FROM public.hex_uppskjuten_omstrukturering
+    WHERE schema_namn = 'sk1_kba_omstr' AND tabell_namn = 'stor_y' AND atgard = 'kolumnordning';
+
+    SELECT attname INTO sista FROM pg_attribute
+    WHERE attrelid = 'sk1_kba_omstr.stor_y'::regclass AND attnum > 0 AND NOT attisdropped
+    ORDER BY attnum DESC LIMIT 1;
+
+    IF 'geom' = ANY(jobb_kolumner) AND sista = 'extra' THEN
+        RAISE NOTICE 'TEST Q1 PASSED: kolumnordning-jobb registrerat (%), extra ligger sist tills vidare', jobb_kolumner;
+    ELSE
+        RAISE WARNING 'TEST Q1 FAILED: jobbets kolumner=%, sista kolumn=%', jobb_kolumner, sista;
+    END IF;
+END $$;
+
+CALL public.kor_uppskjuten_omstrukturering();
+
+-- ============================================================
+-- Q2: geom flyttad – index, trigger och constraint återskapade
+-- ============================================================
+DO $$
+DECLARE
+    sista        text;
+    har_gist     boolean;
+    trigger_def  text;
+    validerad    boolean;
+    vill_check   boolean := public.hex_installning('geometrivalidering', 'trigger_och_check') = 'trigger_och_check';
+    kvar         integer;
+BEGIN
+    SELECT attname INTO sista FROM pg_attribute
+    WHERE attrelid = 'sk1_kba_omstr.stor_y'::regclass AND attnum > 0 AND NOT attisdropped
+    ORDER BY attnum DESC LIMIT 1;
+
+    SELECT EXISTS (
+        SELECT 1 FROM pg_indexes
+        WHERE schemaname = 'sk1_kba_omstr' AND tablename = 'stor_y' AND indexdef LIKE '%USING gist%'
+    ) INTO har_gist;
+
+    SELECT pg_get_triggerdef(t.oid) INTO trigger_def FROM pg_trigger t
+    WHERE t.tgrelid = 'sk1_kba_omstr.stor_y'::regclass AND t.tgname = 'hex_kontrollera_geom';
+
+    SELECT convalidated INTO validerad FROM pg_constraint
+    WHERE conrelid = 'sk1_kba_omstr.stor_y'::regclass AND conname = 'validera_geom_stor_y';
+
+    SELECT count(*) INTO kvar FROM public.hex_uppskjuten_omstrukturering
+    WHERE schema_namn = 'sk1_kba_omstr' AND tabell_namn = 'stor_y' AND atgard = 'kolumnordning';
+
+    IF sista = 'geom' AND har_gist AND trigger_def LIKE '%UPDATE OF geom%' AND kvar = 0
+       AND (NOT vill_check OR (validerad = false AND EXISTS (
+               SELECT 1 FROM public.hex_uppskjuten_omstrukturering
+               WHERE schema_namn = 'sk1_kba_omstr' AND tabell_namn = 'stor_y'
+                 AND atgard = 'validera_constraint' AND constraint_namn = 'validera_geom_stor_y'))) THEN
+        RAISE NOTICE 'TEST Q2 PASSED: geom sist, GiST-index och trigger finns, constraint NOT VALID med validera_constraint-jobb';
+    ELSE
+        RAISE WARNING 'TEST Q2 FAILED: sista=%, gist=%, trigger=%, convalidated=%, kvarvarande kolumnordning-jobb=%',
+            sista, har_gist, trigger_def, validerad, kvar;
+    END IF;
+END $$;
+
+CALL public.kor_uppskjuten_omstrukturering();
+
+-- ============================================================
+-- Q3: validera_constraint-jobbet körs – kön tom för tabellen
+-- ============================================================
+DO $$
+DECLARE
+    validerad  boolean;
+    vill_check boolean := public.hex_installning('geometrivalidering', 'trigger_och_check') = 'trigger_och_check';
+    kvar       integer;
+BEGIN
+    SELECT convalidated INTO validerad FROM pg_constraint
+    WHERE conrelid = 'sk1_kba_omstr.stor_y'::regclass AND conname = 'validera_geom_stor_y';
+
+    SELECT count(*) INTO kvar FROM public.hex_uppskjuten_omstrukturering
+    WHERE schema_namn = 'sk1_kba_omstr' AND tabell_namn = 'stor_y';
+
+    IF kvar = 0 AND (NOT vill_check OR validerad) THEN
+        RAISE NOTICE 'TEST Q3 PASSED: constrainten validerad, inga jobb kvar för stor_y';
+    ELSE
+        RAISE WARNING 'TEST Q3 FAILED: convalidated=%, kvarvarande jobb=%', validerad, kvar;
+    END IF;
+END $$;
+
+-- Återställ inställningen
+DELETE FROM public.hex_installningar WHERE nyckel = 'omstrukturering_max_bytes';
+INSERT INTO public.hex_installningar (nyckel, varde, beskrivning)
+SELECT nyckel, varde, beskrivning FROM q_installning;
+DROP TABLE q_installning;
+
+-- ============================================================
+-- Cleanup
+-- ============================================================
+DROP SCHEMA IF EXISTS sk1_ext_omstr CASCADE;
+DROP SCHEMA IF EXISTS sk1_kba_omstr CASCADE;
+
+\echo ''
+\echo 'HEX OMSTRUKTURERING COMPLETE'
+\echo 'NOTICE = PASSED/INFO,  WARNING = FAILED/BUG CONFIRMED'
@@ -198,6 +198,13 @@ class TestHandlerLogicWithMockGeoServer(unittest.TestCase):
     hex_role_credentials-tabell.
     """
 
+    def setUp(self):
+        """Tom mönstercache så att varje test laddar mönstret via sin egen pg_conn-mock."""
+        gl._schema_patterns.invalidate()
+
+    def tearDown(self):
+        gl._schema_patterns.invalidate()
+
     def _make_gs_mock(self, workspace_ok=True, datastore_ok=True, role_ok=True, acl_ok=True):
         """Returnerar en GeoServerClient-mock med konfigurerbart utfall."""
         gs = MagicMock()
@@ -217,7 +224,7 @@ class TestHandlerLogicWithMockGeoServer(unittest.TestCase):
 
         Cursor-mocken svarar konsekvent på de tre DB-anrop som
         handle_schema_notification gör via pg_conn.cursor():
-          1. _load_schema_pattern   – fetchall x2 (returnerar []: behåller befintligt mönster)
+          1. _load_schema_pattern   – fetchall x2 (returnerar []: fallback-mönstret används)
           2. _fetch_anonymous_read  – fetchone   (returnerar (anonym_las,))
         """
         cur_mock = MagicMock()
@@ -269,10 +276,11 @@ class TestHandlerLogicWithMockGeoServer(unittest.TestCase):
 
     def test_create_handler_accepts_new_prefix_after_runtime_config_change(self):
         """
-        Regression: skx_kba_test publiceras inte om SCHEMA_PATTERN inte
-        uppdaterats sedan tjänsten startade. handle_schema_notification ska
-        ladda om mönstret från DB via pg_conn.cursor() innan validering så
-        att ett nytt prefix (skx) accepteras utan omstart.
+        Regression: skx_kba_test publiceras inte om mönstret inte
+        uppdaterats sedan tjänsten startade. Efter en ogiltigförklaring
+        (CHANNEL_SCHEMA_CONFIG) ska handle_schema_notification ladda mönstret
+        från DB via pg_conn.cursor() innan validering så att ett nytt prefix
+        (skx) accepteras utan omstart.
         """
         gs = self._make_gs_mock()
 
@@ -289,15 +297,11 @@ class TestHandlerLogicWithMockGeoServer(unittest.TestCase):
         mock_conn = MagicMock()
         mock_conn.cursor.return_value.__enter__.return_value = cur_mock
 
-        original_pattern = gl.SCHEMA_PATTERN
-        try:
-            with patch.object(gl, "_fetch_role_credentials",
-                              return_value=("r_skx_kba_test", "pw")):
-                result = gl.handle_schema_notification(
-                    "skx_kba_test", DB_CONFIG, mock_conn, gs
-                )
-        finally:
-            gl.SCHEMA_PATTERN = original_pattern
+        with patch.object(gl, "_fetch_role_credentials",
+                          return_value=("r_skx_kba_test", "pw")):
+            result = gl.handle_schema_notification(
+                "skx_kba_test", DB_CONFIG, mock_conn, gs
+            )
 
         self.assertTrue(result, "skx_kba_test ska accepteras när mönstret laddats om från DB")
         gs.create_workspace.assert_called_once_with("skx_kba_test")
@@ -421,10 +425,9 @@ class TestHandlerLogicWithMockGeoServer(unittest.TestCase):
 
     def test_drop_handler_accepts_new_prefix_after_runtime_config_change(self):
         """
-        Regression: DROP-notifiering för skx_kba_test avvisas om SCHEMA_PATTERN
-        är inaktuellt (t.ex. överskrivit av en annan DB-tråd utan skx).
-        handle_schema_removal_notification ska ladda om mönstret via pg_conn
-        innan validering.
+        Regression: DROP-notifiering för skx_kba_test avvisades när en annan
+        DB-tråd (utan skx) skrev över ett gemensamt mönster. Mönstret cachas nu
+        per databas, så en annan databas mönster påverkar inte valideringen.
         """
         gs = self._make_gs_mock()
 
@@ -441,16 +444,16 @@ class TestHandlerLogicWithMockGeoServer(unittest.TestCase):
         # so __enter__.return_value must be the configured cursor mock.
         mock_conn.cursor.return_value.__enter__.return_value = cur_mock
 
-        original_pattern = gl.SCHEMA_PATTERN
-        try:
-            # Sätt ett inaktuellt mönster som saknar skx (simulerar överskrivning
-            # från en annan DB-tråd)
-            gl.SCHEMA_PATTERN = __import__("re").compile(r"^(sk0|sk1)_(ext|kba|sys)_.+$")
-            result = gl.handle_schema_removal_notification(
-                "skx_kba_test", gs, pg_conn=mock_conn
-            )
-        finally:
-            gl.SCHEMA_PATTERN = original_pattern
+        # En annan databas har ett cachat mönster som saknar skx
+        other_cur = MagicMock()
+        other_cur.fetchall.side_effect = [[("sk1",)], [("ext",), ("kba",), ("sys",)]]
+        other_conn = MagicMock()
+        other_conn.cursor.return_value.__enter__.return_value = other_cur
+        gl._schema_patterns.get("geodata_sk1", other_conn)
+
+        result = gl.handle_schema_removal_notification(
+            "skx_kba_test", gs, pg_conn=mock_conn, db_label="geodata_sk0"
+        )
 
         self.assertTrue(result, "skx_kba_test ska accepteras när mönstret laddats om från DB")
         gs.delete_workspace.assert_called_once_with("skx_kba_test")
@@ -816,7 +819,7 @@ class TestCreateWorkspaceAcl(unittest.TestCase):
 
     def test_create_acl_409_wrong_role_is_repaired(self):
         """
-        409 → GET visar felaktig roll → DELETE gammal + POST ny regel.
+        409 → GET visar felaktig roll → regeln korrigeras med en PUT.
 
         Exempel: regeln pekar på ROLE_AUTHENTICATED istället för r_sk0_kba_test.
         Utan den här reparationen skulle GeoServer fortsätta använda fel roll.
@@ -831,8 +834,7 @@ class TestCreateWorkspaceAcl(unittest.TestCase):
             with patch.object(client, "get_acl_rules", return_value=wrong_rules):
                 with patch.object(client, "_request_with_retry") as mock_req:
                     mock_req.side_effect = [
-                        self._mock_response(200),   # DELETE gammal regel
-                        self._mock_response(201),   # POST ny korrekt regel
+                        self._mock_response(200),   # PUT med korrekt roll
                     ]
                     result = client._ensure_acl_rules("sk0_kba_test", {
                         "sk0_kba_test.*.r": "r_sk0_kba_test",
@@ -841,12 +843,65 @@ class TestCreateWorkspaceAcl(unittest.TestCase):
 
         self.assertTrue(result)
         calls = mock_req.call_args_list
-        # DELETE för felaktig regel
-        self.assertEqual(calls[0][0][0], "DELETE")
-        self.assertIn("sk0_kba_test.*.r", calls[0][0][1])
-        # POST med korrekt roll
-        self.assertEqual(calls[1][0][0], "POST")
-        self.assertEqual(calls[1][1]["json"], {"sk0_kba_test.*.r": "r_sk0_kba_test"})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0][0][0], "PUT")
+        self.assertEqual(calls[0][1]["json"], {"sk0_kba_test.*.r": "r_sk0_kba_test"})
+
+    def test_sync_acl_rules_batches_all_workspaces(self):
+        """Saknade regler för många workspaces skickas i en POST, felaktiga i en PUT."""
+        client = self._make_client()
+        expected = {}
+        for i in range(50):
+            expected.update(gl._expected_acl_rules(f"sk0_kba_ws{i}"))
+        current = dict(expected)
+        current["sk0_kba_ws0.*.r"] = "ROLE_AUTHENTICATED"
+        for i in range(1, 50):
+            del current[f"sk0_kba_ws{i}.*.r"]
+
+        with patch.object(client, "_request_with_retry",
+                          return_value=self._mock_response(201)) as mock_req:
+            failed = client.sync_acl_rules(expected, current)
+
+        self.assertEqual(failed, set())
+        self.assertEqual([c.args[0] for c in mock_req.call_args_list], ["POST", "PUT"])
+        self.assertEqual(len(mock_req.call_args_list[0].kwargs["json"]), 49)
+        self.assertEqual(mock_req.call_args_list[1].kwargs["json"],
+                         {"sk0_kba_ws0.*.r": "r_sk0_kba_ws0"})
+        self.assertEqual(current, expected)
+
+    def test_sync_acl_rules_splits_into_batches(self):
+        """Fler regler än ACL_BATCH_SIZE delas upp i flera block."""
+        client = self._make_client()
+        client.ACL_BATCH_SIZE = 10
+        expected = {}
+        for i in range(12):
+            expected.update(gl._expected_acl_rules(f"sk0_kba_ws{i}"))
+
+        with patch.object(client, "_request_with_retry",
+                          return_value=self._mock_response(201)) as mock_req:
+            client.sync_acl_rules(expected, {})
+
+        self.assertEqual([len(c.kwargs["json"]) for c in mock_req.call_args_list], [10, 10, 4])
+
+    def test_sync_acl_rules_rejected_batch_falls_back_to_single_rules(self):
+        """Avvisat block (409) → reglerna skrivs en och en; befintlig regel PUT:as."""
+        client = self._make_client()
+        expected = gl._expected_acl_rules("sk0_kba_test")
+
+        def respond(method, url, json=None):
+            if method == "POST" and len(json) > 1:
+                return self._mock_response(409)
+            if method == "POST" and "sk0_kba_test.*.w" in json:
+                return self._mock_response(409, "already exists")
+            return self._mock_response(200)
+
+        current = {}
+        with patch.object(client, "_request_with_retry", side_effect=respond) as mock_req:
+            failed = client.sync_acl_rules(expected, current)
+
+        self.assertEqual(failed, set())
+        self.assertEqual(current, expected)
+        self.assertIn("PUT", [c.args[0] for c in mock_req.call_args_list])
 
     def test_create_acl_404_already_exists_geoserver_quirk(self):
         """
@@ -1089,6 +1144,174 @@ class TestCreatePgDatastore(unittest.TestCase):
         mock_put.assert_called_once()
 
 
+class TestDatastoreFingerprintCache(unittest.TestCase):
+    """
+    Enhetstester för DatastoreFingerprintCache och hur create_pg_datastore
+    använder den för att hoppa över onödiga PUT:ar.
+    """
+
+    WORKSPACE = "sk0_kba_testschema"
+
+    def _make_client(self, cache):
+        return gl.GeoServerClient(
+            base_url="http://geoserver.example.com",
+            user="admin",
+            password="secret",
+            fingerprint_cache=cache,
+        )
+
+    def _call_create(self, client, password="pw1"):
+        return client.create_pg_datastore(
+            workspace=self.WORKSPACE,
+            store_name=self.WORKSPACE,
+            host="db-host",
+            port=5432,
+            dbname="geodata",
+            schema_name=self.WORKSPACE,
+            pg_user=f"gs_r_{self.WORKSPACE}",
+            pg_password=password,
+        )
+
+    def test_second_call_with_same_credentials_skips_put(self):
+        """Samma uppgifter två gånger → bara första anropet PUT:ar."""
+        client = self._make_client(gl.DatastoreFingerprintCache())
+        with patch.object(client, "_get_datastore_user", return_value=f"gs_r_{self.WORKSPACE}"):
+            with patch.object(client, "_update_pg_datastore", return_value=True) as mock_put:
+                self.assertTrue(self._call_create(client))
+                self.assertTrue(self._call_create(client))
+        mock_put.assert_called_once()
+
+    def test_changed_password_triggers_put(self):
+        """Nytt lösenord i hex_role_credentials → nytt fingeravtryck → PUT."""
+        client = self._make_client(gl.DatastoreFingerprintCache())
+        with patch.object(client, "_get_datastore_user", return_value=f"gs_r_{self.WORKSPACE}"):
+            with patch.object(client, "_update_pg_datastore", return_value=True) as mock_put:
+                self._call_create(client, password="pw1")
+                self._call_create(client, password="pw2")
+        self.assertEqual(mock_put.call_count, 2)
+
+    def test_failed_put_is_not_remembered(self):
+        """Misslyckad PUT sparas inte – nästa avstämning försöker igen."""
+        client = self._make_client(gl.DatastoreFingerprintCache())
+        with patch.object(client, "_get_datastore_user", return_value=f"gs_r_{self.WORKSPACE}"):
+            with patch.object(client, "_update_pg_datastore", side_effect=[False, True]) as mock_put:
+                self.assertFalse(self._call_create(client))
+                self.assertTrue(self._call_create(client))
+        self.assertEqual(mock_put.call_count, 2)
+
+    def test_persisted_cache_survives_restart(self):
+        """Med fil sparas fingeravtrycken och läses in av en ny cache-instans."""
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "datastores.json"
+            client = self._make_client(gl.DatastoreFingerprintCache(path))
+            with patch.object(client, "_get_datastore_user", return_value=f"gs_r_{self.WORKSPACE}"):
+                with patch.object(client, "_update_pg_datastore", return_value=True):
+                    self._call_create(client)
+
+            restarted = self._make_client(gl.DatastoreFingerprintCache(path))
+            with patch.object(restarted, "_get_datastore_user", return_value=f"gs_r_{self.WORKSPACE}"):
+                with patch.object(restarted, "_update_pg_datastore", return_value=True) as mock_put:
+                    self._call_create(restarted)
+            mock_put.assert_not_called()
+
+    def test_delete_workspace_forgets_fingerprint(self):
+        """Borttagen workspace → fingeravtrycket glöms så att ett återskapat schema skrivs."""
+        cache = gl.DatastoreFingerprintCache()
+        cache.set(f"{self.WORKSPACE}/{self.WORKSPACE}", "abc")
+        client = self._make_client(cache)
+        resp = MagicMock()
+        resp.status_code = 200
+        with patch.object(client, "_request_with_retry", return_value=resp):
+            self.assertTrue(client.delete_workspace(self.WORKSPACE))
+        self.assertIsNone(cache.get(f"{self.WORKSPACE}/{self.WORKSPACE}"))
+
+
+class TestGeoServerHttpPool(unittest.TestCase):
+    """
+    Enhetstester för GeoServerHttpPool och retry-logiken i
+    GeoServerClient._request_with_retry.
+    """
+
+    def _make_client(self, pool):
+        return gl.GeoServerClient(
+            base_url="http://geoserver.example.com",
+            user="admin",
+            password="secret",
+            http_pool=pool,
+        )
+
+    def test_sessions_share_one_adapter(self):
+        """Trådlokala sessioner monterar samma adapter (en gemensam keep-alive-pool)."""
+        pool = gl.GeoServerHttpPool(max_connections=3)
+        client = self._make_client(pool)
+        sessions = [client.session]
+        t = threading.Thread(target=lambda: sessions.append(client.session))
+        t.start()
+        t.join()
+
+        self.assertIsNot(sessions[0], sessions[1])
+        for session in sessions:
+            self.assertIs(session.adapters["http://"], pool.adapter)
+            self.assertIs(session.adapters["https://"], pool.adapter)
+
+    def test_concurrency_is_capped(self):
+        """Aldrig fler samtidiga anrop än max_connections."""
+        pool = gl.GeoServerHttpPool(max_connections=2)
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def slow_request(method, url, **kwargs):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return MagicMock(status_code=200)
+
+        session = MagicMock()
+        session.request.side_effect = slow_request
+        threads = [
+            threading.Thread(target=pool.request, args=(session, "GET", "http://gs/rest"))
+            for _ in range(6)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(session.request.call_count, 6)
+        self.assertLessEqual(peak[0], 2)
+
+    def test_transient_error_is_retried(self):
+        """Anslutningsfel → backoff och nytt försök; svaret returneras."""
+        pool = gl.GeoServerHttpPool()
+        client = self._make_client(pool)
+        ok = MagicMock(status_code=200)
+        with patch.object(pool, "request", side_effect=[
+            requests.exceptions.ConnectionError("down"), ok,
+        ]), patch.object(pool, "backoff", return_value=True) as backoff:
+            resp = client._request_with_retry("GET", "http://gs/rest/about/version.json")
+
+        self.assertIs(resp, ok)
+        backoff.assert_called_once_with(client.RETRY_BACKOFF[0])
+
+    def test_stop_event_aborts_backoff(self):
+        """Satt stop_event → inga fler försök, felet propageras direkt."""
+        stop_event = threading.Event()
+        stop_event.set()
+        pool = gl.GeoServerHttpPool(stop_event=stop_event)
+        client = self._make_client(pool)
+        with patch.object(pool, "request",
+                          side_effect=requests.exceptions.ConnectionError("down")) as request:
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                client._request_with_retry("GET", "http://gs/rest/about/version.json")
+
+        self.assertEqual(request.call_count, 1)
+
+
 class TestReconcileGeoServerSchemas(unittest.TestCase):
     """
     Enhetstester för _reconcile_geoserver_schemas – startavstämningen som körs
@@ -1102,6 +1325,12 @@ class TestReconcileGeoServerSchemas(unittest.TestCase):
     # Hjälpare
     # ------------------------------------------------------------------
 
+    def setUp(self):
+        gl._schema_patterns.invalidate()
+
+    def tearDown(self):
+        gl._schema_patterns.invalidate()
+
     def _make_cur_mock(self, pg_schema_names):
         """
         Returnerar en mock av en psycopg2-cursor vars fetchall() ger de
@@ -1110,8 +1339,33 @@ class TestReconcileGeoServerSchemas(unittest.TestCase):
         cur = MagicMock()
         cur.fetchall.return_value = [(name,) for name in pg_schema_names]
         cur.connection = MagicMock()   # simulerar cur.connection (vår fix)
+        self._set_conn_answers(cur, {})
         return cur
 
+    # Konfigurationstabellerna som schemanamnsmönstret byggs från (sk0/sk1 × ext/kba/sys)
+    PATTERN_ANSWERS = {
+        "publiceras_geoserver": [("sk0",), ("sk1",)],
+        "standardiserade_datakategorier": [("ext",), ("kba",), ("sys",)],
+    }
+
+    def _set_conn_answers(self, cur, answers):
+        """Låter cur.connection svara på frågor vars SQL innehåller en nyckel i answers.
+
+        Frågorna för schemanamnsmönstret besvaras alltid; övriga frågor ger [].
+        """
+        answers = {**self.PATTERN_ANSWERS, **answers}
+        conn_cur = MagicMock()
+
+        def fetchall():
+            sql = conn_cur.execute.call_args[0][0]
+            for key, rows in answers.items():
+                if key in sql:
+                    return rows
+            return []
+
+        conn_cur.fetchall.side_effect = fetchall
+        cur.connection.cursor.return_value.__enter__.return_value = conn_cur
+
     def _make_gs_mock(self, existing_workspaces=None, get_status=200):
         """
         Returnerar en GeoServerClient-mock vars GET /workspaces.json svarar
@@ -1129,6 +1383,29 @@ class TestReconcileGeoServerSchemas(unittest.TestCase):
         gs._request_with_retry.return_value = get_resp
         return gs
 
+    def _set_gs_state(self, gs, schema_names, roles=None, acl=None):
+        """
+        Konfigurerar bulk-tillståndet (roller + ACL) som diffavstämningen hämtar.
+        Standard: allt är redan korrekt för de angivna scheman.
+        """
+        if roles is None:
+            roles = {r for n in schema_names for r in (f"r_{n}", f"w_{n}")}
+        if acl is None:
+            acl = {}
+            for n in schema_names:
+                acl.update(gl._expected_acl_rules(n))
+        gs.get_gs_roles.return_value = set(roles)
+        gs.get_acl_rules.return_value = dict(acl)
+        gs.sync_acl_rules.return_value = set()
+        gs.dry_run = False
+
+    def _set_credentials(self, cur, schema_names):
+        """Låter cur.connection svara på bulkfrågorna för credentials och anonym_las."""
+        self._set_conn_answers(cur, {
+            "hex_role_credentials": [(f"gs_r_{n}", "pw") for n in schema_names],
+            "anonym_las": [],
+        })
+
     DB_CONFIG = {
         "host": "localhost",
         "port": 5432,
@@ -1155,29 +1432,80 @@ class TestReconcileGeoServerSchemas(unittest.TestCase):
     def test_existing_schema_refreshes_datastore_credentials(self):
         """
         Schema finns i både PG och GeoServer → workspace skapas inte igen men
-        create_pg_datastore anropas för att uppdatera lösenordet.
-
-        Förut hoppades befintliga scheman över helt under startavstämning.
-        Nu körs handle_schema_notification för alla scheman (idempotent) så att
-        lösenordsändringar efter ominstallation slår igenom vid omstart av tjänsten.
+        create_pg_datastore anropas med uppgifterna från bulkfrågan så att
+        lösenordsändringar efter ominstallation slår igenom.
+        Roller och ACL som redan är korrekta skrivs inte.
         """
         cur = self._make_cur_mock(["sk0_kba_testschema"])
         gs  = self._make_gs_mock(existing_workspaces=["sk0_kba_testschema"])
+        self._set_gs_state(gs, ["sk0_kba_testschema"])
+        self._set_credentials(cur, ["sk0_kba_testschema"])
 
-        with patch.object(gl, "_fetch_role_credentials",
-                          return_value=(TEST_ROLE_NAME, TEST_ROLE_PASSWORD)):
-            gl._reconcile_geoserver_schemas(cur, self.DB_CONFIG, gs)
+        gl._reconcile_geoserver_schemas(cur, self.DB_CONFIG, gs)
 
-        # create_workspace anropas (idempotent – den verkliga implementationen
-        # kontrollerar att workspace finns innan den försöker skapa)
-        gs.create_workspace.assert_called_once_with("sk0_kba_testschema")
-        # create_pg_datastore anropas alltid för att synka lösenordet
+        gs.create_workspace.assert_not_called()
         gs.create_pg_datastore.assert_called_once()
+        self.assertEqual(
+            gs.create_pg_datastore.call_args.kwargs["pg_user"], "gs_r_sk0_kba_testschema"
+        )
+        gs.create_gs_role.assert_not_called()
+        # ACL stäms av mot den förhämtade kartan – sync_acl_rules skriver inget som redan stämmer
+        gs.sync_acl_rules.assert_called_once_with(
+            gl._expected_acl_rules("sk0_kba_testschema"), gs.get_acl_rules.return_value,
+        )
+
+    def test_existing_schema_writes_only_missing_role_and_acl(self):
+        """Saknad w_-roll och felaktig läsregel → bara de skrivs, mot förhämtad regelkarta."""
+        name = "sk0_kba_testschema"
+        cur = self._make_cur_mock([name])
+        gs  = self._make_gs_mock(existing_workspaces=[name])
+        acl = {f"{name}.*.r": "ROLE_AUTHENTICATED", f"{name}.*.w": f"w_{name}"}
+        self._set_gs_state(gs, [name], roles={f"r_{name}"}, acl=acl)
+        self._set_credentials(cur, [name])
+        gs.create_gs_role.return_value = True
+
+        gl._reconcile_geoserver_schemas(cur, self.DB_CONFIG, gs)
+
+        gs.create_gs_role.assert_called_once_with(f"w_{name}")
+        gs.sync_acl_rules.assert_called_once()
+        # Regelkartan från den enda GET:en återanvänds – ingen egen GET per schema
+        self.assertIs(gs.sync_acl_rules.call_args.args[1], gs.get_acl_rules.return_value)
+        gs.get_acl_rules.assert_called_once()
+
+    def test_acl_for_all_existing_schemas_synced_in_one_call(self):
+        """ACL-reglerna för alla befintliga scheman skickas till sync_acl_rules på en gång."""
+        names = ["sk0_kba_a", "sk0_kba_b", "sk1_ext_c"]
+        cur = self._make_cur_mock(names)
+        gs  = self._make_gs_mock(existing_workspaces=names)
+        self._set_gs_state(gs, names, acl={})
+        self._set_credentials(cur, names)
+
+        gl._reconcile_geoserver_schemas(cur, self.DB_CONFIG, gs)
+
+        gs.sync_acl_rules.assert_called_once()
+        expected = {}
+        for n in names:
+            expected.update(gl._expected_acl_rules(n))
+        self.assertEqual(gs.sync_acl_rules.call_args.args[0], expected)
+
+    def test_bulk_state_unavailable_falls_back_to_full_publish(self):
+        """Om roller/ACL inte kan hämtas i bulk körs handle_schema_notification per schema."""
+        cur = self._make_cur_mock(["sk0_kba_testschema"])
+        gs  = self._make_gs_mock(existing_workspaces=["sk0_kba_testschema"])
+        gs.get_gs_roles.return_value = None
+
+        with patch.object(gl, "handle_schema_notification", return_value=True) as mock_handle:
+            gl._reconcile_geoserver_schemas(cur, self.DB_CONFIG, gs)
+
+        mock_handle.assert_called_once()
+        self.assertEqual(mock_handle.call_args[0][0], "sk0_kba_testschema")
 
     def test_in_sync_logs_ok(self):
         """Identiska listor → ingen skapning, inga varningar om saknade/extra scheman."""
         cur = self._make_cur_mock(["sk0_kba_testschema"])
         gs  = self._make_gs_mock(existing_workspaces=["sk0_kba_testschema"])
+        self._set_gs_state(gs, ["sk0_kba_testschema"])
+        self._set_credentials(cur, ["sk0_kba_testschema"])
 
         # Mocka handle_schema_notification för att isolera reconcilieringslogiken
         # från interna varningar (t.ex. _load_schema_pattern med tom mock-cursor).
@@ -1323,6 +1651,23 @@ class TestReconcileGeoServerSchemas(unittest.TestCase):
         non_sentinel = [l for l in cm.output if "_sentinel_" not in l and "WARNING" in l]
         self.assertEqual(non_sentinel, [])
 
+    def test_extra_workspace_matched_against_db_pattern(self):
+        """
+        Föräldralösa workspaces matchas mot databasens mönster från
+        konfigurationstabellerna, inte mot fallback-värdet SCHEMA_PATTERN:
+        sk2 publiceras enligt DB → sk2_kba_orphan rapporteras.
+        """
+        cur = self._make_cur_mock([])
+        self._set_conn_answers(cur, {"publiceras_geoserver": [("sk2",)]})
+        gs  = self._make_gs_mock(existing_workspaces=["sk2_kba_orphan"])
+        self.assertFalse(gl.SCHEMA_PATTERN.match("sk2_kba_orphan"))
+
+        with self.assertLogs("geoserver_listener", level="WARNING") as cm:
+            gl._reconcile_geoserver_schemas(cur, self.DB_CONFIG, gs)
+
+        warning_lines = [l for l in cm.output if "sk2_kba_orphan" in l]
+        self.assertTrue(warning_lines, "Förväntad WARNING om sk2_kba_orphan saknas i loggen")
+
     # ------------------------------------------------------------------
     # 6. DB-fel avbryter inte lyssnaren
     # ------------------------------------------------------------------
@@ -1345,13 +1690,13 @@ class TestReconcileGeoServerSchemas(unittest.TestCase):
     def test_sk2_schema_blocked_by_schema_pattern(self):
         """
         sk2 är inte publicerbart i standardkonfigurationen (publiceras_geoserver = false).
-        SCHEMA_PATTERN laddas från DB via _load_schema_pattern; i det här testet
-        mockas det till fallback-värdet (sk0/sk1 only) för att verifiera att
-        handle_schema_notification avvisar sk2 via _validate_schema_name.
+        Mönstret laddas från DB via _schema_patterns; i det här testet ger
+        DB-mocken inget mönster så fallback-värdet SCHEMA_PATTERN (sk0/sk1 only)
+        används, och handle_schema_notification avvisar sk2 via _validate_schema_name.
 
         Om sk2 skulle läggas till i standardiserade_skyddsnivaer med
-        publiceras_geoserver = true OCH _load_schema_pattern körs, uppdateras
-        SCHEMA_PATTERN och sk2-scheman publiceras. Det är avsiktligt beteende.
+        publiceras_geoserver = true läses mönstret om (CHANNEL_SCHEMA_CONFIG)
+        och sk2-scheman publiceras. Det är avsiktligt beteende.
         """
         cur = self._make_cur_mock(["sk2_kba_hemlig"])
         gs  = self._make_gs_mock(existing_workspaces=[])
@@ -1366,8 +1711,8 @@ class TestReconcileGeoServerSchemas(unittest.TestCase):
 
 class TestLoadSchemaPattern(unittest.TestCase):
     """
-    Enhetstester för _load_schema_pattern – verifierar att SCHEMA_PATTERN
-    byggs korrekt från konfigurationstabellerna och att fallback fungerar.
+    Enhetstester för _load_schema_pattern – verifierar att mönstret byggs
+    korrekt från konfigurationstabellerna och att fallback fungerar.
     """
 
     def _make_cur_mock(self, skyddsnivaer_prefixes, datakategori_prefixes):
@@ -1379,54 +1724,115 @@ class TestLoadSchemaPattern(unittest.TestCase):
         ]
         return cur
 
-    def setUp(self):
-        """Spara originalvärdet av SCHEMA_PATTERN och återställ efter varje test."""
-        self._original_pattern = gl.SCHEMA_PATTERN
-
-    def tearDown(self):
-        gl.SCHEMA_PATTERN = self._original_pattern
-
     def test_pattern_built_from_config(self):
         """Mönstret byggs från skyddsnivaer + datakategorier ur DB."""
         cur = self._make_cur_mock(["sk0", "sk1"], ["ext", "kba", "sys"])
-        gl._load_schema_pattern(cur)
-        self.assertRegex("sk0_kba_test",  gl.SCHEMA_PATTERN)
-        self.assertRegex("sk1_ext_sjv",   gl.SCHEMA_PATTERN)
-        self.assertNotRegex("sk2_kba_hemlig", gl.SCHEMA_PATTERN)
+        pattern = gl._load_schema_pattern(cur)
+        self.assertRegex("sk0_kba_test",  pattern)
+        self.assertRegex("sk1_ext_sjv",   pattern)
+        self.assertNotRegex("sk2_kba_hemlig", pattern)
 
     def test_new_security_level_included(self):
         """Om sk2 läggs till med publiceras_geoserver = true inkluderas det i mönstret."""
         cur = self._make_cur_mock(["sk0", "sk1", "sk2"], ["ext", "kba", "sys"])
-        gl._load_schema_pattern(cur)
-        self.assertRegex("sk2_kba_hemlig", gl.SCHEMA_PATTERN)
+        self.assertRegex("sk2_kba_hemlig", gl._load_schema_pattern(cur))
 
     def test_new_datakategori_included(self):
         """En ny datakategori inkluderas direkt efter att mönstret laddats."""
         cur = self._make_cur_mock(["sk0", "sk1"], ["ext", "kba", "sys", "int"])
-        gl._load_schema_pattern(cur)
-        self.assertRegex("sk0_int_test", gl.SCHEMA_PATTERN)
+        self.assertRegex("sk0_int_test", gl._load_schema_pattern(cur))
 
-    def test_empty_skyddsnivaer_keeps_existing_pattern(self):
-        """Tomma skyddsnivaer → befintligt mönster behålls, ingen krasch."""
+    def test_empty_skyddsnivaer_returns_none(self):
+        """Tomma skyddsnivaer → None (anroparen behåller sitt mönster), ingen krasch."""
         cur = self._make_cur_mock([], ["kba"])
-        original = gl.SCHEMA_PATTERN
-        gl._load_schema_pattern(cur)
-        self.assertIs(gl.SCHEMA_PATTERN, original)
+        self.assertIsNone(gl._load_schema_pattern(cur))
 
-    def test_empty_kategorier_keeps_existing_pattern(self):
-        """Tomma datakategorier → befintligt mönster behålls."""
+    def test_empty_kategorier_returns_none(self):
+        """Tomma datakategorier → None."""
         cur = self._make_cur_mock(["sk0"], [])
-        original = gl.SCHEMA_PATTERN
-        gl._load_schema_pattern(cur)
-        self.assertIs(gl.SCHEMA_PATTERN, original)
+        self.assertIsNone(gl._load_schema_pattern(cur))
 
-    def test_db_error_keeps_existing_pattern(self):
-        """DB-fel → befintligt mönster behålls, ingen krasch."""
+    def test_db_error_returns_none(self):
+        """DB-fel → None, ingen krasch."""
         cur = MagicMock()
         cur.execute.side_effect = Exception("connection lost")
-        original = gl.SCHEMA_PATTERN
-        gl._load_schema_pattern(cur)
-        self.assertIs(gl.SCHEMA_PATTERN, original)
+        self.assertIsNone(gl._load_schema_pattern(cur))
+
+
+class TestSchemaPatternCache(unittest.TestCase):
+    """
+    Enhetstester för SchemaPatternCache – mönstret laddas en gång per databas
+    och läses om först efter invalidate() (CHANNEL_SCHEMA_CONFIG / återanslutning).
+    """
+
+    def _make_conn_mock(self, skyddsnivaer_prefixes, datakategori_prefixes=("ext", "kba", "sys")):
+        """Anslutnings-mock vars cursor svarar på _load_schema_pattern, hur många gånger som helst."""
+        cur = MagicMock()
+        answers = [
+            [(p,) for p in skyddsnivaer_prefixes],
+            [(p,) for p in datakategori_prefixes],
+        ]
+        cur.fetchall.side_effect = lambda: answers[(cur.fetchall.call_count - 1) % 2]
+        conn = MagicMock()
+        conn.cursor.return_value.__enter__.return_value = cur
+        return conn, cur
+
+    def test_cache_hit_makes_no_queries(self):
+        """Andra anropet för samma databas använder cachen utan DB-frågor."""
+        cache = gl.SchemaPatternCache()
+        conn, cur = self._make_conn_mock(["sk0", "skx"])
+        cache.get("geodata_sk0", conn)
+        cache.get("geodata_sk0", conn)
+        self.assertEqual(cur.execute.call_count, 2)
+
+    def test_invalidate_reloads_pattern(self):
+        """Efter invalidate() laddas mönstret om från DB."""
+        cache = gl.SchemaPatternCache()
+        conn, cur = self._make_conn_mock(["sk0"])
+        self.assertIsNone(cache.get("geodata_sk0", conn).match("skx_kba_test"))
+
+        conn2, _ = self._make_conn_mock(["sk0", "skx"])
+        cache.invalidate("geodata_sk0")
+        self.assertIsNotNone(cache.get("geodata_sk0", conn2).match("skx_kba_test"))
+
+    def test_databases_do_not_overwrite_each_other(self):
+        """Mönstret för en databas påverkar inte en annan databas mönster."""
+        cache = gl.SchemaPatternCache()
+        conn_sk0, _ = self._make_conn_mock(["sk0", "skx"])
+        conn_sk1, _ = self._make_conn_mock(["sk1"])
+        cache.get("geodata_sk0", conn_sk0)
+        cache.get("geodata_sk1", conn_sk1)
+
+        self.assertRegex("skx_kba_test", cache.get("geodata_sk0"))
+        self.assertNotRegex("skx_kba_test", cache.get("geodata_sk1"))
+
+    def test_miss_without_connection_returns_fallback(self):
+        """Utan cachat mönster och utan anslutning används SCHEMA_PATTERN."""
+        cache = gl.SchemaPatternCache()
+        self.assertIs(cache.get("geodata_sk0"), gl.SCHEMA_PATTERN)
+
+    def test_failed_load_is_not_cached(self):
+        """Tomma konfigurationstabeller → fallback, och nästa anrop försöker igen."""
+        cache = gl.SchemaPatternCache()
+        conn, cur = self._make_conn_mock([])
+        self.assertIs(cache.get("geodata_sk0", conn), gl.SCHEMA_PATTERN)
+        cache.get("geodata_sk0", conn)
+        self.assertEqual(cur.execute.call_count, 4)
+
+    def test_invalidate_during_load_discards_stale_pattern(self):
+        """En ogiltigförklaring medan mönstret laddas gör att resultatet inte cachas."""
+        cache = gl.SchemaPatternCache()
+        conn, cur = self._make_conn_mock(["sk0"])
+        original = cur.fetchall.side_effect
+
+        def fetchall_and_invalidate():
+            cache.invalidate("geodata_sk0")
+            return original()
+
+        cur.fetchall.side_effect = fetchall_and_invalidate
+        cache.get("geodata_sk0", conn)
+        cache.get("geodata_sk0", conn)
+        self.assertEqual(cur.execute.call_count, 4)
 
 
 class TestPeriodicReconcileLoop(unittest.TestCase):
@@ -1613,6 +2019,631 @@ class TestPeriodicReconcileLoop(unittest.TestCase):
         self.assertTrue(periodic_called.is_set(), "_periodic_reconcile_loop startades aldrig")
 
 
+class TestSchemaWorkerPool(unittest.TestCase):
+    """
+    Enhetstester för SchemaWorkerPool – verifierar ordning per schema,
+    parallellitet mellan scheman och avstängning.
+    """
+
+    def test_same_schema_runs_in_order(self):
+        """CREATE följt av DROP för samma schema körs i mottagningsordning."""
+        calls = []
+        done = threading.Event()
+
+        def handler(channel, schema_name):
+            time.sleep(0.05 if channel == CHANNEL_CREATE else 0)
+            calls.append((channel, schema_name))
+            if len(calls) == 2:
+                done.set()
+
+        pool = gl.SchemaWorkerPool(handler, max_workers=4, name="test")
+        try:
+            pool.submit(CHANNEL_CREATE, VALID_CREATE_SCHEMA)
+            pool.submit(CHANNEL_DROP, VALID_CREATE_SCHEMA)
+            self.assertTrue(done.wait(timeout=3))
+        finally:
+            pool.shutdown()
+
+        self.assertEqual(calls, [
+            (CHANNEL_CREATE, VALID_CREATE_SCHEMA),
+            (CHANNEL_DROP, VALID_CREATE_SCHEMA),
+        ])
+
+    def test_different_schemas_run_in_parallel(self):
+        """Ett blockerat schema hindrar inte att ett annat schema hanteras."""
+        release = threading.Event()
+        other_done = threading.Event()
+
+        def handler(channel, schema_name):
+            if schema_name == "sk0_kba_slow":
+                release.wait(timeout=3)
+            else:
+                other_done.set()
+
+        pool = gl.SchemaWorkerPool(handler, max_workers=2, name="test")
+        try:
+            pool.submit(CHANNEL_CREATE, "sk0_kba_slow")
+            pool.submit(CHANNEL_CREATE, "sk0_kba_fast")
+            self.assertTrue(other_done.wait(timeout=3),
+                            "sk0_kba_fast ska inte vänta på sk0_kba_slow")
+        finally:
+            release.set()
+            pool.shutdown()
+
+    def test_handler_exception_does_not_kill_worker(self):
+        """Ett undantag i hanteraren stoppar inte poolen."""
+        second = threading.Event()
+
+        def handler(channel, schema_name):
+            if schema_name == "sk0_kba_bad":
+                raise RuntimeError("boom")
+            second.set()
+
+        pool = gl.SchemaWorkerPool(handler, max_workers=1, name="test")
+        try:
+            pool.submit(CHANNEL_CREATE, "sk0_kba_bad")
+            pool.submit(CHANNEL_CREATE, "sk0_kba_good")
+            self.assertTrue(second.wait(timeout=3))
+        finally:
+            pool.shutdown()
+
+    def test_shutdown_calls_on_worker_exit_and_rejects_submit(self):
+        """shutdown() avslutar arbetarna, anropar on_worker_exit och stänger för nya jobb."""
+        exits = []
+        pool = gl.SchemaWorkerPool(
+            lambda c, s: None, max_workers=2, name="test",
+            on_worker_exit=lambda: exits.append(1),
+        )
+        pool.shutdown()
+
+        self.assertEqual(len(exits), 2)
+        self.assertFalse(pool.submit(CHANNEL_CREATE, VALID_CREATE_SCHEMA))
+
+
+class TestGeoServerOutbox(unittest.TestCase):
+    """
+    Enhetstester för GeoServerOutbox och hur listen_loop-delarna
+    (_drain_outbox, arbetarhanteraren) använder händelsekön.
+    """
+
+    def _make_conn(self, fetchall=None, fetchone=None, rowcount=1):
+        cur = MagicMock()
+        cur.fetchall.return_value = fetchall or []
+        cur.fetchone.return_value = fetchone
+        cur.rowcount = rowcount
+        conn = MagicMock()
+        conn.cursor.return_value.__enter__.return_value = cur
+        return conn, cur
+
+    def test_claim_maps_events_to_channels_in_queue_order(self):
+        """Reserverade rader returneras i id-ordning med rätt pg_notify-kanal."""
+        outbox = gl.GeoServerOutbox("geodata")
+        conn, _ = self._make_conn(fetchall=[
+            (7, VALID_CREATE_SCHEMA, "ta_bort"),
+            (3, VALID_CREATE_SCHEMA, "skapa"),
+        ])
+        events = outbox.claim(conn)
+        self.assertEqual(events, [
+            (3, CHANNEL_CREATE, VALID_CREATE_SCHEMA),
+            (7, CHANNEL_DROP, VALID_CREATE_SCHEMA),
+        ])
+
+    def test_claim_excludes_inflight_events(self):
+        """Händelser som redan ligger i arbetspoolen skickas som undantag till frågan."""
+        outbox = gl.GeoServerOutbox()
+        conn, cur = self._make_conn(fetchall=[(3, VALID_CREATE_SCHEMA, "skapa")])
+        outbox.claim(conn)
+
+        conn2, cur2 = self._make_conn()
+        outbox.claim(conn2)
+        sql, params = cur2.execute.call_args.args
+        self.assertIn("FOR UPDATE SKIP LOCKED", sql)
+        self.assertEqual(params[1], [3])
+
+    def test_complete_success_marks_done_and_releases(self):
+        """Lyckad händelse markeras behandlad och släpps ur inflight."""
+        outbox = gl.GeoServerOutbox()
+        conn, _ = self._make_conn(fetchall=[(3, VALID_CREATE_SCHEMA, "skapa")])
+        outbox.claim(conn)
+
+        done_conn, done_cur = self._make_conn()
+        outbox.complete(done_conn, 3, True)
+        self.assertIn("behandlad = now()", done_cur.execute.call_args.args[0])
+
+        conn3, cur3 = self._make_conn()
+        outbox.claim(conn3)
+        self.assertEqual(cur3.execute.call_args.args[1][1], [])
+
+    def test_complete_failure_schedules_retry(self):
+        """Misslyckad händelse får ny väntetid och ges upp efter MAX_ATTEMPTS."""
+        outbox = gl.GeoServerOutbox()
+        conn, cur = self._make_conn()
+        outbox.complete(conn, 5, False)
+        sql, params = cur.execute.call_args.args
+        self.assertIn("last_till", sql)
+        self.assertIn(outbox.MAX_ATTEMPTS, params)
+        self.assertEqual(params[-1], 5)
+
+    def test_available_false_when_table_missing(self):
+        """Saknad tabell/behörighet → False (fallback till payload + startavstämning)."""
+        outbox = gl.GeoServerOutbox()
+        conn, _ = self._make_conn(fetchone=(False,))
+        self.assertFalse(outbox.available(conn))
+        conn, _ = self._make_conn(fetchone=(True,))
+        self.assertTrue(outbox.available(conn))
+
+    def test_available_requires_each_privilege(self):
+        """SELECT, INSERT och UPDATE kontrolleras var för sig och måste alla finnas.
+
+        has_table_privilege med flera privilegier i samma anrop är sant om
+        NÅGOT av dem finns – en roll med bara SELECT skulle då godkännas.
+        """
+        outbox = gl.GeoServerOutbox()
+        conn, cur = self._make_conn(fetchone=(True,))
+        outbox.available(conn)
+        sql = cur.execute.call_args.args[0]
+        for privilege in ("SELECT", "INSERT", "UPDATE"):
+            self.assertIn(f"has_table_privilege('public.hex_geoserver_handelser', '{privilege}')", sql)
+        self.assertEqual(sql.count("has_table_privilege"), 3)
+        self.assertEqual(sql.count(" AND has_table_privilege"), 2)
+
+    def test_enqueue_manual_notification(self):
+        """Manuell NOTIFY utan rad i kön läggs till som 'skapa'/'ta_bort'."""
+        outbox = gl.GeoServerOutbox()
+        conn, cur = self._make_conn(rowcount=1)
+        self.assertTrue(outbox.enqueue(conn, CHANNEL_DROP, VALID_CREATE_SCHEMA))
+        params = cur.execute.call_args.args[1]
+        self.assertEqual(params[:2], (VALID_CREATE_SCHEMA, "ta_bort"))
+
+    def test_drain_submits_event_id_to_pool(self):
+        """_drain_outbox lämnar varje händelse till poolen med sitt id."""
+        outbox = gl.GeoServerOutbox()
+        conn, _ = self._make_conn(fetchall=[(3, VALID_CREATE_SCHEMA, "skapa")])
+        pool = MagicMock()
+        pool.submit.return_value = True
+        gl._drain_outbox(outbox, conn, pool)
+        pool.submit.assert_called_once_with(CHANNEL_CREATE, VALID_CREATE_SCHEMA, 3)
+
+    def test_worker_handler_completes_event_with_result(self):
+        """Arbetarhanteraren kvitterar händelsen med hanterarens utfall."""
+        outbox = MagicMock()
+        conn = MagicMock()
+        conn.closed = False
+        with patch.object(gl, "_connect_pg", return_value=conn), \
+             patch.object(gl, "_process_notification", return_value=True):
+            handler, _ = gl._make_worker_handler(DB_CONFIG, MagicMock(), outbox=outbox)
+            handler(CHANNEL_CREATE, VALID_CREATE_SCHEMA, 3)
+        outbox.complete.assert_called_once_with(conn, 3, True)
+
+
+class _FakeListenConn:
+    """LISTEN-anslutning med ett riktigt filnummer (socketpair) för selector-tester."""
+
+    def __init__(self):
+        import socket
+        self._r, self._w = socket.socketpair()
+        self._lock = threading.Lock()
+        self._queued = []
+        self.notifies = []
+        self.closed = False
+
+    def fileno(self):
+        return self._r.fileno()
+
+    def cursor(self):
+        return MagicMock()
+
+    def send_notify(self, channel, payload):
+        from types import SimpleNamespace
+        with self._lock:
+            self._queued.append(SimpleNamespace(channel=channel, payload=payload))
+        self._w.send(b"x")
+
+    def poll(self):
+        self._r.recv(1024)
+        with self._lock:
+            self.notifies.extend(self._queued)
+            self._queued.clear()
+
+    def close(self):
+        self.closed = True
+        self._r.close()
+        self._w.close()
+
+
+class TestNotificationCoalescer(unittest.TestCase):
+    """
+    Enhetstester för NotificationCoalescer – dubbletter, inställda
+    skapa/ta bort-par och återskapade scheman.
+    """
+
+    def setUp(self):
+        self.pool = MagicMock()
+        self.pool.submit.return_value = True
+        self.listener = MagicMock(db_label="geodata")
+        self.coalescer = gl.NotificationCoalescer(self.pool, window_seconds=60)
+
+    def test_duplicates_are_merged(self):
+        """Samma schema och kanal flera gånger → en hantering med alla id:n."""
+        for handelse_id in (1, 2, 3):
+            self.coalescer.add(CHANNEL_CREATE, VALID_CREATE_SCHEMA, self.listener, handelse_id)
+        self.assertEqual(self.coalescer.flush(force=True), 1)
+        self.pool.submit.assert_called_once_with(
+            CHANNEL_CREATE, VALID_CREATE_SCHEMA, self.listener, 1, 2, 3,
+        )
+
+    def test_drop_cancels_pending_create(self):
+        """Borttagning efter väntande skapande → bara borttagningen körs."""
+        self.coalescer.add(CHANNEL_CREATE, VALID_CREATE_SCHEMA, self.listener, 1)
+        self.coalescer.add(CHANNEL_DROP, VALID_CREATE_SCHEMA, self.listener, 2)
+        self.coalescer.flush(force=True)
+        self.pool.submit.assert_called_once_with(
+            CHANNEL_DROP, VALID_CREATE_SCHEMA, self.listener, 1, 2,
+        )
+
+    def test_create_after_drop_keeps_order(self):
+        """Skapa efter väntande borttagning → borttagningen lämnas först."""
+        self.coalescer.add(CHANNEL_DROP, VALID_CREATE_SCHEMA, self.listener)
+        self.coalescer.add(CHANNEL_CREATE, VALID_CREATE_SCHEMA, self.listener)
+        self.pool.submit.assert_called_once_with(CHANNEL_DROP, VALID_CREATE_SCHEMA, self.listener)
+        self.coalescer.flush(force=True)
+        self.assertEqual(self.pool.submit.call_args.args[0], CHANNEL_CREATE)
+
+    def test_window_delays_submission(self):
+        """Inget lämnas förrän fönstret löpt ut; fönster 0 lämnar vid nästa flush."""
+        self.coalescer.add(CHANNEL_CREATE, VALID_CREATE_SCHEMA, self.listener)
+        self.assertEqual(self.coalescer.flush(), 0)
+        self.assertGreater(self.coalescer.next_due(), 0)
+
+        immediate = gl.NotificationCoalescer(self.pool, window_seconds=0)
+        immediate.add(CHANNEL_CREATE, "sk0_kba_annat", self.listener)
+        self.assertEqual(immediate.flush(), 1)
+        self.assertIsNone(immediate.next_due())
+
+    def test_databases_are_kept_apart(self):
+        """Samma schemanamn i två databaser slås inte ihop."""
+        other = MagicMock(db_label="geodata_b")
+        self.coalescer.add(CHANNEL_CREATE, VALID_CREATE_SCHEMA, self.listener)
+        self.coalescer.add(CHANNEL_CREATE, VALID_CREATE_SCHEMA, other)
+        self.assertEqual(self.coalescer.flush(force=True), 2)
+
+    def test_closed_pool_releases_events(self):
+        """Stängd pool → händelserna kvitteras som misslyckade (tas om senare)."""
+        self.pool.submit.return_value = False
+        self.coalescer.add(CHANNEL_CREATE, VALID_CREATE_SCHEMA, self.listener, 7)
+        self.coalescer.flush(force=True)
+        self.listener.outbox.complete.assert_called_once_with(None, 7, False)
+
+
+class TestMultiplexedListener(unittest.TestCase):
+    """
+    Enhetstester för PgConnectionPool och _serve_databases – en LISTEN-tråd
+    för alla databaser med gemensam arbetspool.
+    """
+
+    DB_A = {**DB_CONFIG, "dbname": "geodata_a"}
+    DB_B = {**DB_CONFIG, "dbname": "geodata_b"}
+
+    def _serve(self, listen_conns, handled, stop, fail_dbs=(), hang=None, reconcile=None):
+        hang = dict(hang or {})
+
+        def fake_connect(db_config):
+            name = db_config["dbname"]
+            if name in fail_dbs:
+                raise psycopg2.OperationalError("connection refused")
+            if name in hang:
+                hang.pop(name).wait()   # som ett connect_timeout mot en databas som inte svarar
+            conn = listen_conns.get(name)
+            if conn is not None and not conn.closed and not getattr(conn, "_used", False):
+                conn._used = True
+                return conn
+            worker_conn = MagicMock()
+            worker_conn.closed = False
+            return worker_conn
+
+        def fake_process(channel, schema_name, db_config, pg_conn, gs_client, notifier=None, db_label=""):
+            handled.append((db_label, channel, schema_name))
+            return True
+
+        with patch.object(gl, "LISTEN_KEEPALIVE_SECONDS", 0.2), \
+             patch.object(gl, "_connect_pg", side_effect=fake_connect), \
+             patch.object(gl, "_process_notification", side_effect=fake_process), \
+             patch.object(gl.GeoServerOutbox, "available", return_value=False), \
+             patch.object(gl, "_reconcile_geoserver_schemas", side_effect=reconcile):
+            gl._serve_databases(
+                [(self.DB_A, None), (self.DB_B, None)], 60, MagicMock(), stop,
+                worker_count=2, name="test", coalesce_window=0,
+            )
+
+    def _wait_for(self, predicate, timeout=3):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and not predicate():
+            time.sleep(0.02)
+        return predicate()
+
+    def test_one_thread_serves_all_databases(self):
+        """Notifieringar från båda databaserna hanteras med rätt databas."""
+        conns = {"geodata_a": _FakeListenConn(), "geodata_b": _FakeListenConn()}
+        handled = []
+        stop = threading.Event()
+        t = threading.Thread(target=self._serve, args=(conns, handled, stop), daemon=True)
+        t.start()
+        self.assertTrue(self._wait_for(lambda: all(c.closed is False and getattr(c, "_used", False)
+                                                   for c in conns.values())))
+        conns["geodata_a"].send_notify(CHANNEL_CREATE, "sk0_kba_a")
+        conns["geodata_b"].send_notify(CHANNEL_DROP, "sk0_kba_b")
+        self.assertTrue(self._wait_for(lambda: len(handled) == 2))
+        stop.set()
+        t.join(timeout=10)
+
+        self.assertFalse(t.is_alive())
+        self.assertCountEqual(handled, [
+            ("geodata_a", CHANNEL_CREATE, "sk0_kba_a"),
+            ("geodata_b", CHANNEL_DROP, "sk0_kba_b"),
+        ])
+        self.assertTrue(all(c.closed for c in conns.values()))
+
+    def test_failed_database_does_not_block_others(self):
+        """En databas som inte går att ansluta till hindrar inte de andra."""
+        conns = {"geodata_b": _FakeListenConn()}
+        handled = []
+        stop = threading.Event()
+        t = threading.Thread(
+            target=self._serve, args=(conns, handled, stop, ("geodata_a",)), daemon=True,
+        )
+        t.start()
+        self.assertTrue(self._wait_for(lambda: getattr(conns["geodata_b"], "_used", False)))
+        conns["geodata_b"].send_notify(CHANNEL_CREATE, "sk0_kba_b")
+        self.assertTrue(self._wait_for(lambda: len(handled) == 1))
+        stop.set()
+        t.join(timeout=10)
+
+        self.assertEqual(handled, [("geodata_b", CHANNEL_CREATE, "sk0_kba_b")])
+
+    def test_hanging_connect_does_not_block_others(self):
+        """En databas vars anslutning hänger stoppar inte notifieringar från de andra."""
+        conns = {"geodata_a": _FakeListenConn(), "geodata_b": _FakeListenConn()}
+        handled = []
+        stop = threading.Event()
+        release = threading.Event()
+        t = threading.Thread(
+            target=self._serve, args=(conns, handled, stop),
+            kwargs={"hang": {"geodata_a": release}}, daemon=True,
+        )
+        t.start()
+        self.assertTrue(self._wait_for(lambda: getattr(conns["geodata_b"], "_used", False)))
+        conns["geodata_b"].send_notify(CHANNEL_CREATE, "sk0_kba_b")
+        self.assertTrue(self._wait_for(lambda: len(handled) == 1))
+        self.assertFalse(getattr(conns["geodata_a"], "_used", False))
+
+        release.set()
+        self.assertTrue(self._wait_for(lambda: getattr(conns["geodata_a"], "_used", False)))
+        conns["geodata_a"].send_notify(CHANNEL_CREATE, "sk0_kba_a")
+        self.assertTrue(self._wait_for(lambda: len(handled) == 2))
+        stop.set()
+        t.join(timeout=10)
+
+        self.assertFalse(t.is_alive())
+        self.assertEqual(handled, [
+            ("geodata_b", CHANNEL_CREATE, "sk0_kba_b"),
+            ("geodata_a", CHANNEL_CREATE, "sk0_kba_a"),
+        ])
+
+    def test_startup_reconcile_runs_off_the_listen_loop(self):
+        """Startavstämningen (utan händelsekö) körs utanför loopen, på en poolanslutning."""
+        conns = {"geodata_a": _FakeListenConn(), "geodata_b": _FakeListenConn()}
+        handled = []
+        stop = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_reconcile(cur, db_config, gs_client, db_label="", all_pg_schemas=None):
+            calls.append((db_label, threading.current_thread().name))
+            release.wait()
+
+        t = threading.Thread(
+            target=self._serve, args=(conns, handled, stop),
+            kwargs={"reconcile": slow_reconcile}, daemon=True,
+        )
+        t.start()
+        self.assertTrue(self._wait_for(lambda: len(calls) == 2))
+        conns["geodata_a"].send_notify(CHANNEL_CREATE, "sk0_kba_a")
+        conns["geodata_b"].send_notify(CHANNEL_DROP, "sk0_kba_b")
+        self.assertTrue(self._wait_for(lambda: len(handled) == 2))
+        release.set()
+        stop.set()
+        t.join(timeout=10)
+
+        self.assertFalse(t.is_alive())
+        self.assertCountEqual(calls, [
+            ("geodata_a", "connect-geodata_a"),
+            ("geodata_b", "connect-geodata_b"),
+        ])
+        self.assertCountEqual(handled, [
+            ("geodata_a", CHANNEL_CREATE, "sk0_kba_a"),
+            ("geodata_b", CHANNEL_DROP, "sk0_kba_b"),
+        ])
+
+    def test_pool_reuses_connection(self):
+        """En lämnad anslutning återanvänds vid nästa lån."""
+        conn = MagicMock()
+        conn.closed = False
+        with patch.object(gl, "_connect_pg", return_value=conn) as connect:
+            pool = gl.PgConnectionPool(DB_CONFIG, max_connections=2)
+            with pool.connection() as first:
+                pass
+            with pool.connection() as second:
+                pass
+        self.assertIs(first, second)
+        connect.assert_called_once()
+
+    def test_pool_discards_broken_connection(self):
+        """OperationalError under lånet → anslutningen stängs och ersätts."""
+        broken, fresh = MagicMock(), MagicMock()
+        broken.closed = fresh.closed = False
+        with patch.object(gl, "_connect_pg", side_effect=[broken, fresh]):
+            pool = gl.PgConnectionPool(DB_CONFIG)
+            with self.assertRaises(psycopg2.OperationalError):
+                with pool.connection():
+                    raise psycopg2.OperationalError("server closed the connection")
+            with pool.connection() as conn:
+                pass
+        broken.close.assert_called_once()
+        self.assertIs(conn, fresh)
+
+    def test_pool_is_bounded(self):
+        """Aldrig fler samtidigt utlånade anslutningar än max_connections."""
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def borrow(pool):
+            with pool.connection():
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.05)
+                with lock:
+                    active[0] -= 1
+
+        def new_conn(db_config):
+            conn = MagicMock()
+            conn.closed = False
+            return conn
+
+        with patch.object(gl, "_connect_pg", side_effect=new_conn):
+            pool = gl.PgConnectionPool(DB_CONFIG, max_connections=2)
+            threads = [threading.Thread(target=borrow, args=(pool,)) for _ in range(5)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertLessEqual(peak[0], 2)
+
+
+class TestListenerMetrics(unittest.TestCase):
+    """
+    Enhetstester för ListenerMetrics, metrik-endpointen och
+    instrumenteringen av _request_with_retry och _process_notification.
+    """
+
+    def setUp(self):
+        self.metrics = gl.ListenerMetrics()
+        patcher = patch.object(gl, "_metrics", self.metrics)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_counter_and_histogram_render(self):
+        """Räknare och histogram renderas i Prometheus textformat."""
+        self.metrics.inc("hex_reconcile_runs_total", db="geodata", result="ok")
+        self.metrics.inc("hex_reconcile_runs_total", db="geodata", result="ok")
+        self.metrics.observe("hex_reconcile_seconds", 0.3, db="geodata")
+        text = self.metrics.render()
+
+        self.assertIn("# TYPE hex_reconcile_runs_total counter", text)
+        self.assertIn('hex_reconcile_runs_total{db="geodata",result="ok"} 2', text)
+        self.assertIn("# TYPE hex_reconcile_seconds histogram", text)
+        self.assertIn('hex_reconcile_seconds_bucket{db="geodata",le="0.25"} 0', text)
+        self.assertIn('hex_reconcile_seconds_bucket{db="geodata",le="0.5"} 1', text)
+        self.assertIn('hex_reconcile_seconds_bucket{db="geodata",le="+Inf"} 1', text)
+        self.assertIn('hex_reconcile_seconds_count{db="geodata"} 1', text)
+        # Metriker utan serier utelämnas
+        self.assertNotIn("hex_listen_wakeups_total", text)
+
+    def test_gauge_function_is_read_on_render(self):
+        """En mätare som är en funktion läses vid varje skrapning."""
+        depth = [3]
+        self.metrics.set_gauge("hex_worker_queue_depth", lambda: depth[0], db="geodata")
+        self.assertIn('hex_worker_queue_depth{db="geodata"} 3', self.metrics.render())
+        depth[0] = 0
+        self.assertIn('hex_worker_queue_depth{db="geodata"} 0', self.metrics.render())
+
+    def test_label_values_are_escaped(self):
+        """Citattecken och radbrytningar i etikettvärden escapas."""
+        self.metrics.inc("hex_listen_connection_errors_total", db='a"b\nc')
+        self.assertIn('db="a\\"b\\nc"', self.metrics.render())
+
+    def test_unknown_metric_raises(self):
+        """Odefinierade metriknamn eller fel typ ger ValueError."""
+        with self.assertRaises(ValueError):
+            self.metrics.inc("hex_okand_total")
+        with self.assertRaises(ValueError):
+            self.metrics.inc("hex_reconcile_seconds")
+
+    def test_http_endpoint_serves_metrics(self):
+        """GET /metrics svarar med registret; andra sökvägar ger 404."""
+        import socket
+        import urllib.error
+        import urllib.request
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        self.metrics.inc("hex_listen_wakeups_total", db="geodata", reason="timeout")
+        server = gl.start_metrics_server(port, "127.0.0.1", self.metrics)
+        self.assertIsNotNone(server)
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as resp:
+                body = resp.read().decode("utf-8")
+                self.assertTrue(resp.headers["Content-Type"].startswith("text/plain"))
+            self.assertIn('hex_listen_wakeups_total{db="geodata",reason="timeout"} 1', body)
+            with self.assertRaises(urllib.error.HTTPError) as cm:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/annat", timeout=5)
+            self.assertEqual(cm.exception.code, 404)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_metrics_server_disabled_by_default(self):
+        """Port 0 → ingen server startas."""
+        self.assertIsNone(gl.start_metrics_server(0))
+
+    def test_request_retry_and_failure_counted(self):
+        """Varje försök mäts; retries och slutligt misslyckande räknas."""
+        pool = gl.GeoServerHttpPool()
+        client = gl.GeoServerClient(
+            base_url="http://geoserver.example.com", user="admin", password="secret",
+            http_pool=pool,
+        )
+        with patch.object(pool, "request",
+                          side_effect=requests.exceptions.Timeout("slow")), \
+             patch.object(pool, "backoff", return_value=True):
+            with self.assertRaises(requests.exceptions.Timeout):
+                client._request_with_retry("GET", "http://gs/rest/about/version.json")
+
+        self.assertEqual(
+            self.metrics.value("hex_geoserver_request_retries_total", method="GET"),
+            client.MAX_RETRIES,
+        )
+        self.assertEqual(
+            self.metrics.value("hex_geoserver_request_failures_total", method="GET"), 1,
+        )
+        self.assertEqual(
+            self.metrics.value("hex_geoserver_request_seconds", method="GET", status="timeout"),
+            1 + client.MAX_RETRIES,
+        )
+
+    def test_process_notification_records_result(self):
+        """Hanteringstid och resultat registreras per databas och kanal."""
+        with patch.object(gl, "handle_schema_notification", return_value=True):
+            gl._process_notification(CHANNEL_CREATE, "sk0_kba_x", DB_CONFIG, MagicMock(),
+                                     MagicMock(), db_label="geodata")
+        with patch.object(gl, "handle_schema_removal_notification",
+                          side_effect=requests.exceptions.ConnectionError("down")):
+            gl._process_notification(CHANNEL_DROP, "sk0_kba_x", DB_CONFIG, MagicMock(),
+                                     MagicMock(), db_label="geodata")
+
+        self.assertEqual(self.metrics.value(
+            "hex_notifications_handled_total", db="geodata", channel=CHANNEL_CREATE, result="ok",
+        ), 1)
+        self.assertEqual(self.metrics.value(
+            "hex_notifications_handled_total", db="geodata", channel=CHANNEL_DROP, result="transient",
+        ), 1)
+        self.assertEqual(self.metrics.value(
+            "hex_notification_seconds", db="geodata", channel=CHANNEL_CREATE,
+        ), 1)
+
+
 class TestLoadConfig(unittest.TestCase):
     """
     Enhetstester för load_config – verifierar att HEX_RECONCILE_INTERVAL
@@ -1645,6 +2676,32 @@ class TestLoadConfig(unittest.TestCase):
             config = gl.load_config()
         self.assertEqual(config["reconcile_interval"], 0)
 
+    def test_worker_count_default(self):
+        """HEX_WORKER_COUNT ej satt → standard 4."""
+        with patch.dict(os.environ, self._MIN_ENV, clear=True):
+            config = gl.load_config()
+        self.assertEqual(config["worker_count"], 4)
+
+    def test_worker_count_minimum_one(self):
+        """HEX_WORKER_COUNT=0 → minst en arbetare."""
+        env = {**self._MIN_ENV, "HEX_WORKER_COUNT": "0"}
+        with patch.dict(os.environ, env, clear=True):
+            config = gl.load_config()
+        self.assertEqual(config["worker_count"], 1)
+
+    def test_gs_max_connections_default(self):
+        """HEX_GS_MAX_CONNECTIONS ej satt → standard 8."""
+        with patch.dict(os.environ, self._MIN_ENV, clear=True):
+            config = gl.load_config()
+        self.assertEqual(config["gs_max_connections"], 8)
+
+    def test_metrics_port_default_disabled(self):
+        """HEX_METRICS_PORT ej satt → 0 (ingen metrik-endpoint)."""
+        with patch.dict(os.environ, self._MIN_ENV, clear=True):
+            config = gl.load_config()
+        self.assertEqual(config["metrics_port"], 0)
+        self.assertEqual(config["metrics_host"], "127.0.0.1")
+
 
 # ---------------------------------------------------------------------------
 # Startpunkt
@@ -0,0 +1,194 @@
+-- ============================================================
+-- HEX SCHEMA_MATCHNINGAR TEST SUITE — GROUP M
+--
+-- M  Förberäknade schema_uttryck-matchningar (hex_schema_matchningar)
+--    M1  Ändrat schema_uttryck i standardiserade_kolumner förnyar
+--        matchningarna (trigger hex_uppdatera_schema_matchningar)
+--    M2  Ny/borttagen rad i standardiserade_roller förnyar matchningarna
+--    M3  Schema som saknas i tabellen (äldre schema) evalueras vid behov
+--        av hamta_schema_matchningar – bara för efterfrågad källa
+--    M4  hantera_kolumntillagg steg 3 flyttar inte en kolumn vars
+--        schema_uttryck inte matchar (skapad_av på ett _ext_-schema)
+--    M5  DROP SCHEMA: ta_bort_schemaroller tar bort schemats rader
+--
+-- Schemas used: sk1_kba_match, sk1_ext_match
+-- Convention: NOTICE = PASSED/INFO, WARNING = FAILED/BUG CONFIRMED
+-- ============================================================
+
+\echo ''
+\echo '============================================================'
+\echo 'HEX SCHEMA_MATCHNINGAR TEST SUITE'
+\echo '============================================================'
+
+-- ============================================================
+-- Cleanup and setup
+-- ============================================================
+DROP SCHEMA IF EXISTS sk1_kba_match CASCADE;
+DROP SCHEMA IF EXISTS sk1_ext_match CASCADE;
+CREATE SCHEMA sk1_kba_match;
+CREATE SCHEMA sk1_ext_match;
+
+\echo ''
+\echo '--- GROUP M: hex_schema_matchningar ---'
+
+-- ============================================================
+-- M1: schema_uttryck för skapad_av ändras och återställs
+-- ============================================================
+DO $$
+DECLARE
+    uttryck     text;
+    fore        text[];
+    under       text[];
+    efter       text[];
+    rad_under   boolean;
+BEGIN
+    SELECT schema_uttryck INTO uttryck
+    FROM public.standardiserade_kolumner WHERE kolumnnamn = 'skapad_av';
+
+    fore := public.hamta_schema_matchningar('sk1_ext_match', 'kolumn');
+
+    UPDATE public.standardiserade_kolumner
+    SET schema_uttryck = 'IS NOT NULL'
+    WHERE kolumnnamn = 'skapad_av';
+
+    under := public.hamta_schema_matchningar('sk1_ext_match', 'kolumn');
+    SELECT matchar INTO rad_under
+    FROM public.hex_schema_matchningar
+    WHERE schema_namn = 'sk1_ext_match' AND kalla = 'kolumn' AND namn = 'skapad_av';
+
+    UPDATE public.standardiserade_kolumner
+    SET schema_uttryck = uttryck
+    WHERE kolumnnamn = 'skapad_av';
+
+    efter := public.hamta_schema_matchningar('sk1_ext_match', 'kolumn');
+
+    IF NOT 'skapad_av' = ANY(fore) AND 'skapad_av' = ANY(under) AND rad_under
+       AND NOT 'skapad_av' = ANY(efter) THEN
+        RAISE NOTICE 'TEST M1 PASSED: skapad_av matchar sk1_ext_match bara medan schema_uttryck = IS NOT NULL';
+    ELSE
+        RAISE WARNING 'TEST M1 FAILED: före=%, under=% (rad=%), efter=%', fore, under, rad_under, efter;
+    END IF;
+END $$;
+
+-- ============================================================
+-- M2: standardroll läggs till och tas bort
+-- ============================================================
+DO $$
+DECLARE
+    ext_under   text[];
+    kba_under   text[];
+    rader_efter integer;
+BEGIN
+    INSERT INTO public.standardiserade_roller (rollnamn, rolltyp, schema_uttryck, beskrivning)
+    VALUES ('m_test_{schema}', 'read', 'LIKE ''%_ext_match''', 'Testroll för test_schema_matchningar');
+
+    ext_under := public.hamta_schema_matchningar('sk1_ext_match', 'roll');
+    kba_under := public.hamta_schema_matchningar('sk1_kba_match', 'roll');
+
+    DELETE FROM public.standardiserade_roller WHERE rollnamn = 'm_test_{schema}';
+
+    SELECT count(*) INTO rader_efter
+    FROM public.hex_schema_matchningar
+    WHERE kalla = 'roll' AND namn = 'm_test_{schema}';
+
+    IF 'm_test_{schema}' = ANY(ext_under) AND NOT 'm_test_{schema}' = ANY(kba_under)
+       AND rader_efter = 0 THEN
+        RAISE NOTICE 'TEST M2 PASSED: ny roll matchade bara sk1_ext_match, raderna försvann med rollen';
+    ELSE
+        RAISE WARNING 'TEST M2 FAILED: ext=%, kba=%, rader kvar efter DELETE=%', ext_under, kba_under, rader_efter;
+    END IF;
+END $$;
+
+-- ============================================================
+-- M3: Cachemiss – raderna för ett schema saknas (som för ett schema som
+-- fanns före installationen) och evalueras vid första uppslaget
+-- ============================================================
+DO $$
+DECLARE
+    kolumner        text[];
+    kolumnrader     integer;
+    rollrader       integer;
+    standard        integer;
+BEGIN
+    DELETE FROM public.hex_schema_matchningar WHERE schema_namn = 'sk1_kba_match';
+
+    kolumner := public.hamta_schema_matchningar('sk1_kba_match', 'kolumn');
+
+    SELECT count(*) FILTER (WHERE kalla = 'kolumn'), count(*) FILTER (WHERE kalla = 'roll')
+    INTO kolumnrader, rollrader
+    FROM public.hex_schema_matchningar
+    WHERE schema_namn = 'sk1_kba_match';
+
+    SELECT count(*) INTO standard FROM public.standardiserade_kolumner;
+
+    IF kolumner @> ARRAY['gid', 'skapad_tidpunkt', 'skapad_av', 'andrad_tidpunkt', 'andrad_av']
+       AND kolumnrader = standard AND rollrader = 0 THEN
+        RAISE NOTICE 'TEST M3 PASSED: % kolumnrader evaluerade vid behov, inga rollrader', kolumnrader;
+    ELSE
+        RAISE WARNING 'TEST M3 FAILED: matchande=%, kolumnrader=% (förväntat %), rollrader=%',
+            kolumner, kolumnrader, standard, rollrader;
+    END IF;
+END $$;
+
+-- ============================================================
+-- M4: ADD COLUMN skapad_av på en _ext_-tabell
+-- skapad_av matchar inte _ext_ och ska ligga kvar där den lades till;
+-- bara skapad_tidpunkt och geom flyttas sist.
+-- ============================================================
+CREATE TABLE sk1_ext_match.objekt_p (
+    namn text,
+    geom geometry(Point, 3007)
+);
+
+ALTER TABLE sk1_ext_match.objekt_p ADD COLUMN skapad_av text;
+
+DO $$
+DECLARE
+    sista text[];
+BEGIN
+    SELECT array_agg(attname::text ORDER BY attnum) INTO sista
+    FROM (
+        SELECT attname, attnum FROM pg_attribute
+        WHERE attrelid = 'sk1_ext_match.objekt_p'::regclass AND attnum > 0 AND NOT attisdropped
+        ORDER BY attnum DESC LIMIT 3
+    ) s;
+
+    IF sista = ARRAY['skapad_av', 'skapad_tidpunkt', 'geom'] THEN
+        RAISE NOTICE 'TEST M4 PASSED: skapad_av flyttades inte på _ext_-tabellen (%)', sista;
+    ELSE
+        RAISE WARNING 'TEST M4 FAILED: sista kolumner %, förväntat {skapad_av,skapad_tidpunkt,geom}', sista;
+    END IF;
+END $$;
+
+-- ============================================================
+-- M5: DROP SCHEMA tar bort schemats matchningar
+-- ============================================================
+CREATE TEMP TABLE m_fore AS
+SELECT count(*) AS antal FROM public.hex_schema_matchningar WHERE schema_namn = 'sk1_ext_match';
+
+DROP SCHEMA sk1_ext_match CASCADE;
+
+DO $$
+DECLARE
+    fore    bigint;
+    efter   bigint;
+BEGIN
+    SELECT antal INTO fore FROM m_fore;
+    SELECT count(*) INTO efter FROM public.hex_schema_matchningar WHERE schema_namn = 'sk1_ext_match';
+
+    IF fore > 0 AND efter = 0 THEN
+        RAISE NOTICE 'TEST M5 PASSED: % rader borttagna med schemat', fore;
+    ELSE
+        RAISE WARNING 'TEST M5 FAILED: rader före DROP=%, efter=%', fore, efter;
+    END IF;
+END $$;
+
+-- ============================================================
+-- Cleanup
+-- ============================================================
+DROP TABLE m_fore;
+DROP SCHEMA IF EXISTS sk1_kba_match CASCADE;
+
+\echo ''
+\echo 'HEX SCHEMA_MATCHNINGAR COMPLETE'
+\echo 'NOTICE = PASSED/INFO,  WARNING = FAILED/BUG CONFIRMED'